@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Benchmark BaseExcelPreprocessor.finalize_output on a synthetic enriched frame.
+
+Compares the previous row-wise implementation (``pd.merge`` against the
+mapping sheet, ``Series.apply(convert_date)`` and the fillna/replace chain over
+object columns) with the current one, which applies the compiled mapping lookup,
+receives categorical metadata and Int32 counts from run_preprocessing, and
+checks both produce the same values. Also reports the in-memory size of each
+input and output frame.
+
+    python3 benchmarks/benchmark_finalize_output.py --rows 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
+from etl_preprocessing import (  # noqa: E402
+    DEFAULT_DIMENSION_VALUE,
+    STATE_VALUE_REPLACEMENTS,
+    BaseExcelPreprocessor,
+)
+from mapping_lookup import MappingLookup, compile_mapping_frame  # noqa: E402
+from pipeline_constants import (  # noqa: E402
+    COMMON_FUEL_COLUMN_RENAME_MAP,
+    MONTH_NAME_TO_NUMBER,
+    STATE_LIST,
+)
+from preprocessing_schema_utils import ensure_expected_output_columns  # noqa: E402
+from utils import convert_date  # noqa: E402
+
+VEHICLE_CLASSES = ["MOTOR CAR", "M-CYCLE/SCOOTER", "E-RICKSHAW(P)", "GOODS CARRIER", "BUS"]
+
+
+class BenchmarkPreprocessor(BaseExcelPreprocessor):
+    """RTO-shaped preprocessor with an in-memory mapping sheet."""
+
+    def __init__(self) -> None:
+        self.pipeline_label = "benchmark"
+        self.column_rename_map = {
+            "Year": "year",
+            "Month": "month",
+            "Day": "day",
+            "Date": "date",
+            "State": "state",
+            "rto_name": "rto_name",
+            "rto_code": "rto_code",
+            "Vehicle Type": "vehicle_type",
+            "Vehicle Category": "vehicle_category",
+            "Vehicle Use Type": "vehicle_use_type",
+            "Unnamed: 1": "vehicle_class",
+            **COMMON_FUEL_COLUMN_RENAME_MAP,
+        }
+        # One class is left unmapped and one maps to blanks so both
+        # defaulting paths are exercised.
+        self.mapping_df = pd.DataFrame(
+            {
+                "Vehicle Class": VEHICLE_CLASSES[:4],
+                "Vehicle Type": ["Passenger", "Passenger", "", "Goods"],
+                "Vehicle Category": ["Car", "Two Wheeler", "", "Truck"],
+                "Vehicle Use Type": ["Private", "Private", "", "Commercial"],
+            }
+        )
+        self.mapping_lookup = MappingLookup(compile_mapping_frame(self.mapping_df))
+        self.report_cache = None
+
+
+class RowWiseBenchmarkPreprocessor(BenchmarkPreprocessor):
+    """The finalize_output implementation that preceded vectorization."""
+
+    def apply_mapping(self, df: pd.DataFrame) -> pd.DataFrame:
+        return pd.merge(
+            df,
+            self.mapping_df,
+            left_on="Unnamed: 1",
+            right_on="Vehicle Class",
+            how="left",
+        )
+
+    def normalize_enriched_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        for column_name in ("Vehicle Type", "Vehicle Category", "Vehicle Use Type"):
+            if column_name in df.columns:
+                df[column_name] = (
+                    df[column_name]
+                    .fillna(DEFAULT_DIMENSION_VALUE)
+                    .replace("", DEFAULT_DIMENSION_VALUE)
+                )
+
+        if "State" in df.columns:
+            df["State"] = df["State"].replace(STATE_VALUE_REPLACEMENTS)
+
+        return df
+
+    def finalize_output(self, df, month, year, extra_columns=()):
+        df = self.apply_mapping(df)
+        df = self.normalize_enriched_frame(df)
+        df = df.rename(self.column_rename_map, axis=1)
+
+        if "date" in df.columns:
+            df["date"] = df["date"].apply(convert_date)
+
+        if "month" in df.columns:
+            df["month"] = df["month"].map(MONTH_NAME_TO_NUMBER)
+
+        df = ensure_expected_output_columns(
+            df,
+            self.output_columns,
+            f"{self.pipeline_label.upper()} preprocessing for {month} {year}",
+        )
+        return df[[*self.output_columns, *extra_columns]]
+
+
+def build_enriched_frame(rows: int, seed: int = 7) -> pd.DataFrame:
+    """Approximate the concatenated frame run_preprocessing hands to finalize_output."""
+    rng = np.random.default_rng(seed)
+    states = np.array([*STATE_LIST, *STATE_VALUE_REPLACEMENTS], dtype=object)
+    offices = np.array([f"Office{index}" for index in range(1400)], dtype=object)
+    office_index = rng.integers(0, len(offices), rows)
+
+    df = pd.DataFrame(
+        {
+            "Unnamed: 1": rng.choice(np.array(VEHICLE_CLASSES, dtype=object), rows),
+            **{
+                source_column: rng.integers(0, 500, rows)
+                for source_column in COMMON_FUEL_COLUMN_RENAME_MAP
+            },
+        }
+    )
+    df["Month"] = "JUN"
+    df["Year"] = "2026"
+    df["Day"] = 1
+    df["Date"] = "1/JUN/2026"
+    df["rto_name"] = offices[office_index]
+    df["rto_code"] = np.char.add("XX", office_index.astype(str)).astype(object)
+    df["State"] = rng.choice(states, rows)
+    return df
+
+
+def compact_enriched_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Mirror the dtypes run_preprocessing now builds before finalize_output."""
+    compact_df = df.copy()
+    for column_name in ("Month", "Year", "Day", "Date", "rto_name", "rto_code", "State"):
+        compact_df[column_name] = compact_df[column_name].astype("category")
+    for column_name in COMMON_FUEL_COLUMN_RENAME_MAP:
+        compact_df[column_name] = compact_df[column_name].astype("Int32")
+    return compact_df
+
+
+def frame_megabytes(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def time_finalize(preprocessor: BaseExcelPreprocessor, df: pd.DataFrame, repeat: int):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        frame = df.copy()
+        started_at = time.perf_counter()
+        result = preprocessor.finalize_output(frame, "JUN", "2026")
+        timings.append(time.perf_counter() - started_at)
+    return min(timings), result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    df = build_enriched_frame(args.rows)
+    compact_df = compact_enriched_frame(df)
+    row_wise_seconds, row_wise_result = time_finalize(
+        RowWiseBenchmarkPreprocessor(), df, args.repeat
+    )
+    vectorized_seconds, vectorized_result = time_finalize(
+        BenchmarkPreprocessor(), compact_df, args.repeat
+    )
+    # The current output uses categorical/Int32 dtypes; compare the values.
+    pd.testing.assert_frame_equal(
+        vectorized_result.astype(object),
+        row_wise_result.astype(object),
+    )
+
+    print(f"rows={args.rows} repeat={args.repeat} (best of)")
+    print(f"row_wise_seconds={row_wise_seconds:.3f}")
+    print(f"vectorized_seconds={vectorized_seconds:.3f}")
+    print(f"speedup={row_wise_seconds / vectorized_seconds:.1f}x")
+    print(
+        f"input_mb row_wise={frame_megabytes(df):.0f} compact={frame_megabytes(compact_df):.0f}"
+    )
+    print(
+        f"output_mb row_wise={frame_megabytes(row_wise_result):.0f} "
+        f"compact={frame_megabytes(vectorized_result):.0f}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
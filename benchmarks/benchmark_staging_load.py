@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark the executemany and table-valued-parameter staging loaders.
+
+Writes a synthetic RTO-shaped CSV, creates a scratch staging table in the
+database from config.yaml (point it at a local SQL Server container, not
+production), and times BaseSqlServerIngestor.load_staging_batches with each
+loader against the same rows. The scratch table and table type are dropped
+afterwards.
+
+    python3 benchmarks/benchmark_staging_load.py --rows 500000 --batch-rows 10000
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
+import etl_ingestion  # noqa: E402
+from etl_ingestion import (  # noqa: E402
+    EXECUTEMANY_STAGING_LOADER,
+    STAGING_LOADERS,
+    BaseSqlServerIngestor,
+)
+from pipeline_constants import COMMON_FUEL_COLUMN_RENAME_MAP, STATE_LIST  # noqa: E402
+
+BENCHMARK_TABLE_NAME = "benchmark_staging_load"
+DIMENSION_COLUMNS = [
+    "year",
+    "month",
+    "day",
+    "date",
+    "state",
+    "rto_name",
+    "rto_code",
+    "vehicle_type",
+    "vehicle_category",
+    "vehicle_use_type",
+    "vehicle_class",
+]
+VEHICLE_CLASSES = ["MOTOR CAR", "M-CYCLE/SCOOTER", "E-RICKSHAW(P)", "GOODS CARRIER", "BUS"]
+
+
+class BenchmarkIngestor(BaseSqlServerIngestor):
+    def __init__(self, batch_rows: int) -> None:
+        super().__init__(
+            file_prefix=BENCHMARK_TABLE_NAME,
+            staging_table_name=BENCHMARK_TABLE_NAME,
+            final_table_name=BENCHMARK_TABLE_NAME,
+            merge_key_columns=[],
+            missing_file_hint="benchmark_staging_load.py",
+        )
+        self.batch_rows = batch_rows
+
+
+def write_rto_csv(csv_path: Path, rows: int, seed: int = 7) -> list[str]:
+    """Write an RTO-output-shaped CSV, with some blank counts, and return its header."""
+    rng = np.random.default_rng(seed)
+    count_columns = list(COMMON_FUEL_COLUMN_RENAME_MAP.values())
+    headers = [*DIMENSION_COLUMNS, *count_columns]
+    with open(csv_path, "w", encoding="utf-8", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(headers)
+        for row_number in range(rows):
+            office = int(rng.integers(0, 1400))
+            counts = rng.integers(0, 500, len(count_columns))
+            writer.writerow(
+                [
+                    "2026",
+                    "6",
+                    str(row_number % 30 + 1),
+                    f"2026-06-{row_number % 30 + 1:02d}",
+                    STATE_LIST[office % len(STATE_LIST)],
+                    f"Office{office}",
+                    f"XX{office}",
+                    "Passenger",
+                    "Car",
+                    "Private",
+                    VEHICLE_CLASSES[row_number % len(VEHICLE_CLASSES)],
+                    *("" if count == 0 else str(count) for count in counts),
+                ]
+            )
+    return headers
+
+
+def time_loader(ingestor: BenchmarkIngestor, conn, csv_path: Path, loader: str):
+    ingestor.staging_loader = loader
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"TRUNCATE TABLE {BENCHMARK_TABLE_NAME}")
+        conn.commit()
+        with ingestor.open_csv_rows(str(csv_path)) as (headers, rows):
+            started_at = time.perf_counter()
+            staged_rows = ingestor.load_staging_batches(
+                conn, cursor, headers, ingestor.iter_row_batches(rows)
+            )
+            return staged_rows, time.perf_counter() - started_at
+    finally:
+        cursor.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch-rows", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    if etl_ingestion.pyodbc is None:
+        print("pyodbc is not installed; this benchmark needs a SQL Server connection.")
+        return 1
+
+    ingestor = BenchmarkIngestor(args.batch_rows)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = Path(tmpdir) / f"{BENCHMARK_TABLE_NAME}.csv"
+        headers = write_rto_csv(csv_path, args.rows)
+        type_name = ingestor.build_staging_table_type_name()
+        column_definitions = ", ".join(f"[{column}] NVARCHAR(MAX) NULL" for column in headers)
+
+        conn = ingestor.connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                f"IF OBJECT_ID('dbo.{BENCHMARK_TABLE_NAME}') IS NOT NULL "
+                f"DROP TABLE dbo.{BENCHMARK_TABLE_NAME}"
+            )
+            cursor.execute(
+                f"CREATE TABLE dbo.{BENCHMARK_TABLE_NAME} "
+                f"({column_definitions}, inserted_at DATETIME NULL)"
+            )
+            # Production types come from the staging table type migration;
+            # the scratch table gets its own here.
+            cursor.execute(f"DROP TYPE IF EXISTS dbo.{type_name}")
+            cursor.execute(f"CREATE TYPE dbo.{type_name} AS TABLE ({column_definitions})")
+            conn.commit()
+
+            print(f"rows={args.rows} batch_rows={args.batch_rows}")
+            timings = {}
+            for loader in STAGING_LOADERS:
+                staged_rows, seconds = time_loader(ingestor, conn, csv_path, loader)
+                if staged_rows != args.rows:
+                    raise RuntimeError(f"{loader} staged {staged_rows} of {args.rows} rows")
+                timings[loader] = seconds
+                print(f"{loader}_seconds={seconds:.3f} rows_per_second={args.rows / seconds:,.0f}")
+
+            baseline = timings[EXECUTEMANY_STAGING_LOADER]
+            for loader, seconds in timings.items():
+                if loader != EXECUTEMANY_STAGING_LOADER:
+                    print(f"{loader}_speedup={baseline / seconds:.1f}x")
+        finally:
+            cursor.execute(f"DROP TABLE IF EXISTS dbo.{BENCHMARK_TABLE_NAME}")
+            cursor.execute(f"DROP TYPE IF EXISTS dbo.{type_name}")
+            conn.commit()
+            cursor.close()
+            conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
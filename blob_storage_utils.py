@@ -1,3 +1,4 @@
+import glob
 import logging
 import os
 
@@ -90,3 +91,34 @@ def upload_matching_csv_artifact(
     logging.info("Uploaded %s to %s/%s", csv_file_path, csv_container_name, csv_file)
     os.remove(csv_file_path)
     return csv_file
+
+
+def upload_parquet_partitions(
+    *,
+    dataset_dir,
+    partition_dirs,
+    container_client,
+    container_name,
+):
+    """
+    Upload each local Parquet partition under ``<dataset>/<partition>/``,
+    first deleting that prefix's existing blobs so a rerun leaves no stale
+    files, then delete the local copies.
+    """
+    blob_root = os.path.dirname(os.path.abspath(dataset_dir))
+    uploaded_files = 0
+    for partition_dir in partition_dirs:
+        blob_prefix = (
+            os.path.relpath(partition_dir, blob_root).replace("\\", "/") + "/"
+        )
+        for blob in container_client.list_blobs(name_starts_with=blob_prefix):
+            container_client.delete_blob(blob.name)
+
+        uploaded_files += upload_globbed_files_to_container(
+            sorted(glob.glob(os.path.join(partition_dir, "*.parquet"))),
+            relative_root=blob_root,
+            container_client=container_client,
+        )
+        logging.info("Replaced Parquet partition %s/%s", container_name, blob_prefix)
+
+    return uploaded_files
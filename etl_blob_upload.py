@@ -13,7 +13,10 @@ from blob_storage_utils import (
     ensure_container_exists,
     upload_globbed_files_to_container,
     upload_matching_csv_artifact,
+    upload_parquet_partitions,
 )
+from parquet_output import build_parquet_dataset_path, iter_month_partitions
+from pipeline_constants import MONTH_NAME_TO_NUMBER
 from runtime_config import load_config
 
 
@@ -27,6 +30,7 @@ def upload_pipeline_artifacts(
     csv_container_config_key: str,
     csv_prefix: str,
     processed_file_directory: str | Path | None = None,
+    parquet_file_prefix: str | None = None,
 ):
     config = load_config()
 
@@ -48,11 +52,27 @@ def upload_pipeline_artifacts(
         container_client=container_client,
     )
 
+    processed_file_directory = Path(processed_file_directory or Path.cwd())
     uploaded_csv_name = upload_matching_csv_artifact(
-        processed_file_directory=str(processed_file_directory or Path.cwd()),
+        processed_file_directory=str(processed_file_directory),
         csv_prefix=csv_prefix.format(month=month, year=year),
         csv_container_client=csv_container_client,
         csv_container_name=csv_container_name,
     )
 
+    if parquet_file_prefix is not None:
+        # The month's Parquet partitions, when preprocessing wrote them, go
+        # to the CSV container as one dataset across months.
+        dataset_dir = build_parquet_dataset_path(processed_file_directory, parquet_file_prefix)
+        upload_parquet_partitions(
+            dataset_dir=dataset_dir,
+            partition_dirs=iter_month_partitions(
+                dataset_dir,
+                year,
+                MONTH_NAME_TO_NUMBER[month],
+            ),
+            container_client=csv_container_client,
+            container_name=csv_container_name,
+        )
+
     return uploaded_raw_files, uploaded_csv_name
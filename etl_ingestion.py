@@ -3,6 +3,9 @@ from __future__ import annotations
 import csv
 import logging
 import os
+import time
+from contextlib import ExitStack, contextmanager
+from itertools import chain, islice
 from pathlib import Path
 
 try:
@@ -12,10 +15,71 @@ except ImportError:  # pragma: no cover - pyodbc needs system ODBC libs absent i
     pyodbc = None
 
 from runtime_config import load_config
-from sqlserver_utils import connect_with_retry
+from sqlserver_utils import SqlServerConnectionPool, connect_with_retry
 
 logger = logging.getLogger(__name__)
 
+INGEST_BATCH_ROWS_ENV_VAR = "VAHAN_INGEST_BATCH_ROWS"
+DEFAULT_INGEST_BATCH_ROWS = 10_000
+STAGING_LOADER_ENV_VAR = "VAHAN_STAGING_LOADER"
+EXECUTEMANY_STAGING_LOADER = "executemany"
+TVP_STAGING_LOADER = "tvp"
+STAGING_LOADERS = (EXECUTEMANY_STAGING_LOADER, TVP_STAGING_LOADER)
+
+# How staged rows replace the final table; each pipeline picks one.
+DELETE_INSERT_FINAL_WRITE = "delete_insert"
+MERGE_FINAL_WRITE = "merge"
+MONTH_RANGE_FINAL_WRITE = "month_range"
+FINAL_WRITE_MODES = (
+    DELETE_INSERT_FINAL_WRITE,
+    MERGE_FINAL_WRITE,
+    MONTH_RANGE_FINAL_WRITE,
+)
+DEFAULT_MONTH_RANGE_COLUMNS = ("year", "month")
+
+STAGING_TABLE_TYPE_COLUMNS_QUERY = """
+    SELECT c.name
+    FROM sys.table_types AS t
+    JOIN sys.columns AS c ON c.object_id = t.type_table_object_id
+    WHERE t.schema_id = SCHEMA_ID('dbo') AND t.name = ?
+    ORDER BY c.column_id
+    """
+
+
+def get_ingest_batch_rows(database_config=None) -> int:
+    """``VAHAN_INGEST_BATCH_ROWS`` overrides ``database.ingest_batch_rows``."""
+    raw_value = os.getenv(INGEST_BATCH_ROWS_ENV_VAR)
+    if raw_value is None:
+        raw_value = (database_config or {}).get("ingest_batch_rows")
+
+    raw_value = str(raw_value if raw_value is not None else "").strip()
+    if not raw_value:
+        return DEFAULT_INGEST_BATCH_ROWS
+    try:
+        return max(1, int(raw_value))
+    except ValueError as exc:
+        raise ValueError(
+            f"Invalid ingestion batch size {raw_value!r}; expected an integer."
+        ) from exc
+
+
+def get_staging_loader(database_config=None) -> str:
+    """``VAHAN_STAGING_LOADER`` overrides ``database.staging_loader``."""
+    raw_value = os.getenv(STAGING_LOADER_ENV_VAR)
+    if raw_value is None:
+        raw_value = (database_config or {}).get("staging_loader")
+
+    loader = str(raw_value or EXECUTEMANY_STAGING_LOADER).strip().lower()
+    if loader not in STAGING_LOADERS:
+        raise ValueError(
+            f"Invalid staging loader {raw_value!r}; expected one of {', '.join(STAGING_LOADERS)}."
+        )
+    return loader
+
+
+def database_error_types() -> tuple[type[BaseException], ...]:
+    return (pyodbc.Error,) if pyodbc is not None else ()
+
 
 class BaseSqlServerIngestor:
     def __init__(
@@ -26,57 +90,109 @@ class BaseSqlServerIngestor:
         final_table_name: str,
         merge_key_columns: list[str],
         missing_file_hint: str,
+        final_write_mode: str = DELETE_INSERT_FINAL_WRITE,
+        month_range_columns: tuple[str, ...] = DEFAULT_MONTH_RANGE_COLUMNS,
     ) -> None:
+        if final_write_mode not in FINAL_WRITE_MODES:
+            raise ValueError(
+                f"Invalid final write mode {final_write_mode!r}; expected one of {', '.join(FINAL_WRITE_MODES)}."
+            )
         config = load_config()
         self.database_host = config["database"]["server"]
         self.database_name = config["database"]["database"]
         self.database_username = config["database"]["username"]
         self.database_password = config["database"]["password"]
+        self.batch_rows = get_ingest_batch_rows(config["database"])
+        self.staging_loader = get_staging_loader(config["database"])
 
         self.file_prefix = file_prefix
         self.staging_table_name = staging_table_name
         self.final_table_name = final_table_name
         self.merge_key_columns = list(merge_key_columns)
         self.missing_file_hint = missing_file_hint
+        self.final_write_mode = final_write_mode
+        self.month_range_columns = tuple(month_range_columns)
 
         self.driver = "{ODBC Driver 18 for SQL Server}"
         self.sql_attr_connection_timeout = 113
         self.login_timeout = 30
         self.connection_timeout = 30
+        # Connections are kept for the ingestor's lifetime so multi-month
+        # loads log in once; close() (or leaving a with block) releases them.
+        self.connection_pool = SqlServerConnectionPool(
+            lambda: self._open_connection(),
+            logger=logger,
+            connection_error_types=database_error_types(),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
 
     def connect(self):
+        """Open a new, unpooled connection, retrying transient login failures."""
         return connect_with_retry(
-            lambda: pyodbc.connect(
-                driver=self.driver,
-                server=self.database_host,
-                database=self.database_name,
-                uid=self.database_username,
-                pwd=self.database_password,
-                timeout=self.login_timeout,
-                attrs_before={
-                    self.sql_attr_connection_timeout: self.connection_timeout
-                },
-            ),
+            self._open_connection,
             logger=logger,
-            connection_error_types=(pyodbc.Error,),
+            connection_error_types=database_error_types(),
         )
 
+    def _open_connection(self):
+        # The pool retries around this itself, so it must not retry again.
+        return pyodbc.connect(
+            driver=self.driver,
+            server=self.database_host,
+            database=self.database_name,
+            uid=self.database_username,
+            pwd=self.database_password,
+            timeout=self.login_timeout,
+            attrs_before={
+                self.sql_attr_connection_timeout: self.connection_timeout
+            },
+        )
+
+    def close(self) -> None:
+        self.connection_pool.close()
+
     def build_file_path(self, month: str, year: str) -> str:
         return f"{self.file_prefix}_{month}_{year}.csv"
 
-    def load_csv_rows(self, file_path: str):
+    @contextmanager
+    def open_csv_rows(self, file_path: str):
+        """Yield the CSV header and a lazy iterator of row tuples, with blanks as NULL."""
         if not os.path.exists(file_path):
             raise FileNotFoundError(
                 f"the file {file_path} does not exist. did you run {self.missing_file_hint} yet?"
             )
 
-        data = []
-        with open(file_path, "r", encoding="utf-8") as csv_file:
+        with open(file_path, "r", encoding="utf-8", newline="") as csv_file:
             csv_reader = csv.reader(csv_file)
             headers = next(csv_reader)
-            for row in csv_reader:
-                data.append(tuple(value if value != "" else None for value in row))
-        return headers, data
+            yield headers, (
+                tuple(value if value != "" else None for value in row)
+                for row in csv_reader
+            )
+
+    def load_csv_rows(self, file_path: str):
+        with self.open_csv_rows(file_path) as (headers, rows):
+            return headers, list(rows)
+
+    def iter_row_batches(self, rows):
+        while True:
+            batch = list(islice(rows, self.batch_rows))
+            if not batch:
+                return
+            yield batch
+
+    def build_staging_insert_query(self, headers: list[str]) -> str:
+        columns = ", ".join(headers)
+        placeholders = ", ".join(["?" for _ in headers])
+        return (
+            f"INSERT INTO {self.staging_table_name} "
+            f"({columns}, inserted_at) VALUES ({placeholders}, GETDATE())"
+        )
 
     def build_delete_query(self) -> str:
         delete_conditions = " AND ".join(
@@ -91,55 +207,305 @@ class BaseSqlServerIngestor:
             )
             """
 
-    def data_ingest_from_file(self, file_path: str | Path) -> int:
-        headers, data = self.load_csv_rows(str(file_path))
-        if not data:
+    def build_merge_query(self, headers: list[str]) -> str:
+        """
+        Upsert staging into the final table on ``merge_key_columns`` in one
+        statement. Staged rows sharing a key are reduced to one first, since
+        MERGE rejects a target row matched more than once; matched rows keep
+        their original ``inserted_at``.
+        """
+        key_columns = ", ".join(self.merge_key_columns)
+        match_conditions = " AND ".join(
+            f"target.{column_name} = source.{column_name}"
+            for column_name in self.merge_key_columns
+        )
+        insert_columns = [*headers, "inserted_at"]
+        update_assignments = ", ".join(
+            f"target.{column_name} = source.{column_name}"
+            for column_name in headers
+            if column_name not in self.merge_key_columns
+        )
+        matched_clause = (
+            f"""
+            WHEN MATCHED THEN
+                UPDATE SET {update_assignments}"""
+            if update_assignments
+            else ""
+        )
+        return f"""
+            WITH staged_rows AS (
+                SELECT {", ".join(insert_columns)},
+                    ROW_NUMBER() OVER (
+                        PARTITION BY {key_columns} ORDER BY inserted_at DESC
+                    ) AS staged_row_number
+                FROM {self.staging_table_name}
+            )
+            MERGE {self.final_table_name} AS target
+            USING (
+                SELECT {", ".join(insert_columns)}
+                FROM staged_rows
+                WHERE staged_row_number = 1
+            ) AS source
+            ON {match_conditions}{matched_clause}
+            WHEN NOT MATCHED BY TARGET THEN
+                INSERT ({", ".join(insert_columns)})
+                VALUES ({", ".join(f"source.{column_name}" for column_name in insert_columns)});
+            """
+
+    def load_staged_month_ranges(self, cursor) -> list[tuple]:
+        columns = ", ".join(self.month_range_columns)
+        cursor.execute(f"SELECT DISTINCT {columns} FROM {self.staging_table_name}")
+        return [tuple(row) for row in cursor.fetchall()]
+
+    def build_month_range_delete_query(self) -> str:
+        conditions = " AND ".join(
+            f"{column_name} = ?" for column_name in self.month_range_columns
+        )
+        return f"DELETE FROM {self.final_table_name} WHERE {conditions}"
+
+    def build_staging_table_type_name(self) -> str:
+        return f"{self.staging_table_name}_rows"
+
+    def find_staging_table_type(self, cursor, headers: list[str]) -> str | None:
+        """
+        Return the TVP table type for this staging table if it exists and its
+        columns match ``headers``. The types ship in
+        sql/migrations/2026-10-18_staging_table_types.sql; the ingest login
+        only needs to read their definitions.
+        """
+        type_name = self.build_staging_table_type_name()
+        cursor.execute(STAGING_TABLE_TYPE_COLUMNS_QUERY, type_name)
+        type_columns = [row[0] for row in cursor.fetchall()]
+        if not type_columns:
             logger.warning(
-                "No rows found in %s. Skipping database ingestion for this file.",
-                file_path,
+                "Table type dbo.%s is missing; apply the staging table type migration. "
+                "Falling back to executemany staging load table=%s",
+                type_name,
+                self.staging_table_name,
             )
-            return 0
+            return None
+        if type_columns != list(headers):
+            logger.warning(
+                "Table type dbo.%s columns do not match the CSV header. "
+                "Falling back to executemany staging load table=%s",
+                type_name,
+                self.staging_table_name,
+            )
+            return None
+        return type_name
+
+    def build_staging_tvp_insert_query(self, headers: list[str]) -> str:
+        columns = ", ".join(headers)
+        return (
+            f"INSERT INTO {self.staging_table_name} ({columns}, inserted_at) "
+            f"SELECT {columns}, GETDATE() FROM ?"
+        )
 
-        logger.info("Connecting to the database...")
-        conn = self.connect()
-        cursor = conn.cursor()
+    def load_staging_batches(self, conn, cursor, headers: list[str], batches) -> int:
+        """
+        Insert row batches into the truncated staging table, committing each
+        batch so neither memory nor the open transaction grows with the file.
+        The final table is untouched until every batch has loaded.
 
-        try:
-            logger.info("Truncating staging table: %s", self.staging_table_name)
-            cursor.execute(f"TRUNCATE TABLE {self.staging_table_name}")
+        With the ``tvp`` loader each batch is sent as one table-valued
+        parameter; if the table type is missing or does not match the CSV, or
+        the first batch is rejected, the load falls back to ``fast_executemany``.
+        """
+        insert_query = self.build_staging_insert_query(headers)
+        loader = self.staging_loader
+        tvp_query = None
+        tvp_type_name = None
+        if loader == TVP_STAGING_LOADER:
+            try:
+                tvp_type_name = self.find_staging_table_type(cursor, headers)
+            except database_error_types() as exc:
+                logger.warning(
+                    "Falling back to executemany staging load table=%s reason=%s",
+                    self.staging_table_name,
+                    exc,
+                )
+            if tvp_type_name is None:
+                loader = EXECUTEMANY_STAGING_LOADER
+            else:
+                tvp_query = self.build_staging_tvp_insert_query(headers)
+        # fast_executemany only affects executemany, not the TVP execute.
+        cursor.fast_executemany = loader == EXECUTEMANY_STAGING_LOADER
 
-            columns = ", ".join(headers)
-            placeholders = ", ".join(["?" for _ in headers])
-            insert_query = (
-                f"INSERT INTO {self.staging_table_name} "
-                f"({columns}, inserted_at) VALUES ({placeholders}, GETDATE())"
+        staged_rows = 0
+        for batch_number, batch in enumerate(batches, start=1):
+            started_at = time.perf_counter()
+            if loader == TVP_STAGING_LOADER:
+                try:
+                    # pyodbc reads the table type name and schema from the
+                    # leading strings of a TVP sequence.
+                    cursor.execute(tvp_query, ([tvp_type_name, "dbo", *batch],))
+                except database_error_types() as exc:
+                    if staged_rows:
+                        raise
+                    conn.rollback()
+                    logger.warning(
+                        "Falling back to executemany staging load table=%s reason=%s",
+                        self.staging_table_name,
+                        exc,
+                    )
+                    loader = EXECUTEMANY_STAGING_LOADER
+                    cursor.fast_executemany = True
+            if loader == EXECUTEMANY_STAGING_LOADER:
+                cursor.executemany(insert_query, batch)
+            conn.commit()
+            staged_rows += len(batch)
+            logger.info(
+                "Inserted staging batch table=%s loader=%s batch=%s rows=%s total_rows=%s seconds=%.2f",
+                self.staging_table_name,
+                loader,
+                batch_number,
+                len(batch),
+                staged_rows,
+                time.perf_counter() - started_at,
             )
+        return staged_rows
 
-            logger.info("Inserting data into staging table: %s", self.staging_table_name)
-            cursor.fast_executemany = True
-            cursor.executemany(insert_query, data)
+    def replace_final_rows(self, conn, cursor, headers: list[str]) -> None:
+        """
+        Swap the staged rows into the final table in a single transaction,
+        using the pipeline's ``final_write_mode``:
+
+        - ``delete_insert`` deletes final rows whose merge keys are staged;
+        - ``merge`` upserts on the merge keys with one ``MERGE``, so unchanged
+          keys are updated in place instead of deleted and reinserted;
+        - ``month_range`` deletes every final row in each staged
+          ``month_range_columns`` value, e.g. (year, month, state), so a rerun
+          replaces whole months. Rows missing from a partial CSV (failed
+          offices or categories) are removed too, so only use it where the
+          CSV always covers the full month.
+        """
+        started_at = time.perf_counter()
+        if self.final_write_mode == MERGE_FINAL_WRITE:
+            logger.info("Merging staging table into final table: %s", self.final_table_name)
+            cursor.execute(self.build_merge_query(headers))
             conn.commit()
+            logger.info(
+                "Replaced final rows table=%s mode=%s seconds=%.2f",
+                self.final_table_name,
+                self.final_write_mode,
+                time.perf_counter() - started_at,
+            )
+            return
 
+        if self.final_write_mode == MONTH_RANGE_FINAL_WRITE:
+            month_ranges = self.load_staged_month_ranges(cursor)
+            logger.info(
+                "Deleting existing records from final table: %s ranges=%s",
+                self.final_table_name,
+                len(month_ranges),
+            )
+            delete_query = self.build_month_range_delete_query()
+            for month_range in month_ranges:
+                cursor.execute(delete_query, *month_range)
+        else:
             logger.info(
                 "Deleting existing records from final table: %s", self.final_table_name
             )
             cursor.execute(self.build_delete_query())
 
-            transfer_query = f"""
+        transfer_query = f"""
             INSERT INTO {self.final_table_name}
             SELECT * FROM {self.staging_table_name}
             """
-            logger.info(
-                "Transferring data from staging table to final table: %s",
-                self.final_table_name,
-            )
-            cursor.execute(transfer_query)
-            conn.commit()
-        finally:
-            cursor.close()
-            conn.close()
+        logger.info(
+            "Transferring data from staging table to final table: %s",
+            self.final_table_name,
+        )
+        cursor.execute(transfer_query)
+        conn.commit()
+        logger.info(
+            "Replaced final rows table=%s mode=%s seconds=%.2f",
+            self.final_table_name,
+            self.final_write_mode,
+            time.perf_counter() - started_at,
+        )
+
+    def ingest_many(self, file_paths) -> dict[str, int]:
+        """
+        Load several CSVs with the same header into staging, one after the
+        other after a single truncate, then replace the final rows for all of
+        them in one transaction. Returns the staged row count per file path;
+        files without rows count as 0 and the database is not touched if
+        every file is empty.
+        """
+        file_paths = list(dict.fromkeys(str(file_path) for file_path in file_paths))
+        row_counts = {}
+        headers = None
+        started_at = time.perf_counter()
+
+        with ExitStack() as stack:
+            conn = cursor = None
+            for file_path in file_paths:
+                with self.open_csv_rows(file_path) as (file_headers, rows):
+                    batches = self.iter_row_batches(rows)
+                    first_batch = next(batches, None)
+                    if first_batch is None:
+                        logger.warning(
+                            "No rows found in %s. Skipping database ingestion for this file.",
+                            file_path,
+                        )
+                        row_counts[file_path] = 0
+                        continue
 
-        return len(data)
+                    if cursor is None:
+                        logger.info("Connecting to the database...")
+                        conn = stack.enter_context(self.connection_pool.connection())
+                        cursor = conn.cursor()
+                        stack.callback(cursor.close)
+                        headers = file_headers
+
+                        logger.info("Truncating staging table: %s", self.staging_table_name)
+                        cursor.execute(f"TRUNCATE TABLE {self.staging_table_name}")
+                        # Committed on its own so a rolled-back batch cannot
+                        # bring back the previous run's staged rows.
+                        conn.commit()
+                        logger.info(
+                            "Inserting data into staging table: %s batch_rows=%s",
+                            self.staging_table_name,
+                            self.batch_rows,
+                        )
+                    elif file_headers != headers:
+                        raise ValueError(
+                            f"CSV header of {file_path} does not match the first file loaded into "
+                            f"{self.staging_table_name}; ingest_many needs files from one pipeline."
+                        )
+
+                    file_started_at = time.perf_counter()
+                    row_counts[file_path] = self.load_staging_batches(
+                        conn,
+                        cursor,
+                        headers,
+                        chain([first_batch], batches),
+                    )
+                    logger.info(
+                        "Loaded staging table=%s file=%s rows=%s seconds=%.2f",
+                        self.staging_table_name,
+                        file_path,
+                        row_counts[file_path],
+                        time.perf_counter() - file_started_at,
+                    )
+
+            if cursor is None:
+                return row_counts
+
+            self.replace_final_rows(conn, cursor, headers)
+
+        logger.info(
+            "Ingested files=%s staged_rows=%s table=%s seconds=%.2f",
+            len(file_paths),
+            sum(row_counts.values()),
+            self.final_table_name,
+            time.perf_counter() - started_at,
+        )
+        return row_counts
+
+    def data_ingest_from_file(self, file_path: str | Path) -> int:
+        return self.ingest_many([file_path])[str(file_path)]
 
     def data_ingest(self, month: str, year: str) -> int:
         return self.data_ingest_from_file(self.build_file_path(month, year))
@@ -1,24 +1,73 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from dataclasses import dataclass
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import groupby
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Iterable, Iterator
 
+import numpy as np
 import pandas as pd
 
-from pipeline_constants import MONTH_NAME_TO_NUMBER
+from mapping_lookup import MappingLookup
+from parquet_output import PartitionedParquetWriter, build_parquet_dataset_path
+from parsed_report_cache import ParsedReportCache
+from pipeline_constants import COMMON_FUEL_COLUMN_RENAME_MAP, MONTH_NAME_TO_NUMBER
+from preprocessing_manifest import (
+    PreprocessingSnapshot,
+    classify_reports,
+    load_snapshot,
+    save_snapshot,
+)
+from runtime_config import load_config
 from preprocessing_schema_utils import (
     ensure_expected_output_columns,
     find_unexpected_source_columns,
 )
-from utils import convert_date, is_valid_excel_download
+from utils import compute_file_sha256, convert_date, is_truthy, is_valid_excel_download
+from xlsx_report_reader import (
+    STREAMING_XLSX_READER,
+    InvalidWorkbookError,
+    UnsupportedWorkbookError,
+    get_xlsx_reader,
+    read_report_table,
+)
 
 DEFAULT_DIMENSION_VALUE = "Others"
 STATE_VALUE_REPLACEMENTS = {
     "Andaman   Nicobar Island": "Andaman and Nicobar",
     "UT of DNH and DD": "Dadara and Nagar Havelli",
 }
+# Bump when _parse_report output changes so cached parsed workbooks are ignored.
+PREPROCESSOR_VERSION = "2"
+# Vahan renders large counts as "1,234" text cells.
+REPORT_THOUSANDS_SEPARATOR = ","
+COUNT_DTYPE = "Int32"
+PREPROCESSING_WORKERS_ENV_VAR = "VAHAN_PREPROCESSING_WORKERS"
+AUTO_PREPROCESSING_WORKERS = "auto"
+# Each worker receives several workbooks per round trip to amortise pickling,
+# and only a few round trips per worker are in flight so parsed frames do not
+# pile up ahead of the consumer.
+PREPROCESSING_CHUNKS_PER_WORKER = 4
+PREPROCESSING_MAX_CHUNKSIZE = 16
+PREPROCESSING_MAX_CHUNKS_IN_FLIGHT_PER_WORKER = 2
+PREPROCESSING_INCREMENTAL_ENV_VAR = "VAHAN_PREPROCESSING_INCREMENTAL"
+DEFAULT_PREPROCESSING_STATE_DIRNAME = "preprocessing_state"
+# Snapshot-only column tying each output row to the report it came from.
+REPORT_KEY_COLUMN = "_report_path"
+PREPROCESSING_STREAMING_OUTPUT_ENV_VAR = "VAHAN_PREPROCESSING_STREAMING_OUTPUT"
+PREPROCESSING_OUTPUT_BATCH_ROWS_ENV_VAR = "VAHAN_PREPROCESSING_OUTPUT_BATCH_ROWS"
+DEFAULT_OUTPUT_BATCH_ROWS = 50_000
+PREPROCESSING_PARQUET_OUTPUT_ENV_VAR = "VAHAN_PREPROCESSING_PARQUET_OUTPUT"
+
+_worker_preprocessor: BaseExcelPreprocessor | None = None
 
 
 @dataclass(frozen=True)
@@ -28,7 +77,185 @@ class ReportContext:
     labels: dict[str, str]
 
 
+@dataclass(frozen=True)
+class ReportLoadResult:
+    frame: pd.DataFrame | None
+    unexpected_source_columns: frozenset[str]
+
+
+def load_preprocessing_config():
+    try:
+        return load_config().get("preprocessing") or {}
+    except FileNotFoundError:
+        return {}
+
+
+def get_preprocessing_workers(preprocessing_config=None) -> int:
+    """
+    Return how many processes read workbooks in parallel.
+
+    ``VAHAN_PREPROCESSING_WORKERS`` overrides ``preprocessing.workers`` in
+    config.yaml. ``auto`` uses every CPU core; unset, ``0`` or ``1`` keeps the
+    serial loop.
+    """
+    raw_value = os.getenv(PREPROCESSING_WORKERS_ENV_VAR)
+    if raw_value is None:
+        if preprocessing_config is None:
+            preprocessing_config = load_preprocessing_config()
+        raw_value = preprocessing_config.get("workers")
+
+    raw_value = str(raw_value if raw_value is not None else "").strip().lower()
+    if not raw_value:
+        return 1
+    if raw_value == AUTO_PREPROCESSING_WORKERS:
+        return os.cpu_count() or 1
+    try:
+        return max(1, int(raw_value))
+    except ValueError as exc:
+        raise ValueError(
+            f"Invalid preprocessing worker count {raw_value!r}; expected an integer or 'auto'."
+        ) from exc
+
+
+def map_unique_values(series: pd.Series, func, na_value=np.nan) -> pd.Series:
+    """
+    Apply ``func`` once per distinct non-null value and broadcast the results;
+    nulls become ``na_value``. Categorical input stays categorical.
+    """
+    is_categorical = isinstance(series.dtype, pd.CategoricalDtype)
+    if is_categorical:
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    converted = np.empty(len(uniques) + 1, dtype=object)
+    converted[:-1] = [func(value) for value in uniques]
+    converted[-1] = na_value
+
+    if is_categorical:
+        converted_codes, categories = pd.factorize(converted)
+        return pd.Series(
+            pd.Categorical.from_codes(converted_codes[codes], categories),
+            index=series.index,
+            name=series.name,
+        )
+    return pd.Series(converted[codes], index=series.index, name=series.name)
+
+
+def to_sorted_categorical(series: pd.Series) -> pd.Series:
+    """Categorical with only the observed values, in sorted order, so equal data compares equal."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype("category")
+
+    categories = series.cat.categories
+    codes = series.cat.codes.to_numpy()
+    observed = np.bincount(codes[codes >= 0], minlength=len(categories)).astype(bool)
+    observed_categories = list(categories[observed])
+    try:
+        sorted_categories = sorted(observed_categories)
+    except TypeError:
+        sorted_categories = sorted(observed_categories, key=str)
+    # Infer the categories' dtype from their values: the same day numbers
+    # arrive as object from report metadata and as int64 from a Parquet
+    # snapshot, and both must yield the same frame.
+    sorted_categories = pd.Index(sorted_categories)
+    if (
+        observed.all()
+        and sorted_categories.dtype == categories.dtype
+        and sorted_categories.equals(categories)
+    ):
+        return series
+
+    # Remap codes through a lookup table rather than
+    # remove_unused_categories/reorder_categories, which sort every row.
+    new_positions = {category: position for position, category in enumerate(sorted_categories)}
+    code_map = np.full(len(categories) + 1, -1, dtype=np.int64)
+    for old_code in np.flatnonzero(observed):
+        code_map[old_code] = new_positions[categories[old_code]]
+    return pd.Series(
+        pd.Categorical.from_codes(code_map[codes], sorted_categories),
+        index=series.index,
+        name=series.name,
+    )
+
+
+def to_compact_counts(series: pd.Series) -> pd.Series:
+    if series.dtype == COUNT_DTYPE:
+        return series
+    return pd.to_numeric(series).astype(COUNT_DTYPE)
+
+
+def _default_blank_dimension(value):
+    return DEFAULT_DIMENSION_VALUE if value == "" else value
+
+
+def _replace_state_value(value):
+    return STATE_VALUE_REPLACEMENTS.get(value, value)
+
+
+def is_incremental_preprocessing_enabled(preprocessing_config=None) -> bool:
+    """``VAHAN_PREPROCESSING_INCREMENTAL`` overrides ``preprocessing.incremental``."""
+    raw_value = os.getenv(PREPROCESSING_INCREMENTAL_ENV_VAR)
+    if raw_value is None:
+        if preprocessing_config is None:
+            preprocessing_config = load_preprocessing_config()
+        raw_value = preprocessing_config.get("incremental", False)
+    return is_truthy(raw_value)
+
+
+def is_streaming_output_enabled(preprocessing_config=None) -> bool:
+    """``VAHAN_PREPROCESSING_STREAMING_OUTPUT`` overrides ``preprocessing.streaming_output``."""
+    raw_value = os.getenv(PREPROCESSING_STREAMING_OUTPUT_ENV_VAR)
+    if raw_value is None:
+        if preprocessing_config is None:
+            preprocessing_config = load_preprocessing_config()
+        raw_value = preprocessing_config.get("streaming_output", False)
+    return is_truthy(raw_value)
+
+
+def is_parquet_output_enabled(preprocessing_config=None) -> bool:
+    """``VAHAN_PREPROCESSING_PARQUET_OUTPUT`` overrides ``preprocessing.parquet_output``."""
+    raw_value = os.getenv(PREPROCESSING_PARQUET_OUTPUT_ENV_VAR)
+    if raw_value is None:
+        if preprocessing_config is None:
+            preprocessing_config = load_preprocessing_config()
+        raw_value = preprocessing_config.get("parquet_output", False)
+    return is_truthy(raw_value)
+
+
+def get_output_batch_rows(preprocessing_config=None) -> int:
+    """Rows finalized and appended per write in streaming output mode."""
+    raw_value = os.getenv(PREPROCESSING_OUTPUT_BATCH_ROWS_ENV_VAR)
+    if raw_value is None:
+        if preprocessing_config is None:
+            preprocessing_config = load_preprocessing_config()
+        raw_value = preprocessing_config.get("output_batch_rows")
+
+    raw_value = str(raw_value if raw_value is not None else "").strip()
+    if not raw_value:
+        return DEFAULT_OUTPUT_BATCH_ROWS
+    try:
+        return max(1, int(raw_value))
+    except ValueError as exc:
+        raise ValueError(
+            f"Invalid preprocessing output batch size {raw_value!r}; expected an integer."
+        ) from exc
+
+
+def _initialize_preprocessing_worker(preprocessor: BaseExcelPreprocessor) -> None:
+    global _worker_preprocessor
+    _worker_preprocessor = preprocessor
+
+
+def _load_report_contexts_in_worker(contexts: list[ReportContext]) -> list[ReportLoadResult]:
+    return [_worker_preprocessor.load_report_context(context) for context in contexts]
+
+
 class BaseExcelPreprocessor:
+    count_source_columns: tuple[str, ...] = tuple(COMMON_FUEL_COLUMN_RENAME_MAP)
+    # Report column matched against the mapping sheet's Vehicle Class.
+    mapping_source_column = "Unnamed: 1"
+    mapping_key_normalizer = None
+
     def __init__(
         self,
         *,
@@ -46,31 +273,116 @@ class BaseExcelPreprocessor:
             if mapping_file_path is not None
             else self.base_directory / "Table and Mapping V2.xlsx"
         )
-        self.mapping_df = self.load_mapping_df()
         self.raw_files_directory = (
             Path(raw_files_directory)
             if raw_files_directory is not None
             else self.base_directory / raw_relative_path
         )
         self.column_rename_map = dict(column_rename_map)
+        # The raw folder name doubles as the output file prefix, e.g.
+        # rto_level_ev_data -> rto_level_ev_data_JUN_2026.csv.
+        self.output_file_prefix = Path(raw_relative_path).name
+        self.report_cache = ParsedReportCache.from_config(
+            self.base_directory,
+            PREPROCESSOR_VERSION,
+            load_preprocessing_config(),
+        )
+        self.mapping_lookup = self.load_mapping_lookup()
 
-    def load_mapping_df(self) -> pd.DataFrame:
-        return pd.read_excel(self.mapping_file_path, sheet_name="Mapping")
+    def load_mapping_lookup(self) -> MappingLookup:
+        return MappingLookup.from_workbook(
+            self.mapping_file_path,
+            key_normalizer=self.mapping_key_normalizer,
+            cache=self.report_cache,
+        )
 
     @property
     def output_columns(self) -> list[str]:
         return list(self.column_rename_map.values())
 
+    @property
+    def count_output_columns(self) -> list[str]:
+        return [
+            self.column_rename_map[column_name]
+            for column_name in self.count_source_columns
+            if column_name in self.column_rename_map
+        ]
+
+    def compact_count_columns(self, df: pd.DataFrame, columns: Iterable[str], context: str) -> pd.DataFrame:
+        """Store vehicle counts as nullable Int32; columns that do not parse are left as read."""
+        for column_name in columns:
+            if column_name not in df.columns:
+                continue
+            try:
+                df[column_name] = to_compact_counts(df[column_name])
+            except (TypeError, ValueError) as exc:
+                logging.warning(
+                    "Keeping non-integer %s count column column=%s context=%s error=%s",
+                    self.pipeline_label,
+                    column_name,
+                    context,
+                    exc,
+                )
+        return df
+
+    def compact_output_dtypes(self, df: pd.DataFrame, context: str) -> pd.DataFrame:
+        """Categorical dimensions and Int32 counts; CSV output is unchanged by either."""
+        count_columns = set(self.count_output_columns)
+        for column_name in self.output_columns:
+            if column_name in df.columns and column_name not in count_columns:
+                df[column_name] = to_sorted_categorical(df[column_name])
+        return self.compact_count_columns(df, self.count_output_columns, context)
+
+    def build_enriched_frame(
+        self,
+        loaded_reports: list[tuple[ReportContext, pd.DataFrame]],
+        report_key_column: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Concatenate report frames and attach each report's metadata as
+        categorical columns built from per-report codes, instead of
+        repeating Python objects on every row of every report.
+        """
+        df = pd.concat([frame for _, frame in loaded_reports], ignore_index=True)
+        row_counts = np.fromiter(
+            (len(frame) for _, frame in loaded_reports),
+            dtype=np.int64,
+            count=len(loaded_reports),
+        )
+        metadata_rows = [dict(context.metadata) for context, _ in loaded_reports]
+        if report_key_column is not None:
+            for row, (context, _) in zip(metadata_rows, loaded_reports):
+                row[report_key_column] = str(context.report_path)
+
+        metadata_keys = list(dict.fromkeys(key for row in metadata_rows for key in row))
+        for key in metadata_keys:
+            report_codes, categories = pd.factorize(
+                pd.Series([row.get(key) for row in metadata_rows], dtype=object)
+            )
+            df[key] = pd.Categorical.from_codes(
+                np.repeat(report_codes, row_counts),
+                categories,
+            )
+        return df
+
     def iter_report_contexts(
         self,
         month: str,
         year: str,
         **kwargs,
     ) -> Iterator[ReportContext]:
+        return self.iter_report_contexts_for_months([(month, year)], **kwargs)
+
+    def iter_report_contexts_for_months(
+        self,
+        months: list[tuple[str, str]],
+        **kwargs,
+    ) -> Iterator[ReportContext]:
+        """Yield candidate reports for every ``(month, year)`` from one walk of the raw tree."""
         raise NotImplementedError
 
     def apply_mapping(self, df: pd.DataFrame) -> pd.DataFrame:
-        raise NotImplementedError
+        return self.mapping_lookup.apply(df, self.mapping_source_column)
 
     def describe_scope(self, month: str, year: str, **kwargs) -> str:
         return "requested scope"
@@ -98,36 +410,70 @@ class BaseExcelPreprocessor:
     def normalize_enriched_frame(self, df: pd.DataFrame) -> pd.DataFrame:
         for column_name in ("Vehicle Type", "Vehicle Category", "Vehicle Use Type"):
             if column_name in df.columns:
-                df[column_name] = (
-                    df[column_name]
-                    .fillna(DEFAULT_DIMENSION_VALUE)
-                    .replace("", DEFAULT_DIMENSION_VALUE)
+                df[column_name] = map_unique_values(
+                    df[column_name],
+                    _default_blank_dimension,
+                    na_value=DEFAULT_DIMENSION_VALUE,
                 )
 
         if "State" in df.columns:
-            df["State"] = df["State"].replace(STATE_VALUE_REPLACEMENTS)
+            df["State"] = map_unique_values(df["State"], _replace_state_value)
 
         return df
 
-    def finalize_output(self, df: pd.DataFrame, month: str, year: str) -> pd.DataFrame:
+    def finalize_output(
+        self,
+        df: pd.DataFrame,
+        month: str,
+        year: str,
+        extra_columns: Iterable[str] = (),
+    ) -> pd.DataFrame:
         df = self.apply_mapping(df)
         df = self.normalize_enriched_frame(df)
-        df = df.rename(self.column_rename_map, axis=1)
+        # Relabel in place; DataFrame.rename would copy every column.
+        df.columns = [
+            self.column_rename_map.get(column_name, column_name)
+            for column_name in df.columns
+        ]
 
         if "date" in df.columns:
-            df["date"] = df["date"].apply(convert_date)
+            # Every report in a run shares a handful of date labels, so only
+            # the distinct values go through strptime/strftime.
+            df["date"] = map_unique_values(df["date"], convert_date)
 
         if "month" in df.columns:
             df["month"] = df["month"].map(MONTH_NAME_TO_NUMBER)
 
-        df = ensure_expected_output_columns(
-            df,
-            self.output_columns,
-            f"{self.pipeline_label.upper()} preprocessing for {month} {year}",
-        )
-        return df[self.output_columns]
+        context = f"{self.pipeline_label.upper()} preprocessing for {month} {year}"
+        df = ensure_expected_output_columns(df, self.output_columns, context)
+        df = self.compact_output_dtypes(df, context)
+        return df[[*self.output_columns, *extra_columns]]
 
     def _read_report(self, report_path: Path) -> pd.DataFrame:
+        if self.report_cache is None:
+            return self._parse_report(report_path)
+        return self.report_cache.get_or_load(report_path, self._parse_report)
+
+    def _parse_report(self, report_path: Path) -> pd.DataFrame:
+        if get_xlsx_reader() == STREAMING_XLSX_READER:
+            try:
+                return read_report_table(
+                    report_path,
+                    skiprows=3,
+                    index_col=0,
+                    thousands=REPORT_THOUSANDS_SEPARATOR,
+                )
+            except InvalidWorkbookError as exc:
+                raise ValueError(
+                    f"Invalid {self.pipeline_label} Excel report file: {report_path}"
+                ) from exc
+            except UnsupportedWorkbookError as exc:
+                logging.info(
+                    "Falling back to openpyxl report_path=%s reason=%s",
+                    report_path,
+                    exc,
+                )
+
         if not is_valid_excel_download(report_path):
             raise ValueError(
                 f"Invalid {self.pipeline_label} Excel report file: {report_path}"
@@ -137,42 +483,277 @@ class BaseExcelPreprocessor:
             report_path,
             skiprows=3,
             index_col=0,
+            thousands=REPORT_THOUSANDS_SEPARATOR,
             engine="openpyxl",
         )
 
-    def run_preprocessing(self, month: str, year: str, **kwargs) -> pd.DataFrame:
-        frames: list[pd.DataFrame] = []
+    def load_report_context(self, context: ReportContext) -> ReportLoadResult:
+        """Read one workbook with compact count columns; empty reports yield no frame."""
+        temp_df = self._read_report(context.report_path)
+        if temp_df.empty:
+            return ReportLoadResult(frame=None, unexpected_source_columns=frozenset())
+
+        unexpected_source_columns = frozenset(
+            find_unexpected_source_columns(
+                temp_df.columns,
+                self.column_rename_map.keys(),
+            )
+        )
+
+        report_df = self.compact_count_columns(
+            temp_df.copy(),
+            self.count_source_columns,
+            str(context.report_path),
+        )
+        return ReportLoadResult(
+            frame=report_df,
+            unexpected_source_columns=unexpected_source_columns,
+        )
+
+    def iter_report_load_results(
+        self,
+        contexts: list[ReportContext],
+        workers: int,
+    ) -> Iterator[ReportLoadResult]:
+        """Yield load results in context order, fanning out across processes when workers > 1."""
+        workers = min(workers, len(contexts))
+        if workers <= 1:
+            for context in contexts:
+                yield self.load_report_context(context)
+            return
+
+        chunksize = min(
+            PREPROCESSING_MAX_CHUNKSIZE,
+            max(1, len(contexts) // (workers * PREPROCESSING_CHUNKS_PER_WORKER)),
+        )
+        max_chunks_in_flight = workers * PREPROCESSING_MAX_CHUNKS_IN_FLIGHT_PER_WORKER
+        logging.info(
+            "Reading %s workbooks in parallel pipeline=%s workers=%s chunksize=%s",
+            len(contexts),
+            self.pipeline_label,
+            workers,
+            chunksize,
+        )
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialize_preprocessing_worker,
+            initargs=(self,),
+        ) as executor:
+            # Executor.map would submit every chunk up front and buffer all
+            # results; keep a bounded window of futures instead.
+            pending = deque()
+            for start in range(0, len(contexts), chunksize):
+                pending.append(
+                    executor.submit(
+                        _load_report_contexts_in_worker,
+                        contexts[start:start + chunksize],
+                    )
+                )
+                if len(pending) >= max_chunks_in_flight:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def get_incremental_state_directory(self, month: str, year: str) -> Path:
+        return (
+            self.base_directory
+            / DEFAULT_PREPROCESSING_STATE_DIRNAME
+            / self.pipeline_label.lower()
+            / f"{year}_{month}"
+        )
+
+    def build_incremental_fingerprint(self, month: str, year: str, **kwargs) -> str:
+        """Identify everything besides the reports that shapes the output rows."""
+        scope = {
+            key: sorted(value) if isinstance(value, (list, tuple, set, frozenset)) else value
+            for key, value in sorted(kwargs.items())
+        }
+        payload = {
+            "preprocessor_version": PREPROCESSOR_VERSION,
+            "pipeline": self.pipeline_label,
+            "output_columns": self.output_columns,
+            "mapping_sha256": (
+                compute_file_sha256(self.mapping_file_path)
+                if self.mapping_file_path.exists()
+                else None
+            ),
+            "scope": scope,
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def build_month_output(
+        self,
+        month: str,
+        year: str,
+        loaded_results: Iterable[tuple[ReportContext, ReportLoadResult]],
+    ) -> tuple[pd.DataFrame, list[ReportContext], set[str]]:
+        loaded_reports: list[tuple[ReportContext, pd.DataFrame]] = []
+        empty_contexts: list[ReportContext] = []
         unexpected_source_columns: set[str] = set()
-        files_found = 0
-        empty_reports = 0
 
-        for context in self.iter_report_contexts(month, year, **kwargs):
-            if not context.report_path.exists():
+        for context, result in loaded_results:
+            if result.frame is None:
+                empty_contexts.append(context)
                 continue
 
-            files_found += 1
-            temp_df = self._read_report(context.report_path)
-            if temp_df.empty:
-                empty_reports += 1
-                logging.warning(self.build_empty_report_log_message(context))
-                continue
+            unexpected_source_columns.update(result.unexpected_source_columns)
+            loaded_reports.append((context, result.frame))
+
+        if not loaded_reports:
+            return pd.DataFrame(columns=self.output_columns), empty_contexts, unexpected_source_columns
+
+        final_df = self.build_enriched_frame(loaded_reports)
+        final_df = self.finalize_output(final_df, month, year)
+        return final_df, empty_contexts, unexpected_source_columns
+
+    def preprocess_all_reports(
+        self,
+        month: str,
+        year: str,
+        contexts: list[ReportContext],
+        workers: int,
+    ) -> tuple[pd.DataFrame, list[ReportContext], set[str]]:
+        return self.build_month_output(
+            month,
+            year,
+            zip(contexts, self.iter_report_load_results(contexts, workers)),
+        )
 
-            unexpected_source_columns.update(
-                find_unexpected_source_columns(
-                    temp_df.columns,
-                    self.column_rename_map.keys(),
+    def preprocess_changed_reports(
+        self,
+        month: str,
+        year: str,
+        contexts: list[ReportContext],
+        workers: int,
+        **kwargs,
+    ) -> tuple[pd.DataFrame, list[ReportContext], set[str], int]:
+        """
+        Re-read only reports added or changed since the saved snapshot and
+        splice their finalized rows into its output, in context order.
+        """
+        state_directory = self.get_incremental_state_directory(month, year)
+        fingerprint = self.build_incremental_fingerprint(month, year, **kwargs)
+        snapshot = load_snapshot(state_directory)
+        if snapshot is None or snapshot.fingerprint != fingerprint:
+            snapshot = PreprocessingSnapshot(fingerprint=fingerprint)
+
+        report_keys = [str(context.report_path) for context in contexts]
+        unchanged, changed = classify_reports(report_keys, snapshot.entries)
+        changed_contexts = [
+            context for context in contexts if str(context.report_path) in changed
+        ]
+
+        entries = dict(unchanged)
+        loaded_reports: list[tuple[ReportContext, pd.DataFrame]] = []
+        for context, result in zip(
+            changed_contexts,
+            self.iter_report_load_results(changed_contexts, workers),
+        ):
+            report_key = str(context.report_path)
+            entries[report_key] = replace(
+                changed[report_key],
+                empty=result.frame is None,
+                unexpected_source_columns=tuple(sorted(result.unexpected_source_columns)),
+            )
+            if result.frame is not None:
+                loaded_reports.append((context, result.frame))
+
+        output_parts: list[pd.DataFrame] = []
+        if snapshot.output is not None:
+            kept_df = snapshot.output[snapshot.output[REPORT_KEY_COLUMN].isin(unchanged)]
+            if not kept_df.empty:
+                output_parts.append(kept_df)
+        if loaded_reports:
+            output_parts.append(
+                self.finalize_output(
+                    self.build_enriched_frame(loaded_reports, REPORT_KEY_COLUMN),
+                    month,
+                    year,
+                    extra_columns=[REPORT_KEY_COLUMN],
                 )
             )
 
-            enriched_df = temp_df.copy()
-            for key, value in context.metadata.items():
-                enriched_df[key] = value
-            frames.append(enriched_df)
+        if output_parts:
+            combined_df = pd.concat(output_parts, ignore_index=True)
+            report_order = {report_key: position for position, report_key in enumerate(report_keys)}
+            ordered_index = (
+                combined_df[REPORT_KEY_COLUMN]
+                .astype(object)
+                .map(report_order)
+                .astype(np.int64)
+                .sort_values(kind="stable")
+                .index
+            )
+            combined_df = combined_df.loc[ordered_index].reset_index(drop=True)
+        else:
+            combined_df = pd.DataFrame(columns=[*self.output_columns, REPORT_KEY_COLUMN])
+        # Kept snapshot rows and re-read rows arrive with different categories
+        # (and, from Parquet, different category dtypes); normalize them once
+        # so the saved snapshot and the returned frame match a full run.
+        combined_df = self.compact_output_dtypes(
+            combined_df,
+            f"{self.pipeline_label.upper()} incremental preprocessing for {month} {year}",
+        )
+
+        save_snapshot(
+            state_directory,
+            PreprocessingSnapshot(
+                fingerprint=fingerprint,
+                entries={report_key: entries[report_key] for report_key in report_keys},
+                output=combined_df,
+            ),
+        )
+
+        empty_contexts = [
+            context for context in contexts if entries[str(context.report_path)].empty
+        ]
+        unexpected_source_columns = {
+            column_name
+            for entry in entries.values()
+            for column_name in entry.unexpected_source_columns
+        }
+        return (
+            combined_df.drop(columns=[REPORT_KEY_COLUMN]),
+            empty_contexts,
+            unexpected_source_columns,
+            len(changed_contexts),
+        )
+
+    def collect_report_contexts(self, month: str, year: str, **kwargs) -> list[ReportContext]:
+        return self.collect_report_contexts_for_months([(month, year)], **kwargs)
+
+    def collect_report_contexts_for_months(
+        self,
+        months: list[tuple[str, str]],
+        **kwargs,
+    ) -> list[ReportContext]:
+        return [
+            context
+            for context in self.iter_report_contexts_for_months(months, **kwargs)
+            if context.report_path.exists()
+        ]
+
+    def log_preprocessing_outcome(
+        self,
+        month: str,
+        year: str,
+        *,
+        files_found: int,
+        empty_contexts: list[ReportContext],
+        unexpected_source_columns: set[str],
+        reparsed_reports: int,
+        output_rows: int,
+        **kwargs,
+    ) -> None:
+        for context in empty_contexts:
+            logging.warning(self.build_empty_report_log_message(context))
 
         if unexpected_source_columns:
             self.log_unexpected_source_columns(month, year, unexpected_source_columns)
 
-        if not frames:
+        if not output_rows:
             logging.warning(
                 "No non-empty %s rows were produced for %s %s in %s.",
                 self.pipeline_label,
@@ -180,18 +761,269 @@ class BaseExcelPreprocessor:
                 year,
                 self.describe_scope(month, year, **kwargs),
             )
-            return pd.DataFrame(columns=self.output_columns)
-
-        final_df = pd.concat(frames, ignore_index=True)
-        final_df = self.finalize_output(final_df, month, year)
+            return
 
         logging.info(
-            "%s preprocessing summary for %s %s: files_found=%s empty_reports=%s output_rows=%s",
+            "%s preprocessing summary for %s %s: files_found=%s empty_reports=%s "
+            "reparsed_reports=%s output_rows=%s",
             self.pipeline_label.upper(),
             month,
             year,
             files_found,
-            empty_reports,
-            len(final_df),
+            len(empty_contexts),
+            reparsed_reports,
+            output_rows,
+        )
+
+    def run_preprocessing(
+        self,
+        month: str,
+        year: str,
+        *,
+        workers: int | None = None,
+        incremental: bool | None = None,
+        **kwargs,
+    ) -> pd.DataFrame:
+        contexts = self.collect_report_contexts(month, year, **kwargs)
+        files_found = len(contexts)
+        if workers is None:
+            workers = get_preprocessing_workers()
+        if incremental is None:
+            incremental = is_incremental_preprocessing_enabled()
+
+        if incremental:
+            final_df, empty_contexts, unexpected_source_columns, reparsed_reports = (
+                self.preprocess_changed_reports(month, year, contexts, workers, **kwargs)
+            )
+        else:
+            final_df, empty_contexts, unexpected_source_columns = self.preprocess_all_reports(
+                month,
+                year,
+                contexts,
+                workers,
+            )
+            reparsed_reports = files_found
+
+        self.log_preprocessing_outcome(
+            month,
+            year,
+            files_found=files_found,
+            empty_contexts=empty_contexts,
+            unexpected_source_columns=unexpected_source_columns,
+            reparsed_reports=reparsed_reports,
+            output_rows=len(final_df),
+            **kwargs,
         )
+        if final_df.empty:
+            return pd.DataFrame(columns=self.output_columns)
         return final_df
+
+    def run_preprocessing_range(
+        self,
+        months: Iterable[tuple[str, str]],
+        *,
+        workers: int | None = None,
+        **kwargs,
+    ) -> Iterator[tuple[str, str, pd.DataFrame]]:
+        """
+        Yield ``(month, year, frame)`` for each requested month, in order,
+        with the frame ``run_preprocessing`` would return for that month.
+
+        The raw tree is walked once for the whole window and every workbook
+        goes through a single reader (one process pool when workers > 1),
+        sharing the mapping lookup and parsed-report cache. Results stream
+        month by month, so only one month's frames are held at a time.
+        """
+        months = list(dict.fromkeys((month, str(year)) for month, year in months))
+        if workers is None:
+            workers = get_preprocessing_workers()
+
+        def month_of(context: ReportContext) -> tuple[str, str]:
+            return context.metadata["Month"], context.metadata["Year"]
+
+        month_positions = {month_year: position for position, month_year in enumerate(months)}
+        contexts = sorted(
+            self.collect_report_contexts_for_months(months, **kwargs),
+            key=lambda context: month_positions[month_of(context)],
+        )
+        logging.info(
+            "%s range preprocessing months=%s files_found=%s",
+            self.pipeline_label.upper(),
+            len(months),
+            len(contexts),
+        )
+
+        month_groups = groupby(
+            zip(contexts, self.iter_report_load_results(contexts, workers)),
+            key=lambda pair: month_of(pair[0]),
+        )
+        next_group = next(month_groups, None)
+        for month, year in months:
+            loaded_results: list[tuple[ReportContext, ReportLoadResult]] = []
+            if next_group is not None and next_group[0] == (month, year):
+                loaded_results = list(next_group[1])
+                next_group = next(month_groups, None)
+
+            final_df, empty_contexts, unexpected_source_columns = self.build_month_output(
+                month,
+                year,
+                loaded_results,
+            )
+            self.log_preprocessing_outcome(
+                month,
+                year,
+                files_found=len(loaded_results),
+                empty_contexts=empty_contexts,
+                unexpected_source_columns=unexpected_source_columns,
+                reparsed_reports=len(loaded_results),
+                output_rows=len(final_df),
+                **kwargs,
+            )
+            if final_df.empty:
+                final_df = pd.DataFrame(columns=self.output_columns)
+            yield month, year, final_df
+
+    def stream_output_csv(
+        self,
+        month: str,
+        year: str,
+        output_path: str | Path,
+        *,
+        workers: int | None = None,
+        batch_rows: int | None = None,
+        parquet_writer: PartitionedParquetWriter | None = None,
+        **kwargs,
+    ) -> int:
+        """
+        Finalize reports in batches of about ``batch_rows`` rows and append
+        each batch to ``output_path`` (and ``parquet_writer``), so memory
+        stays bounded by the batch rather than the month. The file matches
+        what ``run_preprocessing`` followed by ``to_csv`` would write; it is
+        built under a temporary name and moved into place once complete.
+        Returns the row count.
+        """
+        contexts = self.collect_report_contexts(month, year, **kwargs)
+        if workers is None:
+            workers = get_preprocessing_workers()
+        if batch_rows is None:
+            batch_rows = get_output_batch_rows()
+
+        output_path = Path(output_path)
+        empty_contexts: list[ReportContext] = []
+        unexpected_source_columns: set[str] = set()
+        output_rows = 0
+        batches_written = 0
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=output_path.parent,
+            prefix=f".{output_path.name}.",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8", newline="") as output_file:
+                pd.DataFrame(columns=self.output_columns).to_csv(output_file, index=False)
+
+                def write_batch(batch):
+                    batch_df = self.finalize_output(self.build_enriched_frame(batch), month, year)
+                    batch_df.to_csv(output_file, header=False, index=False)
+                    if parquet_writer is not None:
+                        parquet_writer.write(batch_df)
+                    return len(batch_df)
+
+                batch: list[tuple[ReportContext, pd.DataFrame]] = []
+                pending_rows = 0
+                for context, result in zip(
+                    contexts,
+                    self.iter_report_load_results(contexts, workers),
+                ):
+                    if result.frame is None:
+                        empty_contexts.append(context)
+                        continue
+
+                    unexpected_source_columns.update(result.unexpected_source_columns)
+                    batch.append((context, result.frame))
+                    pending_rows += len(result.frame)
+                    if pending_rows >= batch_rows:
+                        output_rows += write_batch(batch)
+                        batches_written += 1
+                        batch, pending_rows = [], 0
+
+                if batch:
+                    output_rows += write_batch(batch)
+                    batches_written += 1
+            os.replace(temp_path, output_path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+        logging.info(
+            "Streamed %s preprocessing output path=%s batches=%s batch_rows=%s",
+            self.pipeline_label,
+            output_path,
+            batches_written,
+            batch_rows,
+        )
+        self.log_preprocessing_outcome(
+            month,
+            year,
+            files_found=len(contexts),
+            empty_contexts=empty_contexts,
+            unexpected_source_columns=unexpected_source_columns,
+            reparsed_reports=len(contexts),
+            output_rows=output_rows,
+            **kwargs,
+        )
+        return output_rows
+
+    def open_parquet_writer(
+        self,
+        output_path: str | Path,
+        preprocessing_config=None,
+    ) -> PartitionedParquetWriter | None:
+        """Writer for the Parquet dataset beside ``output_path`` when ``preprocessing.parquet_output`` is on."""
+        if not is_parquet_output_enabled(preprocessing_config):
+            return None
+        return PartitionedParquetWriter(
+            build_parquet_dataset_path(Path(output_path).parent, self.output_file_prefix)
+        )
+
+    def write_output_frame(
+        self,
+        final_df: pd.DataFrame,
+        output_path: str | Path,
+        preprocessing_config=None,
+    ) -> int:
+        """Write an already preprocessed month to ``output_path`` (and Parquet) and return its row count."""
+        parquet_writer = self.open_parquet_writer(output_path, preprocessing_config)
+        with parquet_writer or nullcontext():
+            final_df.to_csv(output_path, header=True, index=False)
+            if parquet_writer is not None:
+                parquet_writer.write(final_df)
+        return len(final_df)
+
+    def write_output_csv(self, month: str, year: str, output_path: str | Path, **kwargs) -> int:
+        """
+        Write the month's output CSV and return its row count, streaming it
+        when ``preprocessing.streaming_output`` is enabled. Incremental runs
+        keep the whole-frame path because they splice into a saved snapshot.
+        With ``preprocessing.parquet_output`` the same rows are also written
+        to the pipeline's partitioned Parquet dataset beside the CSV.
+        """
+        preprocessing_config = load_preprocessing_config()
+        if is_streaming_output_enabled(preprocessing_config) and not (
+            is_incremental_preprocessing_enabled(preprocessing_config)
+        ):
+            parquet_writer = self.open_parquet_writer(output_path, preprocessing_config)
+            with parquet_writer or nullcontext():
+                return self.stream_output_csv(
+                    month,
+                    year,
+                    output_path,
+                    parquet_writer=parquet_writer,
+                    **kwargs,
+                )
+
+        return self.write_output_frame(
+            self.run_preprocessing(month, year, **kwargs),
+            output_path,
+            preprocessing_config,
+        )
@@ -0,0 +1,176 @@
+"""
+Compiled lookup for the ``Mapping`` sheet of ``Table and Mapping V2.xlsx``.
+
+The sheet maps a vehicle class to its type, category and use type. Instead of
+loading it with openpyxl and ``pd.merge``-ing it onto every month's frame, it
+is compiled once into a frame indexed by the (optionally normalized) vehicle
+class with categorical value columns. The compiled frame is cached in the
+parsed-report cache under the workbook's SHA-256, and applying it is an index
+lookup per distinct vehicle class followed by a code gather per row.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from parsed_report_cache import ParsedReportCache
+from utils import remove_special_chars
+
+# Bump when compile_mapping_frame output changes so cached lookups are ignored.
+MAPPING_LOOKUP_VERSION = "1"
+MAPPING_SHEET_NAME = "Mapping"
+MAPPING_KEY_COLUMN = "Vehicle Class"
+
+_loaded_lookups: dict[tuple, MappingLookup] = {}
+
+
+def normalize_vehicle_class_key(text):
+    """OEM folders name vehicle classes without punctuation."""
+    return remove_special_chars(text).strip()
+
+
+def read_mapping_sheet(mapping_file_path: str | Path) -> pd.DataFrame:
+    return pd.read_excel(mapping_file_path, sheet_name=MAPPING_SHEET_NAME)
+
+
+def compile_mapping_frame(
+    mapping_df: pd.DataFrame,
+    key_normalizer: Callable[[str], str] | None = None,
+) -> pd.DataFrame:
+    """Index the mapping by vehicle class, keeping the first row of any duplicated class."""
+    keys = mapping_df[MAPPING_KEY_COLUMN]
+    if key_normalizer is not None:
+        keys = keys.map(key_normalizer)
+    duplicated = keys.duplicated()
+    if duplicated.any():
+        logging.warning(
+            "Mapping sheet repeats vehicle classes; keeping the first row classes=%s",
+            ", ".join(sorted(map(str, keys[duplicated].unique()))),
+        )
+
+    compiled = mapping_df.loc[~duplicated.to_numpy()].drop(columns=MAPPING_KEY_COLUMN)
+    compiled.index = pd.Index(keys[~duplicated].to_numpy(), name=MAPPING_KEY_COLUMN)
+    for column_name in compiled.columns:
+        compiled[column_name] = compiled[column_name].astype("category")
+    return compiled
+
+
+class MappingLookup:
+    def __init__(self, compiled: pd.DataFrame) -> None:
+        self.compiled = compiled
+        self.keys = compiled.index
+        # A trailing -1 lets unmatched rows (position -1) gather a missing code.
+        self.value_codes = {
+            column_name: np.append(compiled[column_name].cat.codes.to_numpy(), -1)
+            for column_name in compiled.columns
+        }
+
+    @classmethod
+    def from_workbook(
+        cls,
+        mapping_file_path: str | Path,
+        *,
+        key_normalizer: Callable[[str], str] | None = None,
+        cache: ParsedReportCache | None = None,
+    ) -> MappingLookup:
+        """
+        Return the lookup for the workbook's current contents.
+
+        Lookups are reused within the process while the workbook's mtime and
+        size are unchanged, and across runs through ``cache`` when given.
+        """
+        mapping_file_path = Path(mapping_file_path)
+        stat_result = os.stat(mapping_file_path)
+        normalizer_name = key_normalizer.__name__ if key_normalizer is not None else ""
+        memo_key = (
+            str(mapping_file_path.resolve()),
+            stat_result.st_mtime_ns,
+            stat_result.st_size,
+            normalizer_name,
+        )
+        lookup = _loaded_lookups.get(memo_key)
+        if lookup is not None:
+            return lookup
+
+        def compile_workbook(path):
+            return compile_mapping_frame(read_mapping_sheet(path), key_normalizer)
+
+        if cache is None:
+            compiled = compile_workbook(mapping_file_path)
+        else:
+            lookup_cache = ParsedReportCache(
+                cache.cache_dir,
+                cache.max_bytes,
+                f"mapping{MAPPING_LOOKUP_VERSION}{normalizer_name}",
+            )
+            compiled = lookup_cache.get_or_load(mapping_file_path, compile_workbook)
+            logging.info(
+                "Loaded vehicle class mapping path=%s cached=%s classes=%s",
+                mapping_file_path,
+                bool(lookup_cache.hits),
+                len(compiled),
+            )
+
+        lookup = cls(compiled)
+        _loaded_lookups[memo_key] = lookup
+        return lookup
+
+    def apply(self, df: pd.DataFrame, source_column: str) -> pd.DataFrame:
+        """
+        Add the mapped columns to ``df`` in place, matching ``source_column``
+        against the vehicle class. Rows without a match get nulls, as with a
+        left merge.
+        """
+        source = df[source_column]
+        if isinstance(source.dtype, pd.CategoricalDtype):
+            codes, uniques = source.cat.codes.to_numpy(), source.cat.categories
+        else:
+            codes, uniques = pd.factorize(source)
+        positions = np.append(self.keys.get_indexer(uniques), -1)[codes]
+
+        for column_name, value_codes in self.value_codes.items():
+            df[column_name] = pd.Categorical.from_codes(
+                value_codes[positions],
+                dtype=self.compiled[column_name].dtype,
+            )
+        return df
+
+
+def filter_mapped_vehicle_classes(
+    vehicle_classes: list[str],
+    mapping_file_path: str | Path,
+    *,
+    pipeline: str,
+) -> list[str]:
+    """
+    Keep the vehicle classes the mapping sheet resolves, logging the rest.
+
+    Reports for an unmapped class would preprocess with null vehicle type,
+    category and use type, so they are not downloaded until the sheet lists
+    the class.
+    """
+    lookup = MappingLookup.from_workbook(
+        mapping_file_path,
+        key_normalizer=normalize_vehicle_class_key,
+    )
+    mapped = []
+    unmapped = []
+    for vehicle_class in vehicle_classes:
+        if normalize_vehicle_class_key(vehicle_class) in lookup.keys:
+            mapped.append(vehicle_class)
+        else:
+            unmapped.append(vehicle_class)
+    if unmapped:
+        logging.error(
+            "Skipped %s %s vehicle classes missing from the mapping sheet path=%s classes=%s",
+            len(unmapped),
+            pipeline,
+            mapping_file_path,
+            ", ".join(unmapped),
+        )
+    return mapped
@@ -33,11 +33,6 @@ CURRENT_STEP="extraction"
 log_step "Starting OEM extraction for ${RUN_LABEL}"
 run_selenium_step python3 oem_level/oem_level_data_scraper.py "$@"
 
-# Run missing files extraction
-CURRENT_STEP="missing_file_recovery"
-log_step "Running OEM missing-file recovery for ${RUN_LABEL}"
-run_selenium_step python3 oem_level/get_missing_files.py "$@"
-
 # Run Pre Processing
 CURRENT_STEP="preprocessing"
 log_step "Running OEM preprocessing for ${RUN_LABEL}"
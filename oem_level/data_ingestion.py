@@ -24,9 +24,9 @@ class OEMDataIngest(BaseSqlServerIngestor):
 
 
 def main():
-    oem_data_ingest = OEMDataIngest()
     month, year = resolve_month_year_args(sys.argv[1:])
-    oem_data_ingest.data_ingest(month, year)
+    with OEMDataIngest() as oem_data_ingest:
+        oem_data_ingest.data_ingest(month, year)
 
 
 if __name__ == "__main__":
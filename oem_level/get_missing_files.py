@@ -2,7 +2,6 @@ import logging
 import os
 import re
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
 SCRIPT_DIR = os.path.dirname(__file__)
@@ -13,16 +12,26 @@ if SCRIPT_DIR not in sys.path:
 if REPO_ROOT not in sys.path:
     sys.path.append(REPO_ROOT)
 
-from oem_level.oem_level_data_scraper import OEMDataScraper
+from mapping_lookup import filter_mapped_vehicle_classes
+from oem_level.oem_level_data_scraper import MAPPING_FILE_PATH, OEMDataScraper
 from pipeline_constants import STATE_LIST
 from pipeline_logging import configure_pipeline_logging
 from runtime_config import resolve_month_year_args
+from scrape_scheduler import (
+    SCHEDULED_DOWNLOAD_MAX_RETRIES,
+    AdaptiveConcurrencyController,
+    RetryingTaskScheduler,
+)
+from scrape_task_ledger import OEM_PIPELINE, ScrapeTaskLedger, recover_pending_tasks
 from utils import is_valid_excel_download
+from vahan_catalogue import load_catalogue
 
 
 configure_pipeline_logging()
 logger = logging.getLogger(__name__)
 
+RECOVERY_MAX_WORKERS = 10
+
 
 def build_report_path(state, category, year, month):
     state_folder = re.sub(r"[^a-zA-Z\s]", " ", state).rstrip()
@@ -48,41 +57,68 @@ def build_missing_parameters(vehicle_categories, month, year):
     return parameters
 
 
-def run_missing_file_recovery(scraper, parameters):
+def run_missing_file_recovery(scraper, parameters, ledger=None):
     successful_downloads = 0
     failed_downloads = []
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {
-            executor.submit(scraper.run_selenium, args): args for args in parameters
-        }
-        for future in as_completed(futures):
-            state, year, month, category = futures[future]
-            try:
-                future.result()
-                successful_downloads += 1
-            except Exception as exc:
-                failed_downloads.append((state, category))
-                logger.error(
-                    "OEM missing-file recovery failed state=%s year=%s month=%s vehicle_category=%s error=%s",
-                    state,
-                    year,
-                    month,
-                    category,
-                    exc,
-                )
-
+    controller = AdaptiveConcurrencyController.from_config(
+        RECOVERY_MAX_WORKERS,
+        on_limit_change=scraper.session_pool.trim_idle,
+        name="oem_missing_file_recovery",
+    )
+    run_task = scraper.run_selenium
+    if ledger is not None:
+        run_task = ledger.tracked(OEM_PIPELINE, run_task)
+    scraper.download_max_retries = SCHEDULED_DOWNLOAD_MAX_RETRIES
+    scheduler = RetryingTaskScheduler.from_config(controller)
+    for task, future in scheduler.run(run_task, parameters):
+        state, year, month, category = task
+        try:
+            future.result()
+            successful_downloads += 1
+        except Exception as exc:
+            failed_downloads.append((state, category))
+            logger.error(
+                "OEM missing-file recovery failed state=%s year=%s month=%s vehicle_category=%s error=%s",
+                state,
+                year,
+                month,
+                category,
+                exc,
+            )
+
+    scheduler.report.log()
     return successful_downloads, failed_downloads
 
 
-def main():
-    month, year = resolve_month_year_args(sys.argv[1:])
-    scraper = OEMDataScraper()
-
-    vehicle_categories = scraper.get_all_vehicle_category_elements()
+def recover_missing_files(scraper, month, year):
+    # The scraper's task ledger already knows which downloads are unfinished,
+    # so only fall back to rescanning the report folders without it.
+    with ScrapeTaskLedger() as ledger:
+        if recover_pending_tasks(
+            ledger,
+            OEM_PIPELINE,
+            year,
+            month,
+            lambda parameters: run_missing_file_recovery(
+                scraper, parameters, ledger=ledger
+            ),
+        ):
+            return
+
+    catalogue = load_catalogue()
+    if catalogue is not None and catalogue.vehicle_categories:
+        vehicle_categories = catalogue.vehicle_categories
+    else:
+        vehicle_categories = scraper.get_all_vehicle_category_elements()
+    vehicle_categories = filter_mapped_vehicle_classes(
+        vehicle_categories,
+        MAPPING_FILE_PATH,
+        pipeline=OEM_PIPELINE,
+    )
     if not vehicle_categories:
         raise RuntimeError(
-            "Unable to fetch OEM vehicle categories from Vahan. Missing-file recovery cannot continue."
+            "Unable to fetch mapped OEM vehicle categories from Vahan. Missing-file recovery cannot continue."
         )
 
     parameters = build_missing_parameters(vehicle_categories, month, year)
@@ -117,5 +153,13 @@ def main():
         )
 
 
+def main():
+    month, year = resolve_month_year_args(sys.argv[1:])
+    scraper = OEMDataScraper()
+    try:
+        recover_missing_files(scraper, month, year)
+    finally:
+        scraper.close()
+
 if __name__ == "__main__":
     main()
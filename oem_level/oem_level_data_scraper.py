@@ -1,12 +1,9 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import (
     TimeoutException,
     StaleElementReferenceException,
     WebDriverException,
 )
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from datetime import datetime, timedelta
 import logging
 import os
@@ -14,34 +11,56 @@ import re
 import sys
 import shutil
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 repo_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if repo_path not in sys.path:
     sys.path.append(repo_path)
 
+from mapping_lookup import filter_mapped_vehicle_classes
 from pipeline_constants import STATE_LIST
 from pipeline_logging import configure_pipeline_logging
 from runtime_config import get_previous_month_year_label, resolve_month_year_args
+from scrape_scheduler import (
+    SCHEDULED_DOWNLOAD_MAX_RETRIES,
+    AdaptiveConcurrencyController,
+    RetryingTaskScheduler,
+)
+from scrape_task_ledger import OEM_PIPELINE, LedgerTask, ScrapeTaskLedger
+from vahan_catalogue import filter_task_grid, load_or_discover_catalogue
 from utils import (
     BlockedPageError,
+    BrowserSessionPool,
     SeleniumStepError,
-    configure_chrome_options,
     find_element as shared_find_element,
     format_log_context,
+    StepTimings,
+    is_dead_session_error,
     open_page,
+    resolve_chromedriver_path,
     summarize_exception,
     VAHAN_DASHBOARD_URL,
     wait_for_expected_download,
+    wait_for_page_settle,
 )
 
 configure_pipeline_logging()
 
+MAPPING_FILE_PATH = os.path.join(repo_path, "Table and Mapping V2.xlsx")
+OEM_DOWNLOAD_MAX_WORKERS = 30
+
 
 class OEMDataScraper:
-    def __init__(self):
+    def __init__(self, session_pool=None):
         self.max_retries = 5
+        # attempts per report download; see SCHEDULED_DOWNLOAD_MAX_RETRIES
+        self.download_max_retries = self.max_retries
         self.retry_delay = 15
+        self.session_pool = session_pool or BrowserSessionPool(
+            max_sessions=OEM_DOWNLOAD_MAX_WORKERS
+        )
+
+    def close(self):
+        self.session_pool.close()
 
     @staticmethod
     def create_directory_if_not_exists(directory_path):
@@ -93,11 +112,6 @@ class OEMDataScraper:
             month_label,
         )
         self.create_directory_if_not_exists(download_path)
-        browserOpts = webdriver.ChromeOptions()
-        configure_chrome_options(browserOpts, download_path)
-        browser = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), options=browserOpts
-        )
         expected_report_path = os.path.join(download_path, "reportTable.xlsx")
         if os.path.exists(expected_report_path):
             os.remove(expected_report_path)
@@ -109,10 +123,11 @@ class OEMDataScraper:
             "vehicle_category": vehicle_category_label,
         }
 
-        try:
+        with self.session_pool.lease(download_directory=download_path) as browser:
             retries = 0
             last_exception = None
-            while retries < self.max_retries:
+            while retries < self.download_max_retries:
+                timings = StepTimings()
                 try:
                     open_page(
                         browser,
@@ -128,7 +143,12 @@ class OEMDataScraper:
                         step="open_state_dropdown",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="open_state_dropdown",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -137,7 +157,12 @@ class OEMDataScraper:
                         step="select_state",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="select_state",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -146,7 +171,13 @@ class OEMDataScraper:
                         step="open_y_axis_dropdown",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="open_y_axis_dropdown",
+                        panel_id="yaxisVar_panel",
+                        context=context,
+                        timings=timings,
+                    )
                     self.find_element(
                         browser,
                         "id",
@@ -154,7 +185,12 @@ class OEMDataScraper:
                         step="select_y_axis_maker",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="select_y_axis_maker",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -163,7 +199,13 @@ class OEMDataScraper:
                         step="open_x_axis_dropdown",
                         context=context,
                     ).click()
-                    time.sleep(1)
+                    wait_for_page_settle(
+                        browser,
+                        step="open_x_axis_dropdown",
+                        panel_id="xaxisVar_panel",
+                        context=context,
+                        timings=timings,
+                    )
                     self.find_element(
                         browser,
                         "xpath",
@@ -171,7 +213,12 @@ class OEMDataScraper:
                         step="select_x_axis_fuel",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="select_x_axis_fuel",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -180,7 +227,13 @@ class OEMDataScraper:
                         step="open_year_dropdown",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="open_year_dropdown",
+                        panel_id="selectedYear_panel",
+                        context=context,
+                        timings=timings,
+                    )
                     self.find_element(
                         browser,
                         "xpath",
@@ -188,7 +241,12 @@ class OEMDataScraper:
                         step="select_year",
                         context=context,
                     ).click()
-                    time.sleep(5)
+                    wait_for_page_settle(
+                        browser,
+                        step="select_year",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -197,7 +255,12 @@ class OEMDataScraper:
                         step="click_main_refresh",
                         context=context,
                     ).click()
-                    time.sleep(5)
+                    wait_for_page_settle(
+                        browser,
+                        step="click_main_refresh",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -206,7 +269,13 @@ class OEMDataScraper:
                         step="open_month_dropdown",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="open_month_dropdown",
+                        panel_id="groupingTable:selectMonth_panel",
+                        context=context,
+                        timings=timings,
+                    )
                     self.find_element(
                         browser,
                         "xpath",
@@ -214,7 +283,12 @@ class OEMDataScraper:
                         step="select_month",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="select_month",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -223,7 +297,12 @@ class OEMDataScraper:
                         step="open_vehicle_category_filter",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="open_vehicle_category_filter",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -232,7 +311,12 @@ class OEMDataScraper:
                         step="select_vehicle_category",
                         context=context,
                     ).click()
-                    time.sleep(5)
+                    wait_for_page_settle(
+                        browser,
+                        step="select_vehicle_category",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -241,7 +325,12 @@ class OEMDataScraper:
                         step="apply_vehicle_category_filter",
                         context=context,
                     ).click()
-                    time.sleep(5)
+                    wait_for_page_settle(
+                        browser,
+                        step="apply_vehicle_category_filter",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -252,11 +341,13 @@ class OEMDataScraper:
                     ).click()
                     wait_for_expected_download(download_path)
                     logging.info(
-                        "Downloaded OEM report state=%s vehicle_category=%s year=%s month=%s",
+                        "Downloaded OEM report state=%s vehicle_category=%s year=%s month=%s settle_seconds=%.1f timings=%s",
                         state_folder_name,
                         vehicle_category_folder_name,
                         year_label,
                         month_label,
+                        timings.total_seconds,
+                        timings.format(),
                     )
                     return
                 except BlockedPageError as e:
@@ -275,6 +366,8 @@ class OEMDataScraper:
                     TimeoutError,
                     WebDriverException,
                 ) as e:
+                    if is_dead_session_error(e):
+                        raise
                     last_exception = e
                     retries += 1
                     if os.path.exists(expected_report_path):
@@ -285,32 +378,27 @@ class OEMDataScraper:
                     logging.warning(
                         "Retrying OEM download attempt=%s/%s context=%s failed_step=%s error=%s",
                         retries,
-                        self.max_retries,
+                        self.download_max_retries,
                         format_log_context(context),
                         getattr(e, "step", "download_flow"),
                         summarize_exception(e),
                     )
-                    time.sleep(self.retry_delay)
+                    if retries < self.download_max_retries:
+                        time.sleep(self.retry_delay)
 
             raise last_exception
-        finally:
-            browser.quit()
 
     def get_all_vehicle_category_elements(self):
-        browserOpts = webdriver.ChromeOptions()
-        configure_chrome_options(browserOpts)
-        browser = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), options=browserOpts
-        )
         context = {
             "pipeline": "oem",
             "action": "load_vehicle_categories",
         }
 
-        try:
+        with self.session_pool.lease() as browser:
             retries = 0
             last_exception = None
             while retries < self.max_retries:
+                timings = StepTimings()
                 try:
                     open_page(
                         browser,
@@ -318,7 +406,12 @@ class OEMDataScraper:
                         step="initial_page_load",
                         context=context,
                     )
-                    time.sleep(5)
+                    wait_for_page_settle(
+                        browser,
+                        step="initial_page_load",
+                        context=context,
+                        timings=timings,
+                    )
                     self.find_element(
                         browser,
                         "id",
@@ -326,7 +419,12 @@ class OEMDataScraper:
                         step="open_vehicle_category_filter",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="open_vehicle_category_filter",
+                        context=context,
+                        timings=timings,
+                    )
                     category_element = self.find_element(
                         browser,
                         "xpath",
@@ -334,7 +432,12 @@ class OEMDataScraper:
                         step="read_vehicle_category_table",
                         context=context,
                     )
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="read_vehicle_category_table",
+                        context=context,
+                        timings=timings,
+                    )
                     vehicle_category_lst = []
                     for row_label in category_element.find_elements(By.TAG_NAME, "tr"):
                         vehicle_category_lst.append(row_label.text)
@@ -359,6 +462,8 @@ class OEMDataScraper:
                     StaleElementReferenceException,
                     WebDriverException,
                 ) as e:
+                    if is_dead_session_error(e):
+                        raise
                     last_exception = e
                     retries += 1
                     logging.warning(
@@ -372,24 +477,37 @@ class OEMDataScraper:
                     time.sleep(self.retry_delay)
 
             raise last_exception
-        finally:
-            browser.quit()
 
     # define a function to wrap the selenium function for argument unpacking
     def run_selenium(self, args):
         return self.extract_oem_data_by_state_and_vehicle_category(*args)
 
 
-def main():
-    data_extract_class = OEMDataScraper()
-
+def run_monthly_extraction(data_extract_class):
     # get all state and vehicle category elements
-    vehicle_category_lst = data_extract_class.get_all_vehicle_category_elements()
+    catalogue = load_or_discover_catalogue(data_extract_class.session_pool)
+    if catalogue is not None and catalogue.vehicle_categories:
+        vehicle_category_lst = catalogue.vehicle_categories
+    else:
+        vehicle_category_lst = data_extract_class.get_all_vehicle_category_elements()
+    # The categories come from the site itself, so the catalogue cannot
+    # validate them; check them against the mapping sheet instead.
+    vehicle_category_lst = filter_mapped_vehicle_classes(
+        vehicle_category_lst,
+        MAPPING_FILE_PATH,
+        pipeline=OEM_PIPELINE,
+    )
+    if not vehicle_category_lst:
+        raise RuntimeError(
+            "No OEM vehicle categories from Vahan are listed in the mapping sheet. Extraction cannot continue."
+        )
 
     state_lst = STATE_LIST
 
     month, year = resolve_month_year_args(sys.argv[1:])
     parameters = []
+    ledger_entries = []
+    task_directories = {}
     for state in state_lst:
         for category in vehicle_category_lst:
             directory_path = os.path.join(
@@ -402,33 +520,62 @@ def main():
                 month,
             )
 
-            # remove the file if already exists from previous month
-            if os.path.exists(directory_path):
-                shutil.rmtree(directory_path)
-
-            parameters.append((state, year, month, category))
+            task = (state, year, month, category)
+            parameters.append(task)
+            task_directories[task] = directory_path
+            ledger_entries.append(
+                (
+                    LedgerTask(OEM_PIPELINE, state, category, str(year), month),
+                    task,
+                    os.path.join(directory_path, "reportTable.xlsx"),
+                )
+            )
 
-    logging.info(
-        "Prepared OEM download tasks count=%s year=%s month=%s",
-        len(parameters),
-        year,
-        month,
+    parameters = filter_task_grid(
+        catalogue,
+        parameters,
+        ("state", "year", "month", "vehicle_class"),
+        OEM_PIPELINE,
     )
+    offered_tasks = set(parameters)
+    ledger_entries = [entry for entry in ledger_entries if entry[1] in offered_tasks]
 
-    # Run selenium function in parallel
-    with ThreadPoolExecutor(
-        max_workers=30
-    ) as executor:  # Adjust max_workers based on your system's capability
-        futures = {
-            executor.submit(data_extract_class.run_selenium, args): args
-            for args in parameters
-        }
+    with ScrapeTaskLedger() as ledger:
+        pending_tasks = set(
+            ledger.prepare_run(OEM_PIPELINE, year, month, ledger_entries)
+        )
+        parameters = [task for task in parameters if task in pending_tasks]
+        for task in parameters:
+            # remove partial output left by an earlier, unfinished attempt
+            if os.path.exists(task_directories[task]):
+                shutil.rmtree(task_directories[task])
+
+        logging.info(
+            "Prepared OEM download tasks count=%s year=%s month=%s",
+            len(parameters),
+            year,
+            month,
+        )
+
+        # Run selenium function in parallel
+        controller = AdaptiveConcurrencyController.from_config(
+            OEM_DOWNLOAD_MAX_WORKERS,
+            on_limit_change=data_extract_class.session_pool.trim_idle,
+            name="oem_downloads",
+        )
 
         successful_downloads = 0
         failed_downloads = []
 
-        for future in as_completed(futures):
-            state, year_label, month_label, category = futures[future]
+        # failed tasks are requeued with backoff inside this pass instead of
+        # waiting for a separate missing-file run
+        data_extract_class.download_max_retries = SCHEDULED_DOWNLOAD_MAX_RETRIES
+        scheduler = RetryingTaskScheduler.from_config(controller)
+        for task, future in scheduler.run(
+            ledger.tracked(OEM_PIPELINE, data_extract_class.run_selenium),
+            parameters,
+        ):
+            state, year_label, month_label, category = task
             try:
                 future.result()
                 successful_downloads += 1
@@ -445,14 +592,29 @@ def main():
                     summarize_exception(getattr(e, "original_exception", e)),
                 )
 
-    logging.info(
-        "OEM extraction summary for %s %s: prepared=%s succeeded=%s failed=%s",
-        month,
-        year,
-        len(parameters),
-        successful_downloads,
-        len(failed_downloads),
-    )
+        logging.info(
+            "OEM extraction summary for %s %s: prepared=%s succeeded=%s failed=%s",
+            month,
+            year,
+            len(parameters),
+            successful_downloads,
+            len(failed_downloads),
+        )
+        scheduler.report.log()
+
+    if failed_downloads:
+        raise RuntimeError(
+            f"OEM extraction for {month} {year} still has {len(failed_downloads)} failed downloads after retries."
+        )
+
+
+def main():
+    resolve_chromedriver_path()
+    data_extract_class = OEMDataScraper()
+    try:
+        run_monthly_extraction(data_extract_class)
+    finally:
+        data_extract_class.close()
 
 
 if __name__ == "__main__":
@@ -22,6 +22,7 @@ def main():
         raw_container_config_key="container_name",
         csv_container_config_key="csv_container_name",
         csv_prefix="oem_data_by_state_and_category_{month}_{year}",
+        parquet_file_prefix="oem_data_by_state_and_category",
     )
 
 
@@ -12,7 +12,16 @@ UNIT_TEST_MODULES=(
     tests.test_shared_etl_support
     tests.test_missing_file_recovery
     tests.test_selenium_logging
+    tests.test_browser_runtime
+    tests.test_jsf_fetcher
+    tests.test_scrape_scheduler
+    tests.test_scrape_task_ledger
+    tests.test_vahan_catalogue
     tests.test_rto_mapping_refresh
+    tests.test_xlsx_report_reader
+    tests.test_parsed_report_cache
+    tests.test_mapping_lookup
+    tests.test_parquet_output
     tests.test_schema_regression
     tests.test_chat_alerts
     tests.test_dbt_contracts
@@ -0,0 +1,109 @@
+"""
+Partitioned Parquet copy of the monthly preprocessing output.
+
+Each pipeline keeps one hive-partitioned dataset next to its CSVs, e.g.
+``rto_level_ev_data_parquet/state=Goa/year=2026/month=6/part-0-0.parquet``,
+with the CSV's columns stored typed (categorical dimensions as dictionary
+strings, counts as int32). A run writes to a temporary directory and then
+swaps in each (state, year, month) partition it produced, so a rerun replaces
+exactly those partitions. ``etl_blob_upload.upload_pipeline_artifacts``
+uploads the same layout to the CSV container.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # pragma: no cover - pyarrow is only installed where Parquet output is enabled
+    pyarrow = None
+
+PARQUET_DATASET_SUFFIX = "_parquet"
+PARQUET_PARTITION_COLUMNS = ("state", "year", "month")
+PARQUET_FILE_SUFFIX = ".parquet"
+
+
+def build_parquet_dataset_path(directory: str | Path, file_prefix: str) -> Path:
+    return Path(directory) / f"{file_prefix}{PARQUET_DATASET_SUFFIX}"
+
+
+def iter_month_partitions(dataset_dir: str | Path, year, month_number: int) -> list[Path]:
+    """Return the dataset's ``state=*/year=<year>/month=<month>`` directories."""
+    return sorted(
+        path
+        for path in Path(dataset_dir).glob(f"state=*/year={year}/month={month_number}")
+        if path.is_dir()
+    )
+
+
+class PartitionedParquetWriter:
+    """Append output batches to a temporary dataset and swap its partitions in on commit."""
+
+    def __init__(self, dataset_dir: str | Path) -> None:
+        if pyarrow is None:
+            raise RuntimeError(
+                "Parquet output requires pyarrow; install it or disable preprocessing.parquet_output."
+            )
+        self.dataset_dir = Path(dataset_dir)
+        self.dataset_dir.mkdir(parents=True, exist_ok=True)
+        self.temp_dir = Path(
+            tempfile.mkdtemp(dir=self.dataset_dir, prefix=".write.", suffix=".tmp")
+        )
+        self.batches_written = 0
+
+    def __enter__(self) -> PartitionedParquetWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def write(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        df.to_parquet(
+            self.temp_dir,
+            engine="pyarrow",
+            partition_cols=list(PARQUET_PARTITION_COLUMNS),
+            index=False,
+            # Batches share partitions, so file names must not collide.
+            basename_template=f"part-{self.batches_written}-{{i}}{PARQUET_FILE_SUFFIX}",
+        )
+        self.batches_written += 1
+
+    def commit(self) -> list[Path]:
+        """Replace each partition this writer produced and return their final paths."""
+        partitions = sorted(
+            {
+                file_path.parent.relative_to(self.temp_dir)
+                for file_path in self.temp_dir.rglob(f"*{PARQUET_FILE_SUFFIX}")
+            }
+        )
+        committed = []
+        for partition in partitions:
+            target_dir = self.dataset_dir / partition
+            if target_dir.exists():
+                shutil.rmtree(target_dir)
+            target_dir.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self.temp_dir / partition, target_dir)
+            committed.append(target_dir)
+
+        self.discard()
+        logging.info(
+            "Wrote Parquet output dataset=%s partitions=%s batches=%s",
+            self.dataset_dir,
+            len(committed),
+            self.batches_written,
+        )
+        return committed
+
+    def discard(self) -> None:
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
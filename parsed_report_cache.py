@@ -0,0 +1,197 @@
+"""
+Local cache of parsed report workbooks.
+
+Parsed ``reportTable.xlsx`` frames are stored as Parquet files named after
+the workbook's SHA-256 and the preprocessor version, so reruns (after a
+partial recovery, or month after month of a backfill) only parse workbooks
+whose bytes changed. The directory is kept under a byte budget by evicting
+the least recently used entries; cache hits refresh an entry's mtime.
+
+Parquet rather than pickle so entries stay readable across pandas upgrades.
+Where pyarrow is not installed entries fall back to pickles under their own
+suffix, so neither format ever reads the other's files.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # pragma: no cover - pyarrow is pinned in requirements.txt
+    pyarrow = None
+
+from utils import compute_file_sha256
+
+PREPROCESSING_CACHE_DIR_ENV_VAR = "VAHAN_PREPROCESSING_CACHE_DIR"
+PREPROCESSING_CACHE_MAX_MB_ENV_VAR = "VAHAN_PREPROCESSING_CACHE_MAX_MB"
+DEFAULT_PREPROCESSING_CACHE_DIRNAME = "preprocessing_cache"
+DEFAULT_PREPROCESSING_CACHE_MAX_MB = 512
+PARQUET_FRAME_SUFFIX = ".parquet"
+PICKLE_FRAME_SUFFIX = ".pkl"
+
+
+def frame_file_suffix() -> str:
+    return PARQUET_FRAME_SUFFIX if pyarrow is not None else PICKLE_FRAME_SUFFIX
+
+
+def write_frame(df: pd.DataFrame, file) -> None:
+    """Write ``df`` to a path or binary file in the format ``frame_file_suffix`` names."""
+    if pyarrow is not None:
+        df.to_parquet(file, engine="pyarrow")
+    else:
+        df.to_pickle(file)
+
+
+def read_frame(path: str | Path) -> pd.DataFrame:
+    if pyarrow is not None:
+        return pd.read_parquet(path, engine="pyarrow")
+    return pd.read_pickle(path)
+
+
+class ParsedReportCache:
+    def __init__(self, cache_dir: str | Path, max_bytes: int, version: str) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        # Running size estimate; a full directory scan only happens once it
+        # crosses the budget.
+        self._approximate_bytes: int | None = None
+
+    @classmethod
+    def from_config(
+        cls,
+        base_directory: str | Path,
+        version: str,
+        preprocessing_config=None,
+    ) -> ParsedReportCache | None:
+        """
+        Build the cache from ``preprocessing.cache_max_mb`` / ``cache_dir``.
+
+        ``VAHAN_PREPROCESSING_CACHE_MAX_MB`` and ``VAHAN_PREPROCESSING_CACHE_DIR``
+        override config.yaml; a budget of ``0`` disables caching.
+        """
+        preprocessing_config = preprocessing_config or {}
+        raw_max_mb = os.getenv(PREPROCESSING_CACHE_MAX_MB_ENV_VAR)
+        if raw_max_mb is None:
+            raw_max_mb = preprocessing_config.get("cache_max_mb")
+        if raw_max_mb is None or str(raw_max_mb).strip() == "":
+            raw_max_mb = DEFAULT_PREPROCESSING_CACHE_MAX_MB
+        try:
+            max_mb = float(raw_max_mb)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(
+                f"Invalid preprocessing cache size {raw_max_mb!r}; expected a number of megabytes."
+            ) from exc
+        if max_mb <= 0:
+            return None
+
+        cache_dir = (
+            os.getenv(PREPROCESSING_CACHE_DIR_ENV_VAR)
+            or preprocessing_config.get("cache_dir")
+            or Path(base_directory) / DEFAULT_PREPROCESSING_CACHE_DIRNAME
+        )
+        return cls(cache_dir, int(max_mb * 1024 * 1024), version)
+
+    def entry_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}-v{self.version}{frame_file_suffix()}"
+
+    def get_or_load(
+        self,
+        report_path: str | Path,
+        load: Callable[[str | Path], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Return the cached frame for the workbook's current bytes, parsing it on a miss."""
+        entry_path = self.entry_path(compute_file_sha256(report_path))
+        try:
+            df = read_frame(entry_path)
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+        except Exception as exc:
+            logging.warning(
+                "Discarding unreadable preprocessing cache entry path=%s error=%s",
+                entry_path,
+                exc,
+            )
+            entry_path.unlink(missing_ok=True)
+        else:
+            self.hits += 1
+            return df
+
+        self.misses += 1
+        df = load(report_path)
+        self.store(entry_path, df)
+        return df
+
+    def store(self, entry_path: Path, df: pd.DataFrame) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=self.cache_dir,
+            prefix=f".{entry_path.stem}.",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as temp_file:
+                write_frame(df, temp_file)
+            os.replace(temp_path, entry_path)
+        except (TypeError, ValueError) as exc:
+            # Parquet needs string column names and one type per column.
+            Path(temp_path).unlink(missing_ok=True)
+            logging.warning(
+                "Not caching a frame the cache format cannot store path=%s error=%s",
+                entry_path,
+                exc,
+            )
+            return
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+        if self._approximate_bytes is None:
+            self._approximate_bytes = self.current_size_bytes()
+        else:
+            self._approximate_bytes += entry_path.stat().st_size
+        if self._approximate_bytes > self.max_bytes:
+            self._approximate_bytes = self.evict()
+
+    def iter_entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for entry_path in self.cache_dir.glob(f"*{frame_file_suffix()}"):
+            try:
+                stat_result = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat_result.st_mtime, stat_result.st_size, entry_path))
+        return entries
+
+    def current_size_bytes(self) -> int:
+        return sum(size for _, size, _ in self.iter_entries())
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits its budget."""
+        entries = sorted(self.iter_entries())
+        total_bytes = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, entry_path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            total_bytes -= size
+            evicted += 1
+
+        if evicted:
+            logging.info(
+                "Evicted preprocessing cache entries count=%s remaining_bytes=%s max_bytes=%s",
+                evicted,
+                total_bytes,
+                self.max_bytes,
+            )
+        return total_bytes
@@ -0,0 +1,166 @@
+"""
+Persistent snapshot for incremental preprocessing.
+
+For each (pipeline, month, year) the snapshot keeps the last finalized output,
+with every row tagged by the report it came from, plus a manifest of each
+report's mtime, size and SHA-256. A rerun compares the reports on disk with
+the manifest, re-reads only those that were added or changed, and splices
+their rows into the saved output. The output is stored in the parsed-report
+cache's frame format (Parquet where pyarrow is installed).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from parsed_report_cache import frame_file_suffix, read_frame, write_frame
+from utils import compute_file_sha256
+
+MANIFEST_FILENAME = "manifest.json"
+OUTPUT_FILENAME_STEM = "output"
+MANIFEST_SCHEMA_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ReportManifestEntry:
+    mtime_ns: int
+    size: int
+    sha256: str
+    empty: bool = False
+    unexpected_source_columns: tuple[str, ...] = ()
+
+
+@dataclass
+class PreprocessingSnapshot:
+    fingerprint: str
+    entries: dict[str, ReportManifestEntry] = field(default_factory=dict)
+    output: pd.DataFrame | None = None
+
+
+def _write_atomically(path: Path, write) -> None:
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=path.parent,
+        prefix=f".{path.name}.",
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(file_descriptor, "wb") as temp_file:
+            write(temp_file)
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+def build_output_path(state_directory: str | Path) -> Path:
+    return Path(state_directory) / f"{OUTPUT_FILENAME_STEM}{frame_file_suffix()}"
+
+
+def load_snapshot(state_directory: str | Path) -> PreprocessingSnapshot | None:
+    """Return the saved snapshot, or None when it is missing or unreadable."""
+    state_directory = Path(state_directory)
+    try:
+        with (state_directory / MANIFEST_FILENAME).open("r", encoding="utf-8") as manifest_file:
+            payload = json.load(manifest_file)
+        output = read_frame(build_output_path(state_directory))
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        logging.warning(
+            "Discarding unreadable preprocessing snapshot path=%s error=%s",
+            state_directory,
+            exc,
+        )
+        return None
+
+    if payload.get("schema_version") != MANIFEST_SCHEMA_VERSION:
+        return None
+    entries = {
+        report_path: ReportManifestEntry(
+            mtime_ns=entry["mtime_ns"],
+            size=entry["size"],
+            sha256=entry["sha256"],
+            empty=entry.get("empty", False),
+            unexpected_source_columns=tuple(entry.get("unexpected_source_columns", ())),
+        )
+        for report_path, entry in payload.get("reports", {}).items()
+    }
+    return PreprocessingSnapshot(
+        fingerprint=payload.get("fingerprint", ""),
+        entries=entries,
+        output=output,
+    )
+
+
+def save_snapshot(state_directory: str | Path, snapshot: PreprocessingSnapshot) -> None:
+    state_directory = Path(state_directory)
+    state_directory.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "schema_version": MANIFEST_SCHEMA_VERSION,
+        "fingerprint": snapshot.fingerprint,
+        "reports": {
+            report_path: asdict(entry)
+            for report_path, entry in snapshot.entries.items()
+        },
+    }
+    # Output first: a manifest never describes rows that were not saved.
+    _write_atomically(
+        build_output_path(state_directory),
+        lambda output_file: write_frame(snapshot.output, output_file),
+    )
+    _write_atomically(
+        state_directory / MANIFEST_FILENAME,
+        lambda manifest_file: manifest_file.write(
+            json.dumps(payload, indent=2, sort_keys=True).encode("utf-8")
+        ),
+    )
+
+
+def classify_reports(
+    report_paths: list[str],
+    previous_entries: dict[str, ReportManifestEntry],
+) -> tuple[dict[str, ReportManifestEntry], dict[str, ReportManifestEntry]]:
+    """
+    Split reports into unchanged and added/changed ones.
+
+    Matching mtime and size is trusted without hashing; otherwise the file is
+    hashed and only counts as changed when its bytes differ. Returns the
+    unchanged entries (with refreshed stat values) and fresh entries for the
+    reports that must be re-read.
+    """
+    unchanged: dict[str, ReportManifestEntry] = {}
+    changed: dict[str, ReportManifestEntry] = {}
+    for report_path in report_paths:
+        stat_result = os.stat(report_path)
+        previous = previous_entries.get(report_path)
+        if (
+            previous is not None
+            and previous.mtime_ns == stat_result.st_mtime_ns
+            and previous.size == stat_result.st_size
+        ):
+            unchanged[report_path] = previous
+            continue
+
+        digest = compute_file_sha256(report_path)
+        if previous is not None and previous.sha256 == digest:
+            unchanged[report_path] = ReportManifestEntry(
+                mtime_ns=stat_result.st_mtime_ns,
+                size=stat_result.st_size,
+                sha256=digest,
+                empty=previous.empty,
+                unexpected_source_columns=previous.unexpected_source_columns,
+            )
+            continue
+
+        changed[report_path] = ReportManifestEntry(
+            mtime_ns=stat_result.st_mtime_ns,
+            size=stat_result.st_size,
+            sha256=digest,
+        )
+    return unchanged, changed
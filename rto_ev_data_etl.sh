@@ -33,11 +33,6 @@ CURRENT_STEP="extraction"
 log_step "Starting RTO extraction for ${RUN_LABEL}"
 run_selenium_step python3 rto_level/rto_level_data_scraper.py "$@"
 
-# Run missing files extraction
-CURRENT_STEP="missing_file_recovery"
-log_step "Running RTO missing-file recovery for ${RUN_LABEL}"
-run_selenium_step python3 rto_level/rto_level_get_missing_files.py "$@"
-
 # Run Pre Processing
 CURRENT_STEP="preprocessing"
 log_step "Running RTO preprocessing for ${RUN_LABEL}"
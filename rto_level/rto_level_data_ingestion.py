@@ -30,9 +30,9 @@ class RtoDataIngest(BaseSqlServerIngestor):
 
 
 def main():
-    rto_ev_data_ingest = RtoDataIngest()
     month, year = resolve_month_year_args(sys.argv[1:])
-    rto_ev_data_ingest.data_ingest(month, year)
+    with RtoDataIngest() as rto_ev_data_ingest:
+        rto_ev_data_ingest.data_ingest(month, year)
 
 
 if __name__ == "__main__":
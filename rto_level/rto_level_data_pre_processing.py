@@ -4,8 +4,6 @@ import os
 import sys
 from typing import Iterable
 
-import pandas as pd
-
 repo_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if repo_path not in sys.path:
     sys.path.append(repo_path)
@@ -49,7 +47,7 @@ class RTOLevelDataPreProcessor(BaseExcelPreprocessor):
             raw_files_directory=raw_files_directory,
         )
 
-    def iter_report_contexts(self, month, year, **kwargs):
+    def iter_report_contexts_for_months(self, months, **kwargs):
         selected_states = set(kwargs.get("states") or [])
         if not self.raw_files_directory.exists():
             return
@@ -62,24 +60,25 @@ class RTOLevelDataPreProcessor(BaseExcelPreprocessor):
 
             for rto_dir in sorted(path for path in state_dir.iterdir() if path.is_dir()):
                 rto_name, rto_code = self.split_rto_folder_name(rto_dir.name)
-                yield ReportContext(
-                    report_path=rto_dir / year / month / "reportTable.xlsx",
-                    metadata={
-                        "Month": month,
-                        "Year": year,
-                        "Day": 1,
-                        "Date": f"1/{month}/{year}",
-                        "rto_name": rto_name,
-                        "rto_code": rto_code,
-                        "State": state_dir.name,
-                    },
-                    labels={
-                        "state": state_dir.name,
-                        "office": rto_dir.name,
-                        "year": year,
-                        "month": month,
-                    },
-                )
+                for month, year in months:
+                    yield ReportContext(
+                        report_path=rto_dir / year / month / "reportTable.xlsx",
+                        metadata={
+                            "Month": month,
+                            "Year": year,
+                            "Day": 1,
+                            "Date": f"1/{month}/{year}",
+                            "rto_name": rto_name,
+                            "rto_code": rto_code,
+                            "State": state_dir.name,
+                        },
+                        labels={
+                            "state": state_dir.name,
+                            "office": rto_dir.name,
+                            "year": year,
+                            "month": month,
+                        },
+                    )
 
     @staticmethod
     def split_rto_folder_name(folder_name: str):
@@ -87,15 +86,6 @@ class RTOLevelDataPreProcessor(BaseExcelPreprocessor):
             return folder_name, ""
         return folder_name.rsplit("_", 1)
 
-    def apply_mapping(self, df):
-        return pd.merge(
-            df,
-            self.mapping_df,
-            left_on="Unnamed: 1",
-            right_on="Vehicle Class",
-            how="left",
-        )
-
     def describe_scope(self, month: str, year: str, **kwargs) -> str:
         selected_states = set(kwargs.get("states") or [])
         if not selected_states:
@@ -109,8 +99,9 @@ class RTOLevelDataPreProcessor(BaseExcelPreprocessor):
 def main():
     rto_level_data_preprocessor = RTOLevelDataPreProcessor()
     month, year = resolve_month_year_args(sys.argv[1:])
-    final_df = rto_level_data_preprocessor.data_preprocessing(month, year)
-    final_df.to_csv(f"rto_level_ev_data_{month}_{year}.csv", header=True, index=False)
+    rto_level_data_preprocessor.write_output_csv(
+        month, year, f"rto_level_ev_data_{month}_{year}.csv"
+    )
 
 
 if __name__ == "__main__":
@@ -1,15 +1,11 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-from selenium import webdriver
 from selenium.common.exceptions import (
     TimeoutException,
     StaleElementReferenceException,
     WebDriverException,
 )
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 
+import hashlib
 import json
 import logging
 import os
@@ -17,26 +13,48 @@ import sys
 import shutil
 import time
 import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 
 repo_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if repo_path not in sys.path:
     sys.path.append(repo_path)
 
-from pipeline_constants import STATE_LIST
+from pipeline_constants import MONTH_NAME_TO_NUMBER, STATE_LIST
 from pipeline_logging import configure_pipeline_logging
 from runtime_config import resolve_month_year_args
+from scrape_scheduler import (
+    SCHEDULED_DOWNLOAD_MAX_RETRIES,
+    AdaptiveConcurrencyController,
+    RetryingTaskScheduler,
+)
+from scrape_task_ledger import RTO_PIPELINE, LedgerTask, ScrapeTaskLedger
+from vahan_catalogue import filter_task_grid, load_or_discover_catalogue
+from vahan_jsf_fetcher import (
+    HTTP_FETCH_ENGINE,
+    JsfBlockedError,
+    JsfFetchError,
+    VahanJsfFetcher,
+    get_fetch_engine,
+)
 from utils import (
     BlockedPageError,
+    BrowserSessionPool,
     SeleniumStepError,
+    StepTimings,
     VAHAN_DASHBOARD_URL,
-    configure_chrome_options,
     create_directory_if_not_exists,
     find_element,
     format_log_context,
+    is_dead_session_error,
     open_page,
+    resolve_chromedriver_path,
+    set_download_directory,
     summarize_exception,
     get_year_month_label,
+    load_browser_config,
     wait_for_expected_download,
+    wait_for_page_settle,
 )
 
 configure_pipeline_logging()
@@ -46,6 +64,15 @@ configure_pipeline_logging()
 # successful run. Gitignored; the working-tree copy is load-bearing runtime
 # state, not build output.
 RTO_STATE_OFFICE_MAPPING_PATH = "rto_state_office_mapping.json"
+# Per-state fetch timestamps and content hashes for the mapping cache above.
+RTO_STATE_OFFICE_MAPPING_METADATA_PATH = "rto_state_office_mapping.meta.json"
+RTO_MAPPING_TTL_ENV_VAR = "VAHAN_RTO_MAPPING_TTL_HOURS"
+DEFAULT_RTO_MAPPING_TTL_HOURS = 168
+RTO_DOWNLOAD_MAX_WORKERS = 35
+STATE_DROPDOWN_DEFAULT_LABEL = "All Vahan4 Running States"
+RTO_DROPDOWN_DEFAULT_LABEL = "All Vahan4 Running Office"
+# Stable PrimeFaces id of the RTO selectOneMenu label (items: selectedRto_items).
+RTO_DROPDOWN_LABEL_ID = "selectedRto_label"
 
 
 def merge_state_rto_mappings(previous_mapping, fresh_mapping):
@@ -62,10 +89,131 @@ def get_missing_mapping_states(state_rto_mapping, states):
     return [state for state in states if not state_rto_mapping.get(state)]
 
 
+def get_rto_mapping_ttl_hours(browser_config=None):
+    """
+    Hours a state's cached RTO list stays fresh, read from
+    VAHAN_RTO_MAPPING_TTL_HOURS or ``browser.rto_mapping_ttl_hours``.
+    """
+    configured = os.getenv(RTO_MAPPING_TTL_ENV_VAR)
+    if configured is None:
+        if browser_config is None:
+            browser_config = load_browser_config()
+        configured = browser_config.get("rto_mapping_ttl_hours")
+    if configured in (None, ""):
+        return DEFAULT_RTO_MAPPING_TTL_HOURS
+    return max(0.0, float(configured))
+
+
+def hash_rto_offices(offices):
+    return hashlib.sha256(json.dumps(offices).encode("utf-8")).hexdigest()
+
+
+def load_mapping_metadata(metadata_path=RTO_STATE_OFFICE_MAPPING_METADATA_PATH):
+    if not os.path.exists(metadata_path):
+        return {}
+    try:
+        with open(metadata_path, "r") as metadata_file:
+            return json.load(metadata_file)
+    except json.JSONDecodeError:
+        logging.error("RTO mapping metadata %s is corrupted. Refreshing all states.", metadata_path)
+        return {}
+
+
+def get_stale_mapping_states(state_rto_mapping, metadata, states, ttl_hours, now=None):
+    """
+    Return states whose cached RTO list is missing, was never timestamped,
+    was edited since it was fetched, or is older than ``ttl_hours``.
+    """
+    now = now or datetime.now(timezone.utc)
+    stale_states = []
+    for state in states:
+        offices = state_rto_mapping.get(state)
+        state_metadata = metadata.get(state) or {}
+        fetched_at = state_metadata.get("fetched_at")
+        if (
+            not offices
+            or not fetched_at
+            or state_metadata.get("content_sha256") != hash_rto_offices(offices)
+            or now - datetime.fromisoformat(fetched_at) >= timedelta(hours=ttl_hours)
+        ):
+            stale_states.append(state)
+    return stale_states
+
+
+def update_mapping_metadata(metadata, fresh_mapping, now=None):
+    """Stamp freshly fetched states and log those whose office list changed."""
+    fetched_at = (now or datetime.now(timezone.utc)).isoformat(timespec="seconds")
+    updated = dict(metadata or {})
+    for state, offices in (fresh_mapping or {}).items():
+        if not offices:
+            continue
+        content_sha256 = hash_rto_offices(offices)
+        previous_sha256 = (updated.get(state) or {}).get("content_sha256")
+        if previous_sha256 and previous_sha256 != content_sha256:
+            logging.info(
+                "RTO office list changed state=%s offices=%s",
+                state,
+                len(offices),
+            )
+        updated[state] = {
+            "fetched_at": fetched_at,
+            "content_sha256": content_sha256,
+            "office_count": len(offices),
+        }
+    return updated
+
+
+@dataclass(frozen=True)
+class RtoSessionPlan:
+    """Download tasks for one state that share a single browser session."""
+
+    state_label: str
+    tasks: tuple
+
+
+def build_rto_session_plans(parameters, offices_per_plan=1):
+    """
+    Group (state, rto, year, month) download tasks into session plans.
+
+    Each plan covers ``offices_per_plan`` offices of one state, with periods
+    ordered by year and month so the dashboard only refreshes once per year.
+    """
+    tasks_by_state = {}
+    for state_label, rto_label, year_label, month_label in parameters:
+        offices = tasks_by_state.setdefault(state_label, {})
+        offices.setdefault(rto_label, []).append((str(year_label), month_label))
+
+    plans = []
+    for state_label, offices in tasks_by_state.items():
+        office_labels = list(offices)
+        for start in range(0, len(office_labels), offices_per_plan):
+            plan_tasks = []
+            for rto_label in office_labels[start : start + offices_per_plan]:
+                periods = sorted(
+                    set(offices[rto_label]),
+                    key=lambda period: (int(period[0]), MONTH_NAME_TO_NUMBER[period[1]]),
+                )
+                plan_tasks.extend(
+                    (rto_label, year_label, month_label)
+                    for year_label, month_label in periods
+                )
+            plans.append(RtoSessionPlan(state_label, tuple(plan_tasks)))
+    return plans
+
+
 class RTODataScraper:
-    def __init__(self):
+    def __init__(self, session_pool=None, fetch_engine=None):
         self.max_retries = 5
+        # attempts per report download; see SCHEDULED_DOWNLOAD_MAX_RETRIES
+        self.download_max_retries = self.max_retries
         self.retry_delay = 15
+        self.session_pool = session_pool or BrowserSessionPool(
+            max_sessions=RTO_DOWNLOAD_MAX_WORKERS
+        )
+        self.fetch_engine = fetch_engine or get_fetch_engine()
+
+    def close(self):
+        self.session_pool.close()
 
     @staticmethod
     def extract_rto_name_and_code(rto_label):
@@ -128,6 +276,98 @@ class RTODataScraper:
             month_label,
         )
 
+    def read_rto_offices(self, browser, state, current_state_label, context, timings=None):
+        """
+        Select ``state`` on an already loaded dashboard and read its RTO
+        dropdown, leaving the dropdown closed for the next state.
+        :param current_state_label: text the state dropdown currently shows
+        :return: list of RTO office labels
+        """
+        find_element(
+            browser,
+            "xpath",
+            f'//label[starts-with(text(), "{current_state_label}")]',
+            step="open_state_dropdown",
+            context=context,
+        ).click()
+        wait_for_page_settle(
+            browser,
+            step="open_state_dropdown",
+            context=context,
+            timings=timings,
+        )
+
+        find_element(
+            browser,
+            "xpath",
+            f'//li[starts-with(text(), "{state}")]',
+            step="select_state",
+            context=context,
+        ).click()
+        wait_for_page_settle(
+            browser,
+            step="select_state",
+            context=context,
+            timings=timings,
+        )
+
+        rto_dropdown_xpath = f'//label[starts-with(text(), "{RTO_DROPDOWN_DEFAULT_LABEL}")]'
+        find_element(
+            browser,
+            "xpath",
+            rto_dropdown_xpath,
+            step="open_rto_dropdown",
+            context=context,
+        ).click()
+        wait_for_page_settle(
+            browser,
+            step="open_rto_dropdown",
+            context=context,
+            timings=timings,
+        )
+
+        rto_list = find_element(
+            browser,
+            "xpath",
+            "//ul[@id='selectedRto_items']",
+            step="read_rto_list",
+            context=context,
+        )
+        all_rto_office_names = [
+            elem.text
+            for elem in rto_list.find_elements(By.TAG_NAME, "li")
+            if RTO_DROPDOWN_DEFAULT_LABEL not in elem.text
+        ]
+
+        find_element(
+            browser,
+            "xpath",
+            rto_dropdown_xpath,
+            step="close_rto_dropdown",
+            context=context,
+        ).click()
+        wait_for_page_settle(
+            browser,
+            step="close_rto_dropdown",
+            context=context,
+            timings=timings,
+        )
+        return all_rto_office_names
+
+    def load_dashboard(self, browser, context, timings=None):
+        open_page(
+            browser,
+            VAHAN_DASHBOARD_URL,
+            step="initial_page_load",
+            context=context,
+        )
+        wait_for_page_settle(
+            browser,
+            step="initial_page_load",
+            context=context,
+            timings=timings,
+        )
+
     def get_all_rto_from_state(self, state):
         """
         Function is used to get all the rto from the given state
@@ -135,68 +375,26 @@ class RTODataScraper:
         :return: list of all rto from the state
         """
 
-        browser_options = webdriver.ChromeOptions()
-        configure_chrome_options(browser_options)
-        browser = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), options=browser_options
-        )
         context = {
             "pipeline": "rto",
             "state": state,
             "action": "refresh_rto_mapping",
         }
 
-        try:
-            all_rto_office_names = []
+        with self.session_pool.lease() as browser:
             retries = 0
             last_exception = None
             while retries < self.max_retries:
+                timings = StepTimings()
                 try:
-                    open_page(
-                        browser,
-                        VAHAN_DASHBOARD_URL,
-                        step="initial_page_load",
-                        context=context,
-                    )
-                    time.sleep(5)
-
-                    find_element(
-                        browser,
-                        "xpath",
-                        '//label[starts-with(text(), "All Vahan4 Running States")]',
-                        step="open_state_dropdown",
-                        context=context,
-                    ).click()
-                    time.sleep(2)
-
-                    find_element(
+                    self.load_dashboard(browser, context, timings)
+                    all_rto_office_names = self.read_rto_offices(
                         browser,
-                        "xpath",
-                        f'//li[starts-with(text(), "{state}")]',
-                        step="select_state",
-                        context=context,
-                    ).click()
-                    time.sleep(2)
-
-                    find_element(
-                        browser,
-                        "xpath",
-                        '//label[starts-with(text(), "All Vahan4 Running Office")]',
-                        step="open_rto_dropdown",
-                        context=context,
-                    ).click()
-                    time.sleep(2)
-
-                    rto_list = find_element(
-                        browser,
-                        "xpath",
-                        "//ul[@id='selectedRto_items']",
-                        step="read_rto_list",
-                        context=context,
+                        state,
+                        STATE_DROPDOWN_DEFAULT_LABEL,
+                        context,
+                        timings,
                     )
-                    for elem in rto_list.find_elements(By.TAG_NAME, "li"):
-                        if "All Vahan4 Running Office" not in elem.text:
-                            all_rto_office_names.append(elem.text)
 
                     logging.info(
                         "Fetched RTO mapping state=%s offices=%s",
@@ -220,6 +418,8 @@ class RTODataScraper:
                     StaleElementReferenceException,
                     WebDriverException,
                 ) as e:
+                    if is_dead_session_error(e):
+                        raise
                     last_exception = e
                     retries += 1
                     logging.warning(
@@ -233,22 +433,249 @@ class RTODataScraper:
                     time.sleep(self.retry_delay)
 
             raise last_exception
-        finally:
-            browser.quit()
 
-    def extract_rto_level_data(
+    def select_rto_report_period(
         self,
+        browser,
+        form_state,
+        state_label,
+        rto_office_code,
+        year_label,
+        month_label,
+        context,
+        timings=None,
+    ):
+        """
+        Walk the dashboard form up to the requested month, re-clicking only the
+        selections that differ from ``form_state``. A ``form_state`` without
+        ``page_loaded`` starts from a fresh page load.
+        :param form_state: dict updated in place with the current selections
+        :param timings: Optional StepTimings collecting per-step settle times
+        """
+        if not form_state.get("page_loaded"):
+            open_page(
+                browser,
+                VAHAN_DASHBOARD_URL,
+                step="initial_page_load",
+                context=context,
+            )
+            wait_for_page_settle(
+                browser,
+                step="initial_page_load",
+                context=context,
+                timings=timings,
+            )
+            form_state["page_loaded"] = True
+
+        if form_state.get("state") != state_label:
+            # The state dropdown has a generated id and its label shows the
+            # current selection, as in read_rto_offices.
+            current_state_label = form_state.get("state") or STATE_DROPDOWN_DEFAULT_LABEL
+            find_element(
+                browser,
+                "xpath",
+                f'//label[starts-with(text(), "{current_state_label}")]',
+                step="open_state_dropdown",
+                context=context,
+            ).click()
+            wait_for_page_settle(
+                browser,
+                step="open_state_dropdown",
+                context=context,
+                timings=timings,
+            )
+
+            find_element(
+                browser,
+                "xpath",
+                f'//li[starts-with(text(), "{state_label}")]',
+                step="select_state",
+                context=context,
+            ).click()
+            wait_for_page_settle(
+                browser,
+                step="select_state",
+                context=context,
+                timings=timings,
+            )
+            form_state["state"] = state_label
+            form_state.pop("rto_code", None)
+
+        if form_state.get("rto_code") != rto_office_code:
+            find_element(
+                browser,
+                "id",
+                RTO_DROPDOWN_LABEL_ID,
+                step="open_rto_dropdown",
+                context=context,
+            ).click()
+            wait_for_page_settle(
+                browser,
+                step="open_rto_dropdown",
+                context=context,
+                timings=timings,
+            )
+
+            find_element(
+                browser,
+                "xpath",
+                self.build_rto_option_xpath(rto_office_code),
+                step="select_rto_office",
+                context=context,
+            ).click()
+            wait_for_page_settle(
+                browser,
+                step="select_rto_office",
+                context=context,
+                timings=timings,
+            )
+            form_state["rto_code"] = rto_office_code
+            form_state.pop("refreshed_year", None)
+
+        if not form_state.get("axes_selected"):
+            find_element(
+                browser,
+                "id",
+                "yaxisVar_label",
+                step="open_y_axis_dropdown",
+                context=context,
+            ).click()
+            wait_for_page_settle(
+                browser,
+                step="open_y_axis_dropdown",
+                panel_id="yaxisVar_panel",
+                context=context,
+                timings=timings,
+            )
+            find_element(
+                browser,
+                "id",
+                "yaxisVar_1",
+                step="select_y_axis_vehicle_class",
+                context=context,
+            ).click()
+            wait_for_page_settle(
+                browser,
+                step="select_y_axis_vehicle_class",
+                context=context,
+                timings=timings,
+            )
+
+            find_element(
+                browser,
+                "id",
+                "xaxisVar_label",
+                step="open_x_axis_dropdown",
+                context=context,
+            ).click()
+            wait_for_page_settle(
+                browser,
+                step="open_x_axis_dropdown",
+                panel_id="xaxisVar_panel",
+                context=context,
+                timings=timings,
+            )
+            find_element(
+                browser,
+                "xpath",
+                "//ul[@id='xaxisVar_items']/li[text()='Fuel']",
+                step="select_x_axis_fuel",
+                context=context,
+            ).click()
+            wait_for_page_settle(
+                browser,
+                step="select_x_axis_fuel",
+                context=context,
+                timings=timings,
+            )
+            form_state["axes_selected"] = True
+
+        if form_state.get("refreshed_year") != str(year_label):
+            find_element(
+                browser,
+                "id",
+                "selectedYear_label",
+                step="open_year_dropdown",
+                context=context,
+            ).click()
+            wait_for_page_settle(
+                browser,
+                step="open_year_dropdown",
+                panel_id="selectedYear_panel",
+                context=context,
+                timings=timings,
+            )
+            find_element(
+                browser,
+                "xpath",
+                f"//ul[@id='selectedYear_items']/li[text()='{year_label}']",
+                step="select_year",
+                context=context,
+            ).click()
+            wait_for_page_settle(
+                browser,
+                step="select_year",
+                context=context,
+                timings=timings,
+            )
+
+            find_element(
+                browser,
+                "css",
+                "button[class='ui-button ui-widget ui-state-default ui-corner-all ui-button-text-icon-left button']",
+                step="click_main_refresh",
+                context=context,
+            ).click()
+            wait_for_page_settle(
+                browser,
+                step="click_main_refresh",
+                context=context,
+                timings=timings,
+            )
+            form_state["refreshed_year"] = str(year_label)
+
+        find_element(
+            browser,
+            "id",
+            "groupingTable:selectMonth_label",
+            step="open_month_dropdown",
+            context=context,
+        ).click()
+        wait_for_page_settle(
+            browser,
+            step="open_month_dropdown",
+            panel_id="groupingTable:selectMonth_panel",
+            context=context,
+            timings=timings,
+        )
+        find_element(
+            browser,
+            "xpath",
+            f"//ul[@id='groupingTable:selectMonth_items']/li[text()='{month_label}']",
+            step="select_month",
+            context=context,
+        ).click()
+        wait_for_page_settle(
+            browser,
+            step="select_month",
+            context=context,
+            timings=timings,
+        )
+
+    def download_rto_report_period(
+        self,
+        browser,
+        form_state,
         state_label,
         rto_label,
         year_label,
         month_label,
+        download_root=None,
     ):
         """
-        :param state_label: State label for data
-        :param rto_label: vehicle category element
-        :param year_label: Year label for data
-        :param month_label: Month label for data
-        :return downloads csv file in directory set up by chrome
+        Download one (office, year, month) report with up to ``max_retries``
+        attempts, reusing whatever form selections ``form_state`` records.
+        :return: path of the downloaded reportTable.xlsx
         """
         state_folder_name = re.sub(r"[^a-zA-Z\s]", " ", state_label).rstrip()
         rto_folder_name = self.build_rto_folder_name(rto_label)
@@ -257,17 +684,15 @@ class RTODataScraper:
         rto_office_code = rto_folder_name.rsplit("_", 1)[1]
 
         download_path = self.build_download_directory(
-            state_label, rto_label, year_label, month_label
+            state_label,
+            rto_label,
+            year_label,
+            month_label,
+            download_root=download_root,
         )
 
         create_directory_if_not_exists(download_path)
 
-        browserOpts = webdriver.ChromeOptions()
-        configure_chrome_options(browserOpts, download_path)
-
-        browser = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), options=browserOpts
-        )
         expected_report_path = os.path.join(download_path, "reportTable.xlsx")
         if os.path.exists(expected_report_path):
             os.remove(expected_report_path)
@@ -280,216 +705,321 @@ class RTODataScraper:
             "month": month_label,
         }
 
+        retries = 0
+        last_exception = None
+        while retries < self.download_max_retries:
+            timings = StepTimings()
+            try:
+                self.select_rto_report_period(
+                    browser,
+                    form_state,
+                    state_label,
+                    rto_office_code,
+                    year_label,
+                    month_label,
+                    context,
+                    timings=timings,
+                )
+                if form_state.get("download_directory") != download_path:
+                    set_download_directory(browser, download_path)
+                    form_state["download_directory"] = download_path
+
+                find_element(
+                    browser,
+                    "id",
+                    "groupingTable:xls",
+                    step="download_report",
+                    context=context,
+                ).click()
+                report_path = wait_for_expected_download(download_path)
+                logging.info(
+                    "Downloaded RTO report state=%s rto=%s year=%s month=%s settle_seconds=%.1f timings=%s",
+                    state_folder_name,
+                    rto_folder_name,
+                    year_label,
+                    month_label,
+                    timings.total_seconds,
+                    timings.format(),
+                )
+                return report_path
+            except BlockedPageError as e:
+                logging.error(
+                    "RTO page access blocked context=%s page_title=%s diagnostics=%s error=%s",
+                    format_log_context(context),
+                    e.page_title,
+                    e.diagnostics.get("metadata_path", ""),
+                    e,
+                )
+                raise
+            except (
+                SeleniumStepError,
+                TimeoutException,
+                StaleElementReferenceException,
+                TimeoutError,
+                WebDriverException,
+            ) as e:
+                if is_dead_session_error(e):
+                    raise
+                last_exception = e
+                retries += 1
+                # The page may be half-way through an AJAX update, so the next
+                # attempt starts again from a fresh page load.
+                form_state.clear()
+                if os.path.exists(expected_report_path):
+                    try:
+                        os.remove(expected_report_path)
+                    except OSError:
+                        pass
+                logging.warning(
+                    "Retrying RTO download attempt=%s/%s context=%s failed_step=%s error=%s",
+                    retries,
+                    self.download_max_retries,
+                    format_log_context(context),
+                    getattr(e, "step", "download_flow"),
+                    summarize_exception(e),
+                )
+                if retries < self.download_max_retries:
+                    time.sleep(self.retry_delay)
+
+        raise last_exception
+
+    def fetch_report_over_http(
+        self,
+        state_label,
+        rto_label,
+        year_label,
+        month_label,
+        download_path,
+    ):
+        """
+        Try the browser-free fetch engine first.
+        :return: True when the report was downloaded, False to fall back to Selenium
+        """
+        rto_office_code = self.build_rto_folder_name(rto_label).rsplit("_", 1)[1]
+        context = {
+            "pipeline": "rto",
+            "state": state_label,
+            "rto_code": rto_office_code,
+            "year": year_label,
+            "month": month_label,
+        }
         try:
-            retries = 0
-            last_exception = None
-            while retries < self.max_retries:
+            VahanJsfFetcher().fetch_rto_report(
+                state_label,
+                rto_office_code,
+                year_label,
+                month_label,
+                download_path,
+            )
+        except JsfFetchError as e:
+            logging.warning(
+                "HTTP fetch engine fell back to Selenium context=%s failed_step=%s blocked=%s error=%s",
+                format_log_context(context),
+                e.step,
+                isinstance(e, JsfBlockedError),
+                e,
+            )
+            return False
+
+        logging.info(
+            "Downloaded RTO report over HTTP state=%s rto=%s year=%s month=%s",
+            state_label,
+            rto_office_code,
+            year_label,
+            month_label,
+        )
+        return True
+
+    def extract_rto_level_data(
+        self,
+        state_label,
+        rto_label,
+        year_label,
+        month_label,
+    ):
+        """
+        :param state_label: State label for data
+        :param rto_label: vehicle category element
+        :param year_label: Year label for data
+        :param month_label: Month label for data
+        :return downloads csv file in directory set up by chrome
+        """
+        download_path = self.build_download_directory(
+            state_label, rto_label, year_label, month_label
+        )
+        if not download_path:
+            raise ValueError(f"Unable to parse RTO label: {rto_label}")
+        create_directory_if_not_exists(download_path)
+
+        if self.fetch_engine == HTTP_FETCH_ENGINE and self.fetch_report_over_http(
+            state_label,
+            rto_label,
+            year_label,
+            month_label,
+            download_path,
+        ):
+            return
+
+        with self.session_pool.lease(download_directory=download_path) as browser:
+            self.download_rto_report_period(
+                browser,
+                {"download_directory": download_path},
+                state_label,
+                rto_label,
+                year_label,
+                month_label,
+            )
+
+    def extract_rto_session_plan(self, plan, download_root=None):
+        """
+        Download every period of a session plan from one leased browser,
+        keeping the state/office/axis selections between months and only
+        re-running the year refresh when the year changes.
+        :param plan: RtoSessionPlan
+        :param download_root: Optional root for the downloaded report tree
+        :return: (downloaded report paths, failed (rto_label, year, month) tasks)
+        """
+        downloaded_reports = []
+        failed_tasks = []
+
+        with self.session_pool.lease() as browser:
+            form_state = {}
+            for rto_label, year_label, month_label in plan.tasks:
                 try:
-                    open_page(
-                        browser,
-                        VAHAN_DASHBOARD_URL,
-                        step="initial_page_load",
-                        context=context,
+                    downloaded_reports.append(
+                        self.download_rto_report_period(
+                            browser,
+                            form_state,
+                            plan.state_label,
+                            rto_label,
+                            year_label,
+                            month_label,
+                            download_root=download_root,
+                        )
                     )
-
-                    find_element(
-                        browser,
-                        "xpath",
-                        '//label[starts-with(text(), "All Vahan4 Running States")]',
-                        step="open_state_dropdown",
-                        context=context,
-                    ).click()
-                    time.sleep(2)
-
-                    find_element(
-                        browser,
-                        "xpath",
-                        f'//li[starts-with(text(), "{state_label}")]',
-                        step="select_state",
-                        context=context,
-                    ).click()
-                    time.sleep(2)
-
-                    find_element(
-                        browser,
-                        "xpath",
-                        '//label[starts-with(text(), "All Vahan4 Running Office")]',
-                        step="open_rto_dropdown",
-                        context=context,
-                    ).click()
-                    time.sleep(1)
-
-                    find_element(
-                        browser,
-                        "xpath",
-                        self.build_rto_option_xpath(rto_office_code),
-                        step="select_rto_office",
-                        context=context,
-                    ).click()
-                    time.sleep(2)
-
-                    find_element(
-                        browser,
-                        "id",
-                        "yaxisVar_label",
-                        step="open_y_axis_dropdown",
-                        context=context,
-                    ).click()
-                    time.sleep(2)
-                    find_element(
-                        browser,
-                        "id",
-                        "yaxisVar_1",
-                        step="select_y_axis_vehicle_class",
-                        context=context,
-                    ).click()
-                    time.sleep(2)
-
-                    find_element(
-                        browser,
-                        "id",
-                        "xaxisVar_label",
-                        step="open_x_axis_dropdown",
-                        context=context,
-                    ).click()
-                    time.sleep(1)
-                    find_element(
-                        browser,
-                        "xpath",
-                        "//ul[@id='xaxisVar_items']/li[text()='Fuel']",
-                        step="select_x_axis_fuel",
-                        context=context,
-                    ).click()
-                    time.sleep(2)
-
-                    find_element(
-                        browser,
-                        "id",
-                        "selectedYear_label",
-                        step="open_year_dropdown",
-                        context=context,
-                    ).click()
-                    time.sleep(2)
-                    find_element(
-                        browser,
-                        "xpath",
-                        f"//ul[@id='selectedYear_items']/li[text()='{year_label}']",
-                        step="select_year",
-                        context=context,
-                    ).click()
-                    time.sleep(5)
-
-                    find_element(
-                        browser,
-                        "css",
-                        "button[class='ui-button ui-widget ui-state-default ui-corner-all ui-button-text-icon-left button']",
-                        step="click_main_refresh",
-                        context=context,
-                    ).click()
-                    time.sleep(5)
-
-                    find_element(
-                        browser,
-                        "id",
-                        "groupingTable:selectMonth_label",
-                        step="open_month_dropdown",
-                        context=context,
-                    ).click()
-                    time.sleep(2)
-                    find_element(
-                        browser,
-                        "xpath",
-                        f"//ul[@id='groupingTable:selectMonth_items']/li[text()='{month_label}']",
-                        step="select_month",
-                        context=context,
-                    ).click()
-                    time.sleep(2)
-
-                    find_element(
-                        browser,
-                        "id",
-                        "groupingTable:xls",
-                        step="download_report",
-                        context=context,
-                    ).click()
-                    wait_for_expected_download(download_path)
-                    logging.info(
-                        "Downloaded RTO report state=%s rto=%s year=%s month=%s",
-                        state_folder_name,
-                        rto_folder_name,
+                except BlockedPageError:
+                    raise
+                except Exception as e:
+                    form_state.clear()
+                    failed_tasks.append((rto_label, year_label, month_label))
+                    logging.error(
+                        "RTO session plan download failed state=%s rto=%s year=%s month=%s failed_step=%s error=%s",
+                        plan.state_label,
+                        rto_label,
                         year_label,
                         month_label,
-                    )
-                    return
-                except BlockedPageError as e:
-                    logging.error(
-                        "RTO page access blocked context=%s page_title=%s diagnostics=%s error=%s",
-                        format_log_context(context),
-                        e.page_title,
-                        e.diagnostics.get("metadata_path", ""),
-                        e,
-                    )
-                    raise
-                except (
-                    SeleniumStepError,
-                    TimeoutException,
-                    StaleElementReferenceException,
-                    TimeoutError,
-                    WebDriverException,
-                ) as e:
-                    last_exception = e
-                    retries += 1
-                    if os.path.exists(expected_report_path):
-                        try:
-                            os.remove(expected_report_path)
-                        except OSError:
-                            pass
-                    logging.warning(
-                        "Retrying RTO download attempt=%s/%s context=%s failed_step=%s error=%s",
-                        retries,
-                        self.max_retries,
-                        format_log_context(context),
                         getattr(e, "step", "download_flow"),
-                        summarize_exception(e),
+                        summarize_exception(getattr(e, "original_exception", e)),
                     )
-                    time.sleep(self.retry_delay)
 
-            raise last_exception
-        finally:
-            browser.quit()
+        logging.info(
+            "RTO session plan summary state=%s offices=%s tasks=%s downloaded=%s failed=%s",
+            plan.state_label,
+            len({rto_label for rto_label, _, _ in plan.tasks}),
+            len(plan.tasks),
+            len(downloaded_reports),
+            len(failed_tasks),
+        )
+        return downloaded_reports, failed_tasks
 
     # define a function to wrap the selenium function for argument unpacking
     def run_selenium(self, args):
         return self.extract_rto_level_data(*args)
 
     def run_for_all_states(self, states):
+        """
+        Refresh the RTO lists of ``states`` in a single browser session by
+        walking the state dropdown. A state that keeps failing is skipped so
+        the caller falls back to its cached list; a blocked page or a lost
+        browser session stops the walk and returns what was fetched so far.
+        :return: dict of state -> list of RTO office labels
+        """
         results = {}
-        with ThreadPoolExecutor(
-            max_workers=34
-        ) as executor:  # Adjust max_workers as needed
-            futures = {
-                executor.submit(self.get_all_rto_from_state, state): state
-                for state in states
-            }
-            for future in as_completed(futures):
-                state = futures[future]
-                try:
-                    result = future.result()  # Wait for the thread to finish
-                    if result:
-                        results.update(result)  # Add the state's result to the dictionary
+        try:
+            with self.session_pool.lease() as browser:
+                current_state_label = None
+                for state in states:
+                    context = {
+                        "pipeline": "rto",
+                        "state": state,
+                        "action": "refresh_rto_mapping",
+                    }
+                    retries = 0
+                    while retries < self.max_retries:
+                        timings = StepTimings()
+                        try:
+                            if current_state_label is None:
+                                self.load_dashboard(browser, context, timings)
+                                current_state_label = STATE_DROPDOWN_DEFAULT_LABEL
+                            offices = self.read_rto_offices(
+                                browser,
+                                state,
+                                current_state_label,
+                                context,
+                                timings,
+                            )
+                            current_state_label = state
+                            break
+                        except BlockedPageError as e:
+                            logging.error(
+                                "RTO mapping refresh blocked context=%s page_title=%s diagnostics=%s error=%s",
+                                format_log_context(context),
+                                e.page_title,
+                                e.diagnostics.get("metadata_path", ""),
+                                e,
+                            )
+                            return results
+                        except (
+                            SeleniumStepError,
+                            TimeoutException,
+                            StaleElementReferenceException,
+                            WebDriverException,
+                        ) as e:
+                            if is_dead_session_error(e):
+                                raise
+                            retries += 1
+                            # Start the next attempt from a fresh page load.
+                            current_state_label = None
+                            logging.warning(
+                                "Retrying RTO mapping fetch attempt=%s/%s context=%s failed_step=%s error=%s",
+                                retries,
+                                self.max_retries,
+                                format_log_context(context),
+                                getattr(e, "step", "refresh_rto_mapping"),
+                                summarize_exception(e),
+                            )
+                            time.sleep(self.retry_delay)
+                    else:
+                        logging.warning(
+                            "RTO mapping refresh gave up state=%s after %s attempts.",
+                            state,
+                            self.max_retries,
+                        )
+                        continue
+
+                    if offices:
+                        results[state] = offices
+                        logging.info(
+                            "Fetched RTO mapping state=%s offices=%s settle_seconds=%.1f",
+                            state,
+                            len(offices),
+                            timings.total_seconds,
+                        )
                     else:
                         logging.warning(
                             "No RTO offices were fetched for state '%s'.",
                             state,
                         )
-                except Exception as e:
-                    logging.warning(
-                        "RTO mapping refresh failed state=%s failed_step=%s diagnostics=%s error=%s",
-                        state,
-                        getattr(e, "step", "refresh_rto_mapping"),
-                        getattr(e, "diagnostics", {}).get("metadata_path", ""),
-                        summarize_exception(getattr(e, "original_exception", e)),
-                    )
+        except Exception as e:
+            if not is_dead_session_error(e):
+                raise
+            # The lease has discarded the browser; callers fall back to their
+            # cached lists for the states that were not reached.
+            logging.error(
+                "RTO mapping refresh lost its browser session fetched_states=%s error=%s",
+                len(results),
+                summarize_exception(e),
+            )
         return results
 
     @staticmethod
@@ -509,12 +1039,27 @@ class RTODataScraper:
                 )
         return {}
 
-def main():
-    data_extract_class = RTODataScraper()
+def run_monthly_extraction(data_extract_class):
     previous_mapping = data_extract_class.load_previous_mapping()
+    mapping_metadata = load_mapping_metadata()
+    ttl_hours = get_rto_mapping_ttl_hours()
+    stale_states = get_stale_mapping_states(
+        previous_mapping,
+        mapping_metadata,
+        STATE_LIST,
+        ttl_hours,
+    )
+    logging.info(
+        "RTO mapping cache ttl_hours=%s fresh_states=%s stale_states=%s",
+        ttl_hours,
+        len(STATE_LIST) - len(stale_states),
+        len(stale_states),
+    )
 
     try:
-        fresh_mapping = data_extract_class.run_for_all_states(STATE_LIST)
+        fresh_mapping = (
+            data_extract_class.run_for_all_states(stale_states) if stale_states else {}
+        )
     except Exception as e:
         fresh_mapping = {}
         logging.error(
@@ -525,14 +1070,14 @@ def main():
 
     state_rto_mapping = merge_state_rto_mappings(previous_mapping, fresh_mapping)
 
-    fresh_missing_states = get_missing_mapping_states(fresh_mapping, STATE_LIST)
+    fresh_missing_states = get_missing_mapping_states(fresh_mapping, stale_states)
     merged_missing_states = get_missing_mapping_states(state_rto_mapping, STATE_LIST)
 
     if fresh_mapping:
         logging.info(
-            "Fetched live RTO mapping for %s out of %s states.",
+            "Fetched live RTO mapping for %s out of %s stale states.",
             len(fresh_mapping),
-            len(STATE_LIST),
+            len(stale_states),
         )
         if fresh_missing_states:
             logging.warning(
@@ -542,11 +1087,22 @@ def main():
             )
         with open(RTO_STATE_OFFICE_MAPPING_PATH, "w") as rto_mapping_output:
             json.dump(state_rto_mapping, rto_mapping_output, indent=4)
+        with open(RTO_STATE_OFFICE_MAPPING_METADATA_PATH, "w") as metadata_output:
+            json.dump(
+                update_mapping_metadata(mapping_metadata, fresh_mapping),
+                metadata_output,
+                indent=4,
+            )
         logging.info(
             "Saved merged RTO mapping to %s with coverage for %s states.",
             RTO_STATE_OFFICE_MAPPING_PATH,
             len(STATE_LIST) - len(merged_missing_states),
         )
+    elif not stale_states:
+        logging.info(
+            "All cached RTO mapping states are within the %s hour TTL; skipped the live refresh.",
+            ttl_hours,
+        )
     elif previous_mapping:
         logging.warning(
             "Live RTO mapping refresh returned no states. Continuing with the previous %s.",
@@ -567,6 +1123,8 @@ def main():
     month, year = resolve_month_year_args(sys.argv[1:])
 
     parameters = []
+    ledger_entries = []
+    task_directories = {}
     invalid_rto_labels = []
     for state in STATE_LIST:
         # get all RTO office names for state
@@ -585,11 +1143,16 @@ def main():
                 str(year),
                 month,
             )
-            # remove the file if already exists from previous month
-            if os.path.exists(directory_path):
-                shutil.rmtree(directory_path)
-
-            parameters.append((state, rto_office_name, year, month))
+            task = (state, rto_office_name, year, month)
+            parameters.append(task)
+            task_directories[task] = directory_path
+            ledger_entries.append(
+                (
+                    LedgerTask(RTO_PIPELINE, state, rto_office_name, str(year), month),
+                    task,
+                    os.path.join(directory_path, "reportTable.xlsx"),
+                )
+            )
 
     if invalid_rto_labels:
         sample_state, sample_label = invalid_rto_labels[0]
@@ -600,26 +1163,51 @@ def main():
             sample_label,
         )
 
-    logging.info(
-        "Prepared %s RTO download tasks for %s %s.",
-        len(parameters),
-        month,
-        year,
+    catalogue = load_or_discover_catalogue(data_extract_class.session_pool)
+    parameters = filter_task_grid(
+        catalogue,
+        parameters,
+        ("state", "rto", "year", "month"),
+        RTO_PIPELINE,
     )
+    offered_tasks = set(parameters)
+    ledger_entries = [entry for entry in ledger_entries if entry[1] in offered_tasks]
 
-    # run selenium function in parallel
-    with ThreadPoolExecutor(
-        max_workers=35
-    ) as executor:  # adjust max_workers based on your system's capability
-        futures = {
-            executor.submit(data_extract_class.run_selenium, args): args
-            for args in parameters
-        }
+    with ScrapeTaskLedger() as ledger:
+        pending_tasks = set(
+            ledger.prepare_run(RTO_PIPELINE, year, month, ledger_entries)
+        )
+        parameters = [task for task in parameters if task in pending_tasks]
+        for task in parameters:
+            # remove partial output left by an earlier, unfinished attempt
+            if os.path.exists(task_directories[task]):
+                shutil.rmtree(task_directories[task])
+
+        logging.info(
+            "Prepared %s RTO download tasks for %s %s.",
+            len(parameters),
+            month,
+            year,
+        )
+
+        # run selenium function in parallel
+        controller = AdaptiveConcurrencyController.from_config(
+            RTO_DOWNLOAD_MAX_WORKERS,
+            on_limit_change=data_extract_class.session_pool.trim_idle,
+            name="rto_downloads",
+        )
         failed_downloads = []
         successful_downloads = 0
 
-        for future in as_completed(futures):
-            state_label, rto_label, year_label, month_label = futures[future]
+        # failed tasks are requeued with backoff inside this pass instead of
+        # waiting for a separate missing-file run
+        data_extract_class.download_max_retries = SCHEDULED_DOWNLOAD_MAX_RETRIES
+        scheduler = RetryingTaskScheduler.from_config(controller)
+        for task, future in scheduler.run(
+            ledger.tracked(RTO_PIPELINE, data_extract_class.run_selenium),
+            parameters,
+        ):
+            state_label, rto_label, year_label, month_label = task
             try:
                 future.result()
                 successful_downloads += 1
@@ -636,14 +1224,29 @@ def main():
                     summarize_exception(getattr(e, "original_exception", e)),
                 )
 
-    logging.info(
-        "RTO extraction summary for %s %s: prepared=%s succeeded=%s failed=%s",
-        month,
-        year,
-        len(parameters),
-        successful_downloads,
-        len(failed_downloads),
-    )
+        logging.info(
+            "RTO extraction summary for %s %s: prepared=%s succeeded=%s failed=%s",
+            month,
+            year,
+            len(parameters),
+            successful_downloads,
+            len(failed_downloads),
+        )
+        scheduler.report.log()
+
+    if failed_downloads:
+        raise RuntimeError(
+            f"RTO extraction for {month} {year} still has {len(failed_downloads)} failed downloads after retries."
+        )
+
+
+def main():
+    resolve_chromedriver_path()
+    data_extract_class = RTODataScraper()
+    try:
+        run_monthly_extraction(data_extract_class)
+    finally:
+        data_extract_class.close()
 
 
 if __name__ == "__main__":
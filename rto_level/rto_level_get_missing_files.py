@@ -4,7 +4,6 @@ import os
 import re
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
 SCRIPT_DIR = os.path.dirname(__file__)
@@ -20,12 +19,20 @@ from rto_level.rto_level_data_scraper import (
     RTODataScraper,
 )
 from runtime_config import resolve_month_year_args
+from scrape_scheduler import (
+    SCHEDULED_DOWNLOAD_MAX_RETRIES,
+    AdaptiveConcurrencyController,
+    RetryingTaskScheduler,
+)
+from scrape_task_ledger import RTO_PIPELINE, ScrapeTaskLedger, recover_pending_tasks
 from utils import is_valid_excel_download
 
 
 configure_pipeline_logging()
 logger = logging.getLogger(__name__)
 
+RECOVERY_MAX_WORKERS = 10
+
 
 def load_state_rto_mapping(mapping_path=RTO_STATE_OFFICE_MAPPING_PATH):
     with open(mapping_path, "r", encoding="utf-8") as mapping_file:
@@ -76,36 +83,55 @@ def count_existing_valid_files(scraper, state_rto_mapping, month, year):
     return valid_file_count
 
 
-def run_missing_file_recovery(scraper, parameters):
+def run_missing_file_recovery(scraper, parameters, ledger=None):
     successful_downloads = 0
     failed_downloads = []
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {
-            executor.submit(scraper.run_selenium, args): args for args in parameters
-        }
-        for future in as_completed(futures):
-            state, rto_label, year, month = futures[future]
-            try:
-                future.result()
-                successful_downloads += 1
-            except Exception as exc:
-                failed_downloads.append((state, rto_label))
-                logger.error(
-                    "RTO missing-file recovery failed state=%s rto=%s year=%s month=%s error=%s",
-                    state,
-                    rto_label,
-                    year,
-                    month,
-                    exc,
-                )
+    controller = AdaptiveConcurrencyController.from_config(
+        RECOVERY_MAX_WORKERS,
+        on_limit_change=scraper.session_pool.trim_idle,
+        name="rto_missing_file_recovery",
+    )
+    run_task = scraper.run_selenium
+    if ledger is not None:
+        run_task = ledger.tracked(RTO_PIPELINE, run_task)
+    scraper.download_max_retries = SCHEDULED_DOWNLOAD_MAX_RETRIES
+    scheduler = RetryingTaskScheduler.from_config(controller)
+    for task, future in scheduler.run(run_task, parameters):
+        state, rto_label, year, month = task
+        try:
+            future.result()
+            successful_downloads += 1
+        except Exception as exc:
+            failed_downloads.append((state, rto_label))
+            logger.error(
+                "RTO missing-file recovery failed state=%s rto=%s year=%s month=%s error=%s",
+                state,
+                rto_label,
+                year,
+                month,
+                exc,
+            )
 
+    scheduler.report.log()
     return successful_downloads, failed_downloads
 
 
-def main():
-    month, year = resolve_month_year_args(sys.argv[1:])
-    scraper = RTODataScraper()
+def recover_missing_files(scraper, month, year):
+    # The scraper's task ledger already knows which downloads are unfinished,
+    # so only fall back to rescanning the report folders without it.
+    with ScrapeTaskLedger() as ledger:
+        if recover_pending_tasks(
+            ledger,
+            RTO_PIPELINE,
+            year,
+            month,
+            lambda parameters: run_missing_file_recovery(
+                scraper, parameters, ledger=ledger
+            ),
+        ):
+            return
+
     state_rto_mapping = load_state_rto_mapping()
 
     previous_existing_count = -1
@@ -182,5 +208,13 @@ def main():
         time.sleep(5)
 
 
+def main():
+    month, year = resolve_month_year_args(sys.argv[1:])
+    scraper = RTODataScraper()
+    try:
+        recover_missing_files(scraper, month, year)
+    finally:
+        scraper.close()
+
 if __name__ == "__main__":
     main()
@@ -1,37 +1,50 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-from selenium import webdriver
 from selenium.common.exceptions import (
     TimeoutException,
     StaleElementReferenceException,
     WebDriverException,
 )
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 
 import json
 import logging
 import os
+import re
 import sys
 import time
 
-# configure logging to write to both the console and a file
-logging.basicConfig(
-    level=logging.INFO,  # Set the logging level (INFO, DEBUG, etc.)
-    format="%(asctime)s - %(levelname)s - %(message)s",  # log message format
-)
-
 repo_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if repo_path not in sys.path:
     sys.path.append(repo_path)
 
-from utils import *
+from pipeline_logging import configure_pipeline_logging
+from scrape_scheduler import AdaptiveConcurrencyController
+from utils import (
+    BrowserSessionPool,
+    VAHAN_DASHBOARD_URL,
+    create_directory_if_not_exists,
+    find_element,
+    is_dead_session_error,
+    month_mapping,
+    open_page,
+    resolve_chromedriver_path,
+    state_lst,
+    wait_for_expected_download,
+)
+
+configure_pipeline_logging()
+
+HISTORICAL_DOWNLOAD_MAX_WORKERS = 50
 
 
 class RTODataScraper:
-    def __init__(self):
+    def __init__(self, session_pool=None):
         self.max_retries = 5
         self.retry_delay = 15
+        self.session_pool = session_pool or BrowserSessionPool(
+            max_sessions=HISTORICAL_DOWNLOAD_MAX_WORKERS
+        )
+
+    def close(self):
+        self.session_pool.close()
 
     @staticmethod
     def sanitize_folder_name(name):
@@ -63,22 +76,6 @@ class RTODataScraper:
         :param month_label: Month label for data
         :return downloads csv file in directory set up by chrome
         """
-        # create data download directory
-        browserOpts = webdriver.ChromeOptions()
-        browserOpts.browser_version = "stable"
-        browserPrefs = {
-            "credentials_enable_service": False,
-            "profile.password_manager_enabled": False,
-        }
-        browserOpts.add_experimental_option(
-            "excludeSwitches", ["enable-automation", "enable-logging"]
-        )
-        browserOpts.add_argument("--headless")
-        browserOpts.add_argument("--no-sandbox")
-        browserOpts.add_argument("--disable-dev-shm-usage")
-        browserOpts.add_argument("--disable-single-click-autofill")
-        browserOpts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
-
         # create data download directory
         state_folder_name = re.sub(r"[^a-zA-Z\s]", " ", state_label).rstrip()
         rto_name_code = self.extract_rto_name_and_code(rto_label)
@@ -95,118 +92,115 @@ class RTODataScraper:
             month_label,
         )
 
-        browserPrefs.update({"download.default_directory": download_path})
-        browserOpts.add_experimental_option("prefs", browserPrefs)
-
         create_directory_if_not_exists(download_path)
 
-        browser = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), options=browserOpts
-        )
-        retries = 0
-        while retries < self.max_retries:
-            try:
-                browser.get(
-                    "https://vahan.parivahan.gov.in/vahan4dashboard/vahan/view/reportview.xhtml"
-                )
-
-                # select the state
-                find_element(
-                    browser,
-                    "xpath",
-                    '//label[starts-with(text(), "All Vahan4 Running States")]',
-                ).click()
-                time.sleep(2)
-
-                find_element(
-                    browser, "xpath", f'//li[starts-with(text(), "{state_label}")]'
-                ).click()
-                time.sleep(2)
-
-                find_element(
-                    browser,
-                    "xpath",
-                    '//label[starts-with(text(), "All Vahan4 Running Office")]',
-                ).click()
-                time.sleep(2)
-
-                find_element(
-                    browser,
-                    "xpath",
-                    f'//ul[@id="selectedRto_items"]/li[contains(text(), "{rto_office_code}")]',
-                ).click()
-                time.sleep(2)
-
-                # selecting y_axis entering vehicle class as parameter
-                find_element(browser, "id", "yaxisVar_label").click()
-                time.sleep(2)
-                find_element(browser, "id", "yaxisVar_1").click()
-                time.sleep(2)
-
-                # selecting x_axis entering fuel as parameter
-                find_element(browser, "id", "xaxisVar_label").click()
-                time.sleep(1)
-                find_element(
-                    browser, "xpath", "//ul[@id='xaxisVar_items']/li[text()='Fuel']"
-                ).click()
-                time.sleep(2)
-
-                #  selecting year button and entering the value
-                find_element(browser, "id", "selectedYear_label").click()
-                time.sleep(2)
-                find_element(
-                    browser,
-                    "xpath",
-                    f"//ul[@id='selectedYear_items']/li[text()='{year_label}']",
-                ).click()
-                time.sleep(5)
-
-                # click on main refresh button
-                find_element(
-                    browser,
-                    "css",
-                    "button[class='ui-button ui-widget ui-state-default ui-corner-all ui-button-text-icon-left button']",
-                ).click()
-                time.sleep(5)
-
-                # click on month button
-                find_element(browser, "id", "groupingTable:selectMonth_label").click()
-                time.sleep(2)
-                # Enter month
-                find_element(
-                    browser,
-                    "xpath",
-                    f"//ul[@id='groupingTable:selectMonth_items']/li[text()='{month_label}']",
-                ).click()
-                time.sleep(2)
-
-                # click on download button for downloading report
-                find_element(browser, "id", "groupingTable:xls").click()
-                time.sleep(5)
-                browser.quit()
-                logging.info(
-                    f"file successfully downloaded for {state_folder_name}, {rto_folder_name}, {year_label}, {month_label}"
-                )
-                return
-            except (
-                TimeoutException,
-                StaleElementReferenceException,
-                WebDriverException,
-            ) as e:
-                retries += 1
-                logging.info(
-                    f"retrying attempt {retries} for {state_label}, {rto_label}, {year_label},{month_label}"
-                )
-                time.sleep(self.retry_delay)
+        with self.session_pool.lease(download_directory=download_path) as browser:
+            retries = 0
+            last_exception = None
+            while retries < self.max_retries:
+                try:
+                    open_page(browser, VAHAN_DASHBOARD_URL)
+
+                    # select the state
+                    find_element(
+                        browser,
+                        "xpath",
+                        '//label[starts-with(text(), "All Vahan4 Running States")]',
+                    ).click()
+                    time.sleep(2)
+
+                    find_element(
+                        browser, "xpath", f'//li[starts-with(text(), "{state_label}")]'
+                    ).click()
+                    time.sleep(2)
+
+                    find_element(
+                        browser,
+                        "xpath",
+                        '//label[starts-with(text(), "All Vahan4 Running Office")]',
+                    ).click()
+                    time.sleep(2)
+
+                    find_element(
+                        browser,
+                        "xpath",
+                        f'//ul[@id="selectedRto_items"]/li[contains(text(), "{rto_office_code}")]',
+                    ).click()
+                    time.sleep(2)
+
+                    # selecting y_axis entering vehicle class as parameter
+                    find_element(browser, "id", "yaxisVar_label").click()
+                    time.sleep(2)
+                    find_element(browser, "id", "yaxisVar_1").click()
+                    time.sleep(2)
+
+                    # selecting x_axis entering fuel as parameter
+                    find_element(browser, "id", "xaxisVar_label").click()
+                    time.sleep(1)
+                    find_element(
+                        browser, "xpath", "//ul[@id='xaxisVar_items']/li[text()='Fuel']"
+                    ).click()
+                    time.sleep(2)
+
+                    #  selecting year button and entering the value
+                    find_element(browser, "id", "selectedYear_label").click()
+                    time.sleep(2)
+                    find_element(
+                        browser,
+                        "xpath",
+                        f"//ul[@id='selectedYear_items']/li[text()='{year_label}']",
+                    ).click()
+                    time.sleep(5)
+
+                    # click on main refresh button
+                    find_element(
+                        browser,
+                        "css",
+                        "button[class='ui-button ui-widget ui-state-default ui-corner-all ui-button-text-icon-left button']",
+                    ).click()
+                    time.sleep(5)
+
+                    # click on month button
+                    find_element(browser, "id", "groupingTable:selectMonth_label").click()
+                    time.sleep(2)
+                    # Enter month
+                    find_element(
+                        browser,
+                        "xpath",
+                        f"//ul[@id='groupingTable:selectMonth_items']/li[text()='{month_label}']",
+                    ).click()
+                    time.sleep(2)
+
+                    # click on download button for downloading report
+                    find_element(browser, "id", "groupingTable:xls").click()
+                    wait_for_expected_download(download_path)
+                    logging.info(
+                        f"file successfully downloaded for {state_folder_name}, {rto_folder_name}, {year_label}, {month_label}"
+                    )
+                    return
+                except (
+                    TimeoutException,
+                    StaleElementReferenceException,
+                    TimeoutError,
+                    WebDriverException,
+                ) as e:
+                    if is_dead_session_error(e):
+                        raise
+                    last_exception = e
+                    retries += 1
+                    logging.info(
+                        f"retrying attempt {retries} for {state_label}, {rto_label}, {year_label},{month_label}"
+                    )
+                    time.sleep(self.retry_delay)
+
+            raise last_exception
 
     # define a function to wrap the selenium function for argument unpacking
     def run_selenium(self, args):
         return self.extract_rto_level_data(*args)
 
 
-def main():
-    data_extract_class = RTODataScraper()
-
+def run_historical_extraction(data_extract_class):
     with open("rto_state_office_mapping.json", "r") as f:
         state_rto_mapping = json.load(f)
 
@@ -240,19 +234,26 @@ def main():
                         parameters.append((state, rto_office_name, year, month))
 
     # run selenium function in parallel
-    with ThreadPoolExecutor(
-        max_workers=50
-    ) as executor:  # adjust max_workers based on your system's capability
-        futures = [
-            executor.submit(data_extract_class.run_selenium, args)
-            for args in parameters
-        ]
-
-        for future in as_completed(futures):
-            try:
-                result = future.result()
-            except Exception as e:
-                logging.info(f"Exception occurred: {e}")
+    controller = AdaptiveConcurrencyController.from_config(
+        HISTORICAL_DOWNLOAD_MAX_WORKERS,
+        on_limit_change=data_extract_class.session_pool.trim_idle,
+        name="rto_historical_downloads",
+    )
+
+    for _, future in controller.run(data_extract_class.run_selenium, parameters):
+        try:
+            result = future.result()
+        except Exception as e:
+            logging.info(f"Exception occurred: {e}")
+
+
+def main():
+    resolve_chromedriver_path()
+    data_extract_class = RTODataScraper()
+    try:
+        run_historical_extraction(data_extract_class)
+    finally:
+        data_extract_class.close()
 
 
 if __name__ == "__main__":
@@ -7,8 +7,8 @@ import os
 import subprocess
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
 
@@ -22,7 +22,9 @@ from blob_storage_utils import (
     ensure_container_exists,
     upload_globbed_files_to_container,
     upload_matching_csv_artifact,
+    upload_parquet_partitions,
 )
+from parquet_output import build_parquet_dataset_path, iter_month_partitions
 from pipeline_constants import MONTH_NAME_TO_NUMBER
 from pipeline_logging import configure_pipeline_logging
 from rto_level.rto_level_data_ingestion import RtoDataIngest
@@ -30,10 +32,16 @@ from rto_level.rto_level_data_pre_processing import RTOLevelDataPreProcessor
 from rto_level.rto_level_data_scraper import (
     RTO_STATE_OFFICE_MAPPING_PATH,
     RTODataScraper,
+    build_rto_session_plans,
     merge_state_rto_mappings,
 )
 from runtime_config import get_previous_month_year_label, load_config
-from utils import is_valid_excel_download
+from scrape_scheduler import AdaptiveConcurrencyController
+from utils import (
+    BrowserSessionPool,
+    is_valid_excel_download,
+    resolve_chromedriver_path,
+)
 
 
 configure_pipeline_logging()
@@ -41,6 +49,7 @@ logger = logging.getLogger(__name__)
 
 TARGET_STATE = "Telangana"
 MONTH_NUMBER_TO_NAME = {value: key for key, value in MONTH_NAME_TO_NUMBER.items()}
+DEFAULT_INGEST_BATCH_MONTHS = 6
 BACKFILL_ROOT = REPO_ROOT / "rto_level" / "historical_backfill" / "telangana"
 BACKFILL_WORKSPACE = BACKFILL_ROOT / "raw_workspace"
 BACKFILL_RAW_ROOT = BACKFILL_WORKSPACE / "rto_level" / "rto_level_ev_data"
@@ -84,6 +93,23 @@ def parse_args():
         action="store_true",
         help="Ignore any existing valid Telangana workbooks and re-download everything in range.",
     )
+    parser.add_argument(
+        "--session-plan",
+        action="store_true",
+        help=(
+            "Pre-download every missing month per RTO office from one browser "
+            "session, re-walking only the form fields that change between months."
+        ),
+    )
+    parser.add_argument(
+        "--ingest-batch-months",
+        type=int,
+        default=DEFAULT_INGEST_BATCH_MONTHS,
+        help=(
+            "Months ingested together in one SQL Server transaction. Each batch is "
+            "ingested (and uploaded) before the next is preprocessed."
+        ),
+    )
     parser.add_argument(
         "--upload-to-blob",
         action="store_true",
@@ -210,27 +236,28 @@ def run_download_batch(scraper, parameters, max_workers):
     successful_downloads = 0
     failed_downloads = []
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(scraper.run_selenium, args): args for args in parameters
-        }
-        for future in as_completed(futures):
-            state, rto_label, year, month = futures[future]
-            try:
-                future.result()
-                successful_downloads += 1
-            except Exception as exc:
-                failed_downloads.append((state, rto_label, exc))
-                logger.error(
-                    "Telangana historical download failed state=%s rto=%s year=%s month=%s failed_step=%s diagnostics=%s error=%s",
-                    state,
-                    rto_label,
-                    year,
-                    month,
-                    getattr(exc, "step", "download_flow"),
-                    getattr(exc, "diagnostics", {}).get("metadata_path", ""),
-                    exc,
-                )
+    controller = AdaptiveConcurrencyController.from_config(
+        max_workers,
+        on_limit_change=scraper.session_pool.trim_idle,
+        name="telangana_downloads",
+    )
+    for task, future in controller.run(scraper.run_selenium, parameters):
+        state, rto_label, year, month = task
+        try:
+            future.result()
+            successful_downloads += 1
+        except Exception as exc:
+            failed_downloads.append((state, rto_label, exc))
+            logger.error(
+                "Telangana historical download failed state=%s rto=%s year=%s month=%s failed_step=%s diagnostics=%s error=%s",
+                state,
+                rto_label,
+                year,
+                month,
+                getattr(exc, "step", "download_flow"),
+                getattr(exc, "diagnostics", {}).get("metadata_path", ""),
+                exc,
+            )
 
     return successful_downloads, failed_downloads
 
@@ -312,6 +339,62 @@ def ensure_month_downloads(scraper, telangana_offices, month, year, *, max_worke
         force_reextract = False
 
 
+def run_session_plan_downloads(scraper, telangana_offices, month_windows, *, max_workers, force_reextract):
+    parameters = []
+    for window in month_windows:
+        window_parameters, _ = build_download_parameters(
+            scraper,
+            telangana_offices,
+            window.month,
+            window.year,
+            force_reextract=force_reextract,
+        )
+        parameters.extend(window_parameters)
+
+    plans = build_rto_session_plans(parameters)
+    logger.info(
+        "Running Telangana session-plan downloads plans=%s tasks=%s",
+        len(plans),
+        len(parameters),
+    )
+    if not plans:
+        return
+
+    downloaded_count = 0
+    failed_count = 0
+    controller = AdaptiveConcurrencyController.from_config(
+        max_workers,
+        on_limit_change=scraper.session_pool.trim_idle,
+        name="telangana_session_plans",
+    )
+    download_plan = partial(
+        scraper.extract_rto_session_plan,
+        download_root=str(BACKFILL_RAW_ROOT),
+    )
+    for plan, future in controller.run(download_plan, plans):
+        try:
+            downloaded_reports, failed_tasks = future.result()
+            downloaded_count += len(downloaded_reports)
+            failed_count += len(failed_tasks)
+        except Exception as exc:
+            failed_count += len(plan.tasks)
+            logger.error(
+                "Telangana session plan failed rto=%s tasks=%s failed_step=%s error=%s",
+                plan.tasks[0][0],
+                len(plan.tasks),
+                getattr(exc, "step", "download_flow"),
+                exc,
+            )
+
+    # Anything still missing is retried per month by ensure_month_downloads.
+    logger.info(
+        "Telangana session-plan download summary: requested=%s downloaded=%s failed=%s",
+        len(parameters),
+        downloaded_count,
+        failed_count,
+    )
+
+
 def build_output_csv_path(month, year):
     BACKFILL_PROCESSED_ROOT.mkdir(parents=True, exist_ok=True)
     return BACKFILL_PROCESSED_ROOT / f"rto_level_ev_data_telangana_{month}_{year}.csv"
@@ -355,6 +438,56 @@ def upload_telangana_artifacts(month, year, csv_path):
         csv_container_client=csv_container_client,
         csv_container_name=csv_container_name,
     )
+    # Only the Telangana partitions of the shared RTO dataset are replaced.
+    parquet_dataset_dir = build_parquet_dataset_path(
+        BACKFILL_PROCESSED_ROOT,
+        "rto_level_ev_data",
+    )
+    upload_parquet_partitions(
+        dataset_dir=parquet_dataset_dir,
+        partition_dirs=iter_month_partitions(
+            parquet_dataset_dir,
+            year,
+            MONTH_NAME_TO_NUMBER[month],
+        ),
+        container_client=csv_container_client,
+        container_name=csv_container_name,
+    )
+
+
+def ingest_and_upload_months(ingester, prepared_months, *, upload_to_blob):
+    """
+    Ingest a batch of prepared (month, year, csv_path, output_rows) months in
+    one transaction, then upload each month, so blobs are only published for
+    months that reached SQL Server.
+    """
+    ingest_paths = [
+        str(csv_path) for _, _, csv_path, output_rows in prepared_months if output_rows
+    ]
+    row_counts = ingester.ingest_many(ingest_paths) if ingest_paths else {}
+
+    for month, year, csv_path, output_rows in prepared_months:
+        if not output_rows:
+            logger.warning(
+                "No Telangana rows were produced for %s %s. Skipping SQL Server ingestion for this month.",
+                month,
+                year,
+            )
+        else:
+            logger.info(
+                "Inserted or refreshed %s Telangana raw rows for %s %s.",
+                row_counts[str(csv_path)],
+                month,
+                year,
+            )
+
+        if upload_to_blob:
+            upload_telangana_artifacts(month, year, csv_path)
+            logger.info(
+                "Uploaded Telangana raw workbooks and CSV artifact for %s %s.",
+                month,
+                year,
+            )
 
 
 def run_dbt_full_refresh():
@@ -370,8 +503,7 @@ def run_dbt_full_refresh():
         )
 
 
-def main():
-    args = parse_args()
+def run_backfill(args, scraper: RTODataScraper):
     mapping_path = Path(args.mapping_path)
     if not mapping_path.is_absolute():
         mapping_path = (REPO_ROOT / mapping_path).resolve()
@@ -389,7 +521,6 @@ def main():
         month_windows[-1].year,
     )
 
-    scraper = RTODataScraper()
     telangana_offices = refresh_telangana_mapping(
         scraper,
         mapping_path,
@@ -408,6 +539,17 @@ def main():
     ingester = RtoDataIngest()
     processed_months = 0
 
+    if args.session_plan:
+        run_session_plan_downloads(
+            scraper,
+            telangana_offices,
+            month_windows,
+            max_workers=args.max_workers,
+            force_reextract=args.force_reextract,
+        )
+    # Session-plan downloads already honoured --force-reextract.
+    force_month_reextract = args.force_reextract and not args.session_plan
+
     for window in month_windows:
         logger.info(
             "Starting Telangana historical month=%s year=%s offices=%s",
@@ -421,46 +563,43 @@ def main():
             window.month,
             window.year,
             max_workers=args.max_workers,
-            force_reextract=args.force_reextract,
+            force_reextract=force_month_reextract,
         )
 
-        final_df = preprocessor.data_preprocessing(
-            window.month,
-            window.year,
+    prepared_months = []
+    # One pass over the raw tree for the whole window; months are yielded in
+    # order, and every --ingest-batch-months of them are ingested and uploaded
+    # before the next month is finalized.
+    with ingester:
+        for month, year, final_df in preprocessor.run_preprocessing_range(
+            [(window.month, window.year) for window in month_windows],
             states=[TARGET_STATE],
-        )
-        output_csv_path = build_output_csv_path(window.month, window.year)
-        final_df.to_csv(output_csv_path, header=True, index=False)
-        logger.info(
-            "Prepared Telangana RTO CSV %s rows=%s",
-            output_csv_path.name,
-            len(final_df),
-        )
-
-        if final_df.empty:
-            logger.warning(
-                "No Telangana rows were produced for %s %s. Skipping SQL Server ingestion for this month.",
-                window.month,
-                window.year,
-            )
-        else:
-            inserted_rows = ingester.data_ingest_from_file(str(output_csv_path))
+        ):
+            output_csv_path = build_output_csv_path(month, year)
+            output_rows = preprocessor.write_output_frame(final_df, output_csv_path)
             logger.info(
-                "Inserted or refreshed %s Telangana raw rows for %s %s.",
-                inserted_rows,
-                window.month,
-                window.year,
+                "Prepared Telangana RTO CSV %s rows=%s",
+                output_csv_path.name,
+                output_rows,
             )
+            prepared_months.append((month, year, output_csv_path, output_rows))
 
-        if args.upload_to_blob:
-            upload_telangana_artifacts(window.month, window.year, output_csv_path)
-            logger.info(
-                "Uploaded Telangana raw workbooks and CSV artifact for %s %s.",
-                window.month,
-                window.year,
+            if len(prepared_months) >= args.ingest_batch_months:
+                ingest_and_upload_months(
+                    ingester,
+                    prepared_months,
+                    upload_to_blob=args.upload_to_blob,
+                )
+                processed_months += len(prepared_months)
+                prepared_months = []
+
+        if prepared_months:
+            ingest_and_upload_months(
+                ingester,
+                prepared_months,
+                upload_to_blob=args.upload_to_blob,
             )
-
-        processed_months += 1
+            processed_months += len(prepared_months)
 
     if args.run_dbt_full_refresh:
         logger.warning(
@@ -474,5 +613,17 @@ def main():
     )
 
 
+def main():
+    args = parse_args()
+    resolve_chromedriver_path()
+    scraper = RTODataScraper(
+        session_pool=BrowserSessionPool(max_sessions=args.max_workers)
+    )
+    try:
+        run_backfill(args, scraper)
+    finally:
+        scraper.close()
+
+
 if __name__ == "__main__":
     main()
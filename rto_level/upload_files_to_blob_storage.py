@@ -22,6 +22,7 @@ def main():
         raw_container_config_key="rto_wise_container_name",
         csv_container_config_key="rto_wise_csv_container_name",
         csv_prefix="rto_level_ev_data_{month}_{year}",
+        parquet_file_prefix="rto_level_ev_data",
     )
 
 
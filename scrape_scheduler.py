@@ -0,0 +1,444 @@
+"""
+Adaptive concurrency for the scraper fan-outs.
+
+``AdaptiveConcurrencyController`` runs tasks on a thread pool using an AIMD
+(additive increase, multiplicative decrease) limit: parallelism grows by one
+worker per healthy round of completions and halves whenever the site pushes
+back with blocks, timeouts or WebDriver failures. The limit is also capped by
+how many more Chrome instances fit into the currently available memory.
+
+``RetryingTaskScheduler`` runs a fan-out through that controller and requeues
+failed tasks with exponential backoff and jitter within the same pass, bounded
+by a global attempt budget, then reports what is still failing.
+"""
+import heapq
+import itertools
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from utils import (
+    BlockedPageError,
+    SeleniumStepError,
+    load_browser_config,
+    summarize_exception,
+)
+
+MAX_WORKERS_ENV_VAR = "VAHAN_MAX_WORKERS"
+DEFAULT_MIN_WORKERS = 2
+DEFAULT_MEMORY_PER_BROWSER_MB = 350
+DEFAULT_BACKPRESSURE_ERROR_RATE = 0.2
+DEFAULT_LATENCY_TOLERANCE = 2.0
+DEFAULT_TASK_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BUDGET_RATIO = 0.5
+DEFAULT_RETRY_BACKOFF_SECONDS = 10
+DEFAULT_RETRY_BACKOFF_MAX_SECONDS = 300
+# Under the scheduler a download makes one attempt per task run: the scheduler
+# owns retries and backoff, and the AIMD controller sees every failure
+# instead of only the last of a scraper's own retries.
+SCHEDULED_DOWNLOAD_MAX_RETRIES = 1
+# Bad labels or parameters fail the same way on every attempt.
+NON_RETRYABLE_EXCEPTIONS = (ValueError, KeyError)
+MEMINFO_PATH = "/proc/meminfo"
+BACKPRESSURE_EXCEPTIONS = (
+    BlockedPageError,
+    SeleniumStepError,
+    TimeoutException,
+    TimeoutError,
+    WebDriverException,
+)
+
+
+def read_available_memory_mb(meminfo_path=MEMINFO_PATH):
+    """Return MemAvailable in MB, or None where /proc/meminfo is unavailable."""
+    try:
+        with open(meminfo_path, "r", encoding="utf-8") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def is_backpressure_error(exc):
+    if isinstance(exc, SeleniumStepError) and not isinstance(exc, BlockedPageError):
+        # Lookup failures on a healthy page are usually selector problems,
+        # not the site slowing down; only timeouts underneath count.
+        return isinstance(
+            exc.original_exception,
+            (TimeoutException, TimeoutError, WebDriverException),
+        )
+    return isinstance(exc, BACKPRESSURE_EXCEPTIONS)
+
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD concurrency limit shared by one fan-out.
+
+    Parameters:
+    - max_workers: Hard upper bound (thread pool size and browser pool size).
+    - min_workers: Floor the limit never drops below.
+    - initial_workers: Starting limit; defaults to ``min_workers``.
+    - memory_per_worker_mb: Expected resident size of one worker's browser,
+      used to cap the limit by MemAvailable. ``None`` disables the cap.
+    - backpressure_error_rate: Failure share within the recent window that
+      stops further increases.
+    - latency_tolerance: Multiple of the best observed average latency above
+      which the site is treated as slowing down.
+    - on_limit_change: Optional callback receiving the new limit, e.g. to trim
+      idle browsers after a decrease.
+    """
+
+    def __init__(
+        self,
+        max_workers,
+        *,
+        min_workers=DEFAULT_MIN_WORKERS,
+        initial_workers=None,
+        memory_per_worker_mb=DEFAULT_MEMORY_PER_BROWSER_MB,
+        backpressure_error_rate=DEFAULT_BACKPRESSURE_ERROR_RATE,
+        latency_tolerance=DEFAULT_LATENCY_TOLERANCE,
+        window_size=20,
+        memory_probe=read_available_memory_mb,
+        on_limit_change=None,
+        name="fan_out",
+    ):
+        self.max_workers = max(1, int(max_workers))
+        self.min_workers = max(1, min(int(min_workers), self.max_workers))
+        self.limit = max(
+            self.min_workers,
+            min(int(initial_workers or self.min_workers), self.max_workers),
+        )
+        self.memory_per_worker_mb = memory_per_worker_mb
+        self.backpressure_error_rate = backpressure_error_rate
+        self.latency_tolerance = latency_tolerance
+        self.memory_probe = memory_probe
+        self.on_limit_change = on_limit_change
+        self.name = name
+        self.in_flight = 0
+        self._outcomes = deque(maxlen=window_size)
+        self._latency_ewma = None
+        self._best_latency = None
+        self._completions_since_change = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, max_workers, browser_config=None, **kwargs):
+        """
+        Build a controller using ``browser.min_workers``,
+        ``browser.max_workers`` and ``browser.memory_per_browser_mb`` from
+        config.yaml; ``VAHAN_MAX_WORKERS`` overrides the upper bound.
+        """
+        if browser_config is None:
+            browser_config = load_browser_config()
+        configured_max = os.getenv(MAX_WORKERS_ENV_VAR) or browser_config.get("max_workers")
+        if configured_max:
+            max_workers = min(int(max_workers), int(configured_max))
+        kwargs.setdefault(
+            "min_workers",
+            int(browser_config.get("min_workers") or DEFAULT_MIN_WORKERS),
+        )
+        kwargs.setdefault(
+            "memory_per_worker_mb",
+            browser_config.get("memory_per_browser_mb", DEFAULT_MEMORY_PER_BROWSER_MB),
+        )
+        return cls(max_workers, **kwargs)
+
+    def _memory_cap(self):
+        if not self.memory_per_worker_mb or self.memory_probe is None:
+            return self.max_workers
+        available_mb = self.memory_probe()
+        if available_mb is None:
+            return self.max_workers
+        # Running workers already hold their memory; only new ones need room.
+        return max(
+            self.min_workers,
+            self.in_flight + int(available_mb // self.memory_per_worker_mb),
+        )
+
+    def _set_limit(self, new_limit, reason):
+        new_limit = max(self.min_workers, min(new_limit, self.max_workers))
+        if new_limit == self.limit:
+            return False
+        logging.info(
+            "Adaptive concurrency change fan_out=%s previous=%s limit=%s reason=%s",
+            self.name,
+            self.limit,
+            new_limit,
+            reason,
+        )
+        self.limit = new_limit
+        self._completions_since_change = 0
+        return True
+
+    def _is_healthy(self):
+        if self._outcomes:
+            error_rate = self._outcomes.count(False) / len(self._outcomes)
+            if error_rate >= self.backpressure_error_rate:
+                return False
+        if self._best_latency and self._latency_ewma:
+            return self._latency_ewma <= self._best_latency * self.latency_tolerance
+        return True
+
+    def record(self, duration_seconds, exc=None):
+        """Feed one completed task into the AIMD loop."""
+        changed = False
+        with self._lock:
+            self.in_flight -= 1
+            self._completions_since_change += 1
+            backpressure = exc is not None and is_backpressure_error(exc)
+            self._outcomes.append(not backpressure)
+
+            if backpressure:
+                # Only back off once per round so a burst of failures from
+                # the same congested moment does not collapse the limit.
+                if isinstance(exc, BlockedPageError) or self._completions_since_change >= self.limit:
+                    changed = self._set_limit(
+                        self.limit // 2,
+                        type(exc).__name__,
+                    )
+            else:
+                self._latency_ewma = (
+                    duration_seconds
+                    if self._latency_ewma is None
+                    else 0.8 * self._latency_ewma + 0.2 * duration_seconds
+                )
+                if self._best_latency is None or self._latency_ewma < self._best_latency:
+                    self._best_latency = self._latency_ewma
+                if self._completions_since_change >= self.limit and self._is_healthy():
+                    changed = self._set_limit(
+                        min(self.limit + 1, self._memory_cap()),
+                        "healthy_round",
+                    )
+            new_limit = self.limit
+        if changed and self.on_limit_change is not None:
+            self.on_limit_change(new_limit)
+
+    def has_capacity(self):
+        return self.in_flight < self.limit
+
+    def submit(self, executor, func, task):
+        with self._lock:
+            self.in_flight += 1
+        return executor.submit(self._run_task, func, task)
+
+    def _run_task(self, func, task):
+        started_at = time.monotonic()
+        try:
+            result = func(task)
+        except Exception as exc:
+            self.record(time.monotonic() - started_at, exc)
+            raise
+        self.record(time.monotonic() - started_at)
+        return result
+
+    def run(self, func, tasks):
+        """
+        Run ``func(task)`` for every task, never exceeding the current limit.
+
+        Yields ``(task, future)`` pairs in completion order, so callers keep
+        the usual ``future.result()`` error handling.
+        """
+        pending_tasks = deque(tasks)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending_tasks or running:
+                while pending_tasks and self.has_capacity():
+                    task = pending_tasks.popleft()
+                    running[self.submit(executor, func, task)] = task
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield running.pop(future), future
+
+
+@dataclass
+class RetryReport:
+    """Outcome of one ``RetryingTaskScheduler.run`` pass."""
+
+    name: str
+    total_tasks: int = 0
+    attempt_budget: int = 0
+    attempts: int = 0
+    retries: int = 0
+    succeeded: int = 0
+    failed: dict = field(default_factory=dict)
+    budget_exhausted: bool = False
+
+    def log(self):
+        log = logging.warning if self.failed else logging.info
+        log(
+            "Retry scheduler report fan_out=%s tasks=%s succeeded=%s failed=%s attempts=%s retries=%s attempt_budget=%s budget_exhausted=%s",
+            self.name,
+            self.total_tasks,
+            self.succeeded,
+            len(self.failed),
+            self.attempts,
+            self.retries,
+            self.attempt_budget,
+            self.budget_exhausted,
+        )
+        for task, exc in self.failed.items():
+            logging.warning(
+                "Retry scheduler gave up fan_out=%s task=%s failed_step=%s error=%s",
+                self.name,
+                task,
+                getattr(exc, "step", "download_flow"),
+                summarize_exception(getattr(exc, "original_exception", exc)),
+            )
+
+
+class RetryingTaskScheduler:
+    """
+    Single-pass fan-out that retries failed tasks as part of the main run.
+
+    A failed task is requeued after ``backoff_seconds * 2 ** (attempt - 1)``
+    seconds (capped at ``backoff_max_seconds``, with equal jitter so retries
+    do not land in lockstep) while other tasks keep running. Retries stop
+    when a task reaches ``max_attempts`` or the pass has used
+    ``attempt_budget`` attempts in total; first attempts are always made.
+
+    ``run`` yields ``(task, future)`` once per task with its final outcome,
+    and ``report`` summarises the pass afterwards.
+    """
+
+    def __init__(
+        self,
+        controller,
+        *,
+        max_attempts=DEFAULT_TASK_MAX_ATTEMPTS,
+        attempt_budget=None,
+        retry_budget_ratio=DEFAULT_RETRY_BUDGET_RATIO,
+        backoff_seconds=DEFAULT_RETRY_BACKOFF_SECONDS,
+        backoff_max_seconds=DEFAULT_RETRY_BACKOFF_MAX_SECONDS,
+        rng=None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.controller = controller
+        self.max_attempts = max(1, int(max_attempts))
+        self.attempt_budget = attempt_budget
+        self.retry_budget_ratio = retry_budget_ratio
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.sleep = sleep
+        self.report = RetryReport(name=controller.name)
+
+    @classmethod
+    def from_config(cls, controller, browser_config=None, **kwargs):
+        """
+        Build a scheduler using ``browser.task_max_attempts``,
+        ``browser.retry_budget_ratio``, ``browser.retry_backoff_seconds`` and
+        ``browser.retry_backoff_max_seconds`` from config.yaml.
+        """
+        if browser_config is None:
+            browser_config = load_browser_config()
+        kwargs.setdefault(
+            "max_attempts",
+            int(browser_config.get("task_max_attempts") or DEFAULT_TASK_MAX_ATTEMPTS),
+        )
+        kwargs.setdefault(
+            "retry_budget_ratio",
+            float(browser_config.get("retry_budget_ratio", DEFAULT_RETRY_BUDGET_RATIO)),
+        )
+        kwargs.setdefault(
+            "backoff_seconds",
+            float(browser_config.get("retry_backoff_seconds", DEFAULT_RETRY_BACKOFF_SECONDS)),
+        )
+        kwargs.setdefault(
+            "backoff_max_seconds",
+            float(
+                browser_config.get(
+                    "retry_backoff_max_seconds",
+                    DEFAULT_RETRY_BACKOFF_MAX_SECONDS,
+                )
+            ),
+        )
+        return cls(controller, **kwargs)
+
+    def backoff_delay(self, attempt):
+        delay = min(
+            self.backoff_max_seconds,
+            self.backoff_seconds * 2 ** (attempt - 1),
+        )
+        return self.rng.uniform(delay / 2, delay)
+
+    def _should_retry(self, exc, attempts):
+        if isinstance(exc, NON_RETRYABLE_EXCEPTIONS) or attempts >= self.max_attempts:
+            return False
+        # Every task gets its first attempt, so retries spend the remainder.
+        if self.report.total_tasks + self.report.retries >= self.report.attempt_budget:
+            self.report.budget_exhausted = True
+            return False
+        return True
+
+    def run(self, func, tasks):
+        tasks = list(tasks)
+        report = self.report = RetryReport(name=self.controller.name)
+        report.total_tasks = len(tasks)
+        report.attempt_budget = max(
+            len(tasks),
+            self.attempt_budget
+            if self.attempt_budget is not None
+            else len(tasks) + math.ceil(len(tasks) * self.retry_budget_ratio),
+        )
+
+        ready = deque(tasks)
+        delayed = []
+        sequence = itertools.count()
+        attempts = Counter()
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.controller.max_workers) as executor:
+            while ready or delayed or running:
+                now = self.clock()
+                while delayed and delayed[0][0] <= now:
+                    ready.append(heapq.heappop(delayed)[2])
+
+                while ready and self.controller.has_capacity():
+                    task = ready.popleft()
+                    attempts[task] += 1
+                    report.attempts += 1
+                    running[self.controller.submit(executor, func, task)] = task
+
+                if not running:
+                    if delayed:
+                        self.sleep(max(0.0, delayed[0][0] - now))
+                    continue
+
+                timeout = max(0.0, delayed[0][0] - now) if delayed else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    exc = future.exception()
+                    if exc is None:
+                        report.succeeded += 1
+                        yield task, future
+                        continue
+
+                    if self._should_retry(exc, attempts[task]):
+                        delay = self.backoff_delay(attempts[task])
+                        report.retries += 1
+                        heapq.heappush(delayed, (self.clock() + delay, next(sequence), task))
+                        logging.warning(
+                            "Requeued failed task fan_out=%s task=%s attempt=%s delay_seconds=%.1f failed_step=%s error=%s",
+                            self.controller.name,
+                            task,
+                            attempts[task],
+                            delay,
+                            getattr(exc, "step", "download_flow"),
+                            summarize_exception(getattr(exc, "original_exception", exc)),
+                        )
+                        continue
+
+                    report.failed[task] = exc
+                    yield task, future
@@ -0,0 +1,366 @@
+"""
+Durable on-disk ledger of monthly scrape tasks.
+
+Each (pipeline, state, office/category, year, month) download is a row in a
+SQLite file in the working directory recording its status, attempts,
+duration, report hash and last error. Reruns register the same tasks again,
+skip those that already succeeded and still have their report on disk, and
+the missing-file step becomes a ledger query instead of a directory rescan.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from utils import (
+    compute_file_sha256,
+    is_truthy,
+    is_valid_excel_download,
+    summarize_exception,
+)
+
+TASK_LEDGER_PATH_ENV_VAR = "VAHAN_TASK_LEDGER_PATH"
+TASK_LEDGER_FRESH_ENV_VAR = "VAHAN_TASK_LEDGER_FRESH"
+DEFAULT_TASK_LEDGER_FILENAME = "scrape_task_ledger.sqlite3"
+RTO_PIPELINE = "rto"
+OEM_PIPELINE = "oem"
+STATE_PIPELINE = "state"
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_tasks (
+    pipeline TEXT NOT NULL,
+    state TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    year TEXT NOT NULL,
+    month TEXT NOT NULL,
+    params_json TEXT NOT NULL,
+    report_path TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    duration_seconds REAL,
+    file_sha256 TEXT,
+    last_error TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (pipeline, state, scope, year, month)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_scrape_tasks_params
+    ON scrape_tasks (pipeline, params_json);
+"""
+
+
+class LedgerTask(NamedTuple):
+    pipeline: str
+    state: str
+    scope: str
+    year: str
+    month: str
+
+
+def get_task_ledger_path():
+    return os.getenv(TASK_LEDGER_PATH_ENV_VAR) or os.path.join(
+        os.getcwd(),
+        DEFAULT_TASK_LEDGER_FILENAME,
+    )
+
+
+def _utc_now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _encode_params(params):
+    # Params are decoded back into tuples of str, so anything else would stop
+    # matching the task grid it came from.
+    if not all(isinstance(value, str) for value in params):
+        raise TypeError(f"Task ledger params must all be str: {params!r}")
+    return json.dumps(list(params))
+
+
+class ScrapeTaskLedger:
+    """Thread-safe SQLite task ledger shared by one scrape run."""
+
+    def __init__(self, ledger_path=None):
+        self.ledger_path = ledger_path or get_task_ledger_path()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.ledger_path,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _execute(self, query, parameters=()):
+        with self._lock:
+            return self._connection.execute(query, parameters).fetchall()
+
+    def register(self, entries):
+        """
+        Register ``(LedgerTask, params, report_path)`` entries as pending,
+        keeping the status of tasks already in the ledger.
+        """
+        now = _utc_now()
+        rows = [
+            (*task, _encode_params(params), report_path, now)
+            for task, params, report_path in entries
+        ]
+        with self._lock:
+            self._connection.execute("BEGIN")
+            self._connection.executemany(
+                """
+                INSERT INTO scrape_tasks (
+                    pipeline, state, scope, year, month, params_json, report_path, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (pipeline, state, scope, year, month) DO UPDATE SET
+                    params_json = excluded.params_json,
+                    report_path = excluded.report_path
+                """,
+                rows,
+            )
+            self._connection.execute("COMMIT")
+
+    def prune(self, pipeline, year, month, entries):
+        """
+        Delete the month's tasks that ``entries`` no longer lists, such as
+        offices dropped from the RTO mapping or labels the catalogue no
+        longer offers, so recovery does not keep re-running them.
+        """
+        registered = {tuple(task) for task, _, _ in entries}
+        rows = self._execute(
+            """
+            SELECT pipeline, state, scope, year, month
+            FROM scrape_tasks
+            WHERE pipeline = ? AND year = ? AND month = ?
+            """,
+            (pipeline, str(year), month),
+        )
+        stale = [row for row in rows if tuple(row) not in registered]
+        if stale:
+            with self._lock:
+                self._connection.executemany(
+                    """
+                    DELETE FROM scrape_tasks
+                    WHERE pipeline = ? AND state = ? AND scope = ? AND year = ? AND month = ?
+                    """,
+                    stale,
+                )
+            logging.warning(
+                "Task ledger dropped tasks no longer in the task grid pipeline=%s year=%s month=%s count=%s example=%s",
+                pipeline,
+                year,
+                month,
+                len(stale),
+                stale[0],
+            )
+        return len(stale)
+
+    def reset(self, pipeline, year, month):
+        self._execute(
+            """
+            UPDATE scrape_tasks
+            SET status = ?, attempts = 0, duration_seconds = NULL,
+                file_sha256 = NULL, last_error = NULL, updated_at = ?
+            WHERE pipeline = ? AND year = ? AND month = ?
+            """,
+            (STATUS_PENDING, _utc_now(), pipeline, str(year), month),
+        )
+
+    def pending_parameters(self, pipeline, year, month):
+        """
+        Return the params of every task that still needs a download, or
+        ``None`` when the ledger has no tasks for this pipeline and month.
+
+        Succeeded tasks whose report has since disappeared (for example after
+        the blob upload cleaned the folder) are reopened.
+        """
+        rows = self._execute(
+            """
+            SELECT params_json, report_path, status
+            FROM scrape_tasks
+            WHERE pipeline = ? AND year = ? AND month = ?
+            ORDER BY state, scope
+            """,
+            (pipeline, str(year), month),
+        )
+        if not rows:
+            return None
+
+        pending = []
+        reopened = []
+        for params_json, report_path, status in rows:
+            if status == STATUS_SUCCEEDED and is_valid_excel_download(report_path):
+                continue
+            if status == STATUS_SUCCEEDED:
+                reopened.append((STATUS_PENDING, _utc_now(), pipeline, params_json))
+            pending.append(tuple(json.loads(params_json)))
+
+        if reopened:
+            with self._lock:
+                self._connection.executemany(
+                    "UPDATE scrape_tasks SET status = ?, updated_at = ? WHERE pipeline = ? AND params_json = ?",
+                    reopened,
+                )
+        return pending
+
+    def status_counts(self, pipeline, year, month):
+        rows = self._execute(
+            """
+            SELECT status, COUNT(*)
+            FROM scrape_tasks
+            WHERE pipeline = ? AND year = ? AND month = ?
+            GROUP BY status
+            """,
+            (pipeline, str(year), month),
+        )
+        return dict(rows)
+
+    def run(self, pipeline, params, func):
+        """
+        Run ``func(params)`` for a registered task, recording the attempt.
+        Exceptions are recorded and re-raised.
+        """
+        params_json = _encode_params(params)
+        rows = self._execute(
+            "SELECT report_path FROM scrape_tasks WHERE pipeline = ? AND params_json = ?",
+            (pipeline, params_json),
+        )
+        if not rows:
+            raise KeyError(f"Task is not registered in the ledger: {pipeline} {params}")
+        report_path = rows[0][0]
+
+        self._execute(
+            """
+            UPDATE scrape_tasks
+            SET status = ?, attempts = attempts + 1, updated_at = ?
+            WHERE pipeline = ? AND params_json = ?
+            """,
+            (STATUS_RUNNING, _utc_now(), pipeline, params_json),
+        )
+        started_at = time.monotonic()
+        try:
+            result = func(params)
+        except Exception as e:
+            self._execute(
+                """
+                UPDATE scrape_tasks
+                SET status = ?, duration_seconds = ?, last_error = ?, updated_at = ?
+                WHERE pipeline = ? AND params_json = ?
+                """,
+                (
+                    STATUS_FAILED,
+                    time.monotonic() - started_at,
+                    summarize_exception(getattr(e, "original_exception", e)),
+                    _utc_now(),
+                    pipeline,
+                    params_json,
+                ),
+            )
+            raise
+
+        file_sha256 = (
+            compute_file_sha256(report_path) if os.path.exists(report_path) else None
+        )
+        self._execute(
+            """
+            UPDATE scrape_tasks
+            SET status = ?, duration_seconds = ?, file_sha256 = ?, last_error = NULL, updated_at = ?
+            WHERE pipeline = ? AND params_json = ?
+            """,
+            (
+                STATUS_SUCCEEDED,
+                time.monotonic() - started_at,
+                file_sha256,
+                _utc_now(),
+                pipeline,
+                params_json,
+            ),
+        )
+        return result
+
+    def tracked(self, pipeline, func):
+        """Wrap ``func(params)`` so every call is recorded in the ledger."""
+
+        def run_tracked(params):
+            return self.run(pipeline, params, func)
+
+        return run_tracked
+
+    def prepare_run(self, pipeline, year, month, entries):
+        """
+        Register a month's tasks, drop earlier tasks for the month that are
+        not among them, and return the params still to download.
+        VAHAN_TASK_LEDGER_FRESH=true discards earlier progress for the month.
+        """
+        if is_truthy(os.getenv(TASK_LEDGER_FRESH_ENV_VAR, "")):
+            self.reset(pipeline, year, month)
+        self.register(entries)
+        self.prune(pipeline, year, month, entries)
+        pending = self.pending_parameters(pipeline, year, month) or []
+        logging.info(
+            "Task ledger prepared pipeline=%s year=%s month=%s registered=%s resumable_done=%s pending=%s ledger=%s",
+            pipeline,
+            year,
+            month,
+            len(entries),
+            len(entries) - len(pending),
+            len(pending),
+            self.ledger_path,
+        )
+        return pending
+
+
+def recover_pending_tasks(ledger, pipeline, year, month, run_batch):
+    """
+    Re-run the ledger's unfinished tasks for a month in one retrying pass.
+
+    :param run_batch: callable receiving the list of pending params
+    :return: False when the ledger has no tasks for the month, so callers
+        can fall back to scanning the report directories.
+    """
+    parameters = ledger.pending_parameters(pipeline, year, month)
+    if parameters is None:
+        return False
+    if not parameters:
+        logging.info(
+            "Task ledger has no unfinished %s tasks for %s %s.",
+            pipeline,
+            month,
+            year,
+        )
+        return True
+
+    logging.warning(
+        "Task ledger recovery pipeline=%s year=%s month=%s pending=%s counts=%s",
+        pipeline,
+        year,
+        month,
+        len(parameters),
+        ledger.status_counts(pipeline, year, month),
+    )
+    run_batch(parameters)
+
+    remaining = ledger.pending_parameters(pipeline, year, month)
+    if remaining:
+        raise RuntimeError(
+            f"{pipeline} missing-file recovery for {month} {year} left "
+            f"{len(remaining)} tasks unfinished in the task ledger."
+        )
+    return True
@@ -0,0 +1,172 @@
+SET NOCOUNT ON
+SET XACT_ABORT ON
+
+/*
+Table types for the TVP staging loader (database.staging_loader: tvp).
+Each type mirrors its staging table's CSV columns, in order, without
+inserted_at. The ingestor only looks these types up; when one is missing or
+its columns differ from the CSV header, it loads staging with
+fast_executemany instead. Re-runnable: existing types are left untouched.
+
+After applying, grant the ingest login use of each type, e.g.
+    GRANT EXECUTE ON TYPE::dbo.staging_fact_ev_data_by_rto_rows TO [ingest_login];
+*/
+
+IF TYPE_ID(N'dbo.staging_fact_ev_data_by_rto_rows') IS NULL
+BEGIN
+    CREATE TYPE dbo.staging_fact_ev_data_by_rto_rows AS TABLE (
+        [year] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [month] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [day] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [date] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [state] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [rto_name] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [rto_code] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [vehicle_type] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [vehicle_category] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [vehicle_use_type] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [vehicle_class] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [bio_cng_bio_gas] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [bio_diesel_b100] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [bio_methane] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [cng_only] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [diesel] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [diesel_hybrid] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [di_methyl_ether] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [dual_diesel_bio_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [dual_diesel_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [dual_diesel_lng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [electric_bov] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [ethanol_e100] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [flex_fuel_bio_diesel] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [flex_fuel_ethanol] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [fuel_cell_hydrogen] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [hcng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [hydrogen_ice] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [lng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [lpg_only] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [methanol] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [not_applicable] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20_hybrid] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20_hybrid_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20_lpg] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_hybrid] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_hybrid_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_lpg] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_methanol] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [plug_in_hybrid_ev] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [pure_ev] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [solar] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [strong_hybrid_ev] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [total] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL
+    )
+END
+
+IF TYPE_ID(N'dbo.staging_fact_ev_data_by_state_rows') IS NULL
+BEGIN
+    CREATE TYPE dbo.staging_fact_ev_data_by_state_rows AS TABLE (
+        [year] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [month] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [day] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [date] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [state] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [vehicle_type] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [vehicle_category] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [vehicle_use_type] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [vehicle_class] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [bio_cng_bio_gas] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [bio_diesel_b100] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [bio_methane] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [cng_only] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [diesel] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [diesel_hybrid] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [di_methyl_ether] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [dual_diesel_bio_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [dual_diesel_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [dual_diesel_lng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [electric_bov] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [ethanol_e100] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [flex_fuel_bio_diesel] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [flex_fuel_ethanol] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [fuel_cell_hydrogen] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [hcng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [hydrogen_ice] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [lng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [lpg_only] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [methanol] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [not_applicable] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20_hybrid] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20_hybrid_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20_lpg] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_hybrid] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_hybrid_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_lpg] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_methanol] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [plug_in_hybrid_ev] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [pure_ev] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [solar] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [strong_hybrid_ev] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [total] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL
+    )
+END
+
+IF TYPE_ID(N'dbo.staging_fact_oem_data_by_state_and_category_rows') IS NULL
+BEGIN
+    CREATE TYPE dbo.staging_fact_oem_data_by_state_and_category_rows AS TABLE (
+        [year] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [month] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [day] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [date] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [state] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [vehicle_class] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [vehicle_type] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [vehicle_category] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [vehicle_use_type] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [maker] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [bio_cng_bio_gas] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [bio_diesel_b100] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [bio_methane] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [cng_only] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [diesel] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [diesel_hybrid] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [di_methyl_ether] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [dual_diesel_bio_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [dual_diesel_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [dual_diesel_lng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [electric_bov] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [ethanol_e100] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [flex_fuel_bio_diesel] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [flex_fuel_ethanol] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [fuel_cell_hydrogen] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [hcng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [hydrogen_ice] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [lng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [lpg_only] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [methanol] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [not_applicable] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20_hybrid] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20_hybrid_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_e20_lpg] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_hybrid] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_hybrid_cng] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_lpg] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [petrol_methanol] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [plug_in_hybrid_ev] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [pure_ev] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [solar] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [strong_hybrid_ev] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL,
+        [total] NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL
+    )
+END
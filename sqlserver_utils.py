@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
+from contextlib import contextmanager
 
 
 def connect_with_retry(
@@ -38,3 +40,137 @@ def connect_with_retry(
         raise last_error
 
     raise RuntimeError("Database connection retry loop exited unexpectedly.")
+
+
+class SqlServerConnectionPool:
+    """
+    Keep up to ``max_idle`` open connections between uses so repeated loads
+    from one process skip the login handshake. Idle connections are checked
+    with ``health_check_query`` before reuse; a broken one is closed and
+    replaced through ``connect_with_retry``. A connection whose use raised a
+    ``connection_error_types`` error is discarded rather than pooled.
+    """
+
+    def __init__(
+        self,
+        connect_callable,
+        *,
+        max_idle=1,
+        health_check_query="SELECT 1",
+        connection_error_types=(Exception,),
+        logger=None,
+        retry_attempts=5,
+        base_wait_seconds=20,
+        sleep_func=time.sleep,
+    ):
+        self.connect_callable = connect_callable
+        self.max_idle = max_idle
+        self.health_check_query = health_check_query
+        self.connection_error_types = connection_error_types
+        self.logger = logger or logging.getLogger(__name__)
+        self.retry_attempts = retry_attempts
+        self.base_wait_seconds = base_wait_seconds
+        self.sleep_func = sleep_func
+
+        self._idle_connections = []
+        self._lock = threading.Lock()
+        self.acquire_count = 0
+        self.connect_count = 0
+        self.stale_count = 0
+        self.acquire_seconds = 0.0
+
+    def is_healthy(self, connection) -> bool:
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(self.health_check_query)
+                cursor.fetchone()
+            finally:
+                cursor.close()
+        except self.connection_error_types as exc:
+            self.logger.warning("Pooled database connection failed its health check: %s", exc)
+            return False
+        return True
+
+    def acquire(self):
+        started_at = time.perf_counter()
+        connection = None
+        while connection is None:
+            with self._lock:
+                if not self._idle_connections:
+                    break
+                candidate = self._idle_connections.pop()
+            if self.is_healthy(candidate):
+                connection = candidate
+            else:
+                self.stale_count += 1
+                self._close_quietly(candidate)
+
+        reused = connection is not None
+        if connection is None:
+            connection = connect_with_retry(
+                self.connect_callable,
+                attempts=self.retry_attempts,
+                base_wait_seconds=self.base_wait_seconds,
+                sleep_func=self.sleep_func,
+                logger=self.logger,
+                connection_error_types=self.connection_error_types,
+            )
+            self.connect_count += 1
+
+        elapsed_seconds = time.perf_counter() - started_at
+        self.acquire_count += 1
+        self.acquire_seconds += elapsed_seconds
+        self.logger.info(
+            "Acquired database connection reused=%s seconds=%.3f",
+            reused,
+            elapsed_seconds,
+        )
+        return connection
+
+    def release(self, connection, *, discard=False) -> None:
+        if not discard:
+            try:
+                # Never hand the next caller an open transaction.
+                connection.rollback()
+            except self.connection_error_types:
+                discard = True
+
+        with self._lock:
+            if not discard and len(self._idle_connections) < self.max_idle:
+                self._idle_connections.append(connection)
+                return
+        self._close_quietly(connection)
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        except self.connection_error_types:
+            self.release(connection, discard=True)
+            raise
+        except BaseException:
+            self.release(connection)
+            raise
+        self.release(connection)
+
+    def close(self) -> None:
+        with self._lock:
+            idle_connections, self._idle_connections = self._idle_connections, []
+        for connection in idle_connections:
+            self._close_quietly(connection)
+        if self.acquire_count:
+            self.logger.info(
+                "Closed database connection pool acquires=%s connects=%s stale=%s acquire_seconds=%.2f",
+                self.acquire_count,
+                self.connect_count,
+                self.stale_count,
+                self.acquire_seconds,
+            )
+
+    def _close_quietly(self, connection) -> None:
+        try:
+            connection.close()
+        except Exception as exc:
+            self.logger.debug("Ignoring error while closing database connection: %s", exc)
@@ -33,11 +33,6 @@ CURRENT_STEP="extraction"
 log_step "Starting state extraction for ${RUN_LABEL}"
 run_selenium_step python3 state_level/state_level_data_scraper.py "$@"
 
-# Run missing files extraction
-CURRENT_STEP="missing_file_recovery"
-log_step "Running state missing-file recovery for ${RUN_LABEL}"
-run_selenium_step python3 state_level/state_level_get_missing_files.py "$@"
-
 # Run Pre Processing
 CURRENT_STEP="preprocessing"
 log_step "Running state preprocessing for ${RUN_LABEL}"
@@ -5,7 +5,7 @@ repo_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if repo_path not in sys.path:
     sys.path.append(repo_path)
 
-from etl_ingestion import BaseSqlServerIngestor
+from etl_ingestion import MERGE_FINAL_WRITE, BaseSqlServerIngestor
 from pipeline_logging import configure_pipeline_logging
 from runtime_config import resolve_month_year_args
 
@@ -20,13 +20,14 @@ class StateDataIngest(BaseSqlServerIngestor):
             final_table_name="fact_ev_data_by_state",
             merge_key_columns=["date", "state", "vehicle_class"],
             missing_file_hint="state_level_data_pre_processing",
+            final_write_mode=MERGE_FINAL_WRITE,
         )
 
 
 def main():
-    state_ev_data_ingest = StateDataIngest()
     month, year = resolve_month_year_args(sys.argv[1:])
-    state_ev_data_ingest.data_ingest(month, year)
+    with StateDataIngest() as state_ev_data_ingest:
+        state_ev_data_ingest.data_ingest(month, year)
 
 
 if __name__ == "__main__":
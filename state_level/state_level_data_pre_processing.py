@@ -1,8 +1,6 @@
 import os
 import sys
 
-import pandas as pd
-
 repo_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if repo_path not in sys.path:
     sys.path.append(repo_path)
@@ -40,37 +38,29 @@ class StateLevelDataPreProcessor(BaseExcelPreprocessor):
     def get_year_month_label():
         return get_previous_month_year_label()
 
-    def iter_report_contexts(self, month, year, **kwargs):
+    def iter_report_contexts_for_months(self, months, **kwargs):
         if not self.raw_files_directory.exists():
             return
 
         for state_dir in sorted(
             path for path in self.raw_files_directory.iterdir() if path.is_dir()
         ):
-            yield ReportContext(
-                report_path=state_dir / year / month / "reportTable.xlsx",
-                metadata={
-                    "Month": month,
-                    "Year": year,
-                    "Day": 1,
-                    "Date": f"1/{month}/{year}",
-                    "State": state_dir.name,
-                },
-                labels={
-                    "state": state_dir.name,
-                    "year": year,
-                    "month": month,
-                },
-            )
-
-    def apply_mapping(self, df):
-        return pd.merge(
-            df,
-            self.mapping_df,
-            left_on="Unnamed: 1",
-            right_on="Vehicle Class",
-            how="left",
-        )
+            for month, year in months:
+                yield ReportContext(
+                    report_path=state_dir / year / month / "reportTable.xlsx",
+                    metadata={
+                        "Month": month,
+                        "Year": year,
+                        "Day": 1,
+                        "Date": f"1/{month}/{year}",
+                        "State": state_dir.name,
+                    },
+                    labels={
+                        "state": state_dir.name,
+                        "year": year,
+                        "month": month,
+                    },
+                )
 
     def data_preprocessing(self, month, year):
         return self.run_preprocessing(month, year)
@@ -79,9 +69,8 @@ class StateLevelDataPreProcessor(BaseExcelPreprocessor):
 def main():
     state_level_data_preprocessor = StateLevelDataPreProcessor()
     month, year = resolve_month_year_args(sys.argv[1:])
-    final_df = state_level_data_preprocessor.data_preprocessing(month, year)
-    final_df.to_csv(
-        f"state_level_ev_data_{month}_{year}.csv", header=True, index=False
+    state_level_data_preprocessor.write_output_csv(
+        month, year, f"state_level_ev_data_{month}_{year}.csv"
     )
 
 
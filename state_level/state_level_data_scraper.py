@@ -1,11 +1,8 @@
-from selenium import webdriver
 from selenium.common.exceptions import (
     TimeoutException,
     StaleElementReferenceException,
     WebDriverException,
 )
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from datetime import datetime, timedelta
 
 import logging
@@ -14,7 +11,6 @@ import re
 import sys
 import shutil
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 repo_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if repo_path not in sys.path:
@@ -23,26 +19,55 @@ if repo_path not in sys.path:
 from pipeline_constants import STATE_LIST
 from pipeline_logging import configure_pipeline_logging
 from runtime_config import get_previous_month_year_label, resolve_month_year_args
+from scrape_scheduler import (
+    SCHEDULED_DOWNLOAD_MAX_RETRIES,
+    AdaptiveConcurrencyController,
+    RetryingTaskScheduler,
+)
+from scrape_task_ledger import STATE_PIPELINE, LedgerTask, ScrapeTaskLedger
+from vahan_catalogue import filter_task_grid, load_or_discover_catalogue
+from vahan_jsf_fetcher import (
+    HTTP_FETCH_ENGINE,
+    JsfBlockedError,
+    JsfFetchError,
+    VahanJsfFetcher,
+    get_fetch_engine,
+)
 from utils import (
     BlockedPageError,
+    BrowserSessionPool,
     SeleniumStepError,
-    configure_chrome_options,
     find_element as shared_find_element,
     format_log_context,
+    StepTimings,
+    is_dead_session_error,
     open_page,
+    resolve_chromedriver_path,
     summarize_exception,
     VAHAN_DASHBOARD_URL,
     wait_for_expected_download,
+    wait_for_page_settle,
 )
 logger = logging.getLogger(__name__)
 
 configure_pipeline_logging()
 
+STATE_DOWNLOAD_MAX_WORKERS = 34
+
 
 class StateLevelDataScraper:
-    def __init__(self):
+    def __init__(self, session_pool=None, fetch_engine=None):
         self.max_retries = 5
+        # attempts per report download; see SCHEDULED_DOWNLOAD_MAX_RETRIES
+        self.download_max_retries = self.max_retries
         self.retry_delay = 15
+        self.session_pool = session_pool or BrowserSessionPool(
+            max_sessions=STATE_DOWNLOAD_MAX_WORKERS
+        )
+        self.fetch_engine = fetch_engine or get_fetch_engine()
+
+    def close(self):
+        self.session_pool.close()
 
     @staticmethod
     def create_directory_if_not_exists(directory_path):
@@ -91,11 +116,6 @@ class StateLevelDataScraper:
         )
 
         self.create_directory_if_not_exists(download_path)
-        browserOpts = webdriver.ChromeOptions()
-        configure_chrome_options(browserOpts, download_path)
-        browser = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), options=browserOpts
-        )
         expected_report_path = os.path.join(download_path, "reportTable.xlsx")
         if os.path.exists(expected_report_path):
             os.remove(expected_report_path)
@@ -106,10 +126,35 @@ class StateLevelDataScraper:
             "month": month_label,
         }
 
-        try:
+        if self.fetch_engine == HTTP_FETCH_ENGINE:
+            try:
+                VahanJsfFetcher().fetch_state_report(
+                    state_label,
+                    year_label,
+                    month_label,
+                    download_path,
+                )
+                logging.info(
+                    "Downloaded state report over HTTP state=%s year=%s month=%s",
+                    state_folder_name,
+                    year_label,
+                    month_label,
+                )
+                return
+            except JsfFetchError as e:
+                logging.warning(
+                    "HTTP fetch engine fell back to Selenium context=%s failed_step=%s blocked=%s error=%s",
+                    format_log_context(context),
+                    e.step,
+                    isinstance(e, JsfBlockedError),
+                    e,
+                )
+
+        with self.session_pool.lease(download_directory=download_path) as browser:
             retries = 0
             last_exception = None
-            while retries < self.max_retries:
+            while retries < self.download_max_retries:
+                timings = StepTimings()
                 try:
                     open_page(
                         browser,
@@ -125,7 +170,12 @@ class StateLevelDataScraper:
                         step="open_state_dropdown",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="open_state_dropdown",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -134,7 +184,12 @@ class StateLevelDataScraper:
                         step="select_state",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="select_state",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -143,7 +198,13 @@ class StateLevelDataScraper:
                         step="open_y_axis_dropdown",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="open_y_axis_dropdown",
+                        panel_id="yaxisVar_panel",
+                        context=context,
+                        timings=timings,
+                    )
                     self.find_element(
                         browser,
                         "id",
@@ -151,7 +212,12 @@ class StateLevelDataScraper:
                         step="select_y_axis_vehicle_class",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="select_y_axis_vehicle_class",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -160,7 +226,13 @@ class StateLevelDataScraper:
                         step="open_x_axis_dropdown",
                         context=context,
                     ).click()
-                    time.sleep(1)
+                    wait_for_page_settle(
+                        browser,
+                        step="open_x_axis_dropdown",
+                        panel_id="xaxisVar_panel",
+                        context=context,
+                        timings=timings,
+                    )
                     self.find_element(
                         browser,
                         "xpath",
@@ -168,7 +240,12 @@ class StateLevelDataScraper:
                         step="select_x_axis_fuel",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="select_x_axis_fuel",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -177,7 +254,13 @@ class StateLevelDataScraper:
                         step="open_year_dropdown",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="open_year_dropdown",
+                        panel_id="selectedYear_panel",
+                        context=context,
+                        timings=timings,
+                    )
                     self.find_element(
                         browser,
                         "xpath",
@@ -185,7 +268,12 @@ class StateLevelDataScraper:
                         step="select_year",
                         context=context,
                     ).click()
-                    time.sleep(5)
+                    wait_for_page_settle(
+                        browser,
+                        step="select_year",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -194,7 +282,12 @@ class StateLevelDataScraper:
                         step="click_main_refresh",
                         context=context,
                     ).click()
-                    time.sleep(5)
+                    wait_for_page_settle(
+                        browser,
+                        step="click_main_refresh",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -203,7 +296,13 @@ class StateLevelDataScraper:
                         step="open_month_dropdown",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="open_month_dropdown",
+                        panel_id="groupingTable:selectMonth_panel",
+                        context=context,
+                        timings=timings,
+                    )
                     self.find_element(
                         browser,
                         "xpath",
@@ -211,7 +310,12 @@ class StateLevelDataScraper:
                         step="select_month",
                         context=context,
                     ).click()
-                    time.sleep(2)
+                    wait_for_page_settle(
+                        browser,
+                        step="select_month",
+                        context=context,
+                        timings=timings,
+                    )
 
                     self.find_element(
                         browser,
@@ -222,10 +326,12 @@ class StateLevelDataScraper:
                     ).click()
                     wait_for_expected_download(download_path)
                     logging.info(
-                        "Downloaded state report state=%s year=%s month=%s",
+                        "Downloaded state report state=%s year=%s month=%s settle_seconds=%.1f timings=%s",
                         state_folder_name,
                         year_label,
                         month_label,
+                        timings.total_seconds,
+                        timings.format(),
                     )
                     return
                 except BlockedPageError as e:
@@ -244,6 +350,8 @@ class StateLevelDataScraper:
                     TimeoutError,
                     WebDriverException,
                 ) as e:
+                    if is_dead_session_error(e):
+                        raise
                     last_exception = e
                     retries += 1
                     if os.path.exists(expected_report_path):
@@ -254,30 +362,29 @@ class StateLevelDataScraper:
                     logging.warning(
                         "Retrying state download attempt=%s/%s context=%s failed_step=%s error=%s",
                         retries,
-                        self.max_retries,
+                        self.download_max_retries,
                         format_log_context(context),
                         getattr(e, "step", "download_flow"),
                         summarize_exception(e),
                     )
-                    time.sleep(self.retry_delay)
+                    if retries < self.download_max_retries:
+                        time.sleep(self.retry_delay)
 
             raise last_exception
-        finally:
-            browser.quit()
 
     # define a function to wrap the selenium function for argument unpacking
     def run_selenium(self, args):
         return self.extract_state_level_data(*args)
 
 
-def main():
-    data_extract_class = StateLevelDataScraper()
-
+def run_monthly_extraction(data_extract_class):
     state_lst = STATE_LIST
 
     month, year = resolve_month_year_args(sys.argv[1:])
 
     parameters = []
+    ledger_entries = []
+    task_directories = {}
     for state in state_lst:
         directory_path = os.path.join(
             os.getcwd(),
@@ -288,33 +395,63 @@ def main():
             month,
         )
 
-        # remove the file if already exists from previous month
-        if os.path.exists(directory_path):
-            shutil.rmtree(directory_path)
-
-        parameters.append((state, year, month))
+        task = (state, year, month)
+        parameters.append(task)
+        task_directories[task] = directory_path
+        ledger_entries.append(
+            (
+                LedgerTask(STATE_PIPELINE, state, "", str(year), month),
+                task,
+                os.path.join(directory_path, "reportTable.xlsx"),
+            )
+        )
 
-    # Run selenium function in parallel
-    logging.info(
-        "Prepared state download tasks count=%s year=%s month=%s",
-        len(parameters),
-        year,
-        month,
+    catalogue = load_or_discover_catalogue(data_extract_class.session_pool)
+    parameters = filter_task_grid(
+        catalogue,
+        parameters,
+        ("state", "year", "month"),
+        STATE_PIPELINE,
     )
+    offered_tasks = set(parameters)
+    ledger_entries = [entry for entry in ledger_entries if entry[1] in offered_tasks]
 
-    with ThreadPoolExecutor(
-            max_workers=34
-    ) as executor:  # Adjust max_workers based on your system's capability
-        futures = {
-            executor.submit(data_extract_class.run_selenium, args): args
-            for args in parameters
-        }
+    with ScrapeTaskLedger() as ledger:
+        pending_tasks = set(
+            ledger.prepare_run(STATE_PIPELINE, year, month, ledger_entries)
+        )
+        parameters = [task for task in parameters if task in pending_tasks]
+        for task in parameters:
+            # remove partial output left by an earlier, unfinished attempt
+            if os.path.exists(task_directories[task]):
+                shutil.rmtree(task_directories[task])
+
+        # Run selenium function in parallel
+        logging.info(
+            "Prepared state download tasks count=%s year=%s month=%s",
+            len(parameters),
+            year,
+            month,
+        )
+
+        controller = AdaptiveConcurrencyController.from_config(
+            STATE_DOWNLOAD_MAX_WORKERS,
+            on_limit_change=data_extract_class.session_pool.trim_idle,
+            name="state_downloads",
+        )
 
         successful_downloads = 0
         failed_downloads = []
 
-        for future in as_completed(futures):
-            state, year_label, month_label = futures[future]
+        # failed tasks are requeued with backoff inside this pass instead of
+        # waiting for a separate missing-file run
+        data_extract_class.download_max_retries = SCHEDULED_DOWNLOAD_MAX_RETRIES
+        scheduler = RetryingTaskScheduler.from_config(controller)
+        for task, future in scheduler.run(
+            ledger.tracked(STATE_PIPELINE, data_extract_class.run_selenium),
+            parameters,
+        ):
+            state, year_label, month_label = task
             try:
                 future.result()
                 successful_downloads += 1
@@ -330,14 +467,29 @@ def main():
                     summarize_exception(getattr(e, "original_exception", e)),
                 )
 
-    logging.info(
-        "State extraction summary for %s %s: prepared=%s succeeded=%s failed=%s",
-        month,
-        year,
-        len(parameters),
-        successful_downloads,
-        len(failed_downloads),
-    )
+        logging.info(
+            "State extraction summary for %s %s: prepared=%s succeeded=%s failed=%s",
+            month,
+            year,
+            len(parameters),
+            successful_downloads,
+            len(failed_downloads),
+        )
+        scheduler.report.log()
+
+    if failed_downloads:
+        raise RuntimeError(
+            f"State extraction for {month} {year} still has {len(failed_downloads)} failed downloads after retries."
+        )
+
+
+def main():
+    resolve_chromedriver_path()
+    data_extract_class = StateLevelDataScraper()
+    try:
+        run_monthly_extraction(data_extract_class)
+    finally:
+        data_extract_class.close()
 
 
 if __name__ == "__main__":
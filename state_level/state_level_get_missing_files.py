@@ -2,7 +2,6 @@ import logging
 import os
 import re
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
 SCRIPT_DIR = os.path.dirname(__file__)
@@ -16,6 +15,12 @@ if REPO_ROOT not in sys.path:
 from pipeline_constants import STATE_LIST
 from pipeline_logging import configure_pipeline_logging
 from runtime_config import resolve_month_year_args
+from scrape_scheduler import (
+    SCHEDULED_DOWNLOAD_MAX_RETRIES,
+    AdaptiveConcurrencyController,
+    RetryingTaskScheduler,
+)
+from scrape_task_ledger import STATE_PIPELINE, ScrapeTaskLedger, recover_pending_tasks
 from state_level.state_level_data_scraper import StateLevelDataScraper
 from utils import is_valid_excel_download
 
@@ -23,6 +28,8 @@ from utils import is_valid_excel_download
 configure_pipeline_logging()
 logger = logging.getLogger(__name__)
 
+RECOVERY_MAX_WORKERS = 10
+
 
 def build_report_path(state, year, month):
     state_folder = re.sub(r"[^a-zA-Z\s]", " ", state).rstrip()
@@ -45,35 +52,53 @@ def build_missing_parameters(month, year):
     return parameters
 
 
-def run_missing_file_recovery(scraper, parameters):
+def run_missing_file_recovery(scraper, parameters, ledger=None):
     successful_downloads = 0
     failed_downloads = []
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {
-            executor.submit(scraper.run_selenium, args): args for args in parameters
-        }
-        for future in as_completed(futures):
-            state, year, month = futures[future]
-            try:
-                future.result()
-                successful_downloads += 1
-            except Exception as exc:
-                failed_downloads.append(state)
-                logger.error(
-                    "State missing-file recovery failed state=%s year=%s month=%s error=%s",
-                    state,
-                    year,
-                    month,
-                    exc,
-                )
-
+    controller = AdaptiveConcurrencyController.from_config(
+        RECOVERY_MAX_WORKERS,
+        on_limit_change=scraper.session_pool.trim_idle,
+        name="state_missing_file_recovery",
+    )
+    run_task = scraper.run_selenium
+    if ledger is not None:
+        run_task = ledger.tracked(STATE_PIPELINE, run_task)
+    scraper.download_max_retries = SCHEDULED_DOWNLOAD_MAX_RETRIES
+    scheduler = RetryingTaskScheduler.from_config(controller)
+    for task, future in scheduler.run(run_task, parameters):
+        state, year, month = task
+        try:
+            future.result()
+            successful_downloads += 1
+        except Exception as exc:
+            failed_downloads.append(state)
+            logger.error(
+                "State missing-file recovery failed state=%s year=%s month=%s error=%s",
+                state,
+                year,
+                month,
+                exc,
+            )
+
+    scheduler.report.log()
     return successful_downloads, failed_downloads
 
 
-def main():
-    month, year = resolve_month_year_args(sys.argv[1:])
-    scraper = StateLevelDataScraper()
+def recover_missing_files(scraper, month, year):
+    # The scraper's task ledger already knows which downloads are unfinished,
+    # so only fall back to rescanning the report folders without it.
+    with ScrapeTaskLedger() as ledger:
+        if recover_pending_tasks(
+            ledger,
+            STATE_PIPELINE,
+            year,
+            month,
+            lambda parameters: run_missing_file_recovery(
+                scraper, parameters, ledger=ledger
+            ),
+        ):
+            return
 
     parameters = build_missing_parameters(month, year)
     if not parameters:
@@ -107,5 +132,13 @@ def main():
         )
 
 
+def main():
+    month, year = resolve_month_year_args(sys.argv[1:])
+    scraper = StateLevelDataScraper()
+    try:
+        recover_missing_files(scraper, month, year)
+    finally:
+        scraper.close()
+
 if __name__ == "__main__":
     main()
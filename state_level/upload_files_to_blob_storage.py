@@ -22,6 +22,7 @@ def main():
         raw_container_config_key="state_wise_container_name",
         csv_container_config_key="state_wise_csv_container_name",
         csv_prefix="state_level_ev_data_{month}_{year}",
+        parquet_file_prefix="state_level_ev_data",
     )
 
 
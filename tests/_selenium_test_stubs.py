@@ -30,6 +30,12 @@ def install_selenium_stubs():
     class DummyException(Exception):
         pass
 
+    class DummyInvalidSessionIdException(DummyException):
+        pass
+
+    class DummyNoSuchWindowException(DummyException):
+        pass
+
     class DummyBy:
         ID = "id"
         CSS_SELECTOR = "css"
@@ -57,6 +63,8 @@ def install_selenium_stubs():
     exceptions.TimeoutException = DummyException
     exceptions.StaleElementReferenceException = DummyException
     exceptions.WebDriverException = DummyException
+    exceptions.InvalidSessionIdException = DummyInvalidSessionIdException
+    exceptions.NoSuchWindowException = DummyNoSuchWindowException
     webdriver_common_by.By = DummyBy
     webdriver_support_ec.element_to_be_clickable = dummy_clickable
     webdriver_support_wait.WebDriverWait = DummyWebDriverWait
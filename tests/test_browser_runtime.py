@@ -0,0 +1,344 @@
+import importlib.util
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from tests._selenium_test_stubs import install_selenium_stubs
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_module(relative_path: str, module_name: str):
+    module_path = REPO_ROOT / relative_path
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+class RecordingDriver:
+    def __init__(self, name):
+        self.name = name
+        self.visited = []
+        self.cdp_commands = []
+        self.quit_called = False
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((command, params))
+
+    def quit(self):
+        self.quit_called = True
+
+
+class DriverFactory:
+    def __init__(self):
+        self.created = []
+
+    def __call__(self):
+        driver = RecordingDriver(f"driver-{len(self.created)}")
+        self.created.append(driver)
+        return driver
+
+
+class BrowserSessionPoolTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = load_module("utils.py", "utils_for_browser_runtime_tests")
+
+    def test_lease_reuses_warm_session_and_rotates_download_directory(self):
+        factory = DriverFactory()
+        pool = self.module.BrowserSessionPool(max_sessions=2, driver_factory=factory)
+
+        with pool.lease(download_directory="/tmp/first") as first_driver:
+            pass
+        with pool.lease(download_directory="/tmp/second") as second_driver:
+            pass
+
+        self.assertIs(first_driver, second_driver)
+        self.assertEqual(len(factory.created), 1)
+        self.assertEqual(first_driver.visited, [self.module.BLANK_PAGE_URL])
+        download_paths = [
+            params["downloadPath"]
+            for command, params in first_driver.cdp_commands
+            if command == "Page.setDownloadBehavior"
+        ]
+        self.assertEqual(download_paths, ["/tmp/first", "/tmp/second"])
+
+    def test_session_is_recycled_after_max_uses(self):
+        factory = DriverFactory()
+        pool = self.module.BrowserSessionPool(
+            max_sessions=1,
+            max_uses_per_session=2,
+            driver_factory=factory,
+        )
+
+        for _ in range(3):
+            with pool.lease():
+                pass
+
+        self.assertEqual(len(factory.created), 2)
+        self.assertTrue(factory.created[0].quit_called)
+        self.assertFalse(factory.created[1].quit_called)
+
+    def test_blocked_page_discards_session(self):
+        factory = DriverFactory()
+        pool = self.module.BrowserSessionPool(max_sessions=1, driver_factory=factory)
+
+        with self.assertRaises(self.module.BlockedPageError):
+            with pool.lease():
+                raise self.module.BlockedPageError(
+                    step="initial_page_load",
+                    identifier="url",
+                    value="https://example.test",
+                    context={},
+                    page_title="Access Forbidden",
+                    blocked_reason="page_title_access_forbidden",
+                )
+
+        with pool.lease() as driver:
+            pass
+
+        self.assertTrue(factory.created[0].quit_called)
+        self.assertIs(driver, factory.created[1])
+        self.assertEqual(pool.session_count, 1)
+
+    def test_dead_session_is_discarded_instead_of_recycled(self):
+        factory = DriverFactory()
+        pool = self.module.BrowserSessionPool(max_sessions=1, driver_factory=factory)
+        dead_session = self.module.InvalidSessionIdException("invalid session id")
+
+        with self.assertRaises(self.module.SeleniumStepError):
+            with pool.lease():
+                raise self.module.SeleniumStepError(
+                    step="download_report",
+                    identifier="id",
+                    value="groupingTable:xls",
+                    context={},
+                    original_exception=dead_session,
+                )
+        with self.assertRaises(TimeoutError):
+            with pool.lease():
+                raise TimeoutError("download did not finish")
+        with pool.lease() as driver:
+            pass
+
+        self.assertTrue(factory.created[0].quit_called)
+        self.assertFalse(factory.created[1].quit_called)
+        self.assertIs(driver, factory.created[1])
+        self.assertEqual(len(factory.created), 2)
+
+    def test_lease_blocks_until_a_session_is_released(self):
+        factory = DriverFactory()
+        pool = self.module.BrowserSessionPool(max_sessions=1, driver_factory=factory)
+        leased_by_worker = []
+
+        def lease_in_worker():
+            with pool.lease() as driver:
+                leased_by_worker.append(driver)
+
+        with pool.lease() as first_driver:
+            worker = threading.Thread(target=lease_in_worker)
+            worker.start()
+            worker.join(timeout=0.1)
+            self.assertTrue(worker.is_alive())
+
+        worker.join(timeout=1)
+        self.assertEqual(leased_by_worker, [first_driver])
+        self.assertEqual(len(factory.created), 1)
+
+    def test_trim_idle_quits_surplus_sessions(self):
+        factory = DriverFactory()
+        pool = self.module.BrowserSessionPool(max_sessions=3, driver_factory=factory)
+
+        with pool.lease(), pool.lease(), pool.lease():
+            pass
+        trimmed = pool.trim_idle(1)
+
+        self.assertEqual(trimmed, 2)
+        self.assertEqual(pool.session_count, 1)
+        self.assertEqual(sum(driver.quit_called for driver in factory.created), 2)
+
+    def test_close_quits_idle_sessions_and_rejects_new_leases(self):
+        factory = DriverFactory()
+        pool = self.module.BrowserSessionPool(max_sessions=1, driver_factory=factory)
+
+        with pool.lease():
+            pass
+        pool.close()
+
+        self.assertTrue(factory.created[0].quit_called)
+        with self.assertRaises(RuntimeError):
+            with pool.lease():
+                pass
+
+
+class ChromedriverResolutionTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = load_module("utils.py", "utils_for_chromedriver_tests")
+
+    def setUp(self):
+        self.module.clear_resolved_chromedriver_path()
+        self.addCleanup(self.module.clear_resolved_chromedriver_path)
+
+    def test_resolution_is_memoized_across_calls(self):
+        install_driver = mock.Mock(return_value="/opt/wdm/chromedriver")
+
+        with mock.patch.dict(os.environ, {}, clear=True):
+            first = self.module.resolve_chromedriver_path({}, install_driver)
+            second = self.module.resolve_chromedriver_path({}, install_driver)
+
+        self.assertEqual(first, "/opt/wdm/chromedriver")
+        self.assertEqual(second, first)
+        install_driver.assert_called_once_with()
+
+    def test_config_override_skips_webdriver_manager(self):
+        install_driver = mock.Mock()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            driver_path = Path(tmpdir) / "chromedriver"
+            driver_path.write_bytes(b"binary")
+
+            with mock.patch.dict(os.environ, {}, clear=True):
+                resolved = self.module.resolve_chromedriver_path(
+                    {"chromedriver_path": str(driver_path)},
+                    install_driver,
+                )
+
+        self.assertEqual(resolved, str(driver_path))
+        install_driver.assert_not_called()
+
+    def test_offline_mode_uses_newest_cached_binary(self):
+        install_driver = mock.Mock()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            older = Path(tmpdir) / "linux64" / "120.0" / "chromedriver"
+            newer = Path(tmpdir) / "linux64" / "121.0" / "chromedriver"
+            for index, path in enumerate((older, newer)):
+                path.parent.mkdir(parents=True)
+                path.write_bytes(b"binary")
+                os.utime(path, (1000 + index, 1000 + index))
+
+            with mock.patch.object(
+                self.module, "WEBDRIVER_MANAGER_CACHE_ROOT", tmpdir
+            ), mock.patch.dict(
+                os.environ,
+                {self.module.CHROMEDRIVER_OFFLINE_ENV_VAR: "true"},
+                clear=True,
+            ):
+                resolved = self.module.resolve_chromedriver_path({}, install_driver)
+
+        self.assertEqual(resolved, str(newer))
+        install_driver.assert_not_called()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ScriptedDriver:
+    def __init__(self, idle_results, panel_results=()):
+        self.idle_results = list(idle_results)
+        self.panel_results = list(panel_results)
+        self.panel_ids = []
+
+    def execute_script(self, script, *args):
+        if args:
+            self.panel_ids.append(args[0])
+            return self.panel_results.pop(0)
+        return self.idle_results.pop(0)
+
+
+class PageSettleTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = load_module("utils.py", "utils_for_page_settle_tests")
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.multiple(
+            self.module.time,
+            monotonic=self.clock.monotonic,
+            sleep=self.clock.sleep,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_waits_for_ajax_idle_and_dropdown_panel(self):
+        driver = ScriptedDriver(
+            idle_results=[False, True, True],
+            panel_results=[False, True],
+        )
+        timings = self.module.StepTimings()
+
+        self.module.wait_for_page_settle(
+            driver,
+            step="open_year_dropdown",
+            panel_id="selectedYear_panel",
+            timings=timings,
+            min_delay_seconds=0,
+        )
+
+        self.assertEqual(driver.panel_ids, ["selectedYear_panel"] * 2)
+        self.assertEqual(self.clock.sleeps, [0.1, 0.1])
+        self.assertAlmostEqual(timings.durations["open_year_dropdown"], 0.2)
+
+    def test_pacing_floor_is_slept_before_the_first_idle_poll(self):
+        driver = ScriptedDriver(idle_results=[True])
+        poll_times = []
+        execute_script = driver.execute_script
+        driver.execute_script = lambda script, *args: (
+            poll_times.append(self.clock.now) or execute_script(script, *args)
+        )
+
+        with mock.patch.dict(
+            os.environ,
+            {self.module.MIN_STEP_DELAY_ENV_VAR: "0.75"},
+        ):
+            self.module.wait_for_page_settle(driver, step="select_month")
+
+        self.assertEqual(self.clock.sleeps, [0.75])
+        self.assertEqual(poll_times, [100.75])
+
+    def test_timeout_raises_selenium_step_error(self):
+        driver = ScriptedDriver(idle_results=[False] * 5)
+
+        with mock.patch.object(
+            self.module,
+            "capture_browser_diagnostics",
+            return_value={"metadata_path": ""},
+        ):
+            with self.assertRaises(self.module.SeleniumStepError) as raised:
+                self.module.wait_for_page_settle(
+                    driver,
+                    step="click_main_refresh",
+                    timeout=0.3,
+                    min_delay_seconds=0,
+                )
+
+        self.assertEqual(raised.exception.step, "click_main_refresh")
+        self.assertIsInstance(raised.exception.original_exception, TimeoutError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,306 @@
+import importlib.util
+import io
+import sys
+import tempfile
+import threading
+import unittest
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs
+
+from tests._selenium_test_stubs import install_selenium_stubs
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FORM_ID = "masterLayout_formlogin"
+REFRESH_CLASS = (
+    "ui-button ui-widget ui-state-default ui-corner-all ui-button-text-icon-left button"
+)
+OFFICES = {
+    "Telangana(TG)": ["HYDERABAD - TG1( 01-JAN-2020 )", "RANGAREDDY - TG11( 01-JAN-2020 )"],
+}
+
+
+def load_module(relative_path: str, module_name: str):
+    module_path = REPO_ROOT / relative_path
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_workbook_bytes():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as workbook:
+        workbook.writestr("[Content_Types].xml", "<Types/>")
+        workbook.writestr("xl/workbook.xml", "<workbook/>")
+    return buffer.getvalue()
+
+
+def render_select(name, labels, selected_value=None):
+    options = "".join(
+        f'<option value="{index}"{" selected" if str(index) == selected_value else ""}>{label}</option>'
+        for index, label in enumerate(labels)
+    )
+    return f'<select id="{name}" name="{name}">{options}</select>'
+
+
+class StandInDashboard:
+    """Records the posts a replayed session makes against a tiny JSF lookalike."""
+
+    def __init__(self, drop_y_axis=False, block=False):
+        self.drop_y_axis = drop_y_axis
+        self.block = block
+        self.view_state_counter = 0
+        self.values = {}
+        self.refreshed = False
+        self.posts = []
+
+    def next_view_state(self):
+        self.view_state_counter += 1
+        return f"view-state-{self.view_state_counter}"
+
+    def state_labels(self):
+        return ["All Vahan4 Running States (36/36)", *OFFICES]
+
+    def selected_state(self):
+        index = int(self.values.get("j_idt31_input", "0"))
+        return self.state_labels()[index]
+
+    def render_select(self, name, labels):
+        # Like the real page, re-rendered selects keep the submitted choice.
+        return render_select(name, labels, self.values.get(name))
+
+    def render_form(self):
+        offices = ["All Vahan4 Running Office"] + OFFICES.get(self.selected_state(), [])
+        parts = [
+            f'<form id="{FORM_ID}" name="{FORM_ID}">',
+            f'<input type="hidden" name="{FORM_ID}" value="{FORM_ID}" />',
+            self.render_select("j_idt31_input", self.state_labels()),
+            self.render_select("j_idt40_input", offices),
+        ]
+        if not self.drop_y_axis:
+            parts.append(
+                self.render_select("yaxisVar_input", ["State", "Vehicle Class", "Maker"])
+            )
+        parts.append(self.render_select("xaxisVar_input", ["Month Wise", "Fuel"]))
+        parts.append(self.render_select("selectedYear_input", ["2025", "2026"]))
+        parts.append(f'<button id="j_idt65" class="{REFRESH_CLASS}">Refresh</button>')
+        if self.refreshed:
+            parts.append(
+                self.render_select(
+                    "groupingTable:selectMonth_input",
+                    ["JAN", "FEB", "MAR"],
+                )
+            )
+            parts.append('<button id="groupingTable:xls" class="ui-button">XLSX</button>')
+        parts.append("</form>")
+        return "".join(parts)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    dashboard = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, body, content_type, status=200):
+        encoded = body if isinstance(body, bytes) else body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(encoded)))
+        self.send_header("Set-Cookie", "JSESSIONID=stand-in")
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def do_GET(self):
+        dashboard = self.dashboard
+        if dashboard.block:
+            self.send_body("<title>Access Forbidden</title>", "text/html", status=403)
+            return
+        dashboard.values = {}
+        dashboard.refreshed = False
+        view_state = dashboard.next_view_state()
+        self.send_body(
+            "<html><head><title>Vahan Dashboard</title></head><body>"
+            + dashboard.render_form().replace(
+                "</form>",
+                f'<input type="hidden" name="javax.faces.ViewState" value="{view_state}" /></form>',
+            )
+            + "</body></html>",
+            "text/html",
+        )
+
+    def do_POST(self):
+        dashboard = self.dashboard
+        length = int(self.headers["Content-Length"])
+        payload = {
+            key: values[0]
+            for key, values in parse_qs(self.rfile.read(length).decode("utf-8")).items()
+        }
+        payload["cookie"] = self.headers.get("Cookie", "")
+        dashboard.posts.append(payload)
+        dashboard.values.update(payload)
+
+        if "groupingTable:xls" in payload:
+            self.send_body(
+                build_workbook_bytes(),
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+            return
+
+        if payload.get("javax.faces.source") == "j_idt65":
+            dashboard.refreshed = True
+        view_state = dashboard.next_view_state()
+        self.send_body(
+            '<?xml version="1.0" encoding="UTF-8"?><partial-response><changes>'
+            f'<update id="{FORM_ID}"><![CDATA[{dashboard.render_form()}]]></update>'
+            f'<update id="j_id1:javax.faces.ViewState:0"><![CDATA[{view_state}]]></update>'
+            "</changes></partial-response>",
+            "text/xml",
+        )
+
+
+class JsfFetcherTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = load_module("vahan_jsf_fetcher.py", "vahan_jsf_fetcher_for_tests")
+
+    def start_server(self, dashboard):
+        handler = type("Handler", (StandInHandler,), {"dashboard": dashboard})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_port}/reportview.xhtml"
+
+    def test_replays_rto_selection_and_streams_workbook(self):
+        dashboard = StandInDashboard()
+        fetcher = self.module.VahanJsfFetcher(base_url=self.start_server(dashboard))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            report_path = fetcher.fetch_rto_report(
+                "Telangana",
+                "TG11",
+                "2026",
+                "FEB",
+                str(Path(tmpdir) / "TG11" / "2026" / "FEB"),
+            )
+            self.assertTrue(zipfile.is_zipfile(report_path))
+            self.assertEqual(Path(report_path).name, "reportTable.xlsx")
+
+        sources = [post.get("javax.faces.source") for post in dashboard.posts]
+        self.assertEqual(
+            sources,
+            [
+                "j_idt31",
+                "j_idt40",
+                "yaxisVar",
+                "xaxisVar",
+                "selectedYear",
+                "j_idt65",
+                "groupingTable:selectMonth",
+                None,
+            ],
+        )
+        # Each post carries the view state returned by the previous response.
+        self.assertEqual(
+            [post["javax.faces.ViewState"] for post in dashboard.posts],
+            [f"view-state-{index}" for index in range(1, 9)],
+        )
+        export = dashboard.posts[-1]
+        self.assertEqual(export["j_idt40_input"], "2")
+        self.assertEqual(export["yaxisVar_input"], "1")
+        self.assertEqual(export["xaxisVar_input"], "1")
+        self.assertEqual(export["groupingTable:selectMonth_input"], "1")
+        self.assertIn("JSESSIONID=stand-in", export["cookie"])
+
+    def test_missing_form_field_is_reported_as_drift(self):
+        fetcher = self.module.VahanJsfFetcher(
+            base_url=self.start_server(StandInDashboard(drop_y_axis=True))
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertRaises(self.module.JsfDriftError) as raised:
+                fetcher.fetch_state_report("Telangana", "2026", "JAN", tmpdir)
+
+        self.assertEqual(raised.exception.step, "select_y_axis_vehicle_class")
+
+    def test_forbidden_response_is_reported_as_block(self):
+        fetcher = self.module.VahanJsfFetcher(
+            base_url=self.start_server(StandInDashboard(block=True))
+        )
+
+        with self.assertRaises(self.module.JsfBlockedError):
+            fetcher.load()
+
+    def test_fetch_engine_defaults_to_selenium_and_rejects_unknown_values(self):
+        with mock.patch.dict("os.environ", {}, clear=True):
+            self.assertEqual(self.module.get_fetch_engine({}), "selenium")
+            self.assertEqual(
+                self.module.get_fetch_engine({"fetch_engine": "HTTP"}),
+                "http",
+            )
+        with mock.patch.dict(
+            "os.environ",
+            {self.module.FETCH_ENGINE_ENV_VAR: "curl"},
+        ):
+            with self.assertRaises(ValueError):
+                self.module.get_fetch_engine({})
+
+
+class HttpEngineFallbackTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = load_module(
+            "rto_level/rto_level_data_scraper.py",
+            "rto_scraper_for_fetch_engine_tests",
+        )
+
+    def test_drift_falls_back_to_selenium_download(self):
+        session_pool = mock.MagicMock()
+        scraper = self.module.RTODataScraper(
+            session_pool=session_pool,
+            fetch_engine=self.module.HTTP_FETCH_ENGINE,
+        )
+        failing_fetcher = mock.Mock()
+        fetcher_module = sys.modules[self.module.VahanJsfFetcher.__module__]
+        failing_fetcher.fetch_rto_report.side_effect = fetcher_module.JsfDriftError(
+            "select_rto_office",
+            "option not found",
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir, mock.patch.object(
+            self.module,
+            "VahanJsfFetcher",
+            return_value=failing_fetcher,
+        ), mock.patch.object(
+            self.module.RTODataScraper,
+            "build_download_directory",
+            return_value=tmpdir,
+        ), mock.patch.object(
+            self.module.RTODataScraper,
+            "download_rto_report_period",
+        ) as selenium_download:
+            scraper.extract_rto_level_data(
+                "Telangana",
+                "HYDERABAD - TG1( 01-JAN-2020 )",
+                "2026",
+                "JAN",
+            )
+
+        failing_fetcher.fetch_rto_report.assert_called_once_with(
+            "Telangana", "TG1", "2026", "JAN", tmpdir
+        )
+        selenium_download.assert_called_once()
+        session_pool.lease.assert_called_once_with(download_directory=tmpdir)
+
+
+if __name__ == "__main__":
+    unittest.main()
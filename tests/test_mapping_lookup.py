@@ -0,0 +1,117 @@
+import importlib
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from tests._selenium_test_stubs import install_selenium_stubs
+
+
+def build_mapping_df():
+    return pd.DataFrame(
+        {
+            "Vehicle Class": ["MOTOR CAR", "M-CYCLE/SCOOTER", "E-RICKSHAW(P)", "MOTOR CAR"],
+            "Vehicle Type": ["Passenger", "Passenger", "", "Goods"],
+            "Vehicle Category": ["Car", "Two Wheeler", None, "Truck"],
+            "Vehicle Use Type": ["Private", "Private", "", "Commercial"],
+        }
+    )
+
+
+class MappingLookupTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = importlib.import_module("mapping_lookup")
+        cls.cache_module = importlib.import_module("parsed_report_cache")
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = Path(tmpdir.name)
+        patcher = mock.patch.dict(self.module._loaded_lookups, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_mapping_workbook(self, mapping_df):
+        mapping_path = self.root / "Table and Mapping V2.xlsx"
+        with pd.ExcelWriter(mapping_path, engine="openpyxl") as writer:
+            mapping_df.to_excel(writer, sheet_name="Mapping", index=False)
+        return mapping_path
+
+    def test_apply_matches_left_merge_on_first_mapping_row(self):
+        mapping_df = build_mapping_df()
+        with self.assertLogs(level="WARNING"):
+            lookup = self.module.MappingLookup(self.module.compile_mapping_frame(mapping_df))
+        report_df = pd.DataFrame(
+            {"Unnamed: 1": ["MOTOR CAR", "BUS", "E-RICKSHAW(P)", None, "MOTOR CAR"]}
+        )
+
+        expected = pd.merge(
+            report_df,
+            mapping_df.drop_duplicates("Vehicle Class"),
+            left_on="Unnamed: 1",
+            right_on="Vehicle Class",
+            how="left",
+        ).drop(columns="Vehicle Class")
+        result = lookup.apply(report_df.copy(), "Unnamed: 1")
+
+        pd.testing.assert_frame_equal(result.astype(object), expected.astype(object))
+        self.assertIsInstance(result["Vehicle Type"].dtype, pd.CategoricalDtype)
+
+    def test_key_normalizer_matches_oem_folder_names(self):
+        lookup = self.module.MappingLookup(
+            self.module.compile_mapping_frame(
+                build_mapping_df().iloc[:3],
+                self.module.normalize_vehicle_class_key,
+            )
+        )
+        report_df = pd.DataFrame(
+            {"Vehicle Class": pd.Categorical(["M CYCLE SCOOTER", "E RICKSHAW P", "MOTOR CAR"])}
+        )
+
+        result = lookup.apply(report_df, "Vehicle Class")
+
+        self.assertEqual(list(result["Vehicle Category"].isna()), [False, True, False])
+        self.assertEqual(result["Vehicle Category"].iloc[0], "Two Wheeler")
+        self.assertEqual(list(result["Vehicle Type"]), ["Passenger", "", "Passenger"])
+
+    def test_compiled_lookup_is_cached_by_workbook_contents(self):
+        mapping_path = self.write_mapping_workbook(build_mapping_df().iloc[:3])
+        cache = self.cache_module.ParsedReportCache(self.root / "cache", 10 * 1024 * 1024, "1")
+
+        first = self.module.MappingLookup.from_workbook(mapping_path, cache=cache)
+        self.assertIs(self.module.MappingLookup.from_workbook(mapping_path, cache=cache), first)
+        self.module._loaded_lookups.clear()
+        with mock.patch.object(
+            self.module, "read_mapping_sheet", wraps=self.module.read_mapping_sheet
+        ) as read_mapping_sheet:
+            second = self.module.MappingLookup.from_workbook(mapping_path, cache=cache)
+            normalized = self.module.MappingLookup.from_workbook(
+                mapping_path,
+                key_normalizer=self.module.normalize_vehicle_class_key,
+                cache=cache,
+            )
+
+        pd.testing.assert_frame_equal(second.compiled, first.compiled)
+        self.assertIsNot(normalized, second)
+        read_mapping_sheet.assert_called_once_with(mapping_path)
+
+    def test_filter_mapped_vehicle_classes_drops_classes_missing_from_the_sheet(self):
+        mapping_path = self.write_mapping_workbook(build_mapping_df().iloc[:3])
+
+        with self.assertLogs(level="ERROR") as logs:
+            mapped = self.module.filter_mapped_vehicle_classes(
+                ["M-CYCLE/SCOOTER", "BUS", "E-RICKSHAW(P)"],
+                mapping_path,
+                pipeline="oem",
+            )
+
+        self.assertEqual(mapped, ["M-CYCLE/SCOOTER", "E-RICKSHAW(P)"])
+        self.assertIn("classes=BUS", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import re
 import unittest
 from pathlib import Path
 
@@ -6,6 +7,9 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 MIGRATION_PATH = (
     REPO_ROOT / "sql" / "migrations" / "2026-06-19_vahan_fuel_schema_refresh.sql"
 )
+STAGING_TABLE_TYPES_PATH = (
+    REPO_ROOT / "sql" / "migrations" / "2026-10-18_staging_table_types.sql"
+)
 REPAIR_PATH = (
     REPO_ROOT / "sql" / "migrations" / "2026-06-21_vahan_business_column_null_repair.sql"
 )
@@ -60,6 +64,26 @@ class MigrationContractTests(unittest.TestCase):
         self.assertIn("ethanol", sql)
         self.assertNotIn("inserted_at = NULL", sql)
 
+    def test_staging_table_types_mirror_staging_columns(self):
+        staging_tables = dict(
+            re.findall(r"CREATE TABLE dbo\.(staging_\w+) \((.*?)\n\)", MIGRATION_PATH.read_text(), re.S)
+        )
+        table_types = dict(
+            re.findall(
+                r"CREATE TYPE dbo\.(staging_\w+)_rows AS TABLE \((.*?)\n    \)",
+                STAGING_TABLE_TYPES_PATH.read_text(),
+                re.S,
+            )
+        )
+
+        self.assertEqual(set(table_types), set(staging_tables))
+        for table_name, columns in staging_tables.items():
+            staging_columns = re.findall(r"\[(\w+)\]", columns)
+            self.assertEqual(
+                re.findall(r"\[(\w+)\]", table_types[table_name]),
+                [column for column in staging_columns if column != "inserted_at"],
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
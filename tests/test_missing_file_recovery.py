@@ -95,6 +95,7 @@ class MissingFileRecoveryTests(unittest.TestCase):
             pass
 
         stub_module.OEMDataScraper = DummyOEMDataScraper
+        stub_module.MAPPING_FILE_PATH = "Table and Mapping V2.xlsx"
         module = load_module(
             "oem_level/get_missing_files.py",
             "oem_missing_file_recovery",
@@ -0,0 +1,109 @@
+import importlib
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from tests._selenium_test_stubs import install_selenium_stubs
+
+
+def fake_to_parquet(df, path, engine, partition_cols, index, basename_template):
+    """Write one text file per hive partition, as pyarrow's dataset writer would."""
+    for values, group in df.groupby(partition_cols, observed=True):
+        partition_dir = Path(path).joinpath(
+            *(f"{column}={value}" for column, value in zip(partition_cols, values))
+        )
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        (partition_dir / basename_template.format(i=0)).write_text(
+            group.drop(columns=partition_cols).to_csv(index=False),
+            encoding="utf-8",
+        )
+
+
+def build_output_df(states, month=6):
+    return pd.DataFrame(
+        {
+            "state": pd.Categorical(states),
+            "year": "2026",
+            "month": month,
+            "electric_bov": pd.array(range(len(states)), dtype="Int32"),
+        }
+    )
+
+
+class PartitionedParquetWriterTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = importlib.import_module("parquet_output")
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.dataset_dir = self.module.build_parquet_dataset_path(tmpdir.name, "rto_level_ev_data")
+        for patcher in (
+            mock.patch.object(self.module, "pyarrow", object()),
+            mock.patch.object(pd.DataFrame, "to_parquet", fake_to_parquet),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def partition_files(self):
+        return sorted(
+            str(path.relative_to(self.dataset_dir))
+            for path in self.dataset_dir.rglob("*.parquet")
+        )
+
+    def test_commit_replaces_only_written_partitions(self):
+        with self.module.PartitionedParquetWriter(self.dataset_dir) as writer:
+            writer.write(build_output_df(["Goa", "Kerala"]))
+            writer.write(build_output_df(["Goa"], month=7))
+
+        with self.module.PartitionedParquetWriter(self.dataset_dir) as writer:
+            writer.write(build_output_df(["Telangana"]))
+            writer.write(build_output_df(["Goa"]))
+
+        self.assertEqual(
+            self.partition_files(),
+            [
+                "state=Goa/year=2026/month=6/part-1-0.parquet",
+                "state=Goa/year=2026/month=7/part-1-0.parquet",
+                "state=Kerala/year=2026/month=6/part-0-0.parquet",
+                "state=Telangana/year=2026/month=6/part-0-0.parquet",
+            ],
+        )
+        self.assertEqual(
+            [
+                path.relative_to(self.dataset_dir).as_posix()
+                for path in self.module.iter_month_partitions(self.dataset_dir, "2026", 6)
+            ],
+            [
+                "state=Goa/year=2026/month=6",
+                "state=Kerala/year=2026/month=6",
+                "state=Telangana/year=2026/month=6",
+            ],
+        )
+        self.assertEqual(list(self.dataset_dir.glob(".write.*")), [])
+
+    def test_failed_run_leaves_existing_partitions(self):
+        with self.module.PartitionedParquetWriter(self.dataset_dir) as writer:
+            writer.write(build_output_df(["Goa"]))
+
+        with self.assertRaises(RuntimeError):
+            with self.module.PartitionedParquetWriter(self.dataset_dir) as writer:
+                writer.write(build_output_df(["Goa", "Kerala"]))
+                raise RuntimeError("preprocessing failed")
+
+        self.assertEqual(self.partition_files(), ["state=Goa/year=2026/month=6/part-0-0.parquet"])
+        self.assertEqual(list(self.dataset_dir.glob(".write.*")), [])
+
+    def test_missing_pyarrow_is_reported(self):
+        with mock.patch.object(self.module, "pyarrow", None):
+            with self.assertRaisesRegex(RuntimeError, "pyarrow"):
+                self.module.PartitionedParquetWriter(self.dataset_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import importlib
+import importlib.util
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from tests._selenium_test_stubs import install_selenium_stubs
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_module(relative_path: str, module_name: str):
+    module_path = REPO_ROOT / relative_path
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+class ParsedReportCacheTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = load_module("parsed_report_cache.py", "parsed_report_cache_for_tests")
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = Path(tmpdir.name)
+        self.cache = self.module.ParsedReportCache(self.root / "cache", 10 * 1024 * 1024, "1")
+
+    def write_report(self, name, payload):
+        report_path = self.root / name
+        report_path.write_bytes(payload)
+        return report_path
+
+    def test_unchanged_workbook_is_parsed_once(self):
+        report_path = self.write_report("reportTable.xlsx", b"report-a")
+        load = mock.Mock(return_value=pd.DataFrame({"PETROL": [1, 2]}, index=["Total", "1"]))
+
+        first = self.cache.get_or_load(report_path, load)
+        second = self.cache.get_or_load(report_path, load)
+
+        load.assert_called_once_with(report_path)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_changed_bytes_or_version_miss_the_cache(self):
+        report_path = self.write_report("reportTable.xlsx", b"report-a")
+        load = mock.Mock(return_value=pd.DataFrame({"PETROL": [1]}))
+        self.cache.get_or_load(report_path, load)
+
+        report_path.write_bytes(b"report-b")
+        self.cache.get_or_load(report_path, load)
+        bumped = self.module.ParsedReportCache(self.cache.cache_dir, self.cache.max_bytes, "2")
+        bumped.get_or_load(report_path, load)
+
+        self.assertEqual(load.call_count, 3)
+
+    def test_eviction_drops_least_recently_used_entries(self):
+        frames = {}
+        for name in ("a", "b", "c"):
+            report_path = self.write_report(f"{name}.xlsx", name.encode())
+            frames[name] = report_path
+            self.cache.get_or_load(report_path, lambda path: pd.DataFrame({"x": range(200)}))
+        entry_size = self.cache.entry_path(
+            self.module.compute_file_sha256(frames["a"])
+        ).stat().st_size
+        # Make "a" the most recently used entry before shrinking the budget.
+        old = time.time() - 60
+        for name in ("b", "c"):
+            os.utime(self.cache.entry_path(self.module.compute_file_sha256(frames[name])), (old, old))
+        self.cache.get_or_load(frames["a"], mock.Mock())
+
+        self.cache.max_bytes = entry_size * 2
+        remaining = self.cache.evict()
+
+        self.assertLessEqual(remaining, self.cache.max_bytes)
+        surviving = {
+            name
+            for name, report_path in frames.items()
+            if self.cache.entry_path(self.module.compute_file_sha256(report_path)).exists()
+        }
+        self.assertIn("a", surviving)
+        self.assertEqual(len(surviving), 2)
+
+    def test_unreadable_entry_is_replaced(self):
+        report_path = self.write_report("reportTable.xlsx", b"report-a")
+        entry_path = self.cache.entry_path(self.module.compute_file_sha256(report_path))
+        entry_path.parent.mkdir(parents=True)
+        entry_path.write_bytes(b"not a cached frame")
+
+        with self.assertLogs(level="WARNING"):
+            result = self.cache.get_or_load(report_path, lambda path: pd.DataFrame({"x": [1]}))
+
+        self.assertEqual(list(result["x"]), [1])
+        pd.testing.assert_frame_equal(self.module.read_frame(entry_path), result)
+
+    def test_entries_are_parquet_when_pyarrow_is_installed(self):
+        report_path = self.write_report("reportTable.xlsx", b"report-a")
+        frame = pd.DataFrame({"PETROL": [1]})
+
+        with mock.patch.object(self.module, "pyarrow", object()), \
+                mock.patch.object(pd.DataFrame, "to_parquet") as to_parquet:
+            self.cache.get_or_load(report_path, lambda path: frame)
+            entry_path = self.cache.entry_path(self.module.compute_file_sha256(report_path))
+
+        self.assertEqual(entry_path.suffix, ".parquet")
+        self.assertEqual(to_parquet.call_args.kwargs, {"engine": "pyarrow"})
+
+    def test_frame_parquet_cannot_store_is_returned_uncached(self):
+        report_path = self.write_report("reportTable.xlsx", b"report-a")
+        frame = pd.DataFrame({0: [1]})
+
+        with mock.patch.object(self.module, "pyarrow", object()), \
+                mock.patch.object(
+                    pd.DataFrame,
+                    "to_parquet",
+                    side_effect=ValueError("parquet must have string column names"),
+                ):
+            with self.assertLogs(level="WARNING"):
+                result = self.cache.get_or_load(report_path, lambda path: frame)
+
+        self.assertIs(result, frame)
+        self.assertEqual(list((self.root / "cache").iterdir()), [])
+
+    def test_from_config_honours_budget_and_overrides(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            cache = self.module.ParsedReportCache.from_config(self.root, "1", {"cache_max_mb": 2})
+            self.assertEqual(cache.max_bytes, 2 * 1024 * 1024)
+            self.assertEqual(cache.cache_dir, self.root / "preprocessing_cache")
+            self.assertIsNone(
+                self.module.ParsedReportCache.from_config(self.root, "1", {"cache_max_mb": 0})
+            )
+        with mock.patch.dict(
+            os.environ,
+            {
+                self.module.PREPROCESSING_CACHE_MAX_MB_ENV_VAR: "0",
+            },
+        ):
+            self.assertIsNone(
+                self.module.ParsedReportCache.from_config(self.root, "1", {"cache_max_mb": 2})
+            )
+
+
+
+@unittest.skipIf(importlib.util.find_spec("pyarrow") is None, "pyarrow is not installed")
+class ParquetSnapshotTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.manifest = importlib.import_module("preprocessing_manifest")
+        cls.preprocessing = importlib.import_module("etl_preprocessing")
+
+    def test_snapshot_round_trip_keeps_compacted_dtypes(self):
+        to_sorted_categorical = self.preprocessing.to_sorted_categorical
+        output = pd.DataFrame(
+            {
+                "day": to_sorted_categorical(pd.Series(pd.Categorical(pd.Index([1, 1], dtype=object)))),
+                "state": to_sorted_categorical(pd.Series(["Goa", "Kerala"])),
+                "electric_bov": pd.Series([2, 3], dtype="Int32"),
+            }
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.manifest.save_snapshot(
+                tmpdir,
+                self.manifest.PreprocessingSnapshot(fingerprint="f", output=output),
+            )
+            self.assertTrue((Path(tmpdir) / "output.parquet").exists())
+            loaded = self.manifest.load_snapshot(tmpdir).output
+
+        for column_name in ("day", "state"):
+            loaded[column_name] = to_sorted_categorical(loaded[column_name])
+        pd.testing.assert_frame_equal(loaded, output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,11 @@
 import importlib.util
+import sys
 import tempfile
 import unittest
 from pathlib import Path
 from unittest import mock
 
+from tests._selenium_test_stubs import install_selenium_stubs
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
@@ -43,6 +45,7 @@ class PipelineIngestorWiringTests(unittest.TestCase):
             "fact_oem_data_by_state_and_category",
         )
         self.assertEqual(ingestor.merge_key_columns, ["date", "state", "vehicle_class"])
+        self.assertEqual(ingestor.final_write_mode, "delete_insert")
         self.assertEqual(
             ingestor.build_file_path("JUL", "2026"),
             "oem_data_by_state_and_category_JUL_2026.csv",
@@ -61,6 +64,7 @@ class PipelineIngestorWiringTests(unittest.TestCase):
         self.assertEqual(ingestor.staging_table_name, "staging_fact_ev_data_by_state")
         self.assertEqual(ingestor.final_table_name, "fact_ev_data_by_state")
         self.assertEqual(ingestor.merge_key_columns, ["date", "state", "vehicle_class"])
+        self.assertEqual(ingestor.final_write_mode, "merge")
         self.assertEqual(
             ingestor.build_file_path("JUL", "2026"),
             "state_level_ev_data_JUL_2026.csv",
@@ -79,6 +83,7 @@ class PipelineIngestorWiringTests(unittest.TestCase):
             ingestor.merge_key_columns,
             ["date", "state", "rto_code", "rto_name", "vehicle_class"],
         )
+        self.assertEqual(ingestor.final_write_mode, "delete_insert")
         self.assertEqual(
             ingestor.build_file_path("JUL", "2026"),
             "rto_level_ev_data_JUL_2026.csv",
@@ -104,6 +109,7 @@ class PipelineUploadWrapperTests(unittest.TestCase):
             raw_container_config_key="container_name",
             csv_container_config_key="csv_container_name",
             csv_prefix="oem_data_by_state_and_category_{month}_{year}",
+            parquet_file_prefix="oem_data_by_state_and_category",
         )
 
     def test_state_upload_wrapper_uses_expected_artifact_paths(self):
@@ -124,6 +130,7 @@ class PipelineUploadWrapperTests(unittest.TestCase):
             raw_container_config_key="state_wise_container_name",
             csv_container_config_key="state_wise_csv_container_name",
             csv_prefix="state_level_ev_data_{month}_{year}",
+            parquet_file_prefix="state_level_ev_data",
         )
 
     def test_rto_upload_wrapper_uses_expected_artifact_paths(self):
@@ -144,8 +151,70 @@ class PipelineUploadWrapperTests(unittest.TestCase):
             raw_container_config_key="rto_wise_container_name",
             csv_container_config_key="rto_wise_csv_container_name",
             csv_prefix="rto_level_ev_data_{month}_{year}",
+            parquet_file_prefix="rto_level_ev_data",
         )
 
 
+class TelanganaBackfillIngestionTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        module_name = "telangana_backfill_module"
+        spec = importlib.util.spec_from_file_location(
+            module_name,
+            REPO_ROOT / "rto_level" / "telangana_historical_backfill.py",
+        )
+        cls.module = importlib.util.module_from_spec(spec)
+        # Its dataclasses resolve their module through sys.modules. Register
+        # and drop only that name: patch.dict would restore the whole table
+        # and unload modules imported along the way.
+        sys.modules[module_name] = cls.module
+        try:
+            spec.loader.exec_module(cls.module)
+        finally:
+            sys.modules.pop(module_name, None)
+
+    def test_batch_is_ingested_before_its_months_are_uploaded(self):
+        events = []
+        ingester = mock.Mock()
+        ingester.ingest_many.side_effect = lambda paths: (
+            events.append(("ingest", paths)) or {path: 5 for path in paths}
+        )
+        prepared_months = [
+            ("JAN", "2014", Path("jan.csv"), 5),
+            ("FEB", "2014", Path("feb.csv"), 0),
+        ]
+
+        with mock.patch.object(
+            self.module,
+            "upload_telangana_artifacts",
+            side_effect=lambda month, year, csv_path: events.append(("upload", month)),
+        ):
+            self.module.ingest_and_upload_months(
+                ingester,
+                prepared_months,
+                upload_to_blob=True,
+            )
+
+        self.assertEqual(
+            events,
+            [("ingest", ["jan.csv"]), ("upload", "JAN"), ("upload", "FEB")],
+        )
+
+    def test_failed_ingest_uploads_nothing(self):
+        ingester = mock.Mock()
+        ingester.ingest_many.side_effect = RuntimeError("database unavailable")
+
+        with mock.patch.object(self.module, "upload_telangana_artifacts") as upload:
+            with self.assertRaises(RuntimeError):
+                self.module.ingest_and_upload_months(
+                    ingester,
+                    [("JAN", "2014", Path("jan.csv"), 5)],
+                    upload_to_blob=True,
+                )
+
+        upload.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
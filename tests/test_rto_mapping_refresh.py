@@ -1,6 +1,9 @@
+import importlib
 import importlib.util
 import unittest
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from unittest import mock
 
 from tests._selenium_test_stubs import install_selenium_stubs
 
@@ -22,6 +25,7 @@ class RtoMappingRefreshTests(unittest.TestCase):
     def setUpClass(cls):
         install_selenium_stubs()
         cls.module = load_module("rto_level/rto_level_data_scraper.py", "rto_scraper")
+        cls.utils = importlib.import_module("utils")
 
     def test_merge_prefers_fresh_mapping_and_keeps_previous_fallback(self):
         previous = {
@@ -99,6 +103,316 @@ class RtoMappingRefreshTests(unittest.TestCase):
             "/tmp/telangana-backfill/Telangana/Hyderabad RTO_TG01/2026/JUN",
         )
 
+    def test_build_rto_session_plans_groups_offices_and_orders_periods(self):
+        parameters = [
+            ("Telangana", "Office A - TG01( 01-JAN-2026 )", "2014", "JAN"),
+            ("Telangana", "Office B - TG02( 01-JAN-2026 )", "2013", "FEB"),
+            ("Telangana", "Office A - TG01( 01-JAN-2026 )", "2013", "DEC"),
+            ("Telangana", "Office A - TG01( 01-JAN-2026 )", "2013", "MAR"),
+        ]
+
+        plans = self.module.build_rto_session_plans(parameters)
+
+        self.assertEqual(len(plans), 2)
+        self.assertEqual(plans[0].state_label, "Telangana")
+        self.assertEqual(
+            [(year, month) for _, year, month in plans[0].tasks],
+            [("2013", "MAR"), ("2013", "DEC"), ("2014", "JAN")],
+        )
+        self.assertEqual(
+            plans[1].tasks,
+            (("Office B - TG02( 01-JAN-2026 )", "2013", "FEB"),),
+        )
+
+    def test_session_plan_form_walk_only_reselects_changed_fields(self):
+        scraper = self.module.RTODataScraper(session_pool=mock.Mock())
+        clicked_steps = []
+
+        def record_step(browser, identifier, value, *, step, context):
+            clicked_steps.append(step)
+            return mock.Mock()
+
+        form_state = {}
+        with mock.patch.object(self.module, "find_element", side_effect=record_step), \
+                mock.patch.object(self.module, "open_page") as open_page, \
+                mock.patch.object(self.module, "wait_for_page_settle"):
+            for year_label, month_label in (("2013", "JAN"), ("2013", "FEB"), ("2014", "JAN")):
+                clicked_steps.clear()
+                scraper.select_rto_report_period(
+                    mock.Mock(),
+                    form_state,
+                    "Telangana",
+                    "TG01",
+                    year_label,
+                    month_label,
+                    context={},
+                )
+                if month_label == "FEB":
+                    self.assertEqual(
+                        clicked_steps,
+                        ["open_month_dropdown", "select_month"],
+                    )
+
+        open_page.assert_called_once()
+        self.assertEqual(
+            clicked_steps,
+            [
+                "open_year_dropdown",
+                "select_year",
+                "click_main_refresh",
+                "open_month_dropdown",
+                "select_month",
+            ],
+        )
+
+    def test_form_walk_reopens_dropdowns_after_state_and_office_changes(self):
+        scraper = self.module.RTODataScraper(session_pool=mock.Mock())
+        clicked = []
+
+        def record_step(browser, identifier, value, *, step, context):
+            clicked.append((step, identifier, value))
+            return mock.Mock()
+
+        form_state = {}
+        with mock.patch.object(self.module, "find_element", side_effect=record_step), \
+                mock.patch.object(self.module, "open_page"), \
+                mock.patch.object(self.module, "wait_for_page_settle"):
+            for state_label, rto_office_code in (
+                ("Telangana", "TG01"),
+                ("Telangana", "TG02"),
+                ("Goa", "GA1"),
+            ):
+                scraper.select_rto_report_period(
+                    mock.Mock(),
+                    form_state,
+                    state_label,
+                    rto_office_code,
+                    "2026",
+                    "JUN",
+                    context={},
+                )
+
+        self.assertEqual(
+            [value for step, _, value in clicked if step == "open_state_dropdown"],
+            [
+                '//label[starts-with(text(), "All Vahan4 Running States")]',
+                '//label[starts-with(text(), "Telangana")]',
+            ],
+        )
+        self.assertEqual(
+            [(identifier, value) for step, identifier, value in clicked if step == "open_rto_dropdown"],
+            [("id", "selectedRto_label")] * 3,
+        )
+
+    def test_single_office_download_loads_dashboard_on_first_attempt(self):
+        session_pool = mock.MagicMock()
+        scraper = self.module.RTODataScraper(session_pool=session_pool)
+
+        with mock.patch.object(self.module, "find_element"), \
+                mock.patch.object(self.module, "open_page") as open_page, \
+                mock.patch.object(self.module, "wait_for_page_settle"), \
+                mock.patch.object(self.module, "set_download_directory") as set_download_directory, \
+                mock.patch.object(self.module, "create_directory_if_not_exists"), \
+                mock.patch.object(self.module, "wait_for_expected_download", return_value="reportTable.xlsx"), \
+                mock.patch.object(self.module.time, "sleep") as sleep:
+            scraper.extract_rto_level_data(
+                "Telangana",
+                "Hyderabad - TG01( 01-JAN-2026 )",
+                "2026",
+                "JUN",
+            )
+
+        open_page.assert_called_once()
+        set_download_directory.assert_not_called()
+        sleep.assert_not_called()
+
+    def test_scheduled_download_makes_one_attempt_without_sleeping(self):
+        scraper = self.module.RTODataScraper(session_pool=mock.MagicMock())
+        scraper.download_max_retries = self.module.SCHEDULED_DOWNLOAD_MAX_RETRIES
+
+        with mock.patch.object(
+            self.module, "find_element", side_effect=TimeoutError("grid did not render")
+        ), \
+                mock.patch.object(self.module, "open_page") as open_page, \
+                mock.patch.object(self.module, "wait_for_page_settle"), \
+                mock.patch.object(self.module, "create_directory_if_not_exists"), \
+                mock.patch.object(self.module.time, "sleep") as sleep:
+            with self.assertRaises(TimeoutError):
+                scraper.extract_rto_level_data(
+                    "Telangana",
+                    "Hyderabad - TG01( 01-JAN-2026 )",
+                    "2026",
+                    "JUN",
+                )
+
+        open_page.assert_called_once()
+        sleep.assert_not_called()
+
+    def test_dead_session_leaves_the_lease_without_retrying(self):
+        session_pool = mock.MagicMock()
+        scraper = self.module.RTODataScraper(session_pool=session_pool)
+        dead_session = self.module.SeleniumStepError(
+            step="download_report",
+            identifier="id",
+            value="groupingTable:xls",
+            context={},
+            original_exception=self.utils.InvalidSessionIdException("invalid session id"),
+        )
+
+        with mock.patch.object(self.module, "find_element", side_effect=dead_session), \
+                mock.patch.object(self.module, "open_page") as open_page, \
+                mock.patch.object(self.module, "wait_for_page_settle"), \
+                mock.patch.object(self.module, "create_directory_if_not_exists"), \
+                mock.patch.object(self.module.time, "sleep") as sleep:
+            with self.assertRaises(self.module.SeleniumStepError):
+                scraper.extract_rto_level_data(
+                    "Telangana",
+                    "Hyderabad - TG01( 01-JAN-2026 )",
+                    "2026",
+                    "JUN",
+                )
+
+        open_page.assert_called_once()
+        sleep.assert_not_called()
+        # The lease sees the error, so the pool discards the browser.
+        exit_args = session_pool.lease.return_value.__exit__.call_args.args
+        self.assertIs(exit_args[1], dead_session)
+
+    def test_stale_mapping_states_respect_ttl_and_content_hash(self):
+        now = datetime(2026, 3, 10, tzinfo=timezone.utc)
+        mapping = {
+            "Goa": ["Panaji - GA1"],
+            "Kerala": ["Kochi - KL7"],
+            "Punjab": ["Amritsar - PB2"],
+            "Sikkim": ["Gangtok - SK1"],
+        }
+        metadata = self.module.update_mapping_metadata(
+            {},
+            {"Goa": mapping["Goa"], "Kerala": mapping["Kerala"]},
+            now=now - timedelta(hours=2),
+        )
+        metadata.update(
+            self.module.update_mapping_metadata(
+                {},
+                {"Punjab": mapping["Punjab"]},
+                now=now - timedelta(days=30),
+            )
+        )
+        # Hand-edited cache entry no longer matches its recorded hash.
+        mapping["Kerala"] = ["Kochi - KL7", "Aluva - KL41"]
+
+        stale = self.module.get_stale_mapping_states(
+            mapping,
+            metadata,
+            ["Goa", "Kerala", "Punjab", "Sikkim", "Tripura"],
+            ttl_hours=24,
+            now=now,
+        )
+
+        self.assertEqual(stale, ["Kerala", "Punjab", "Sikkim", "Tripura"])
+        self.assertEqual(metadata["Goa"]["office_count"], 1)
+
+    def test_run_for_all_states_walks_states_in_one_browser_session(self):
+        session_pool = mock.MagicMock()
+        scraper = self.module.RTODataScraper(session_pool=session_pool)
+        offices = {
+            "Goa": ["All Vahan4 Running Office", "Panaji - GA1"],
+            "Kerala": ["All Vahan4 Running Office", "Kochi - KL7", "Aluva - KL41"],
+        }
+        clicked = []
+        selected = {}
+
+        def fake_find_element(browser, identifier, value, *, step, context):
+            clicked.append((step, value))
+            element = mock.Mock()
+            if step == "select_state":
+                selected["state"] = context["state"]
+            if step == "read_rto_list":
+                element.find_elements.return_value = [
+                    mock.Mock(text=label) for label in offices[selected["state"]]
+                ]
+            return element
+
+        with mock.patch.object(self.module, "find_element", side_effect=fake_find_element), \
+                mock.patch.object(self.module, "open_page") as open_page, \
+                mock.patch.object(self.module, "wait_for_page_settle"):
+            results = scraper.run_for_all_states(["Goa", "Kerala"])
+
+        self.assertEqual(
+            results,
+            {"Goa": ["Panaji - GA1"], "Kerala": ["Kochi - KL7", "Aluva - KL41"]},
+        )
+        session_pool.lease.assert_called_once_with()
+        open_page.assert_called_once()
+        state_dropdowns = [value for step, value in clicked if step == "open_state_dropdown"]
+        self.assertEqual(
+            state_dropdowns,
+            [
+                '//label[starts-with(text(), "All Vahan4 Running States")]',
+                '//label[starts-with(text(), "Goa")]',
+            ],
+        )
+
+
+    def test_run_for_all_states_stops_when_the_browser_session_dies(self):
+        session_pool = mock.MagicMock()
+        scraper = self.module.RTODataScraper(session_pool=session_pool)
+        dead_session = self.utils.NoSuchWindowException("window closed")
+
+        def fake_find_element(browser, identifier, value, *, step, context):
+            if context["state"] == "Kerala":
+                raise dead_session
+            element = mock.Mock()
+            if step == "read_rto_list":
+                element.find_elements.return_value = [
+                    mock.Mock(text="All Vahan4 Running Office"),
+                    mock.Mock(text="Panaji - GA1"),
+                ]
+            return element
+
+        with mock.patch.object(self.module, "find_element", side_effect=fake_find_element), \
+                mock.patch.object(self.module, "open_page"), \
+                mock.patch.object(self.module, "wait_for_page_settle"), \
+                mock.patch.object(self.module.time, "sleep") as sleep:
+            results = scraper.run_for_all_states(["Goa", "Kerala", "Punjab"])
+
+        self.assertEqual(results, {"Goa": ["Panaji - GA1"]})
+        sleep.assert_not_called()
+        exit_args = session_pool.lease.return_value.__exit__.call_args.args
+        self.assertIs(exit_args[1], dead_session)
+
+class RtoHistoricalScraperTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = load_module(
+            "rto_level/rto_level_historical_data_scraper.py", "rto_historical_scraper"
+        )
+
+    def test_download_leases_a_pooled_browser_for_the_report_folder(self):
+        session_pool = mock.MagicMock()
+        scraper = self.module.RTODataScraper(session_pool=session_pool)
+
+        with mock.patch.object(self.module, "find_element"), \
+                mock.patch.object(self.module, "open_page") as open_page, \
+                mock.patch.object(self.module, "create_directory_if_not_exists"), \
+                mock.patch.object(self.module, "wait_for_expected_download") as wait_for_download, \
+                mock.patch.object(self.module.time, "sleep"):
+            scraper.extract_rto_level_data(
+                "Telangana",
+                "Hyderabad - TG01( 01-JAN-2026 )",
+                2016,
+                "JUN",
+            )
+
+        download_path = session_pool.lease.call_args.kwargs["download_directory"]
+        self.assertTrue(download_path.endswith("Hyderabad_TG01/2016/JUN"))
+        open_page.assert_called_once_with(
+            session_pool.lease.return_value.__enter__.return_value,
+            self.module.VAHAN_DASHBOARD_URL,
+        )
+        wait_for_download.assert_called_once_with(download_path)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,6 +2,7 @@ import tempfile
 import unittest
 from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
 from unittest import mock
 
 import blob_storage_utils
@@ -19,12 +20,24 @@ class FakeBlobClient:
 
 
 class FakeContainerClient:
-    def __init__(self):
+    def __init__(self, existing_blobs=()):
         self.uploads = []
+        self.existing_blobs = list(existing_blobs)
+        self.deleted_blobs = []
 
     def get_blob_client(self, blob):
         return FakeBlobClient(blob, self.uploads)
 
+    def list_blobs(self, name_starts_with):
+        return [
+            SimpleNamespace(name=name)
+            for name in self.existing_blobs
+            if name.startswith(name_starts_with)
+        ]
+
+    def delete_blob(self, name):
+        self.deleted_blobs.append(name)
+
 
 class RuntimeConfigTests(unittest.TestCase):
     def test_get_previous_month_year_label_uses_previous_calendar_month(self):
@@ -96,6 +109,90 @@ class SqlServerUtilsTests(unittest.TestCase):
         self.assertEqual(len(calls), 2)
 
 
+class FakeConnection:
+    def __init__(self, name, healthy=True):
+        self.name = name
+        self.healthy = healthy
+        self.rollbacks = 0
+        self.closed = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, query):
+        if not self.healthy:
+            raise ValueError(f"{self.name} is gone")
+
+    def fetchone(self):
+        return (1,)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class SqlServerConnectionPoolTests(unittest.TestCase):
+    def build_pool(self, connections):
+        opened = []
+
+        def connect():
+            connection = connections.pop(0)
+            opened.append(connection)
+            return connection
+
+        pool = sqlserver_utils.SqlServerConnectionPool(
+            connect,
+            base_wait_seconds=0,
+            sleep_func=lambda _: None,
+            connection_error_types=(ValueError,),
+        )
+        return pool, opened
+
+    def test_released_connection_is_reused_after_health_check(self):
+        pool, opened = self.build_pool([FakeConnection("first")])
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        self.assertIs(second, first)
+        self.assertEqual(len(opened), 1)
+        self.assertEqual(first.rollbacks, 2)
+        self.assertEqual((pool.acquire_count, pool.connect_count), (2, 1))
+        pool.close()
+        self.assertTrue(first.closed)
+
+    def test_broken_idle_connection_is_replaced(self):
+        pool, opened = self.build_pool([FakeConnection("first"), FakeConnection("second")])
+
+        with pool.connection() as first:
+            pass
+        first.healthy = False
+        with self.assertLogs("sqlserver_utils", level="WARNING"):
+            with pool.connection() as second:
+                pass
+
+        self.assertEqual([connection.name for connection in opened], ["first", "second"])
+        self.assertIs(second, opened[1])
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stale_count, 1)
+
+    def test_connection_error_discards_the_connection(self):
+        pool, opened = self.build_pool([FakeConnection("first"), FakeConnection("second")])
+
+        with self.assertRaises(ValueError):
+            with pool.connection():
+                raise ValueError("connection reset")
+        with pool.connection() as second:
+            pass
+
+        self.assertTrue(opened[0].closed)
+        self.assertEqual(second.name, "second")
+
+
 class BlobStorageUtilsTests(unittest.TestCase):
     def test_upload_globbed_files_to_container_uploads_relative_paths_and_cleans_up(self):
         container_client = FakeContainerClient()
@@ -173,6 +270,48 @@ class BlobStorageUtilsTests(unittest.TestCase):
             )
             self.assertFalse(csv_path.exists())
 
+    def test_upload_parquet_partitions_replaces_partition_blobs(self):
+        container_client = FakeContainerClient(
+            existing_blobs=[
+                "rto_level_ev_data_parquet/state=Goa/year=2026/month=6/part-0-0.parquet",
+                "rto_level_ev_data_parquet/state=Goa/year=2026/month=6/part-1-0.parquet",
+                "rto_level_ev_data_parquet/state=Goa/year=2026/month=7/part-0-0.parquet",
+            ]
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dataset_dir = Path(tmpdir) / "rto_level_ev_data_parquet"
+            partition_dir = dataset_dir / "state=Goa" / "year=2026" / "month=6"
+            partition_dir.mkdir(parents=True)
+            (partition_dir / "part-0-0.parquet").write_bytes(b"parquet-bytes")
+
+            uploaded = blob_storage_utils.upload_parquet_partitions(
+                dataset_dir=dataset_dir,
+                partition_dirs=[partition_dir],
+                container_client=container_client,
+                container_name="rto-csv",
+            )
+
+            self.assertEqual(uploaded, 1)
+            self.assertEqual(
+                container_client.deleted_blobs,
+                [
+                    "rto_level_ev_data_parquet/state=Goa/year=2026/month=6/part-0-0.parquet",
+                    "rto_level_ev_data_parquet/state=Goa/year=2026/month=6/part-1-0.parquet",
+                ],
+            )
+            self.assertEqual(
+                container_client.uploads,
+                [
+                    (
+                        "rto_level_ev_data_parquet/state=Goa/year=2026/month=6/part-0-0.parquet",
+                        b"parquet-bytes",
+                        True,
+                    )
+                ],
+            )
+            self.assertFalse(partition_dir.exists())
+
 
 if __name__ == "__main__":
     unittest.main()
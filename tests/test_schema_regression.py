@@ -1,3 +1,4 @@
+import importlib
 import importlib.util
 import os
 import tempfile
@@ -255,6 +256,277 @@ class PipelineSchemaRegressionTests(unittest.TestCase):
             self.assertEqual(result.loc[0, "rto_name"], "Hyderabad")
             self.assertEqual(result.loc[0, "rto_code"], "TG01")
 
+    def test_rto_preprocessing_process_pool_matches_serial_output(self):
+        module = load_module("rto_level/rto_level_data_pre_processing.py", "rto_pre_pool")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            write_mapping_workbook(root)
+            raw_root = root / "rto_level" / "rto_level_ev_data"
+            for state, office, maker_count in (
+                ("Goa", "Panaji_GA01", 3),
+                ("Goa", "Margao_GA08", 0),
+                ("Kerala", "Kochi_KL07", 5),
+            ):
+                raw_df = build_raw_dataframe()
+                raw_df["ELECTRIC(BOV)"] = maker_count
+                if maker_count == 0:
+                    raw_df = raw_df.iloc[0:0]
+                if state == "Kerala":
+                    raw_df["HYDROGEN(FUTURE)"] = 1
+                write_report_table(
+                    raw_root / state / office / "2026" / "JUN" / "reportTable.xlsx",
+                    raw_df,
+                )
+
+            processor = module.RTOLevelDataPreProcessor(base_directory=root)
+            serial = processor.run_preprocessing("JUN", "2026", workers=1)
+            with self.assertLogs(level="WARNING") as captured:
+                parallel = processor.run_preprocessing("JUN", "2026", workers=2)
+
+            pd.testing.assert_frame_equal(parallel, serial)
+            self.assertEqual(list(parallel["rto_code"]), ["GA01", "KL07"])
+            self.assertEqual(list(parallel["electric_bov"]), [3, 5])
+            log_output = "\n".join(captured.output)
+            self.assertIn("office=Margao_GA08", log_output)
+            self.assertIn("HYDROGEN(FUTURE)", log_output)
+
+    def test_rto_preprocessing_uses_compact_dtypes_without_changing_csv(self):
+        module = load_module("rto_level/rto_level_data_pre_processing.py", "rto_pre_dtypes")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            write_mapping_workbook(root)
+            raw_root = root / "rto_level" / "rto_level_ev_data"
+            raw_df = build_raw_dataframe()
+            raw_df["ELECTRIC(BOV)"] = "1,234"
+            write_report_table(raw_root / "Goa" / "Panaji_GA01" / "2026" / "JUN" / "reportTable.xlsx", raw_df)
+            kerala_df = build_raw_dataframe().drop(columns=["PETROL"])
+            write_report_table(raw_root / "Kerala" / "Kochi_KL07" / "2026" / "JUN" / "reportTable.xlsx", kerala_df)
+
+            processor = module.RTOLevelDataPreProcessor(base_directory=root)
+            result = processor.run_preprocessing("JUN", "2026", workers=1)
+            csv_path = root / "output.csv"
+            result.to_csv(csv_path, header=True, index=False)
+
+            self.assertEqual(str(result["electric_bov"].dtype), "Int32")
+            self.assertEqual(str(result["petrol"].dtype), "Int32")
+            self.assertEqual(str(result["hcng"].dtype), "Int32")
+            for column_name in ("state", "rto_code", "vehicle_class", "vehicle_type", "date"):
+                self.assertIsInstance(result[column_name].dtype, pd.CategoricalDtype)
+            csv_rows = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+            self.assertEqual(list(csv_rows["electric_bov"]), ["1234", "11"])
+            self.assertEqual(list(csv_rows["petrol"]), ["19", ""])
+            self.assertEqual(list(csv_rows["hcng"]), ["", ""])
+            self.assertEqual(list(csv_rows["date"]), ["01/06/2026", "01/06/2026"])
+            self.assertEqual(list(csv_rows["month"]), ["6", "6"])
+            self.assertEqual(list(csv_rows["state"]), ["Goa", "Kerala"])
+
+    def test_rto_streaming_output_matches_whole_frame_csv(self):
+        module = load_module("rto_level/rto_level_data_pre_processing.py", "rto_pre_streaming")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            write_mapping_workbook(root)
+            raw_root = root / "rto_level" / "rto_level_ev_data"
+            write_report_table(raw_root / "Goa" / "Panaji_GA01" / "2026" / "JUN" / "reportTable.xlsx", build_raw_dataframe())
+            kerala_df = build_raw_dataframe().drop(columns=["PETROL"])
+            write_report_table(raw_root / "Kerala" / "Kochi_KL07" / "2026" / "JUN" / "reportTable.xlsx", kerala_df)
+            write_report_table(
+                raw_root / "Kerala" / "Kollam_KL02" / "2026" / "JUN" / "reportTable.xlsx",
+                pd.DataFrame(),
+            )
+
+            processor = module.RTOLevelDataPreProcessor(base_directory=root)
+            processor.run_preprocessing("JUN", "2026", workers=1).to_csv(
+                root / "whole.csv", header=True, index=False
+            )
+            streamed_rows = processor.stream_output_csv(
+                "JUN", "2026", root / "streamed.csv", workers=1, batch_rows=1
+            )
+            with mock.patch.dict(
+                os.environ,
+                {"VAHAN_PREPROCESSING_STREAMING_OUTPUT": "true"},
+            ), mock.patch.object(processor, "run_preprocessing") as run_preprocessing:
+                written_rows = processor.write_output_csv("JUN", "2026", root / "configured.csv")
+
+            whole_csv = (root / "whole.csv").read_text(encoding="utf-8")
+            self.assertEqual(streamed_rows, 2)
+            self.assertEqual(written_rows, 2)
+            run_preprocessing.assert_not_called()
+            self.assertEqual((root / "streamed.csv").read_text(encoding="utf-8"), whole_csv)
+            self.assertEqual((root / "configured.csv").read_text(encoding="utf-8"), whole_csv)
+            self.assertEqual(sorted(path.name for path in root.glob(".*.tmp")), [])
+
+    def test_rto_parquet_output_is_written_beside_the_csv(self):
+        module = load_module("rto_level/rto_level_data_pre_processing.py", "rto_pre_parquet")
+        parquet_output = importlib.import_module("parquet_output")
+        parsed_report_cache = importlib.import_module("parsed_report_cache")
+        written_frames = []
+
+        def record_to_parquet(df, path, **kwargs):
+            written_frames.append(df.copy())
+            partition_dir = Path(path) / "state=Goa" / "year=2026" / "month=6"
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            (partition_dir / kwargs["basename_template"].format(i=0)).write_bytes(b"parquet")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            write_mapping_workbook(root)
+            raw_root = root / "rto_level" / "rto_level_ev_data"
+            write_report_table(raw_root / "Goa" / "Panaji_GA01" / "2026" / "JUN" / "reportTable.xlsx", build_raw_dataframe())
+
+            processor = module.RTOLevelDataPreProcessor(base_directory=root)
+            # Keep the parsed-report cache on pickles so only the dataset
+            # writer reaches the recorded to_parquet, with or without pyarrow.
+            with mock.patch.dict(
+                os.environ,
+                {"VAHAN_PREPROCESSING_PARQUET_OUTPUT": "true", "VAHAN_PREPROCESSING_STREAMING_OUTPUT": "true"},
+            ), mock.patch.object(parquet_output, "pyarrow", object()), mock.patch.object(
+                parsed_report_cache, "pyarrow", None
+            ), mock.patch.object(
+                pd.DataFrame, "to_parquet", record_to_parquet
+            ):
+                output_rows = processor.write_output_csv("JUN", "2026", root / "rto_level_ev_data_JUN_2026.csv")
+
+            self.assertEqual(output_rows, 1)
+            self.assertEqual(len(written_frames), 1)
+            self.assertEqual(list(written_frames[0].columns), RTO_OUTPUT_COLUMNS)
+            self.assertEqual(str(written_frames[0]["electric_bov"].dtype), "Int32")
+            self.assertTrue(
+                (
+                    root
+                    / "rto_level_ev_data_parquet"
+                    / "state=Goa"
+                    / "year=2026"
+                    / "month=6"
+                    / "part-0-0.parquet"
+                ).exists()
+            )
+
+    def test_rto_range_preprocessing_matches_per_month_runs(self):
+        module = load_module("rto_level/rto_level_data_pre_processing.py", "rto_pre_range")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            write_mapping_workbook(root)
+            raw_root = root / "rto_level" / "rto_level_ev_data"
+            for state, office in (("Goa", "Panaji_GA01"), ("Telangana", "Hyderabad_TG01")):
+                for month in ("MAY", "JUN"):
+                    write_report_table(
+                        raw_root / state / office / "2026" / month / "reportTable.xlsx",
+                        build_raw_dataframe(),
+                    )
+            write_report_table(
+                raw_root / "Telangana" / "Warangal_TG03" / "2026" / "JUN" / "reportTable.xlsx",
+                build_raw_dataframe().drop(columns=["PETROL"]),
+            )
+
+            processor = module.RTOLevelDataPreProcessor(base_directory=root)
+            months = [("MAY", "2026"), ("JUL", "2026"), ("JUN", "2026")]
+            expected = {
+                (month, year): processor.run_preprocessing(month, year, workers=1, states=["Telangana"])
+                for month, year in months
+            }
+            with mock.patch.object(
+                processor,
+                "iter_report_contexts_for_months",
+                wraps=processor.iter_report_contexts_for_months,
+            ) as iter_contexts:
+                results = list(
+                    processor.run_preprocessing_range(months, workers=1, states=["Telangana"])
+                )
+
+            iter_contexts.assert_called_once()
+            self.assertEqual([(month, year) for month, year, _ in results], months)
+            for month, year, result in results:
+                pd.testing.assert_frame_equal(result, expected[(month, year)])
+            self.assertEqual([len(result) for _, _, result in results], [1, 0, 2])
+
+    def test_rto_incremental_preprocessing_only_rereads_changed_reports(self):
+        module = load_module("rto_level/rto_level_data_pre_processing.py", "rto_pre_incremental")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            write_mapping_workbook(root)
+            raw_root = root / "rto_level" / "rto_level_ev_data"
+
+            def write_office(state, office, electric_count):
+                raw_df = build_raw_dataframe()
+                raw_df["ELECTRIC(BOV)"] = electric_count
+                report_path = raw_root / state / office / "2026" / "JUN" / "reportTable.xlsx"
+                write_report_table(report_path, raw_df)
+                return report_path
+
+            write_office("Goa", "Panaji_GA01", 1)
+            write_office("Goa", "Margao_GA08", 2)
+            kochi_report = write_office("Kerala", "Kochi_KL07", 3)
+
+            with mock.patch.dict(os.environ, {"VAHAN_PREPROCESSING_CACHE_MAX_MB": "0"}):
+                processor = module.RTOLevelDataPreProcessor(base_directory=root)
+            first = processor.run_preprocessing("JUN", "2026", workers=1, incremental=True)
+            self.assertEqual(list(first["electric_bov"]), [2, 1, 3])
+
+            # Recovery replaces one report, adds another and one disappears.
+            write_office("Goa", "Margao_GA08", 20)
+            write_office("Kerala", "Alappuzha_KL04", 4)
+            os.remove(kochi_report)
+
+            with mock.patch.object(
+                processor,
+                "_read_report",
+                wraps=processor._read_report,
+            ) as read_report:
+                second = processor.run_preprocessing("JUN", "2026", workers=1, incremental=True)
+
+            self.assertEqual(
+                sorted(call.args[0].parent.parent.parent.name for call in read_report.call_args_list),
+                ["Alappuzha_KL04", "Margao_GA08"],
+            )
+            full = processor.run_preprocessing("JUN", "2026", workers=1, incremental=False)
+            pd.testing.assert_frame_equal(second, full)
+            self.assertEqual(list(second["rto_code"]), ["GA08", "GA01", "KL04"])
+            self.assertEqual(list(second["electric_bov"]), [20, 1, 4])
+
+            with mock.patch.object(processor, "_read_report") as read_report:
+                third = processor.run_preprocessing("JUN", "2026", workers=1, incremental=True)
+            read_report.assert_not_called()
+            pd.testing.assert_frame_equal(third, full)
+
+    def test_normalize_enriched_frame_defaults_blanks_and_renames_states(self):
+        module = importlib.import_module("etl_preprocessing")
+        preprocessor = module.BaseExcelPreprocessor.__new__(module.BaseExcelPreprocessor)
+        df = pd.DataFrame(
+            {
+                "Vehicle Type": ["Passenger", None, "", "Goods"],
+                "Vehicle Category": [float("nan")] * 4,
+                "State": ["Goa", "UT of DNH and DD", None, "Andaman   Nicobar Island"],
+                "Date": ["1/JUN/2026", "1/JUN/2026", None, "1/JAN/2025"],
+            }
+        )
+
+        result = preprocessor.normalize_enriched_frame(df)
+        dates = module.map_unique_values(result["Date"], module.convert_date)
+
+        self.assertEqual(list(result["Vehicle Type"]), ["Passenger", "Others", "Others", "Goods"])
+        self.assertEqual(list(result["Vehicle Category"]), ["Others"] * 4)
+        self.assertEqual(
+            list(result["State"].fillna("<missing>")),
+            ["Goa", "Dadara and Nagar Havelli", "<missing>", "Andaman and Nicobar"],
+        )
+        self.assertEqual(list(dates.fillna("<missing>")), ["01/06/2026", "01/06/2026", "<missing>", "01/01/2025"])
+
+    def test_preprocessing_worker_count_resolution(self):
+        module = importlib.import_module("etl_preprocessing")
+        env_var = module.PREPROCESSING_WORKERS_ENV_VAR
+
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(module.get_preprocessing_workers({}), 1)
+            self.assertEqual(module.get_preprocessing_workers({"workers": 3}), 3)
+        with mock.patch.dict(os.environ, {env_var: "auto"}), \
+                mock.patch.object(module.os, "cpu_count", return_value=8):
+            self.assertEqual(module.get_preprocessing_workers({"workers": 3}), 8)
+        with mock.patch.dict(os.environ, {env_var: "0"}):
+            self.assertEqual(module.get_preprocessing_workers({}), 1)
+        with mock.patch.dict(os.environ, {env_var: "many"}):
+            with self.assertRaises(ValueError):
+                module.get_preprocessing_workers({})
+
     def test_state_preprocessing_outputs_expected_columns(self):
         module = load_module(
             "state_level/state_level_data_pre_processing.py", "state_pre"
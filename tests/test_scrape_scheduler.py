@@ -0,0 +1,228 @@
+import importlib.util
+import os
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from tests._selenium_test_stubs import install_selenium_stubs
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_module(relative_path: str, module_name: str):
+    module_path = REPO_ROOT / relative_path
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+def complete(controller, count, exc=None, duration=1.0):
+    for _ in range(count):
+        controller.in_flight += 1
+        controller.record(duration, exc)
+
+
+class AdaptiveConcurrencyControllerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = load_module("scrape_scheduler.py", "scrape_scheduler_for_tests")
+
+    def build_controller(self, **kwargs):
+        kwargs.setdefault("memory_probe", None)
+        return self.module.AdaptiveConcurrencyController(**kwargs)
+
+    def blocked_error(self):
+        return self.module.BlockedPageError(
+            step="initial_page_load",
+            identifier="url",
+            value="https://example.test",
+            context={},
+            page_title="Access Forbidden",
+            blocked_reason="page_title_access_forbidden",
+        )
+
+    def test_limit_grows_by_one_per_healthy_round(self):
+        controller = self.build_controller(max_workers=5, min_workers=2)
+
+        complete(controller, 2)
+        self.assertEqual(controller.limit, 3)
+        complete(controller, 3)
+        self.assertEqual(controller.limit, 4)
+        complete(controller, 20)
+        self.assertEqual(controller.limit, 5)
+
+    def test_blocked_page_halves_limit_and_notifies(self):
+        limit_changes = []
+        controller = self.build_controller(
+            max_workers=20,
+            min_workers=2,
+            initial_workers=16,
+            on_limit_change=limit_changes.append,
+        )
+
+        complete(controller, 1, self.blocked_error())
+        complete(controller, 1, self.blocked_error())
+
+        self.assertEqual(controller.limit, 4)
+        self.assertEqual(limit_changes, [8, 4])
+
+    def test_timeouts_back_off_once_per_round_and_selector_errors_do_not(self):
+        controller = self.build_controller(max_workers=20, initial_workers=8)
+        selector_error = self.module.SeleniumStepError(
+            step="select_month",
+            identifier="xpath",
+            value="//li",
+            context={},
+            original_exception=ValueError("no such option"),
+        )
+
+        complete(controller, 4, selector_error)
+        self.assertEqual(controller.limit, 8)
+
+        complete(controller, 4, TimeoutError("page stalled"))
+        self.assertEqual(controller.limit, 4)
+        complete(controller, 3, TimeoutError("page stalled"))
+        self.assertEqual(controller.limit, 4)
+
+    def test_slow_responses_stop_further_increases(self):
+        controller = self.build_controller(max_workers=10, min_workers=2)
+
+        complete(controller, 2, duration=1.0)
+        self.assertEqual(controller.limit, 3)
+        complete(controller, 6, duration=10.0)
+
+        self.assertEqual(controller.limit, 3)
+
+    def test_increase_is_capped_by_available_memory(self):
+        controller = self.build_controller(
+            max_workers=10,
+            min_workers=2,
+            memory_per_worker_mb=400,
+            memory_probe=lambda: 500,
+        )
+
+        complete(controller, 20)
+
+        # No task is in flight, so only one more 400 MB browser fits.
+        self.assertEqual(controller.limit, 2)
+
+    def test_run_never_exceeds_current_limit(self):
+        controller = self.build_controller(max_workers=4, min_workers=2)
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def task(value):
+            with lock:
+                active.append(value)
+                peak.append(len(active))
+            with lock:
+                active.remove(value)
+            return value * 2
+
+        results = {
+            task_value: future.result()
+            for task_value, future in controller.run(task, range(30))
+        }
+
+        self.assertEqual(results, {value: value * 2 for value in range(30)})
+        self.assertLessEqual(max(peak), 4)
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_from_config_applies_env_override(self):
+        with mock.patch.dict(os.environ, {self.module.MAX_WORKERS_ENV_VAR: "6"}):
+            controller = self.module.AdaptiveConcurrencyController.from_config(
+                35,
+                browser_config={"min_workers": 3, "memory_per_browser_mb": 500},
+            )
+
+        self.assertEqual(controller.max_workers, 6)
+        self.assertEqual(controller.min_workers, 3)
+        self.assertEqual(controller.memory_per_worker_mb, 500)
+
+
+
+class RetryingTaskSchedulerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = load_module("scrape_scheduler.py", "scrape_scheduler_for_retry_tests")
+
+    def build_scheduler(self, **kwargs):
+        controller = self.module.AdaptiveConcurrencyController(
+            max_workers=4,
+            min_workers=4,
+            memory_probe=None,
+        )
+        kwargs.setdefault("backoff_seconds", 0.01)
+        kwargs.setdefault("backoff_max_seconds", 0.02)
+        return self.module.RetryingTaskScheduler(controller, **kwargs)
+
+    def test_failed_tasks_are_requeued_until_they_succeed(self):
+        scheduler = self.build_scheduler(max_attempts=3, attempt_budget=10)
+        calls = []
+        lock = threading.Lock()
+
+        def flaky(task):
+            with lock:
+                calls.append(task)
+                attempt = calls.count(task)
+            if task in {"b", "c"} and attempt < task_attempts_needed[task]:
+                raise TimeoutError("page stalled")
+            return task.upper()
+
+        task_attempts_needed = {"b": 2, "c": 3}
+        results = {task: future.result() for task, future in scheduler.run(flaky, "abcd")}
+
+        self.assertEqual(results, {"a": "A", "b": "B", "c": "C", "d": "D"})
+        self.assertEqual(scheduler.report.attempts, 7)
+        self.assertEqual(scheduler.report.retries, 3)
+        self.assertEqual(scheduler.report.succeeded, 4)
+        self.assertEqual(scheduler.report.failed, {})
+
+    def test_non_retryable_and_exhausted_tasks_are_reported_once(self):
+        scheduler = self.build_scheduler(max_attempts=2)
+
+        def run(task):
+            if task == "bad-label":
+                raise ValueError("Unable to parse RTO label")
+            if task == "stalled":
+                raise TimeoutError("page stalled")
+            return task
+
+        outcomes = [task for task, _ in scheduler.run(run, ["ok", "bad-label", "stalled"])]
+
+        self.assertCountEqual(outcomes, ["ok", "bad-label", "stalled"])
+        self.assertEqual(set(scheduler.report.failed), {"bad-label", "stalled"})
+        self.assertEqual(scheduler.report.attempts, 4)
+        self.assertFalse(scheduler.report.budget_exhausted)
+
+    def test_global_attempt_budget_limits_retries(self):
+        scheduler = self.build_scheduler(max_attempts=5, attempt_budget=6)
+
+        def always_fail(task):
+            raise TimeoutError("page stalled")
+
+        outcomes = list(scheduler.run(always_fail, ["a", "b", "c", "d"]))
+
+        self.assertEqual(len(outcomes), 4)
+        self.assertEqual(scheduler.report.attempts, 6)
+        self.assertEqual(len(scheduler.report.failed), 4)
+        self.assertTrue(scheduler.report.budget_exhausted)
+
+    def test_backoff_grows_exponentially_with_bounded_jitter(self):
+        scheduler = self.build_scheduler(backoff_seconds=10, backoff_max_seconds=60)
+
+        for attempt, ceiling in [(1, 10), (2, 20), (3, 40), (4, 60), (6, 60)]:
+            delay = scheduler.backoff_delay(attempt)
+            self.assertGreaterEqual(delay, ceiling / 2)
+            self.assertLessEqual(delay, ceiling)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from tests._selenium_test_stubs import install_selenium_stubs
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_module(relative_path: str, module_name: str):
+    module_path = REPO_ROOT / relative_path
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_workbook(report_path):
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with zipfile.ZipFile(report_path, "w") as workbook:
+        workbook.writestr("[Content_Types].xml", "<Types/>")
+        workbook.writestr("xl/workbook.xml", "<workbook/>")
+
+
+class ScrapeTaskLedgerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = load_module("scrape_task_ledger.py", "scrape_task_ledger_for_tests")
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+        self.ledger = self.module.ScrapeTaskLedger(os.path.join(self.tmpdir, "ledger.sqlite3"))
+        self.addCleanup(self.ledger.close)
+
+    def build_entries(self, states):
+        return [
+            (
+                self.module.LedgerTask("state", state, "", "2026", "JAN"),
+                (state, "2026", "JAN"),
+                os.path.join(self.tmpdir, state, "reportTable.xlsx"),
+            )
+            for state in states
+        ]
+
+    def download(self, params):
+        write_workbook(os.path.join(self.tmpdir, params[0], "reportTable.xlsx"))
+
+    def test_rerun_resumes_only_unfinished_tasks(self):
+        entries = self.build_entries(["Goa", "Kerala", "Punjab"])
+        pending = self.ledger.prepare_run("state", "2026", "JAN", entries)
+        self.assertEqual(len(pending), 3)
+
+        self.ledger.run("state", ("Goa", "2026", "JAN"), self.download)
+        with self.assertRaises(TimeoutError):
+            self.ledger.run(
+                "state",
+                ("Kerala", "2026", "JAN"),
+                mock.Mock(side_effect=TimeoutError("page stalled")),
+            )
+
+        resumed = self.ledger.prepare_run("state", "2026", "JAN", entries)
+
+        self.assertEqual(resumed, [("Kerala", "2026", "JAN"), ("Punjab", "2026", "JAN")])
+        self.assertEqual(
+            self.ledger.status_counts("state", "2026", "JAN"),
+            {"succeeded": 1, "failed": 1, "pending": 1},
+        )
+        row = self.ledger._execute(
+            "SELECT attempts, file_sha256, last_error FROM scrape_tasks WHERE state = 'Kerala'"
+        )[0]
+        self.assertEqual(row[0], 1)
+        self.assertIsNone(row[1])
+        self.assertIn("page stalled", row[2])
+        goa_hash = self.ledger._execute(
+            "SELECT file_sha256 FROM scrape_tasks WHERE state = 'Goa'"
+        )[0][0]
+        self.assertEqual(len(goa_hash), 64)
+
+    def test_succeeded_task_with_deleted_report_is_reopened(self):
+        entries = self.build_entries(["Goa"])
+        self.ledger.prepare_run("state", "2026", "JAN", entries)
+        self.ledger.run("state", ("Goa", "2026", "JAN"), self.download)
+        self.assertEqual(self.ledger.pending_parameters("state", "2026", "JAN"), [])
+
+        os.remove(os.path.join(self.tmpdir, "Goa", "reportTable.xlsx"))
+
+        self.assertEqual(
+            self.ledger.pending_parameters("state", "2026", "JAN"),
+            [("Goa", "2026", "JAN")],
+        )
+        self.assertEqual(self.ledger.status_counts("state", "2026", "JAN"), {"pending": 1})
+
+    def test_unknown_month_returns_none_so_callers_can_rescan(self):
+        self.assertIsNone(self.ledger.pending_parameters("state", "2026", "FEB"))
+        self.assertFalse(
+            self.module.recover_pending_tasks(
+                self.ledger, "state", "2026", "FEB", mock.Mock()
+            )
+        )
+
+    def test_fresh_env_var_discards_previous_progress(self):
+        entries = self.build_entries(["Goa"])
+        self.ledger.prepare_run("state", "2026", "JAN", entries)
+        self.ledger.run("state", ("Goa", "2026", "JAN"), self.download)
+
+        with mock.patch.dict(os.environ, {self.module.TASK_LEDGER_FRESH_ENV_VAR: "true"}):
+            pending = self.ledger.prepare_run("state", "2026", "JAN", entries)
+
+        self.assertEqual(pending, [("Goa", "2026", "JAN")])
+
+    def test_tasks_dropped_from_the_grid_are_not_recovered(self):
+        self.ledger.prepare_run("state", "2026", "JAN", self.build_entries(["Goa", "Kerala"]))
+
+        with self.assertLogs(level="WARNING"):
+            pending = self.ledger.prepare_run(
+                "state", "2026", "JAN", self.build_entries(["Goa"])
+            )
+
+        self.assertEqual(pending, [("Goa", "2026", "JAN")])
+        self.assertEqual(
+            self.ledger.pending_parameters("state", "2026", "JAN"),
+            [("Goa", "2026", "JAN")],
+        )
+
+    def test_non_string_params_are_rejected(self):
+        entries = [
+            (
+                self.module.LedgerTask("state", "Goa", "", "2026", "JAN"),
+                ("Goa", 2026, "JAN"),
+                os.path.join(self.tmpdir, "Goa", "reportTable.xlsx"),
+            )
+        ]
+
+        with self.assertRaises(TypeError):
+            self.ledger.prepare_run("state", "2026", "JAN", entries)
+
+    def test_recover_pending_tasks_raises_when_tasks_stay_unfinished(self):
+        self.ledger.prepare_run("state", "2026", "JAN", self.build_entries(["Goa", "Kerala"]))
+
+        def recover_goa_only(parameters):
+            for params in parameters:
+                if params[0] == "Goa":
+                    self.ledger.run("state", params, self.download)
+
+        with self.assertRaises(RuntimeError):
+            self.module.recover_pending_tasks(
+                self.ledger, "state", "2026", "JAN", recover_goa_only
+            )
+
+        self.assertEqual(
+            self.ledger.pending_parameters("state", "2026", "JAN"),
+            [("Kerala", "2026", "JAN")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,12 @@
+import os
 import tempfile
 import unittest
 from pathlib import Path
+from types import SimpleNamespace
 from unittest import mock
 
 import etl_blob_upload
+import etl_ingestion
 from etl_ingestion import BaseSqlServerIngestor
 
 
@@ -28,12 +31,24 @@ STORAGE_CONFIG = {
 class RecordingCursor:
     def __init__(self):
         self.executed = []
+        self.execute_params = []
         self.executemany_calls = []
         self.fast_executemany = False
         self.closed = False
+        self.rejected_query_fragment = None
+        self.fetchall_rows = []
 
-    def execute(self, query):
+    def execute(self, query, *params):
+        if self.rejected_query_fragment and self.rejected_query_fragment in query:
+            raise FakeDatabaseError(f"rejected: {query}")
         self.executed.append(query)
+        self.execute_params.append(params)
+
+    def fetchall(self):
+        return self.fetchall_rows
+
+    def fetchone(self):
+        return (1,)
 
     def executemany(self, query, data):
         self.executemany_calls.append((query, list(data)))
@@ -42,12 +57,20 @@ class RecordingCursor:
         self.closed = True
 
 
+class FakeDatabaseError(Exception):
+    pass
+
+
 class RecordingConnection:
     def __init__(self):
         self.cursor_instance = RecordingCursor()
         self.commit_count = 0
+        self.rollback_count = 0
         self.closed = False
 
+    def rollback(self):
+        self.rollback_count += 1
+
     def cursor(self):
         return self.cursor_instance
 
@@ -91,7 +114,7 @@ class FakeBlobServiceClient:
 
 
 class DummyIngestor(BaseSqlServerIngestor):
-    def __init__(self):
+    def __init__(self, **kwargs):
         with mock.patch("etl_ingestion.load_config", return_value=DATABASE_CONFIG):
             super().__init__(
                 file_prefix="demo_file",
@@ -99,6 +122,7 @@ class DummyIngestor(BaseSqlServerIngestor):
                 final_table_name="final_demo",
                 merge_key_columns=["date", "state", "vehicle_class"],
                 missing_file_hint="demo_preprocessing",
+                **kwargs,
             )
 
 
@@ -123,11 +147,14 @@ class SharedSqlIngestionTests(unittest.TestCase):
                 encoding="utf-8",
             )
 
-            with mock.patch.object(ingestor, "connect", return_value=connection):
+            with mock.patch.object(ingestor, "_open_connection", return_value=connection):
                 inserted_rows = ingestor.data_ingest_from_file(csv_path)
 
         self.assertEqual(inserted_rows, 2)
-        self.assertEqual(connection.commit_count, 2)
+        self.assertEqual(connection.commit_count, 3)
+        # The connection stays pooled until the ingestor is closed.
+        self.assertFalse(connection.closed)
+        ingestor.close()
         self.assertTrue(connection.closed)
         self.assertTrue(connection.cursor_instance.closed)
         self.assertTrue(connection.cursor_instance.fast_executemany)
@@ -147,6 +174,285 @@ class SharedSqlIngestionTests(unittest.TestCase):
             ],
         )
 
+    def test_data_ingest_from_file_streams_rows_in_batches(self):
+        with mock.patch.dict(os.environ, {"VAHAN_INGEST_BATCH_ROWS": "2"}):
+            ingestor = DummyIngestor()
+        connection = RecordingConnection()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = Path(tmpdir) / "demo.csv"
+            csv_path.write_text(
+                "date,state,vehicle_class\n"
+                + "".join(f"0{day}/06/2026,Goa,BUS\n" for day in range(1, 6)),
+                encoding="utf-8",
+            )
+
+            with mock.patch.object(ingestor, "_open_connection", return_value=connection):
+                inserted_rows = ingestor.data_ingest_from_file(csv_path)
+
+        self.assertEqual(inserted_rows, 5)
+        self.assertEqual(
+            [len(data) for _, data in connection.cursor_instance.executemany_calls],
+            [2, 2, 1],
+        )
+        # The truncate, one commit per staging batch, then the final-table swap.
+        self.assertEqual(connection.commit_count, 5)
+        self.assertIn("DELETE FROM final_demo", connection.cursor_instance.executed[1])
+
+    def test_ingestor_reuses_one_connection_across_files(self):
+        connection = RecordingConnection()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = self.write_demo_csv(tmpdir)
+            with DummyIngestor() as ingestor, mock.patch.object(
+                ingestor, "_open_connection", return_value=connection
+            ) as connect:
+                ingestor.data_ingest_from_file(csv_path)
+                ingestor.data_ingest_from_file(csv_path)
+
+        connect.assert_called_once_with()
+        self.assertEqual(connection.cursor_instance.executed.count("SELECT 1"), 1)
+        self.assertEqual(connection.cursor_instance.executed.count("TRUNCATE TABLE staging_demo"), 2)
+        self.assertTrue(connection.closed)
+
+    def test_connect_retries_transient_login_failures(self):
+        ingestor = DummyIngestor()
+        connection = RecordingConnection()
+
+        with mock.patch.object(
+            etl_ingestion,
+            "pyodbc",
+            SimpleNamespace(Error=FakeDatabaseError),
+        ), mock.patch.object(
+            ingestor,
+            "_open_connection",
+            side_effect=[FakeDatabaseError("login timeout"), connection],
+        ) as open_connection:
+            with self.assertLogs("etl_ingestion", level="WARNING"):
+                self.assertIs(ingestor.connect(), connection)
+
+        self.assertEqual(open_connection.call_count, 2)
+
+    def write_demo_csv(self, tmpdir, rows=3):
+        csv_path = Path(tmpdir) / "demo.csv"
+        csv_path.write_text(
+            "date,state,vehicle_class\n"
+            + "".join(f"0{day}/06/2026,Goa,BUS\n" for day in range(1, rows + 1)),
+            encoding="utf-8",
+        )
+        return csv_path
+
+    def test_ingest_many_stages_all_files_before_one_final_replace(self):
+        ingestor = DummyIngestor()
+        connection = RecordingConnection()
+        cursor = connection.cursor_instance
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            june_path = self.write_demo_csv(tmpdir, rows=3)
+            july_path = Path(tmpdir) / "july.csv"
+            july_path.write_text("date,state,vehicle_class\n01/07/2026,Goa,BUS\n", encoding="utf-8")
+            empty_path = Path(tmpdir) / "empty.csv"
+            empty_path.write_text("date,state,vehicle_class\n", encoding="utf-8")
+
+            with mock.patch.object(ingestor, "_open_connection", return_value=connection):
+                with self.assertLogs("etl_ingestion", level="WARNING"):
+                    row_counts = ingestor.ingest_many([june_path, empty_path, july_path])
+
+        self.assertEqual(
+            row_counts,
+            {str(june_path): 3, str(empty_path): 0, str(july_path): 1},
+        )
+        self.assertEqual(cursor.executed.count("TRUNCATE TABLE staging_demo"), 1)
+        self.assertEqual(len(cursor.executemany_calls), 2)
+        self.assertEqual(sum("DELETE FROM final_demo" in query for query in cursor.executed), 1)
+        self.assertIn("INSERT INTO final_demo", cursor.executed[-1])
+        # The truncate, one commit per staging batch, then the final-table swap.
+        self.assertEqual(connection.commit_count, 4)
+
+    def test_ingest_many_rejects_mismatched_headers_before_final_replace(self):
+        ingestor = DummyIngestor()
+        connection = RecordingConnection()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            june_path = self.write_demo_csv(tmpdir)
+            other_path = Path(tmpdir) / "other.csv"
+            other_path.write_text("date,state\n01/07/2026,Goa\n", encoding="utf-8")
+
+            with mock.patch.object(ingestor, "_open_connection", return_value=connection):
+                with self.assertRaisesRegex(ValueError, "does not match"):
+                    ingestor.ingest_many([june_path, other_path])
+
+        self.assertFalse(
+            any("final_demo" in query for query in connection.cursor_instance.executed)
+        )
+        self.assertTrue(connection.cursor_instance.closed)
+
+    def test_ingest_many_skips_database_when_every_file_is_empty(self):
+        ingestor = DummyIngestor()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            empty_path = Path(tmpdir) / "empty.csv"
+            empty_path.write_text("date,state,vehicle_class\n", encoding="utf-8")
+
+            with mock.patch.object(ingestor, "_open_connection") as connect:
+                with self.assertLogs("etl_ingestion", level="WARNING"):
+                    row_counts = ingestor.ingest_many([empty_path])
+
+        self.assertEqual(row_counts, {str(empty_path): 0})
+        connect.assert_not_called()
+
+    def test_tvp_loader_sends_each_batch_as_one_table_valued_parameter(self):
+        with mock.patch.dict(
+            os.environ,
+            {"VAHAN_INGEST_BATCH_ROWS": "2", "VAHAN_STAGING_LOADER": "tvp"},
+        ):
+            ingestor = DummyIngestor()
+        connection = RecordingConnection()
+        cursor = connection.cursor_instance
+        cursor.fetchall_rows = [("date",), ("state",), ("vehicle_class",)]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = self.write_demo_csv(tmpdir)
+            with mock.patch.object(ingestor, "_open_connection", return_value=connection):
+                inserted_rows = ingestor.data_ingest_from_file(csv_path)
+
+        type_name = "staging_demo_rows"
+        self.assertEqual(inserted_rows, 3)
+        self.assertEqual(cursor.executemany_calls, [])
+        self.assertFalse(cursor.fast_executemany)
+        self.assertIn("FROM sys.table_types", cursor.executed[1])
+        self.assertEqual(cursor.execute_params[1], (type_name,))
+        self.assertFalse(any("CREATE TYPE" in query for query in cursor.executed))
+        tvp_calls = [
+            params for query, params in zip(cursor.executed, cursor.execute_params) if "FROM ?" in query
+        ]
+        self.assertEqual(
+            tvp_calls,
+            [
+                (([type_name, "dbo", ("01/06/2026", "Goa", "BUS"), ("02/06/2026", "Goa", "BUS")],),),
+                (([type_name, "dbo", ("03/06/2026", "Goa", "BUS")],),),
+            ],
+        )
+        self.assertIn("DELETE FROM final_demo", cursor.executed[-2])
+
+    def test_tvp_loader_falls_back_to_executemany_when_rejected(self):
+        with mock.patch.dict(os.environ, {"VAHAN_STAGING_LOADER": "tvp"}):
+            ingestor = DummyIngestor()
+        connection = RecordingConnection()
+        connection.cursor_instance.fetchall_rows = [("date",), ("state",), ("vehicle_class",)]
+        connection.cursor_instance.rejected_query_fragment = "FROM ?"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = self.write_demo_csv(tmpdir)
+            with mock.patch.object(
+                etl_ingestion,
+                "pyodbc",
+                SimpleNamespace(Error=FakeDatabaseError),
+            ), mock.patch.object(ingestor, "_open_connection", return_value=connection):
+                with self.assertLogs("etl_ingestion", level="WARNING"):
+                    inserted_rows = ingestor.data_ingest_from_file(csv_path)
+
+        self.assertEqual(inserted_rows, 3)
+        # The rejected batch, then the pool's reset on release.
+        self.assertEqual(connection.rollback_count, 2)
+        self.assertEqual(len(connection.cursor_instance.executemany_calls[0][1]), 3)
+        self.assertTrue(connection.cursor_instance.fast_executemany)
+        # The truncate was committed before the rejected batch was rolled back.
+        self.assertEqual(connection.commit_count, 3)
+
+    def test_tvp_loader_uses_executemany_when_table_type_is_missing_or_stale(self):
+        for type_columns in ([], [("date",), ("state",)]):
+            with self.subTest(type_columns=type_columns):
+                with mock.patch.dict(os.environ, {"VAHAN_STAGING_LOADER": "tvp"}):
+                    ingestor = DummyIngestor()
+                connection = RecordingConnection()
+                connection.cursor_instance.fetchall_rows = type_columns
+
+                with tempfile.TemporaryDirectory() as tmpdir:
+                    csv_path = self.write_demo_csv(tmpdir)
+                    with mock.patch.object(ingestor, "_open_connection", return_value=connection):
+                        with self.assertLogs("etl_ingestion", level="WARNING"):
+                            inserted_rows = ingestor.data_ingest_from_file(csv_path)
+
+                self.assertEqual(inserted_rows, 3)
+                self.assertEqual(connection.rollback_count, 1)
+                self.assertTrue(connection.cursor_instance.fast_executemany)
+                self.assertEqual(len(connection.cursor_instance.executemany_calls), 1)
+
+    def test_merge_final_write_upserts_staging_in_one_statement(self):
+        ingestor = DummyIngestor(final_write_mode="merge")
+        connection = RecordingConnection()
+        cursor = connection.cursor_instance
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = self.write_demo_csv(tmpdir)
+            with mock.patch.object(ingestor, "_open_connection", return_value=connection):
+                ingestor.data_ingest_from_file(csv_path)
+
+        merge_query = cursor.executed[-1]
+        self.assertEqual(len(cursor.executed), 2)
+        self.assertIn("MERGE final_demo AS target", merge_query)
+        self.assertIn(
+            "PARTITION BY date, state, vehicle_class ORDER BY inserted_at DESC",
+            merge_query,
+        )
+        self.assertIn("WHERE staged_row_number = 1", merge_query)
+        self.assertIn(
+            "ON target.date = source.date AND target.state = source.state "
+            "AND target.vehicle_class = source.vehicle_class",
+            merge_query,
+        )
+        # Every CSV column is a key here, so there is nothing to update.
+        self.assertNotIn("WHEN MATCHED", merge_query)
+        self.assertIn("INSERT (date, state, vehicle_class, inserted_at)", merge_query)
+        self.assertNotIn("DELETE", merge_query)
+
+    def test_merge_query_updates_non_key_columns_but_not_inserted_at(self):
+        ingestor = DummyIngestor(final_write_mode="merge")
+
+        merge_query = ingestor.build_merge_query(
+            ["date", "state", "vehicle_class", "electric_bov"]
+        )
+
+        self.assertIn("UPDATE SET target.electric_bov = source.electric_bov", merge_query)
+        self.assertNotIn("target.inserted_at", merge_query)
+
+    def test_month_range_final_write_deletes_each_staged_month(self):
+        ingestor = DummyIngestor(
+            final_write_mode="month_range",
+            month_range_columns=("year", "month", "state"),
+        )
+        connection = RecordingConnection()
+        cursor = connection.cursor_instance
+        cursor.fetchall_rows = [("2026", "6", "Goa"), ("2026", "6", "Kerala")]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = self.write_demo_csv(tmpdir)
+            with mock.patch.object(ingestor, "_open_connection", return_value=connection):
+                ingestor.data_ingest_from_file(csv_path)
+
+        self.assertEqual(
+            cursor.executed[1],
+            "SELECT DISTINCT year, month, state FROM staging_demo",
+        )
+        delete_query = "DELETE FROM final_demo WHERE year = ? AND month = ? AND state = ?"
+        self.assertEqual(cursor.executed[2:4], [delete_query, delete_query])
+        self.assertEqual(
+            cursor.execute_params[2:4],
+            [("2026", "6", "Goa"), ("2026", "6", "Kerala")],
+        )
+        self.assertIn("INSERT INTO final_demo", cursor.executed[4])
+        self.assertEqual(connection.commit_count, 3)
+
+    def test_unknown_final_write_mode_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "final write mode"):
+            DummyIngestor(final_write_mode="switch")
+
+    def test_unknown_staging_loader_is_rejected(self):
+        with mock.patch.dict(os.environ, {"VAHAN_STAGING_LOADER": "bcp"}):
+            with self.assertRaisesRegex(ValueError, "staging loader"):
+                DummyIngestor()
+
     def test_data_ingest_from_file_skips_empty_csv(self):
         ingestor = DummyIngestor()
 
@@ -154,7 +460,7 @@ class SharedSqlIngestionTests(unittest.TestCase):
             csv_path = Path(tmpdir) / "empty.csv"
             csv_path.write_text("date,state,vehicle_class\n", encoding="utf-8")
 
-            with mock.patch.object(ingestor, "connect") as connect_mock:
+            with mock.patch.object(ingestor, "_open_connection") as connect_mock:
                 inserted_rows = ingestor.data_ingest_from_file(csv_path)
 
         self.assertEqual(inserted_rows, 0)
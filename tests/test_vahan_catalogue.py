@@ -0,0 +1,198 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+from tests._selenium_test_stubs import install_selenium_stubs
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_module(relative_path: str, module_name: str):
+    module_path = REPO_ROOT / relative_path
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+class VahanCatalogueTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = load_module("vahan_catalogue.py", "vahan_catalogue_for_tests")
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.catalogue_path = os.path.join(tmpdir.name, "vahan_catalogue.json")
+
+    def build_catalogue(self, **overrides):
+        values = {
+            "states": ["Goa(12)", "Kerala(87)"],
+            "vehicle_categories": ["TWO WHEELER(NT)", "THREE WHEELER(T)"],
+            "years": ["2026", "2025"],
+            "months": ["JAN", "FEB"],
+            "months_year": "2026",
+            "discovered_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        values.update(overrides)
+        return self.module.VahanCatalogue(**values)
+
+    def test_validate_tasks_rejects_labels_missing_from_the_site(self):
+        catalogue = self.build_catalogue()
+
+        valid, invalid = catalogue.validate_tasks(
+            [
+                ("Goa", "2026", "FEB", "TWO WHEELER(NT)"),
+                ("Ladakh", "2026", "FEB", "TWO WHEELER(NT)"),
+                ("Kerala", "2026", "MAR", "TWO WHEELER(NT)"),
+                ("Kerala", "2025", "MAR", "TWO WHEELER(NT)"),
+                ("Kerala", "2024", "JAN", "TWO WHEELER(NT)"),
+                ("Kerala", "2025", "JAN", "E-RICKSHAW(P)"),
+            ],
+            ("state", "year", "month", "category"),
+        )
+
+        self.assertEqual(
+            valid,
+            [
+                ("Goa", "2026", "FEB", "TWO WHEELER(NT)"),
+                ("Kerala", "2025", "MAR", "TWO WHEELER(NT)"),
+            ],
+        )
+        self.assertEqual(
+            [reason.split()[0] for _, reason in invalid],
+            ["state", "month", "year", "vehicle"],
+        )
+
+    def test_save_bumps_version_only_when_labels_change(self):
+        first = self.module.save_catalogue(self.build_catalogue(), self.catalogue_path)
+        same = self.module.save_catalogue(
+            self.build_catalogue(),
+            self.catalogue_path,
+            previous=self.module.load_catalogue(self.catalogue_path),
+        )
+        changed = self.module.save_catalogue(
+            self.build_catalogue(months=["JAN", "FEB", "MAR"]),
+            self.catalogue_path,
+            previous=self.module.load_catalogue(self.catalogue_path),
+        )
+
+        self.assertEqual((first.version, same.version, changed.version), (1, 1, 2))
+        with open(self.catalogue_path, "r", encoding="utf-8") as catalogue_file:
+            payload = json.load(catalogue_file)
+        self.assertEqual(payload["version"], 2)
+        self.assertEqual(payload["schema_version"], self.module.CATALOGUE_SCHEMA_VERSION)
+
+    def test_fresh_catalogue_is_reused_without_a_browser(self):
+        self.module.save_catalogue(self.build_catalogue(), self.catalogue_path)
+        session_pool = mock.MagicMock()
+
+        catalogue = self.module.load_or_discover_catalogue(
+            session_pool,
+            ttl_hours=24,
+            catalogue_path=self.catalogue_path,
+        )
+
+        self.assertEqual(catalogue.version, 1)
+        session_pool.lease.assert_not_called()
+
+    def test_failed_discovery_falls_back_to_stale_catalogue(self):
+        stale_time = datetime.now(timezone.utc) - timedelta(days=3)
+        self.module.save_catalogue(
+            self.build_catalogue(discovered_at=stale_time.isoformat(timespec="seconds")),
+            self.catalogue_path,
+        )
+
+        with mock.patch.object(
+            self.module,
+            "discover_catalogue",
+            side_effect=TimeoutError("dashboard stalled"),
+        ) as discover:
+            catalogue = self.module.load_or_discover_catalogue(
+                mock.MagicMock(),
+                ttl_hours=24,
+                catalogue_path=self.catalogue_path,
+            )
+
+        discover.assert_called_once()
+        self.assertEqual(catalogue.states, ["Goa(12)", "Kerala(87)"])
+
+    def test_filter_task_grid_keeps_everything_without_catalogue(self):
+        tasks = [("Goa", "2026", "JAN")]
+
+        self.assertEqual(
+            self.module.filter_task_grid(None, tasks, ("state", "year", "month"), "state"),
+            tasks,
+        )
+
+    def test_filter_task_grid_keeps_the_grid_when_every_task_is_rejected(self):
+        catalogue = self.build_catalogue(months=["JAN"])
+        tasks = [("Goa", "2026", "FEB"), ("Kerala", "2026", "FEB")]
+
+        with self.assertLogs(level="ERROR") as logs:
+            kept = self.module.filter_task_grid(
+                catalogue, tasks, ("state", "year", "month"), "state"
+            )
+
+        self.assertEqual(kept, tasks)
+        self.assertIn("keeping the full task grid", logs.output[0])
+
+    def test_months_are_not_checked_when_their_year_is_unknown(self):
+        catalogue = self.build_catalogue(months=["JAN"], months_year="")
+
+        valid, invalid = catalogue.validate_tasks(
+            [("Goa", "2026", "FEB")], ("state", "year", "month")
+        )
+
+        self.assertEqual((valid, invalid), ([("Goa", "2026", "FEB")], []))
+
+    def test_read_catalogue_walks_one_page(self):
+        options = {
+            "j_idt31_items": ["All Vahan4 Running States (36/36)", "Goa(12)", "Kerala(87)"],
+            "selectedYear_items": ["2026", "2025"],
+            "groupingTable:selectMonth_items": ["JAN", "FEB"],
+        }
+
+        def option_items(by, xpath):
+            items_id = xpath.split("'")[1]
+            return [
+                mock.Mock(get_attribute=mock.Mock(return_value=label))
+                for label in options[items_id]
+            ]
+
+        browser = mock.Mock()
+        browser.find_elements.side_effect = option_items
+
+        def fake_find_element(driver, identifier, value, *, step, context):
+            element = mock.Mock()
+            element.text = "2025" if step == "read_selected_year" else ""
+            element.get_attribute.return_value = "j_idt31_label"
+            element.find_elements.return_value = [
+                mock.Mock(text="TWO WHEELER(NT)"),
+                mock.Mock(text="THREE WHEELER(T)"),
+            ]
+            return element
+
+        with mock.patch.object(self.module, "find_element", side_effect=fake_find_element), \
+                mock.patch.object(self.module, "open_page") as open_page, \
+                mock.patch.object(self.module, "wait_for_page_settle"):
+            catalogue = self.module.read_catalogue(browser, context={})
+
+        open_page.assert_called_once()
+        self.assertEqual(catalogue.states, ["Goa(12)", "Kerala(87)"])
+        self.assertEqual(catalogue.vehicle_categories, ["TWO WHEELER(NT)", "THREE WHEELER(T)"])
+        self.assertEqual(catalogue.years, ["2026", "2025"])
+        self.assertEqual(catalogue.months, ["JAN", "FEB"])
+        self.assertEqual(catalogue.months_year, "2025")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import importlib
+import importlib.util
+import os
+import tempfile
+import unittest
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from tests._selenium_test_stubs import install_selenium_stubs
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_module(relative_path: str, module_name: str):
+    module_path = REPO_ROOT / relative_path
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_report_table(path, df, startrow=3):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        df.to_excel(writer, index=True, startrow=startrow)
+
+
+def read_with_openpyxl(path):
+    return pd.read_excel(path, skiprows=3, index_col=0, engine="openpyxl")
+
+
+class XlsxReportReaderTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = load_module("xlsx_report_reader.py", "xlsx_report_reader_for_tests")
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+        self.report_path = os.path.join(self.tmpdir, "reportTable.xlsx")
+
+    def assert_matches_openpyxl(self):
+        pd.testing.assert_frame_equal(
+            self.module.read_report_table(self.report_path),
+            read_with_openpyxl(self.report_path),
+        )
+
+    def test_vahan_layout_matches_read_excel(self):
+        df = pd.DataFrame(
+            {
+                "Unnamed: 1": ["TWO WHEELER(NT)", "Maker A", None],
+                "ELECTRIC(BOV)": [12, 0, 3],
+                "PETROL": [1.5, None, 2],
+                "CNG ONLY": ["", "4", "x"],
+            },
+            index=["Total", "S No", "1"],
+        )
+        write_report_table(self.report_path, df)
+
+        self.assert_matches_openpyxl()
+
+    def test_sparse_rows_and_blank_lines_match_read_excel(self):
+        df = pd.DataFrame(
+            {"A": [None, 2, None, None], "B": [None, None, "x", None], "C": [None, 1, None, None]},
+            index=[None, "row", None, "tail"],
+        )
+        write_report_table(self.report_path, df)
+
+        self.assert_matches_openpyxl()
+
+    def test_header_only_report_is_empty(self):
+        write_report_table(self.report_path, pd.DataFrame(columns=["A", "B"]))
+
+        result = self.module.read_report_table(self.report_path)
+
+        self.assertTrue(result.empty)
+        pd.testing.assert_frame_equal(result, read_with_openpyxl(self.report_path))
+
+    def test_rows_keep_numeric_and_boolean_types(self):
+        df = pd.DataFrame({"count": [7], "ratio": [0.25], "flag": [True]}, index=["Total"])
+        write_report_table(self.report_path, df, startrow=0)
+
+        rows = self.module.read_sheet_rows(self.report_path)
+
+        self.assertEqual(rows[0], ["", "count", "ratio", "flag"])
+        self.assertEqual(rows[1], ["Total", 7, 0.25, True])
+        self.assertIsInstance(rows[1][1], int)
+
+    def test_incomplete_archive_is_invalid(self):
+        with zipfile.ZipFile(self.report_path, "w") as workbook:
+            workbook.writestr("[Content_Types].xml", "<Types/>")
+
+        with self.assertRaises(self.module.InvalidWorkbookError):
+            self.module.read_report_table(self.report_path)
+
+        Path(self.report_path).write_bytes(b"")
+        with self.assertRaises(self.module.InvalidWorkbookError):
+            self.module.read_report_table(self.report_path)
+
+    def test_date_formatted_cells_are_left_to_openpyxl(self):
+        df = pd.DataFrame({"when": [datetime(2026, 1, 31)]}, index=["Total"])
+        write_report_table(self.report_path, df)
+
+        with self.assertRaises(self.module.UnsupportedWorkbookError):
+            self.module.read_report_table(self.report_path)
+
+    def test_reader_env_var_is_validated(self):
+        with mock.patch.dict(os.environ, {self.module.XLSX_READER_ENV_VAR: "OpenPyXL"}):
+            self.assertEqual(self.module.get_xlsx_reader(), self.module.OPENPYXL_XLSX_READER)
+        with mock.patch.dict(os.environ, {self.module.XLSX_READER_ENV_VAR: "xlrd"}):
+            with self.assertRaises(ValueError):
+                self.module.get_xlsx_reader()
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(self.module.get_xlsx_reader(), self.module.STREAMING_XLSX_READER)
+
+
+class BaseExcelPreprocessorReaderTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        install_selenium_stubs()
+        cls.module = importlib.import_module("etl_preprocessing")
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.report_path = Path(tmpdir.name) / "reportTable.xlsx"
+        self.preprocessor = self.module.BaseExcelPreprocessor.__new__(
+            self.module.BaseExcelPreprocessor
+        )
+        self.preprocessor.pipeline_label = "state"
+        self.preprocessor.report_cache = None
+
+    def test_invalid_report_keeps_existing_error_message(self):
+        self.report_path.write_bytes(b"<html>Access Forbidden</html>")
+
+        for reader in ("streaming", "openpyxl"):
+            with mock.patch.dict(os.environ, {"VAHAN_XLSX_READER": reader}):
+                with self.assertRaisesRegex(ValueError, "Invalid state Excel report file"):
+                    self.preprocessor._read_report(self.report_path)
+
+    def test_date_cells_fall_back_to_openpyxl(self):
+        df = pd.DataFrame({"when": [datetime(2026, 1, 31)], "count": [np.int64(3)]}, index=["Total"])
+        write_report_table(self.report_path, df)
+
+        result = self.preprocessor._read_report(self.report_path)
+
+        pd.testing.assert_frame_equal(result, read_with_openpyxl(self.report_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,20 @@
+import hashlib
 import json
 import logging
 import os
 import re
+import threading
 import time
 import zipfile
 
 from pipeline_constants import STATE_LIST
-from runtime_config import get_previous_month_year_label
+from runtime_config import get_previous_month_year_label, load_config
 
 
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime, timedelta
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
@@ -20,12 +25,47 @@ VAHAN_DASHBOARD_URL = (
 )
 VAHAN_HEADLESS_ENV_VAR = "VAHAN_HEADLESS"
 HEADLESS_FALSE_VALUES = {"0", "false", "no", "off"}
+TRUTHY_VALUES = {"1", "true", "yes", "on"}
+CHROMEDRIVER_PATH_ENV_VAR = "VAHAN_CHROMEDRIVER_PATH"
+CHROMEDRIVER_OFFLINE_ENV_VAR = "VAHAN_CHROMEDRIVER_OFFLINE"
+CHROMEDRIVER_BINARY_NAMES = ("chromedriver", "chromedriver.exe")
+WEBDRIVER_MANAGER_CACHE_ROOT = os.path.join(
+    os.path.expanduser("~"), ".wdm", "drivers", "chromedriver"
+)
 BLOCKED_PAGE_TITLE = "Access Forbidden"
 BLOCKED_PAGE_MARKERS = (
     "Access Forbidden",
     "You don’t have permission to access this page",
     "You don't have permission to access this page",
 )
+BLANK_PAGE_URL = "about:blank"
+DEFAULT_BROWSER_SESSION_MAX_USES = 25
+MIN_STEP_DELAY_ENV_VAR = "VAHAN_MIN_STEP_DELAY_SECONDS"
+DEFAULT_MIN_STEP_DELAY_SECONDS = 0.5
+DEFAULT_PAGE_SETTLE_TIMEOUT_SECONDS = 30
+# True once jQuery and the PrimeFaces AJAX queue are drained and no blocking
+# overlay (dialog mask / blockUI / status dialog) is visible.
+PRIMEFACES_IDLE_SCRIPT = """
+if (document.readyState !== "complete") { return false; }
+if (window.jQuery && window.jQuery.active > 0) { return false; }
+if (window.PrimeFaces && PrimeFaces.ajax && PrimeFaces.ajax.Queue
+        && !PrimeFaces.ajax.Queue.isEmpty()) { return false; }
+var overlays = document.querySelectorAll(
+    ".ui-widget-overlay, .ui-blockui, .ui-blockui-content, .ui-dialog.ui-overlay-visible[role='alertdialog']"
+);
+for (var i = 0; i < overlays.length; i++) {
+    var style = window.getComputedStyle(overlays[i]);
+    if (style.display !== "none" && style.visibility !== "hidden"
+            && overlays[i].offsetParent !== null) { return false; }
+}
+return true;
+"""
+DROPDOWN_PANEL_VISIBLE_SCRIPT = """
+var panel = document.getElementById(arguments[0]);
+if (!panel) { return false; }
+var style = window.getComputedStyle(panel);
+return style.display !== "none" && style.visibility !== "hidden" && panel.offsetHeight > 0;
+"""
 
 state_lst = STATE_LIST
 
@@ -186,6 +226,318 @@ def configure_chrome_options(browser_options, download_directory=None):
     return browser_options
 
 
+_chromedriver_path_lock = threading.Lock()
+_resolved_chromedriver_path = None
+
+
+def is_truthy(value):
+    return str(value).strip().lower() in TRUTHY_VALUES
+
+
+def load_browser_config():
+    try:
+        return load_config().get("browser") or {}
+    except FileNotFoundError:
+        return {}
+
+
+def find_cached_chromedriver(cache_root=None):
+    """Return the newest chromedriver binary already in the webdriver-manager cache."""
+    candidates = []
+    for directory, _, filenames in os.walk(cache_root or WEBDRIVER_MANAGER_CACHE_ROOT):
+        for filename in filenames:
+            if filename in CHROMEDRIVER_BINARY_NAMES:
+                candidate = os.path.join(directory, filename)
+                candidates.append((os.path.getmtime(candidate), candidate))
+    if not candidates:
+        return None
+    return max(candidates)[1]
+
+
+def install_chromedriver():
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    return ChromeDriverManager().install()
+
+
+def resolve_chromedriver_path(browser_config=None, install_driver=None):
+    """
+    Resolve the chromedriver binary once per process.
+
+    Resolution order: the ``VAHAN_CHROMEDRIVER_PATH`` environment variable or
+    ``browser.chromedriver_path`` in config.yaml, then the newest cached
+    binary when offline mode is enabled, then webdriver-manager. The result
+    is memoized so concurrent scraper tasks never repeat the lookup.
+    """
+    global _resolved_chromedriver_path
+
+    with _chromedriver_path_lock:
+        if _resolved_chromedriver_path:
+            return _resolved_chromedriver_path
+
+        if browser_config is None:
+            browser_config = load_browser_config()
+
+        override_path = os.getenv(CHROMEDRIVER_PATH_ENV_VAR) or browser_config.get(
+            "chromedriver_path"
+        )
+        offline_mode = is_truthy(
+            os.getenv(
+                CHROMEDRIVER_OFFLINE_ENV_VAR,
+                browser_config.get("chromedriver_offline", False),
+            )
+        )
+
+        if override_path:
+            if not os.path.exists(override_path):
+                raise FileNotFoundError(
+                    f"Configured chromedriver binary does not exist: {override_path}"
+                )
+            driver_path = override_path
+            source = "override"
+        elif offline_mode:
+            driver_path = find_cached_chromedriver()
+            if not driver_path:
+                raise FileNotFoundError(
+                    "Offline chromedriver mode is enabled but no cached binary was "
+                    f"found under {WEBDRIVER_MANAGER_CACHE_ROOT}"
+                )
+            source = "offline_cache"
+        else:
+            driver_path = (install_driver or install_chromedriver)()
+            source = "webdriver_manager"
+
+        logging.info(
+            "Resolved chromedriver binary source=%s path=%s", source, driver_path
+        )
+        _resolved_chromedriver_path = driver_path
+        return driver_path
+
+
+def clear_resolved_chromedriver_path():
+    global _resolved_chromedriver_path
+
+    with _chromedriver_path_lock:
+        _resolved_chromedriver_path = None
+
+
+def create_chrome_driver(download_directory=None):
+    """Launch a Chrome session configured with the shared Vahan browser policy."""
+    # Imported lazily so helpers in this module stay importable in CI, where
+    # only the selenium test stubs are available.
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    browser_options = webdriver.ChromeOptions()
+    configure_chrome_options(browser_options, download_directory)
+    return webdriver.Chrome(
+        service=Service(resolve_chromedriver_path()), options=browser_options
+    )
+
+
+def set_download_directory(driver, download_directory):
+    """Point an already running Chrome session at a new download directory."""
+    driver.execute_cdp_cmd(
+        "Page.setDownloadBehavior",
+        {"behavior": "allow", "downloadPath": str(download_directory)},
+    )
+
+
+def reset_browser_session(driver):
+    """Drop page and cookie state so the next lease starts a fresh JSF session."""
+    driver.get(BLANK_PAGE_URL)
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+
+
+# Errors after which a browser cannot be reset and leased again.
+DEAD_SESSION_EXCEPTIONS = (InvalidSessionIdException, NoSuchWindowException)
+
+
+def is_dead_session_error(exc):
+    """Whether ``exc``, or an exception it wraps, means the browser session is gone."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, DEAD_SESSION_EXCEPTIONS):
+            return True
+        seen.add(id(exc))
+        exc = getattr(exc, "original_exception", None) or exc.__cause__ or exc.__context__
+    return False
+
+
+class _PooledBrowserSession:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+
+
+class BrowserSessionPool:
+    """
+    Bounded pool of warm Chrome sessions leased to scraper tasks.
+
+    Sessions are created lazily up to ``max_sessions``. Each lease resets the
+    page state and rotates the download directory through CDP, and sessions
+    are quit after ``max_uses_per_session`` leases, when a lease ends with
+    one of the ``recycle_on`` exceptions (a blocked page by default), or when
+    the browser session died during the lease.
+    """
+
+    def __init__(
+        self,
+        max_sessions,
+        *,
+        max_uses_per_session=DEFAULT_BROWSER_SESSION_MAX_USES,
+        driver_factory=None,
+        recycle_on=(BlockedPageError,),
+    ):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1.")
+        self.max_sessions = max_sessions
+        self.max_uses_per_session = max_uses_per_session
+        self.driver_factory = driver_factory or create_chrome_driver
+        self.recycle_on = tuple(recycle_on)
+        self._condition = threading.Condition()
+        self._idle_sessions = []
+        self._session_count = 0
+        self._closed = False
+
+    @property
+    def session_count(self):
+        with self._condition:
+            return self._session_count
+
+    def _acquire_slot(self):
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser session pool is closed.")
+                if self._idle_sessions:
+                    return self._idle_sessions.pop()
+                if self._session_count < self.max_sessions:
+                    self._session_count += 1
+                    return None
+                self._condition.wait()
+
+    def _create_session(self):
+        try:
+            return _PooledBrowserSession(self.driver_factory())
+        except Exception:
+            with self._condition:
+                self._session_count -= 1
+                self._condition.notify()
+            raise
+
+    @staticmethod
+    def _quit(session, reason):
+        try:
+            session.driver.quit()
+        except Exception as exc:
+            logging.warning(
+                "Failed to quit pooled browser session reason=%s error=%s",
+                reason,
+                summarize_exception(exc),
+            )
+
+    def _discard(self, session, reason):
+        self._quit(session, reason)
+        with self._condition:
+            self._session_count -= 1
+            self._condition.notify()
+
+    def _release(self, session):
+        if session.uses >= self.max_uses_per_session:
+            self._discard(session, "max_uses_reached")
+            return
+
+        with self._condition:
+            if not self._closed:
+                self._idle_sessions.append(session)
+                self._condition.notify()
+                return
+        self._discard(session, "pool_closed")
+
+    def _prepare_session(self, session, download_directory):
+        if session is None:
+            session = self._create_session()
+        else:
+            try:
+                reset_browser_session(session.driver)
+            except Exception as exc:
+                logging.warning(
+                    "Replacing pooled browser session that failed to reset error=%s",
+                    summarize_exception(exc),
+                )
+                self._quit(session, "reset_failed")
+                session = self._create_session()
+
+        if download_directory:
+            try:
+                set_download_directory(session.driver, download_directory)
+            except Exception:
+                self._discard(session, "download_directory_failed")
+                raise
+        return session
+
+    @contextmanager
+    def lease(self, download_directory=None):
+        """
+        Lease a warm browser session for the duration of a ``with`` block.
+
+        :param download_directory: Optional directory Chrome should save
+            downloads into for this lease.
+        :return: Selenium WebDriver instance.
+        """
+        session = self._prepare_session(self._acquire_slot(), download_directory)
+        session.uses += 1
+        try:
+            yield session.driver
+        except self.recycle_on:
+            self._discard(session, "recycle_on_error")
+            raise
+        except BaseException as exc:
+            if is_dead_session_error(exc):
+                self._discard(session, "dead_session")
+            else:
+                self._release(session)
+            raise
+        else:
+            self._release(session)
+
+    def trim_idle(self, keep_sessions):
+        """Quit idle sessions beyond ``keep_sessions`` total, e.g. after concurrency backs off."""
+        with self._condition:
+            surplus = max(0, self._session_count - max(0, keep_sessions))
+            trimmed_sessions = self._idle_sessions[:surplus]
+            del self._idle_sessions[:surplus]
+
+        for session in trimmed_sessions:
+            self._discard(session, "trimmed")
+        return len(trimmed_sessions)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idle_sessions = list(self._idle_sessions)
+            self._idle_sessions.clear()
+            self._condition.notify_all()
+
+        for session in idle_sessions:
+            self._discard(session, "pool_closed")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def compute_file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as report_file:
+        for chunk in iter(lambda: report_file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def is_valid_excel_download(file_path):
     if not os.path.exists(file_path):
         return False
@@ -389,6 +741,135 @@ def open_page(driver, url, step="initial_page_load", context=None):
         )
 
 
+@lru_cache(maxsize=1)
+def _load_browser_config_once():
+    # Read per form step, so avoid re-parsing config.yaml on every click.
+    return load_browser_config()
+
+
+def get_min_step_delay_seconds(browser_config=None):
+    """
+    Politeness floor slept after every form click, before polling for idle, read from
+    VAHAN_MIN_STEP_DELAY_SECONDS or ``browser.min_step_delay_seconds``.
+    """
+    configured = os.getenv(MIN_STEP_DELAY_ENV_VAR)
+    if configured is None:
+        if browser_config is None:
+            browser_config = _load_browser_config_once()
+        configured = browser_config.get("min_step_delay_seconds")
+    if configured in (None, ""):
+        return DEFAULT_MIN_STEP_DELAY_SECONDS
+    return max(0.0, float(configured))
+
+
+class StepTimings:
+    """Per-task record of how long each form step took to settle."""
+
+    def __init__(self):
+        self.durations = {}
+
+    def record(self, step, seconds):
+        self.durations[step] = self.durations.get(step, 0.0) + seconds
+
+    @property
+    def total_seconds(self):
+        return sum(self.durations.values())
+
+    def format(self):
+        return ",".join(
+            f"{step}={seconds:.2f}s" for step, seconds in self.durations.items()
+        )
+
+
+def _evaluate_wait_script(driver, script, *args):
+    try:
+        return bool(driver.execute_script(script, *args)), None
+    except Exception as e:
+        # Scripts can fail transiently while PrimeFaces swaps the DOM.
+        return False, e
+
+
+def wait_for_page_settle(
+    driver,
+    step=None,
+    context=None,
+    panel_id=None,
+    timings=None,
+    timeout=DEFAULT_PAGE_SETTLE_TIMEOUT_SECONDS,
+    poll_interval_seconds=0.1,
+    min_delay_seconds=None,
+):
+    """
+    Wait for the PrimeFaces page to go idle after a click, replacing fixed
+    sleeps between form steps.
+
+    Parameters:
+    - driver: Selenium WebDriver instance.
+    - step: Semantic step name used for timings and failure logs.
+    - context: Optional dict with pipeline metadata like state/month/year.
+    - panel_id: Optional dropdown panel id (e.g. "yaxisVar_panel") that must
+      be visible before the next click.
+    - timings: Optional StepTimings collecting the settle duration per step.
+    - min_delay_seconds: Minimum time spent per step; defaults to the
+      configured pacing floor so the site is never hit faster than that.
+      It is slept before the first idle poll, giving the click's AJAX request
+      time to start so an idle check cannot pass before it is in flight.
+    """
+    if min_delay_seconds is None:
+        min_delay_seconds = get_min_step_delay_seconds()
+
+    started_at = time.monotonic()
+    deadline = started_at + timeout
+    if min_delay_seconds > 0:
+        time.sleep(min_delay_seconds)
+    last_error = None
+    while True:
+        idle, last_error = _evaluate_wait_script(driver, PRIMEFACES_IDLE_SCRIPT)
+        if idle and panel_id:
+            idle, last_error = _evaluate_wait_script(
+                driver,
+                DROPDOWN_PANEL_VISIBLE_SCRIPT,
+                panel_id,
+            )
+        if idle:
+            break
+        if time.monotonic() >= deadline:
+            exc = TimeoutError(
+                f"Page did not settle within {timeout} seconds"
+                + (f" (last error: {summarize_exception(last_error)})" if last_error else "")
+            )
+            identifier = "panel" if panel_id else "page_state"
+            value = panel_id or "primefaces_idle"
+            diagnostics = capture_browser_diagnostics(
+                driver=driver,
+                step=step,
+                identifier=identifier,
+                value=value,
+                context=context,
+                exc=exc,
+            )
+            logging.error(
+                "Selenium page settle timed out step=%s wait=%s context=%s diagnostics=%s error=%s",
+                step or "unknown_step",
+                value,
+                format_log_context(context),
+                diagnostics.get("metadata_path", ""),
+                summarize_exception(exc),
+            )
+            raise SeleniumStepError(
+                step=step,
+                identifier=identifier,
+                value=value,
+                context=context,
+                original_exception=exc,
+                diagnostics=diagnostics,
+            ) from exc
+        time.sleep(poll_interval_seconds)
+
+    if timings is not None:
+        timings.record(step or "unknown_step", time.monotonic() - started_at)
+
+
 def find_element(driver, identifier, value, timeout=10, step=None, context=None):
     """
     Find and return a web element based on the identifier (ID, CSS, or XPath).
@@ -0,0 +1,461 @@
+"""
+Catalogue of the labels the Vahan dashboard currently offers.
+
+One browser session reads the state dropdown, the OEM vehicle-category
+filter, the year dropdown and the month labels of the latest report, and the
+result is persisted to a versioned JSON file. Scrapers validate their task
+grids against it before launching downloads so no browser time is spent on
+labels that no longer exist on the site.
+"""
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+
+from pipeline_logging import configure_pipeline_logging
+from utils import (
+    BlockedPageError,
+    BrowserSessionPool,
+    SeleniumStepError,
+    StepTimings,
+    VAHAN_DASHBOARD_URL,
+    find_element,
+    format_log_context,
+    is_dead_session_error,
+    load_browser_config,
+    open_page,
+    resolve_chromedriver_path,
+    summarize_exception,
+    wait_for_page_settle,
+)
+
+CATALOGUE_PATH_ENV_VAR = "VAHAN_CATALOGUE_PATH"
+CATALOGUE_TTL_ENV_VAR = "VAHAN_CATALOGUE_TTL_HOURS"
+DEFAULT_CATALOGUE_PATH = "vahan_catalogue.json"
+DEFAULT_CATALOGUE_TTL_HOURS = 24
+# 2: months_year is the year selected in the default view, not max(years).
+CATALOGUE_SCHEMA_VERSION = 2
+STATE_DROPDOWN_DEFAULT_LABEL = "All Vahan4 Running States"
+REFRESH_BUTTON_CSS = (
+    "button[class='ui-button ui-widget ui-state-default ui-corner-all ui-button-text-icon-left button']"
+)
+
+
+@dataclass
+class VahanCatalogue:
+    """Labels offered by the dashboard at ``discovered_at``."""
+
+    states: list
+    vehicle_categories: list
+    years: list
+    months: list
+    months_year: str = ""
+    version: int = 0
+    content_sha256: str = ""
+    discovered_at: str = ""
+    schema_version: int = CATALOGUE_SCHEMA_VERSION
+
+    def compute_content_sha256(self):
+        content = {
+            "states": self.states,
+            "vehicle_categories": self.vehicle_categories,
+            "years": self.years,
+            "months": self.months,
+            "months_year": self.months_year,
+        }
+        return hashlib.sha256(
+            json.dumps(content, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def has_state(self, state):
+        # Dropdown labels carry a suffix, e.g. "Goa(12)"; the scrapers match
+        # them with starts-with, so do the same here.
+        return any(label.startswith(state) for label in self.states)
+
+    def invalid_reason(self, state=None, year=None, month=None, category=None):
+        """Return why a task's labels are not on the site, or None."""
+        if state is not None and self.states and not self.has_state(state):
+            return f"state {state!r} is not in the state dropdown"
+        if category is not None and self.vehicle_categories and category not in self.vehicle_categories:
+            return f"vehicle category {category!r} is not in the VhClass filter"
+        if year is not None and self.years and str(year) not in self.years:
+            return f"year {year} is not in the year dropdown"
+        if (
+            month is not None
+            and self.months
+            and str(year) == self.months_year
+            and month not in self.months
+        ):
+            return f"month {month} is not yet published for {year}"
+        return None
+
+    def validate_tasks(self, parameters, fields):
+        """
+        Split task tuples into those the site can serve and those it cannot.
+
+        :param fields: name of each tuple position, e.g.
+            ``("state", "rto", "year", "month")``; positions named other than
+            state/year/month/category are not checked.
+        :return: (valid_parameters, [(task, reason), ...])
+        """
+        checked_fields = {"state", "year", "month", "category"}
+        valid = []
+        invalid = []
+        for task in parameters:
+            labels = {
+                name: value
+                for name, value in zip(fields, task)
+                if name in checked_fields
+            }
+            reason = self.invalid_reason(**labels)
+            if reason:
+                invalid.append((task, reason))
+            else:
+                valid.append(task)
+        return valid, invalid
+
+
+def get_catalogue_path():
+    return os.getenv(CATALOGUE_PATH_ENV_VAR) or DEFAULT_CATALOGUE_PATH
+
+
+def get_catalogue_ttl_hours(browser_config=None):
+    """
+    Hours a saved catalogue is reused before it is rediscovered, read from
+    VAHAN_CATALOGUE_TTL_HOURS or ``browser.catalogue_ttl_hours``.
+    """
+    configured = os.getenv(CATALOGUE_TTL_ENV_VAR)
+    if configured is None:
+        if browser_config is None:
+            browser_config = load_browser_config()
+        configured = browser_config.get("catalogue_ttl_hours")
+    if configured in (None, ""):
+        return DEFAULT_CATALOGUE_TTL_HOURS
+    return max(0.0, float(configured))
+
+
+def load_catalogue(catalogue_path=None):
+    catalogue_path = catalogue_path or get_catalogue_path()
+    if not os.path.exists(catalogue_path):
+        return None
+    try:
+        with open(catalogue_path, "r", encoding="utf-8") as catalogue_file:
+            payload = json.load(catalogue_file)
+    except json.JSONDecodeError:
+        logging.error("Vahan catalogue %s is corrupted. Ignoring it.", catalogue_path)
+        return None
+    if payload.get("schema_version") != CATALOGUE_SCHEMA_VERSION:
+        logging.warning(
+            "Vahan catalogue %s has schema_version=%s; expected %s. Ignoring it.",
+            catalogue_path,
+            payload.get("schema_version"),
+            CATALOGUE_SCHEMA_VERSION,
+        )
+        return None
+    known_fields = set(VahanCatalogue.__dataclass_fields__)
+    return VahanCatalogue(**{key: value for key, value in payload.items() if key in known_fields})
+
+
+def save_catalogue(catalogue, catalogue_path=None, previous=None):
+    """
+    Persist ``catalogue``, bumping its version whenever the labels differ
+    from ``previous``.
+    """
+    catalogue_path = catalogue_path or get_catalogue_path()
+    catalogue.content_sha256 = catalogue.compute_content_sha256()
+    if previous is None:
+        catalogue.version = 1
+    elif previous.content_sha256 != catalogue.content_sha256:
+        catalogue.version = previous.version + 1
+        logging.warning(
+            "Vahan catalogue changed version=%s added_states=%s removed_states=%s added_categories=%s removed_categories=%s",
+            catalogue.version,
+            sorted(set(catalogue.states) - set(previous.states)),
+            sorted(set(previous.states) - set(catalogue.states)),
+            sorted(set(catalogue.vehicle_categories) - set(previous.vehicle_categories)),
+            sorted(set(previous.vehicle_categories) - set(catalogue.vehicle_categories)),
+        )
+    else:
+        catalogue.version = previous.version
+
+    temporary_path = f"{catalogue_path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as catalogue_file:
+        json.dump(asdict(catalogue), catalogue_file, indent=4)
+    os.replace(temporary_path, catalogue_path)
+    return catalogue
+
+
+def is_catalogue_fresh(catalogue, ttl_hours, now=None):
+    if catalogue is None or not catalogue.discovered_at:
+        return False
+    now = now or datetime.now(timezone.utc)
+    return now - datetime.fromisoformat(catalogue.discovered_at) < timedelta(hours=ttl_hours)
+
+
+def read_option_labels(browser, items_id, step, context):
+    """Read every option of a PrimeFaces dropdown, including hidden panels."""
+    items_xpath = f"//ul[@id='{items_id}']/li"
+    labels = [
+        (item.get_attribute("textContent") or "").strip()
+        for item in browser.find_elements(By.XPATH, items_xpath)
+    ]
+    labels = [label for label in labels if label]
+    if not labels:
+        raise SeleniumStepError(
+            step=step,
+            identifier="xpath",
+            value=items_xpath,
+            context=context,
+            original_exception=ValueError("dropdown has no options"),
+        )
+    return labels
+
+
+def read_catalogue(browser, context, timings=None):
+    """Walk one loaded dashboard page and return its VahanCatalogue."""
+    open_page(
+        browser,
+        VAHAN_DASHBOARD_URL,
+        step="initial_page_load",
+        context=context,
+    )
+    wait_for_page_settle(
+        browser,
+        step="initial_page_load",
+        context=context,
+        timings=timings,
+    )
+
+    state_label_id = find_element(
+        browser,
+        "xpath",
+        f'//label[starts-with(text(), "{STATE_DROPDOWN_DEFAULT_LABEL}")]',
+        step="locate_state_dropdown",
+        context=context,
+    ).get_attribute("id")
+    states = [
+        label
+        for label in read_option_labels(
+            browser,
+            state_label_id.rsplit("_label", 1)[0] + "_items",
+            step="read_state_options",
+            context=context,
+        )
+        if not label.startswith(STATE_DROPDOWN_DEFAULT_LABEL)
+    ]
+    years = read_option_labels(
+        browser,
+        "selectedYear_items",
+        step="read_year_options",
+        context=context,
+    )
+
+    find_element(
+        browser,
+        "id",
+        "filterLayout-toggler",
+        step="open_vehicle_category_filter",
+        context=context,
+    ).click()
+    wait_for_page_settle(
+        browser,
+        step="open_vehicle_category_filter",
+        context=context,
+        timings=timings,
+    )
+    category_table = find_element(
+        browser,
+        "xpath",
+        '//table[@id="VhClass"]/tbody',
+        step="read_vehicle_category_table",
+        context=context,
+    )
+    vehicle_categories = [
+        row.text for row in category_table.find_elements(By.TAG_NAME, "tr")
+    ]
+
+    # Month labels only render with a report, so refresh the default view.
+    find_element(
+        browser,
+        "css",
+        REFRESH_BUTTON_CSS,
+        step="click_main_refresh",
+        context=context,
+    ).click()
+    wait_for_page_settle(
+        browser,
+        step="click_main_refresh",
+        context=context,
+        timings=timings,
+    )
+    months = read_option_labels(
+        browser,
+        "groupingTable:selectMonth_items",
+        step="read_month_options",
+        context=context,
+    )
+    # The month labels belong to the year the default view selected. If that
+    # label cannot be read as one of the offered years, leave months_year
+    # empty so no task is rejected for an unpublished month.
+    selected_year = (
+        find_element(
+            browser,
+            "id",
+            "selectedYear_label",
+            step="read_selected_year",
+            context=context,
+        ).text
+        or ""
+    ).strip()
+
+    return VahanCatalogue(
+        states=states,
+        vehicle_categories=[category for category in vehicle_categories if category],
+        years=years,
+        months=months,
+        months_year=selected_year if selected_year in years else "",
+        discovered_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    )
+
+
+def discover_catalogue(session_pool, max_retries=5, retry_delay=15):
+    """Discover the catalogue in a single leased browser session."""
+    context = {"pipeline": "catalogue", "action": "discover_catalogue"}
+    with session_pool.lease() as browser:
+        retries = 0
+        last_exception = None
+        while retries < max_retries:
+            timings = StepTimings()
+            try:
+                catalogue = read_catalogue(browser, context, timings)
+                logging.info(
+                    "Discovered Vahan catalogue states=%s vehicle_categories=%s years=%s months=%s settle_seconds=%.1f",
+                    len(catalogue.states),
+                    len(catalogue.vehicle_categories),
+                    len(catalogue.years),
+                    len(catalogue.months),
+                    timings.total_seconds,
+                )
+                return catalogue
+            except BlockedPageError as e:
+                logging.error(
+                    "Vahan catalogue discovery blocked context=%s page_title=%s diagnostics=%s error=%s",
+                    format_log_context(context),
+                    e.page_title,
+                    e.diagnostics.get("metadata_path", ""),
+                    e,
+                )
+                raise
+            except (
+                SeleniumStepError,
+                TimeoutException,
+                StaleElementReferenceException,
+                WebDriverException,
+            ) as e:
+                if is_dead_session_error(e):
+                    raise
+                last_exception = e
+                retries += 1
+                logging.warning(
+                    "Retrying Vahan catalogue discovery attempt=%s/%s failed_step=%s error=%s",
+                    retries,
+                    max_retries,
+                    getattr(e, "step", "discover_catalogue"),
+                    summarize_exception(e),
+                )
+                time.sleep(retry_delay)
+
+        raise last_exception
+
+
+def load_or_discover_catalogue(session_pool, ttl_hours=None, catalogue_path=None, force=False):
+    """
+    Return the saved catalogue while it is within its TTL, otherwise
+    rediscover it. If discovery fails the last saved catalogue (or None) is
+    returned so scrapers can still run without validation.
+    """
+    previous = load_catalogue(catalogue_path)
+    if ttl_hours is None:
+        ttl_hours = get_catalogue_ttl_hours()
+    if not force and is_catalogue_fresh(previous, ttl_hours):
+        logging.info(
+            "Using cached Vahan catalogue version=%s discovered_at=%s",
+            previous.version,
+            previous.discovered_at,
+        )
+        return previous
+
+    try:
+        catalogue = discover_catalogue(session_pool)
+    except Exception as e:
+        logging.error(
+            "Vahan catalogue discovery failed; %s. error=%s",
+            "falling back to the saved catalogue" if previous else "task grids will not be validated",
+            summarize_exception(getattr(e, "original_exception", e)),
+        )
+        return previous
+    return save_catalogue(catalogue, catalogue_path, previous=previous)
+
+
+def filter_task_grid(catalogue, parameters, fields, pipeline):
+    """
+    Drop tasks whose labels the catalogue does not list, logging what was
+    skipped. Without a catalogue every task is kept, and so is the full grid
+    when the catalogue would reject every task: a cached catalogue can
+    predate the month being published, and a run that downloads nothing
+    must not look like a success.
+    """
+    parameters = list(parameters)
+    if catalogue is None:
+        return parameters
+    valid, invalid = catalogue.validate_tasks(parameters, fields)
+    if not invalid:
+        return valid
+    sample_task, sample_reason = invalid[0]
+    if not valid:
+        logging.error(
+            "Vahan catalogue version=%s discovered_at=%s rejects all %s %s tasks; keeping the full task grid. Example: task=%s reason=%s",
+            catalogue.version,
+            catalogue.discovered_at,
+            len(invalid),
+            pipeline,
+            sample_task,
+            sample_reason,
+        )
+        return parameters
+    logging.error(
+        "Skipped %s %s tasks not offered by the Vahan catalogue version=%s. Example: task=%s reason=%s",
+        len(invalid),
+        pipeline,
+        catalogue.version,
+        sample_task,
+        sample_reason,
+    )
+    return valid
+
+
+def main():
+    configure_pipeline_logging()
+    resolve_chromedriver_path()
+    session_pool = BrowserSessionPool(max_sessions=1)
+    try:
+        catalogue = load_or_discover_catalogue(session_pool, force=True)
+    finally:
+        session_pool.close()
+    if catalogue is None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Browser-free fetch engine for the Vahan dashboard.
+
+The dashboard is a JSF/PrimeFaces page: every dropdown change is an AJAX form
+POST carrying the current ``javax.faces.ViewState`` and the XLSX export is a
+plain form POST of the same fields. ``VahanJsfFetcher`` replays those posts
+with a cookie-aware urllib opener and streams the workbook straight to disk.
+
+Any sign that the page no longer looks like what the replay expects (missing
+fields, unknown options, JSF error responses, non-XLSX downloads) raises
+``JsfDriftError``; an access block raises ``JsfBlockedError``. Callers keep the
+Selenium flow as a fallback for both.
+"""
+import http.cookiejar
+import os
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from html.parser import HTMLParser
+from urllib import error, parse, request
+
+from utils import (
+    BLOCKED_PAGE_MARKERS,
+    BLOCKED_PAGE_TITLE,
+    VAHAN_DASHBOARD_URL,
+    create_directory_if_not_exists,
+    load_browser_config,
+)
+
+FETCH_ENGINE_ENV_VAR = "VAHAN_FETCH_ENGINE"
+SELENIUM_FETCH_ENGINE = "selenium"
+HTTP_FETCH_ENGINE = "http"
+FETCH_ENGINES = {SELENIUM_FETCH_ENGINE, HTTP_FETCH_ENGINE}
+VIEW_STATE_FIELD = "javax.faces.ViewState"
+STATE_SELECT_PREFIX = "All Vahan4 Running States"
+RTO_SELECT_PREFIX = "All Vahan4 Running Office"
+Y_AXIS_FIELD = "yaxisVar_input"
+X_AXIS_FIELD = "xaxisVar_input"
+YEAR_FIELD = "selectedYear_input"
+MONTH_FIELD = "groupingTable:selectMonth_input"
+XLS_BUTTON_ID = "groupingTable:xls"
+REFRESH_BUTTON_CLASS = (
+    "ui-button ui-widget ui-state-default ui-corner-all ui-button-text-icon-left button"
+)
+DEFAULT_HTTP_TIMEOUT_SECONDS = 60
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+
+class JsfFetchError(RuntimeError):
+    def __init__(self, step, message):
+        self.step = step
+        super().__init__(f"step={step} {message}")
+
+
+class JsfDriftError(JsfFetchError):
+    """The page no longer matches the recorded form structure."""
+
+
+class JsfBlockedError(JsfFetchError):
+    """The site refused the request (403 or the Access Forbidden page)."""
+
+
+def get_fetch_engine(browser_config=None):
+    engine = os.getenv(FETCH_ENGINE_ENV_VAR)
+    if not engine:
+        if browser_config is None:
+            browser_config = load_browser_config()
+        engine = browser_config.get("fetch_engine") or SELENIUM_FETCH_ENGINE
+    engine = str(engine).strip().lower()
+    if engine not in FETCH_ENGINES:
+        raise ValueError(
+            f"Unsupported fetch engine '{engine}'. Use one of: {', '.join(sorted(FETCH_ENGINES))}."
+        )
+    return engine
+
+
+def normalize_label(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+class _JsfMarkupParser(HTMLParser):
+    """Collects the form fields, select options and buttons from a page or fragment."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.form_id = None
+        self.title = ""
+        self.inputs = {}
+        self.selects = {}
+        self.selected_values = {}
+        self.buttons = []
+        self._current_select = None
+        self._current_option = None
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form" and self.form_id is None and attrs.get("id"):
+            self.form_id = attrs["id"]
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "input" and attrs.get("name"):
+            input_type = attrs.get("type", "text")
+            if input_type in {"submit", "button", "image"}:
+                return
+            if input_type in {"checkbox", "radio"} and "checked" not in attrs:
+                return
+            self.inputs[attrs["name"]] = attrs.get("value", "")
+        elif tag == "select" and attrs.get("name"):
+            self._current_select = attrs["name"]
+            self.selects[self._current_select] = []
+        elif tag == "option" and self._current_select is not None:
+            self._current_option = {
+                "value": attrs.get("value"),
+                "label": "",
+                "selected": "selected" in attrs,
+            }
+        elif tag == "button" and attrs.get("id"):
+            self.buttons.append(
+                {"id": attrs["id"], "class": normalize_label(attrs.get("class"))}
+            )
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "option" and self._current_option is not None:
+            option = self._current_option
+            option["label"] = normalize_label(option["label"])
+            if option["value"] is None:
+                option["value"] = option["label"]
+            self.selects[self._current_select].append(option)
+            if option["selected"]:
+                self.selected_values[self._current_select] = option["value"]
+            self._current_option = None
+        elif tag == "select":
+            self._current_select = None
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        if self._current_option is not None:
+            self._current_option["label"] += data
+
+
+class VahanJsfFetcher:
+    """
+    Replays the dashboard form posts for one report at a time.
+
+    An instance keeps its own cookie jar and view state, so use one per thread.
+    """
+
+    def __init__(self, base_url=VAHAN_DASHBOARD_URL, timeout=DEFAULT_HTTP_TIMEOUT_SECONDS, opener=None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.opener = opener or request.build_opener(
+            request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+        self.form_id = None
+        self.fields = {}
+        self.options = {}
+        self.buttons = []
+
+    def _open(self, step, data=None, headers=None):
+        encoded = parse.urlencode(data).encode("utf-8") if data is not None else None
+        http_request = request.Request(
+            self.base_url,
+            data=encoded,
+            headers={"User-Agent": USER_AGENT, **(headers or {})},
+        )
+        try:
+            return self.opener.open(http_request, timeout=self.timeout)
+        except error.HTTPError as e:
+            if e.code == 403:
+                raise JsfBlockedError(step, "blocked_by_site=true status=403") from e
+            raise JsfDriftError(step, f"unexpected HTTP status={e.code}") from e
+        except (error.URLError, OSError) as e:
+            raise JsfFetchError(step, f"request failed error={e}") from e
+
+    @staticmethod
+    def _check_blocked(step, body, title=""):
+        if normalize_label(title) == BLOCKED_PAGE_TITLE:
+            raise JsfBlockedError(step, "blocked_by_site=true page_title_access_forbidden")
+        for marker in BLOCKED_PAGE_MARKERS:
+            if marker in body:
+                raise JsfBlockedError(step, f"blocked_by_site=true marker={marker}")
+
+    def _absorb_markup(self, markup):
+        parser = _JsfMarkupParser()
+        parser.feed(markup)
+        if parser.form_id and self.form_id is None:
+            self.form_id = parser.form_id
+        for name, value in parser.inputs.items():
+            self.fields[name] = value
+        for name, options in parser.selects.items():
+            self.options[name] = options
+            self.fields[name] = parser.selected_values.get(
+                name,
+                options[0]["value"] if options else "",
+            )
+        known_ids = {button["id"] for button in self.buttons}
+        self.buttons.extend(
+            button for button in parser.buttons if button["id"] not in known_ids
+        )
+        return parser
+
+    def load(self):
+        step = "initial_page_load"
+        with self._open(step) as response:
+            body = response.read().decode("utf-8", errors="replace")
+        self.form_id = None
+        self.fields = {}
+        self.options = {}
+        self.buttons = []
+        parser = self._absorb_markup(body)
+        self._check_blocked(step, body, parser.title)
+        if not self.form_id or VIEW_STATE_FIELD not in self.fields:
+            raise JsfDriftError(step, "dashboard form or view state not found")
+
+    def _find_select(self, step, field):
+        if field in self.options:
+            return field
+        # State and RTO selects have generated ids, so match them by their
+        # placeholder option instead.
+        for name, options in self.options.items():
+            if options and options[0]["label"].startswith(field):
+                return name
+        raise JsfDriftError(step, f"select not found field={field}")
+
+    def _post_partial(self, step, source, extra=None, event="change"):
+        payload = dict(self.fields)
+        payload.update(
+            {
+                "javax.faces.partial.ajax": "true",
+                "javax.faces.source": source,
+                "javax.faces.partial.execute": "@all",
+                "javax.faces.partial.render": "@form",
+                self.form_id: self.form_id,
+            }
+        )
+        if event:
+            payload["javax.faces.behavior.event"] = event
+            payload["javax.faces.partial.event"] = event
+        payload.update(extra or {})
+
+        with self._open(step, payload, {"Faces-Request": "partial/ajax"}) as response:
+            body = response.read().decode("utf-8", errors="replace")
+        self._check_blocked(step, body)
+        try:
+            root = ET.fromstring(body)
+        except ET.ParseError as e:
+            raise JsfDriftError(step, "response is not a JSF partial response") from e
+        if root.tag != "partial-response":
+            raise JsfDriftError(step, f"unexpected response root={root.tag}")
+        for node in root.iter():
+            if node.tag in {"error", "redirect"}:
+                raise JsfDriftError(step, f"partial response contains <{node.tag}>")
+            if node.tag != "update":
+                continue
+            if VIEW_STATE_FIELD in (node.get("id") or ""):
+                self.fields[VIEW_STATE_FIELD] = (node.text or "").strip()
+            else:
+                self._absorb_markup(node.text or "")
+
+    def select(self, step, field, label=None, prefix=None, contains=None, index=None):
+        """Choose one option of a PrimeFaces select and replay its change event."""
+        name = self._find_select(step, field)
+        options = self.options[name]
+        for position, option in enumerate(options):
+            if (
+                (label is not None and option["label"] == label)
+                or (prefix is not None and option["label"].startswith(prefix))
+                or (contains is not None and contains in option["label"])
+                or (index is not None and position == index)
+            ):
+                self.fields[name] = option["value"]
+                break
+        else:
+            raise JsfDriftError(
+                step,
+                f"option not found field={name} wanted={label or prefix or contains or index}",
+            )
+        component_id = name[: -len("_input")] if name.endswith("_input") else name
+        self._post_partial(step, component_id)
+
+    def refresh(self):
+        step = "click_main_refresh"
+        for button in self.buttons:
+            if button["class"] == REFRESH_BUTTON_CLASS:
+                self._post_partial(
+                    step,
+                    button["id"],
+                    extra={button["id"]: button["id"]},
+                    event=None,
+                )
+                return
+        raise JsfDriftError(step, "refresh button not found")
+
+    def download_report(self, download_directory, filename="reportTable.xlsx"):
+        """Post the XLSX export and stream it to ``download_directory``."""
+        step = "download_report"
+        payload = dict(self.fields)
+        payload.update({self.form_id: self.form_id, XLS_BUTTON_ID: XLS_BUTTON_ID})
+
+        create_directory_if_not_exists(download_directory)
+        report_path = os.path.join(download_directory, filename)
+        partial_path = f"{report_path}.part"
+        try:
+            with self._open(step, payload) as response, open(partial_path, "wb") as report_file:
+                content_type = response.headers.get("Content-Type", "")
+                if content_type.startswith(("text/", "application/xml", "application/xhtml")):
+                    body = response.read().decode("utf-8", errors="replace")
+                    self._check_blocked(step, body)
+                    raise JsfDriftError(step, f"export returned content_type={content_type}")
+                while True:
+                    chunk = response.read(DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    report_file.write(chunk)
+            if not zipfile.is_zipfile(partial_path):
+                raise JsfDriftError(step, "export is not an XLSX workbook")
+            os.replace(partial_path, report_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        return report_path
+
+    def _fetch_report(self, selections, month_label, download_directory):
+        self.load()
+        for step, field, matcher in selections:
+            self.select(step, field, **matcher)
+        self.refresh()
+        self.select("select_month", MONTH_FIELD, label=month_label)
+        return self.download_report(download_directory)
+
+    def fetch_state_report(self, state_label, year_label, month_label, download_directory):
+        selections = [
+            ("select_state", STATE_SELECT_PREFIX, {"prefix": state_label}),
+            ("select_y_axis_vehicle_class", Y_AXIS_FIELD, {"index": 1}),
+            ("select_x_axis_fuel", X_AXIS_FIELD, {"label": "Fuel"}),
+            ("select_year", YEAR_FIELD, {"label": str(year_label)}),
+        ]
+        return self._fetch_report(selections, month_label, download_directory)
+
+    def fetch_rto_report(
+        self,
+        state_label,
+        rto_office_code,
+        year_label,
+        month_label,
+        download_directory,
+    ):
+        selections = [
+            ("select_state", STATE_SELECT_PREFIX, {"prefix": state_label}),
+            # Same disambiguation as RTODataScraper.build_rto_option_xpath.
+            ("select_rto_office", RTO_SELECT_PREFIX, {"contains": f" - {rto_office_code}("}),
+            ("select_y_axis_vehicle_class", Y_AXIS_FIELD, {"index": 1}),
+            ("select_x_axis_fuel", X_AXIS_FIELD, {"label": "Fuel"}),
+            ("select_year", YEAR_FIELD, {"label": str(year_label)}),
+        ]
+        return self._fetch_report(selections, month_label, download_directory)
+
@@ -0,0 +1,312 @@
+"""
+Lightweight reader for Vahan ``reportTable.xlsx`` downloads.
+
+The reports are a single sheet of strings and counts, so instead of building
+the openpyxl object model this opens the archive once, validates it, and
+streams ``xl/sharedStrings.xml`` and the first worksheet through expat.
+Rows are produced with the same conventions as pandas' openpyxl reader and
+handed to pandas' ``TextParser``, so headers, ``NaN`` handling and dtypes
+match ``pd.read_excel`` for this layout.
+"""
+from __future__ import annotations
+
+import os
+import posixpath
+import re
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from xml.etree.ElementTree import ParseError, iterparse
+from xml.parsers import expat
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+XLSX_READER_ENV_VAR = "VAHAN_XLSX_READER"
+STREAMING_XLSX_READER = "streaming"
+OPENPYXL_XLSX_READER = "openpyxl"
+XLSX_READERS = (STREAMING_XLSX_READER, OPENPYXL_XLSX_READER)
+
+SPREADSHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+RELATIONSHIP_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_RELATIONSHIP_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+REQUIRED_PARTS = ("[Content_Types].xml", "xl/workbook.xml")
+DEFAULT_SHEET_PART = "xl/worksheets/sheet1.xml"
+# Built-in number formats Excel renders as dates or times.
+BUILTIN_DATE_FORMAT_IDS = frozenset(range(14, 23)) | frozenset(range(45, 48))
+DATE_FORMAT_PATTERN = re.compile(r"[dmyhs]", re.IGNORECASE)
+
+
+class InvalidWorkbookError(ValueError):
+    """The file is not a complete XLSX archive."""
+
+
+class UnsupportedWorkbookError(ValueError):
+    """The workbook uses features this reader leaves to openpyxl."""
+
+
+def get_xlsx_reader():
+    """Return the report reader selected by VAHAN_XLSX_READER (default streaming)."""
+    reader = (os.getenv(XLSX_READER_ENV_VAR) or STREAMING_XLSX_READER).strip().lower()
+    if reader not in XLSX_READERS:
+        raise ValueError(
+            f"Unsupported {XLSX_READER_ENV_VAR}={reader!r}; expected one of {', '.join(XLSX_READERS)}."
+        )
+    return reader
+
+
+def _column_index(letters):
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def _element_text(element):
+    # Rich-text strings split their text across runs; phonetic hints (rPh)
+    # are not part of the displayed value.
+    parts = []
+    for child in element:
+        if child.tag == f"{SPREADSHEET_NS}t":
+            parts.append(child.text or "")
+        elif child.tag == f"{SPREADSHEET_NS}r":
+            parts.extend(run.text or "" for run in child.iter(f"{SPREADSHEET_NS}t"))
+    return "".join(parts)
+
+
+def _read_shared_strings(archive, names):
+    if "xl/sharedStrings.xml" not in names:
+        return []
+    shared_strings = []
+    with archive.open("xl/sharedStrings.xml") as shared_strings_file:
+        for _, element in iterparse(shared_strings_file):
+            if element.tag == f"{SPREADSHEET_NS}si":
+                shared_strings.append(_element_text(element))
+                element.clear()
+    return shared_strings
+
+
+def _read_date_style_ids(archive, names):
+    """Return the cell style indexes whose number format renders as a date."""
+    if "xl/styles.xml" not in names:
+        return frozenset()
+    custom_date_formats = set()
+    date_style_ids = set()
+    with archive.open("xl/styles.xml") as styles_file:
+        in_cell_xfs = False
+        style_index = 0
+        for event, element in iterparse(styles_file, events=("start", "end")):
+            if element.tag == f"{SPREADSHEET_NS}cellXfs":
+                in_cell_xfs = event == "start"
+            elif event == "end" and element.tag == f"{SPREADSHEET_NS}numFmt":
+                # Ignore quoted literals and colour/condition sections.
+                format_code = re.sub(r'"[^"]*"|\[[^\]]*\]', "", element.get("formatCode", ""))
+                if DATE_FORMAT_PATTERN.search(format_code):
+                    custom_date_formats.add(int(element.get("numFmtId", "0")))
+            elif event == "end" and in_cell_xfs and element.tag == f"{SPREADSHEET_NS}xf":
+                number_format_id = int(element.get("numFmtId", "0"))
+                if number_format_id in BUILTIN_DATE_FORMAT_IDS or number_format_id in custom_date_formats:
+                    date_style_ids.add(style_index)
+                style_index += 1
+    return frozenset(date_style_ids)
+
+
+def _first_sheet_part(archive, names):
+    """Resolve the first worksheet listed in workbook.xml."""
+    if "xl/_rels/workbook.xml.rels" not in names:
+        return DEFAULT_SHEET_PART
+    with archive.open("xl/workbook.xml") as workbook_file:
+        first_sheet = next(
+            (
+                element
+                for _, element in iterparse(workbook_file)
+                if element.tag == f"{SPREADSHEET_NS}sheet"
+            ),
+            None,
+        )
+    if first_sheet is None:
+        return DEFAULT_SHEET_PART
+    relationship_id = first_sheet.get(f"{RELATIONSHIP_NS}id")
+    with archive.open("xl/_rels/workbook.xml.rels") as relationships_file:
+        for _, element in iterparse(relationships_file):
+            if (
+                element.tag == f"{PACKAGE_RELATIONSHIP_NS}Relationship"
+                and element.get("Id") == relationship_id
+            ):
+                target = element.get("Target", "")
+                if target.startswith("/"):
+                    return target.lstrip("/")
+                return posixpath.normpath(posixpath.join("xl", target))
+    return DEFAULT_SHEET_PART
+
+
+def _convert_number(text):
+    if text.isdigit():
+        return int(text)
+    value = float(text)
+    if value.is_integer():
+        return int(value)
+    return value
+
+
+class _SheetReader:
+    """
+    expat handlers that turn ``<row>``/``<c>`` elements into row lists,
+    converting cells the way pandas' openpyxl reader does.
+    """
+
+    SHEET_READ_CHUNK_BYTES = 64 * 1024
+
+    def __init__(self, shared_strings, date_style_ids):
+        self.shared_strings = shared_strings
+        self.date_style_ids = date_style_ids
+        self.rows = []
+        self.values = None
+        self.cell_attributes = None
+        self.text_parts = []
+        self.collecting_text = False
+        self.in_inline_string = False
+        self.in_phonetic_run = False
+
+    def parse(self, sheet_file):
+        parser = expat.ParserCreate(namespace_separator="}")
+        parser.buffer_text = True
+        parser.StartElementHandler = self.start_element
+        parser.EndElementHandler = self.end_element
+        parser.CharacterDataHandler = self.character_data
+        while chunk := sheet_file.read(self.SHEET_READ_CHUNK_BYTES):
+            parser.Parse(chunk, False)
+        parser.Parse(b"", True)
+        return self.rows
+
+    def start_element(self, name, attributes):
+        tag = name[name.rfind("}") + 1:]
+        if tag == "c":
+            self.cell_attributes = attributes
+            self.text_parts = []
+        elif tag == "v" or (tag == "t" and self.in_inline_string and not self.in_phonetic_run):
+            self.collecting_text = True
+        elif tag == "is":
+            self.in_inline_string = True
+        elif tag == "rPh":
+            self.in_phonetic_run = True
+        elif tag == "row":
+            row_number = int(attributes.get("r", len(self.rows) + 1))
+            # openpyxl yields empty rows for gaps in the row numbering.
+            while len(self.rows) < row_number - 1:
+                self.rows.append([])
+            self.values = []
+
+    def end_element(self, name):
+        tag = name[name.rfind("}") + 1:]
+        if tag == "c":
+            self.add_cell()
+        elif tag in ("v", "t"):
+            self.collecting_text = False
+        elif tag == "is":
+            self.in_inline_string = False
+        elif tag == "rPh":
+            self.in_phonetic_run = False
+        elif tag == "row":
+            values = self.values
+            while values and values[-1] == "":
+                values.pop()
+            self.rows.append(values)
+            self.values = None
+
+    def character_data(self, data):
+        if self.collecting_text:
+            self.text_parts.append(data)
+
+    def add_cell(self):
+        values = self.values
+        reference = self.cell_attributes.get("r")
+        if reference:
+            column = _column_index(reference.rstrip("0123456789"))
+            if column < len(values):
+                return
+            values.extend([""] * (column - len(values)))
+        values.append(self.convert_cell())
+
+    def convert_cell(self):
+        """Mirror pandas' openpyxl ``_convert_cell`` for the current ``<c>``."""
+        cell_type = self.cell_attributes.get("t", "n")
+        text = "".join(self.text_parts)
+        if cell_type == "inlineStr":
+            return text
+        if not self.text_parts:
+            return ""
+        if cell_type == "s":
+            return self.shared_strings[int(text)]
+        if cell_type == "e":
+            return np.nan
+        if cell_type == "b":
+            return text == "1"
+        if cell_type == "d":
+            return datetime.fromisoformat(text)
+        if cell_type == "str":
+            return text
+        if int(self.cell_attributes.get("s", "0")) in self.date_style_ids:
+            raise UnsupportedWorkbookError("worksheet contains date-formatted numbers")
+        return _convert_number(text)
+
+
+def read_sheet_rows(report_path: str | Path) -> list[list[object]]:
+    """
+    Return the first worksheet as rows of Python values, trimmed and padded
+    the way pandas' openpyxl reader does.
+
+    :raises InvalidWorkbookError: if the file is not a complete XLSX archive
+    :raises UnsupportedWorkbookError: for date-formatted numeric cells
+    """
+    try:
+        with zipfile.ZipFile(report_path) as archive:
+            names = set(archive.namelist())
+            missing_parts = [part for part in REQUIRED_PARTS if part not in names]
+            if missing_parts:
+                raise InvalidWorkbookError(
+                    f"{report_path} is missing {', '.join(missing_parts)}"
+                )
+            sheet_part = _first_sheet_part(archive, names)
+            if sheet_part not in names:
+                raise InvalidWorkbookError(f"{report_path} is missing {sheet_part}")
+
+            shared_strings = _read_shared_strings(archive, names)
+            date_style_ids = _read_date_style_ids(archive, names)
+            with archive.open(sheet_part) as sheet_file:
+                data = _SheetReader(shared_strings, date_style_ids).parse(sheet_file)
+    except (OSError, zipfile.BadZipFile, KeyError, ParseError, expat.ExpatError) as exc:
+        raise InvalidWorkbookError(f"{report_path} is not a readable XLSX archive: {exc}") from exc
+
+    last_row_with_data = max(
+        (row_number for row_number, row in enumerate(data) if row),
+        default=-1,
+    )
+    data = data[: last_row_with_data + 1]
+    if data:
+        max_width = max(len(row) for row in data)
+        data = [row + [""] * (max_width - len(row)) for row in data]
+    return data
+
+
+def read_report_table(
+    report_path: str | Path,
+    skiprows: int = 3,
+    index_col: int | None = 0,
+    thousands: str | None = None,
+) -> pd.DataFrame:
+    """Equivalent of ``pd.read_excel(report_path, skiprows=..., index_col=..., thousands=...)``."""
+    data = read_sheet_rows(report_path)
+    if not data:
+        return pd.DataFrame()
+    parser = TextParser(
+        data,
+        header=0,
+        index_col=index_col,
+        has_index_names=False,
+        skiprows=skiprows,
+        skip_blank_lines=False,
+        thousands=thousands,
+    )
+    return parser.read()